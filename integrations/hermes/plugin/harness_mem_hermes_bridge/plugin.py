@@ -4,39 +4,64 @@ Hooks registered:
     on_session_start(session_id, model, platform, **kwargs)
     on_session_end(session_id, completed, interrupted, model, platform, **kwargs)
 
+The hooks only enqueue work and return immediately; a small pool of background
+threads sends it to the daemon, so Hermes session start/end latency does not
+depend on the daemon (finalize summaries, outages, retries). Work for one
+session runs in the order the hooks fired, and at most one task per session
+runs at a time. When the queue is full new work is dropped with a warning
+rather than blocking Hermes. Pending work is drained at interpreter exit.
+
 Environment variables:
-    HARNESS_MEM_URL          Daemon base URL (default: http://127.0.0.1:37888)
-    HARNESS_MEM_TOKEN        Bearer token forwarded as x-harness-mem-token header
-    HARNESS_MEM_PROJECT_KEY  Project namespace used by finalize_session (default: "default")
+    HARNESS_MEM_URL              Daemon base URL (default: http://127.0.0.1:37888)
+    HARNESS_MEM_TOKEN            Bearer token forwarded as x-harness-mem-token header
+    HARNESS_MEM_PROJECT_KEY      Project namespace used by finalize_session (default: "default")
+    HARNESS_MEM_HOOK_QUEUE_SIZE  Maximum queued hook tasks (default: 256)
+    HARNESS_MEM_HOOK_WORKERS     Background sender threads (default: 2)
+    HARNESS_MEM_HOOK_DRAIN_SEC   Seconds to wait for pending work at exit (default: 10)
 """
 
 from __future__ import annotations
 
+import atexit
+import logging
 import os
-from typing import Any, Optional
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional
 
 from harness_mem import HarnessMemClient
 
 _PLATFORM = "hermes"
 _DEFAULT_BASE_URL = "http://127.0.0.1:37888"
 _DEFAULT_PROJECT = "default"
+_DEFAULT_QUEUE_SIZE = 256
+_DEFAULT_WORKERS = 2
+_DEFAULT_DRAIN_SEC = 10.0
+
+_logger = logging.getLogger("harness_mem_hermes_bridge")
 
 _client: Optional[HarnessMemClient] = None
+_client_lock = threading.Lock()
 
 
 def _get_client() -> HarnessMemClient:
     global _client
-    if _client is None:
-        _client = HarnessMemClient(
-            base_url=os.environ.get("HARNESS_MEM_URL", _DEFAULT_BASE_URL),
-            token=os.environ.get("HARNESS_MEM_TOKEN"),
-        )
-    return _client
+    with _client_lock:
+        if _client is None:
+            _client = HarnessMemClient(
+                base_url=os.environ.get("HARNESS_MEM_URL", _DEFAULT_BASE_URL),
+                token=os.environ.get("HARNESS_MEM_TOKEN"),
+            )
+        return _client
 
 
 def _reset_client_for_testing() -> None:
-    """Reset the lazily-constructed client. Used by the test suite."""
-    global _client
+    """Reset the lazily-constructed client and dispatcher. Used by the test suite."""
+    global _client, _dispatcher
+    with _dispatcher_lock:
+        dispatcher, _dispatcher = _dispatcher, None
+    if dispatcher is not None:
+        dispatcher.close(timeout=5.0)
     _client = None
 
 
@@ -44,8 +69,158 @@ def _project_key() -> str:
     return os.environ.get("HARNESS_MEM_PROJECT_KEY", _DEFAULT_PROJECT)
 
 
+def _env_number(name: str, default: float) -> float:
+    raw = os.environ.get(name)
+    if not raw:
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        _logger.warning("ignoring invalid %s=%r", name, raw)
+        return default
+
+
+class _SessionDispatcher:
+    """Bounded background queue that keeps per-session order.
+
+    Each session has its own FIFO; a session with pending work is handed to one
+    worker at a time, so tasks of different sessions run in parallel while the
+    tasks of one session never overlap or reorder.
+    """
+
+    def __init__(self, *, max_pending: int, workers: int) -> None:
+        self.max_pending = max(1, max_pending)
+        self.workers = max(1, workers)
+        self._cond = threading.Condition()
+        self._sessions: Dict[str, Deque[Callable[[], None]]] = {}
+        self._ready: Deque[str] = deque()
+        self._threads: list = []
+        self._pending = 0
+        self._closed = False
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def submit(self, session_id: str, task: Callable[[], None]) -> bool:
+        with self._cond:
+            if self._closed or self._pending >= self.max_pending:
+                self.dropped += 1
+                _logger.warning("harness-mem hook queue full; dropped work for session %s", session_id)
+                return False
+            queue = self._sessions.get(session_id)
+            if queue is None:
+                # No worker owns this session: make it runnable.
+                queue = self._sessions[session_id] = deque()
+                self._ready.append(session_id)
+            queue.append(task)
+            self._pending += 1
+            if len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._run, name="harness-mem-hermes-hooks", daemon=True)
+                self._threads.append(thread)
+                thread.start()
+            self._cond.notify_all()
+            return True
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._ready or self._closed)
+                if not self._ready:
+                    return
+                session_id = self._ready.popleft()
+                task = self._sessions[session_id].popleft()
+            try:
+                task()
+            except Exception as exc:
+                _logger.warning("harness-mem hook for session %s failed: %s", session_id, exc)
+                failed = True
+            else:
+                failed = False
+            with self._cond:
+                if failed:
+                    self.failed += 1
+                else:
+                    self.completed += 1
+                self._pending -= 1
+                if self._sessions[session_id]:
+                    self._ready.append(session_id)
+                else:
+                    del self._sessions[session_id]
+                self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending == 0, timeout=timeout)
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        drained = self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            if not drained:
+                _logger.warning("harness-mem hook queue closed with %d task(s) pending", self._pending)
+        return drained
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                "pending": self._pending,
+                "completed": self.completed,
+                "failed": self.failed,
+                "dropped": self.dropped,
+            }
+
+
+_dispatcher: Optional[_SessionDispatcher] = None
+_dispatcher_lock = threading.Lock()
+_atexit_registered = False
+
+
+def _get_dispatcher() -> _SessionDispatcher:
+    global _dispatcher, _atexit_registered
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = _SessionDispatcher(
+                max_pending=int(_env_number("HARNESS_MEM_HOOK_QUEUE_SIZE", _DEFAULT_QUEUE_SIZE)),
+                workers=int(_env_number("HARNESS_MEM_HOOK_WORKERS", _DEFAULT_WORKERS)),
+            )
+            if not _atexit_registered:
+                atexit.register(shutdown)
+                _atexit_registered = True
+        return _dispatcher
+
+
+def flush(timeout: Optional[float] = None) -> bool:
+    """Wait until every queued hook task was sent; ``False`` on timeout."""
+    with _dispatcher_lock:
+        dispatcher = _dispatcher
+    return True if dispatcher is None else dispatcher.flush(timeout)
+
+
+def shutdown(timeout: Optional[float] = None) -> bool:
+    """Drain pending hook tasks (up to ``HARNESS_MEM_HOOK_DRAIN_SEC``) and stop the workers."""
+    global _dispatcher
+    with _dispatcher_lock:
+        dispatcher, _dispatcher = _dispatcher, None
+    if dispatcher is None:
+        return True
+    if timeout is None:
+        timeout = _env_number("HARNESS_MEM_HOOK_DRAIN_SEC", _DEFAULT_DRAIN_SEC)
+    return dispatcher.close(timeout)
+
+
+def stats() -> Dict[str, int]:
+    """Counters of the hook dispatcher (pending / completed / failed / dropped)."""
+    with _dispatcher_lock:
+        dispatcher = _dispatcher
+    if dispatcher is None:
+        return {"pending": 0, "completed": 0, "failed": 0, "dropped": 0}
+    return dispatcher.stats()
+
+
 def on_session_start(session_id, model, platform, **_kwargs: Any) -> None:
-    _get_client().record_event({
+    client = _get_client()
+    event = {
         "platform": _PLATFORM,
         "event_type": "session_start",
         "session_id": session_id,
@@ -53,7 +228,8 @@ def on_session_start(session_id, model, platform, **_kwargs: Any) -> None:
             "hermes_model": model,
             "hermes_platform": platform,
         },
-    })
+    }
+    _get_dispatcher().submit(str(session_id), lambda: client.record_event(event))
 
 
 def on_session_end(
@@ -65,7 +241,7 @@ def on_session_end(
     **_kwargs: Any,
 ) -> None:
     client = _get_client()
-    client.record_event({
+    event = {
         "platform": _PLATFORM,
         "event_type": "session_end",
         "session_id": session_id,
@@ -75,13 +251,20 @@ def on_session_end(
             "hermes_model": model,
             "hermes_platform": platform,
         },
-    })
-    if completed and not interrupted:
-        client.finalize_session(
-            session_id=session_id,
-            platform=_PLATFORM,
-            project=_project_key(),
-        )
+    }
+    finalize = bool(completed and not interrupted)
+    project = _project_key()
+
+    def _end() -> None:
+        client.record_event(event)
+        if finalize:
+            client.finalize_session(
+                session_id=session_id,
+                platform=_PLATFORM,
+                project=project,
+            )
+
+    _get_dispatcher().submit(str(session_id), _end)
 
 
 def register(ctx: Any) -> None:
@@ -11,10 +11,14 @@ session lifecycle events to harness-mem. The plugin must:
 4. Resolve `HARNESS_MEM_URL`, `HARNESS_MEM_TOKEN`, and `HARNESS_MEM_PROJECT_KEY`
    from environment variables, with sensible defaults.
 5. Tolerate forward-compatible kwargs from future Hermes versions.
+6. Return from hooks without waiting for the daemon, keep per-session order,
+   and drop (not block) when the bounded queue is full.
 """
 
 from __future__ import annotations
 
+import threading
+import time
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -64,6 +68,7 @@ class TestOnSessionStart:
         mock_client_cls.return_value = mock_client
 
         plugin.on_session_start("sess-001", "claude-sonnet-4.6", "cli")
+        assert plugin.flush(timeout=5)
 
         mock_client.record_event.assert_called_once()
         event = mock_client.record_event.call_args.args[0]
@@ -83,6 +88,7 @@ class TestOnSessionStart:
             model="claude-sonnet-4.6",
             platform="telegram",
         )
+        assert plugin.flush(timeout=5)
 
         event = mock_client.record_event.call_args.args[0]
         assert event["session_id"] == "sess-kw"
@@ -101,6 +107,7 @@ class TestOnSessionStart:
             future_arg="something",
             another_arg=42,
         )
+        assert plugin.flush(timeout=5)
 
         mock_client.record_event.assert_called_once()
 
@@ -123,6 +130,7 @@ class TestOnSessionEnd:
             "claude-sonnet-4.6",
             "cli",
         )
+        assert plugin.flush(timeout=5)
 
         # First call must be record_event with event_type=session_end.
         first_call = mock_client.record_event.call_args.args[0]
@@ -145,6 +153,7 @@ class TestOnSessionEnd:
             model="m",
             platform="cli",
         )
+        assert plugin.flush(timeout=5)
 
         mock_client.finalize_session.assert_called_once()
         kwargs = mock_client.finalize_session.call_args.kwargs
@@ -163,6 +172,7 @@ class TestOnSessionEnd:
             model="m",
             platform="cli",
         )
+        assert plugin.flush(timeout=5)
 
         mock_client.record_event.assert_called_once()
         mock_client.finalize_session.assert_not_called()
@@ -180,6 +190,7 @@ class TestOnSessionEnd:
             model="m",
             platform="cli",
         )
+        assert plugin.flush(timeout=5)
 
         mock_client.finalize_session.assert_not_called()
 
@@ -199,6 +210,7 @@ class TestEnvConfiguration:
         plugin.on_session_end(
             "sess", completed=True, interrupted=False, model="m", platform="cli",
         )
+        assert plugin.flush(timeout=5)
 
         kwargs = mock_client.finalize_session.call_args.kwargs
         assert kwargs["project"] == "my-project"
@@ -212,6 +224,7 @@ class TestEnvConfiguration:
         plugin.on_session_end(
             "sess", completed=True, interrupted=False, model="m", platform="cli",
         )
+        assert plugin.flush(timeout=5)
 
         kwargs = mock_client.finalize_session.call_args.kwargs
         assert kwargs["project"] == "default"
@@ -222,6 +235,7 @@ class TestEnvConfiguration:
         mock_client_cls.return_value = MagicMock()
 
         plugin.on_session_start("sess", "m", "cli")
+        assert plugin.flush(timeout=5)
 
         mock_client_cls.assert_called_once()
         ctor_kwargs = mock_client_cls.call_args.kwargs
@@ -233,6 +247,7 @@ class TestEnvConfiguration:
         mock_client_cls.return_value = MagicMock()
 
         plugin.on_session_start("sess", "m", "cli")
+        assert plugin.flush(timeout=5)
 
         ctor_kwargs = mock_client_cls.call_args.kwargs
         assert ctor_kwargs["token"] == "secret-token"
@@ -243,6 +258,7 @@ class TestEnvConfiguration:
         mock_client_cls.return_value = MagicMock()
 
         plugin.on_session_start("sess", "m", "cli")
+        assert plugin.flush(timeout=5)
 
         ctor_kwargs = mock_client_cls.call_args.kwargs
         assert ctor_kwargs["base_url"] == "http://127.0.0.1:37888"
@@ -260,8 +276,101 @@ class TestClientSingleton:
         mock_client_cls.return_value = MagicMock()
 
         plugin.on_session_start("a", "m", "cli")
+        assert plugin.flush(timeout=5)
         plugin.on_session_start("b", "m", "cli")
+        assert plugin.flush(timeout=5)
         plugin.on_session_end("c", completed=True, interrupted=False, model="m", platform="cli")
+        assert plugin.flush(timeout=5)
 
         # HarnessMemClient should be constructed exactly once across all calls.
         assert mock_client_cls.call_count == 1
+
+
+# ---------------------------------------------------------------------------
+# Background dispatch
+# ---------------------------------------------------------------------------
+
+
+class TestBackgroundDispatch:
+    @patch("harness_mem_hermes_bridge.plugin.HarnessMemClient")
+    def test_hooks_do_not_wait_for_the_daemon(self, mock_client_cls):
+        mock_client = MagicMock()
+        mock_client.finalize_session.side_effect = lambda **_: time.sleep(0.3)
+        mock_client_cls.return_value = mock_client
+
+        started = time.perf_counter()
+        plugin.on_session_end("sess-slow", completed=True, interrupted=False, model="m", platform="cli")
+        assert time.perf_counter() - started < 0.1
+
+        assert plugin.flush(timeout=5)
+        mock_client.finalize_session.assert_called_once()
+
+    @patch("harness_mem_hermes_bridge.plugin.HarnessMemClient")
+    def test_keeps_order_within_a_session(self, mock_client_cls):
+        calls = []
+        lock = threading.Lock()
+
+        def _record(event):
+            time.sleep(0.02 if event["event_type"] == "session_start" else 0)
+            with lock:
+                calls.append((event["session_id"], event["event_type"]))
+
+        def _finalize(**kwargs):
+            with lock:
+                calls.append((kwargs["session_id"], "finalize"))
+
+        mock_client = MagicMock()
+        mock_client.record_event.side_effect = _record
+        mock_client.finalize_session.side_effect = _finalize
+        mock_client_cls.return_value = mock_client
+
+        for session_id in ("a", "b", "c"):
+            plugin.on_session_start(session_id, "m", "cli")
+            plugin.on_session_end(session_id, completed=True, interrupted=False, model="m", platform="cli")
+        assert plugin.flush(timeout=5)
+
+        for session_id in ("a", "b", "c"):
+            assert [kind for sid, kind in calls if sid == session_id] == ["session_start", "session_end", "finalize"]
+
+    @patch("harness_mem_hermes_bridge.plugin.HarnessMemClient")
+    def test_failure_is_logged_and_skips_finalize(self, mock_client_cls, caplog):
+        mock_client = MagicMock()
+        mock_client.record_event.side_effect = OSError("daemon down")
+        mock_client_cls.return_value = mock_client
+
+        plugin.on_session_end("sess-down", completed=True, interrupted=False, model="m", platform="cli")
+        assert plugin.flush(timeout=5)
+
+        mock_client.finalize_session.assert_not_called()
+        assert plugin.stats()["failed"] == 1
+        assert "daemon down" in caplog.text
+
+    @patch.dict("os.environ", {"HARNESS_MEM_HOOK_QUEUE_SIZE": "1", "HARNESS_MEM_HOOK_WORKERS": "1"}, clear=False)
+    @patch("harness_mem_hermes_bridge.plugin.HarnessMemClient")
+    def test_full_queue_drops_instead_of_blocking(self, mock_client_cls):
+        release = threading.Event()
+        mock_client = MagicMock()
+        mock_client.record_event.side_effect = lambda event: release.wait(5)
+        mock_client_cls.return_value = mock_client
+
+        started = time.perf_counter()
+        plugin.on_session_start("a", "m", "cli")
+        plugin.on_session_start("b", "m", "cli")
+        assert time.perf_counter() - started < 0.1
+        release.set()
+
+        assert plugin.flush(timeout=5)
+        assert plugin.stats()["dropped"] == 1
+        assert mock_client.record_event.call_count == 1
+
+    @patch("harness_mem_hermes_bridge.plugin.HarnessMemClient")
+    def test_shutdown_drains_pending_finalizations(self, mock_client_cls):
+        mock_client = MagicMock()
+        mock_client.finalize_session.side_effect = lambda **_: time.sleep(0.05)
+        mock_client_cls.return_value = mock_client
+
+        for session_id in ("a", "b", "c", "d"):
+            plugin.on_session_end(session_id, completed=True, interrupted=False, model="m", platform="cli")
+
+        assert plugin.shutdown(timeout=5)
+        assert mock_client.finalize_session.call_count == 4
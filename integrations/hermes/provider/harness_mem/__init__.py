@@ -14,6 +14,7 @@ import json
 import logging
 import os
 import threading
+import time
 from typing import Any, Dict, List, Optional
 from urllib import request
 from urllib.error import HTTPError, URLError
@@ -40,6 +41,11 @@ _DEFAULT_BASE_URL = "http://127.0.0.1:37888"
 _DEFAULT_PROJECT = "default"
 _DEFAULT_TIMEOUT_SEC = 8.0
 _MIN_QUERY_LEN = 3
+# Paths written to HARNESS_MEM_TRACE_FILE; replayable with `python -m harness_mem.loadgen`.
+_TRACE_PATHS = frozenset({"/v1/search", "/v1/events/record", "/v1/resume-pack", "/v1/timeline", "/v1/observations/get"})
+# Body fields whose strings are masked in the trace unless HARNESS_MEM_TRACE_RAW=1.
+_TRACE_REDACTED_KEYS = frozenset({"content", "payload", "query"})
+_trace_lock = threading.Lock()
 
 
 def _normalize_match_text(text: str) -> str:
@@ -158,6 +164,43 @@ def _env(name: str, default: str = "") -> str:
     return os.environ.get(name, default).strip()
 
 
+def _mask(value: Any) -> Any:
+    """Same-shape copy of ``value`` with every string replaced by ``x`` of equal length."""
+    if isinstance(value, str):
+        return "x" * len(value)
+    if isinstance(value, dict):
+        return {key: _mask(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_mask(item) for item in value]
+    return value
+
+
+def _redact_trace_body(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {
+            key: _mask(item) if key in _TRACE_REDACTED_KEYS else _redact_trace_body(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_redact_trace_body(item) for item in value]
+    return value
+
+
+def _append_trace(method: str, path: str, payload: Optional[Dict[str, Any]]) -> None:
+    trace_file = _env("HARNESS_MEM_TRACE_FILE")
+    if not trace_file or path not in _TRACE_PATHS:
+        return
+    line = {"ts": round(time.time(), 6), "method": method, "path": path}
+    if payload is not None:
+        # Turn text stays out of the trace by default; masking keeps body sizes realistic for replay.
+        line["body"] = payload if _coerce_bool(_env("HARNESS_MEM_TRACE_RAW")) else _redact_trace_body(payload)
+    try:
+        with _trace_lock, open(trace_file, "a", encoding="utf-8") as handle:
+            handle.write(json.dumps(line, ensure_ascii=False, separators=(",", ":")) + "\n")
+    except OSError as exc:
+        logger.debug("harness-mem trace write failed: %s", exc)
+
+
 def _compact_turn(user_content: str, assistant_content: str) -> str:
     user = (user_content or "").strip()
     assistant = (assistant_content or "").strip()
@@ -372,6 +415,7 @@ class HarnessMemMemoryProvider(MemoryProvider):
         return self._request_json("POST", "/v1/events/record", payload)
 
     def _request_json(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        _append_trace(method.upper(), path, payload)
         url = f"{self._base_url}{path}"
         body = json.dumps(payload or {}).encode("utf-8") if method.upper() in {"POST", "PUT", "PATCH"} else None
         headers = {"content-type": "application/json"}
@@ -0,0 +1,482 @@
+"""Streaming backfill of a Hermes ``state.db`` into harness-mem.
+
+``/v1/ingest/hermes-state`` imports a whole state.db as one server-side job.
+It loads every selected message into memory, records one observation per
+message, and competes with live searches for the daemon's writer while it
+runs. This command does the same work from the client side, in small steps:
+
+- ``messages`` are read in fixed-size pages (``WHERE id > ? ORDER BY id
+  LIMIT ?``) on short read-only transactions, so memory stays bounded and
+  Hermes can keep writing to its database.
+- User / assistant messages are folded into turns and compacted with
+  ``_compact_turn``, exactly like live ``sync_turn``. One observation is
+  stored per turn, not per message. Tool results and tool-call-only messages
+  are skipped.
+- Turns are sent in batches through ``/v1/events/record`` (up to
+  ``--concurrency`` requests in flight). Each turn has a stable
+  ``event_id`` / ``dedupe_hash``, so re-running is idempotent.
+- After every batch the last message id whose turn was fully sent is written
+  to the checkpoint file. An interrupted run resumes from there. A turn still
+  open at the end of the database (no reply yet, session not ended and
+  active within ``--idle-flush-sec``) is left for the next run. The
+  checkpoint never moves past a turn the daemon rejected, so the next run
+  sends it again (turns already stored are deduplicated).
+- Sending is rate limited (``--max-rate`` events/s). The rate is halved
+  whenever the daemon slows down, i.e. a batch's median write latency exceeds
+  ``--target-latency-ms`` or it answers 429 / 503. It then grows back
+  gradually, so a live daemon keeps serving searches.
+
+Usage (from the directory containing the provider, e.g. ``~/.hermes/plugins``)::
+
+    python -m harness_mem.backfill --source ~/.hermes/state.db --project my-project
+    python -m harness_mem.backfill --source ~/.hermes/state.db --dry-run --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.error import HTTPError
+
+from . import _DEFAULT_PROJECT, HarnessMemMemoryProvider, _compact_turn, _env
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_PAGE_SIZE = 500
+_DEFAULT_BATCH_SIZE = 50
+_DEFAULT_CONCURRENCY = 2
+_DEFAULT_MAX_RATE = 50.0
+_DEFAULT_TARGET_LATENCY_MS = 250.0
+_DEFAULT_IDLE_FLUSH_SEC = 3600.0
+_MAX_ATTEMPTS = 5
+_RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+_OVERLOAD_STATUSES = frozenset({429, 503})
+
+_PAGE_SQL = """
+    SELECT
+        m.id AS id,
+        m.session_id AS session_id,
+        m.role AS role,
+        m.content AS content,
+        m.timestamp AS timestamp,
+        s.ended_at AS session_ended_at
+    FROM messages m
+    LEFT JOIN sessions s ON s.id = m.session_id
+    WHERE m.id > ?
+    ORDER BY m.id ASC
+    LIMIT ?
+"""
+
+
+class BackfillAborted(RuntimeError):
+    """The daemon stayed unreachable / overloaded; progress up to the checkpoint is kept."""
+
+
+def _source_key(source_db_path: str) -> str:
+    return hashlib.sha256(f"hermes_state_db_source:{source_db_path}".encode("utf-8")).hexdigest()[:16]
+
+
+def _iso(seconds: Any) -> Optional[str]:
+    try:
+        value = float(seconds)
+    except (TypeError, ValueError):
+        return None
+    if value <= 0:
+        return None
+    return datetime.fromtimestamp(value, tz=timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+class _Turn:
+    __slots__ = ("session_id", "first_id", "last_id", "ts", "last_ts", "user", "assistant", "ended")
+
+    def __init__(self, session_id: str, first_id: int, ts: Any) -> None:
+        self.session_id = session_id
+        self.first_id = first_id
+        self.last_id = first_id
+        self.ts = ts
+        self.last_ts = ts
+        self.user = ""
+        self.assistant: List[str] = []
+        self.ended = False
+
+
+class _Throttle:
+    """Spaces sends to ``rate`` per second; AIMD on per-batch latency."""
+
+    def __init__(self, max_rate: float, target_latency_ms: float) -> None:
+        self.max_rate = max_rate
+        self.rate = max_rate
+        self.target_latency_ms = target_latency_ms
+        self.slowdowns = 0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        if self.max_rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next, now)
+            self._next = slot + 1.0 / self.rate
+        if slot > now:
+            time.sleep(slot - now)
+
+    def observe(self, latencies_ms: List[float], overloaded: bool) -> None:
+        if self.max_rate <= 0:
+            return
+        slow = bool(latencies_ms) and statistics.median(latencies_ms) > self.target_latency_ms
+        with self._lock:
+            if overloaded or slow:
+                self.rate = max(self.rate / 2.0, 1.0)
+                self.slowdowns += 1
+            else:
+                self.rate = min(self.rate * 1.25, self.max_rate)
+
+
+class HermesStateBackfill:
+    """Streams one Hermes state.db into harness-mem as compacted turns."""
+
+    def __init__(
+        self,
+        source_db_path: str,
+        *,
+        project: Optional[str] = None,
+        base_url: Optional[str] = None,
+        token: Optional[str] = None,
+        checkpoint_path: Optional[str] = None,
+        page_size: int = _DEFAULT_PAGE_SIZE,
+        batch_size: int = _DEFAULT_BATCH_SIZE,
+        concurrency: int = _DEFAULT_CONCURRENCY,
+        max_rate: float = _DEFAULT_MAX_RATE,
+        target_latency_ms: float = _DEFAULT_TARGET_LATENCY_MS,
+        idle_flush_sec: float = _DEFAULT_IDLE_FLUSH_SEC,
+        dry_run: bool = False,
+        retry_backoff_sec: float = 0.5,
+    ) -> None:
+        if page_size < 1 or batch_size < 1 or concurrency < 1:
+            raise ValueError("page_size, batch_size and concurrency must be >= 1")
+        self.source_db_path = os.path.realpath(os.path.expanduser(source_db_path))
+        self.provider = HarnessMemMemoryProvider()
+        if base_url:
+            self.provider._base_url = base_url.rstrip("/")
+        if token:
+            self.provider._token = token
+        self.project = project or _env("HARNESS_MEM_PROJECT_KEY", _DEFAULT_PROJECT) or _DEFAULT_PROJECT
+        self.source_key = _source_key(self.source_db_path)
+        self.checkpoint_path = checkpoint_path
+        self.page_size = page_size
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.idle_flush_sec = idle_flush_sec
+        self.dry_run = dry_run
+        self.retry_backoff_sec = retry_backoff_sec
+        self.throttle = _Throttle(max_rate, target_latency_ms)
+        self.stats: Dict[str, Any] = {
+            "source_db_path": self.source_db_path,
+            "project": self.project,
+            "dry_run": dry_run,
+            "start_after_message_id": 0,
+            "after_message_id": 0,
+            "messages_read": 0,
+            "messages_skipped": 0,
+            "turns_built": 0,
+            "turns_sent": 0,
+            "turns_failed": 0,
+            "turns_open": 0,
+            "batches": 0,
+            "failed_samples": [],
+        }
+        self._first_failed_id: Optional[int] = None
+
+    # -- checkpoint ---------------------------------------------------------
+
+    def _checkpoint_key(self) -> str:
+        return f"{self.source_key}:{self.project}"
+
+    def _load_checkpoint(self) -> int:
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return 0
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as handle:
+                data = json.load(handle)
+            return int(data.get(self._checkpoint_key(), {}).get("after_message_id") or 0)
+        except (OSError, ValueError, AttributeError) as exc:
+            logger.warning("harness-mem backfill checkpoint %s unreadable, starting over: %s", self.checkpoint_path, exc)
+            return 0
+
+    def _save_checkpoint(self, after_message_id: int) -> None:
+        self.stats["after_message_id"] = after_message_id
+        if not self.checkpoint_path or self.dry_run:
+            return
+        data: Dict[str, Any] = {}
+        if os.path.exists(self.checkpoint_path):
+            try:
+                with open(self.checkpoint_path, "r", encoding="utf-8") as handle:
+                    data = json.load(handle)
+            except (OSError, ValueError):
+                data = {}
+        data[self._checkpoint_key()] = {
+            "source_db_path": self.source_db_path,
+            "project": self.project,
+            "after_message_id": after_message_id,
+            "updated_at": time.time(),
+        }
+        directory = os.path.dirname(os.path.abspath(self.checkpoint_path))
+        os.makedirs(directory, exist_ok=True)
+        tmp = f"{self.checkpoint_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as handle:
+            json.dump(data, handle, ensure_ascii=False, sort_keys=True)
+        os.replace(tmp, self.checkpoint_path)
+
+    # -- reading ------------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        if not os.path.exists(self.source_db_path):
+            raise FileNotFoundError(f"Hermes state.db not found: {self.source_db_path}")
+        conn = sqlite3.connect(f"file:{self.source_db_path}?mode=ro", uri=True, timeout=5.0)
+        conn.row_factory = sqlite3.Row
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if not {"sessions", "messages"} <= tables:
+            conn.close()
+            raise ValueError("not a Hermes state.db: sessions/messages tables are required")
+        return conn
+
+    def _pages(self, conn: sqlite3.Connection, after_id: int) -> Iterator[List[sqlite3.Row]]:
+        while True:
+            # One short read transaction per page; Hermes may be writing meanwhile.
+            rows = conn.execute(_PAGE_SQL, (after_id, self.page_size)).fetchall()
+            if not rows:
+                return
+            yield rows
+            after_id = int(rows[-1]["id"])
+            if len(rows) < self.page_size:
+                return
+
+    # -- turns --------------------------------------------------------------
+
+    def _turn_event(self, turn: _Turn) -> Dict[str, Any]:
+        user = turn.user
+        assistant = "\n\n".join(turn.assistant)
+        compact = _compact_turn(user, assistant)
+        source_id = f"{self.source_key}:turn:{turn.session_id}:{turn.first_id}"
+        digest = hashlib.sha256(f"{self.project}:{source_id}".encode("utf-8")).hexdigest()
+        ts = _iso(turn.ts)
+        event: Dict[str, Any] = {
+            "event_id": f"hermes_turn_{digest[:32]}",
+            "platform": "hermes",
+            "project": self.project,
+            "session_id": turn.session_id,
+            "event_type": "assistant_response",
+            "title": "Hermes turn",
+            "content": compact,
+            "payload": {
+                "title": "Hermes turn",
+                "content": compact,
+                "user": user[:4000],
+                "assistant": assistant[:4000],
+                "source_type": "hermes_state_db",
+                "hermes_message_ids": [turn.first_id, turn.last_id],
+            },
+            "tags": ["hermes", "turn", "hermes_state_db", "backfill"],
+            "metadata": {
+                "source": "hermes_state_backfill",
+                "source_type": "hermes_state_db",
+                "hermes_session_id": turn.session_id,
+                "hermes_source_db_key": self.source_key,
+            },
+            "privacy_tags": [],
+            "dedupe_hash": hashlib.sha256(f"hermes_state_turn:{self.project}:{source_id}".encode("utf-8")).hexdigest(),
+            "thread_id": turn.session_id,
+        }
+        if ts:
+            event["ts"] = ts
+        return event
+
+    def _fold(self, row: sqlite3.Row, open_turns: Dict[str, _Turn], ready: List[_Turn]) -> None:
+        self.stats["messages_read"] += 1
+        session_id = str(row["session_id"] or "").strip()
+        role = str(row["role"] or "").strip().lower()
+        content = str(row["content"] or "").strip()
+        message_id = int(row["id"])
+        if not session_id or role not in ("user", "assistant") or not content:
+            self.stats["messages_skipped"] += 1
+            turn = open_turns.get(session_id)
+            if turn is not None:
+                turn.last_id = message_id
+            return
+        turn = open_turns.get(session_id)
+        if role == "user" or turn is None:
+            if turn is not None:
+                ready.append(open_turns.pop(session_id))
+            turn = open_turns[session_id] = _Turn(session_id, message_id, row["timestamp"])
+        turn.last_id = message_id
+        turn.last_ts = row["timestamp"]
+        if role == "user":
+            turn.user = content
+        else:
+            turn.assistant.append(content)
+        turn.ended = row["session_ended_at"] is not None
+
+    # -- sending ------------------------------------------------------------
+
+    def _send(self, event: Dict[str, Any]) -> Tuple[bool, float, bool, Optional[str]]:
+        """``(sent, latency_ms, overloaded, error)``; raises ``BackfillAborted`` when retries run out."""
+        overloaded = False
+        attempt = 0
+        while True:
+            self.throttle.wait()
+            started = time.monotonic()
+            try:
+                response = self.provider._request_json("POST", "/v1/events/record", {"event": event})
+                latency_ms = (time.monotonic() - started) * 1000.0
+                if response.get("ok") is False:
+                    return False, latency_ms, overloaded, str(response.get("error") or "record failed")
+                return True, latency_ms, overloaded, None
+            except ValueError as exc:  # body that is not JSON: the request may not have been stored
+                return False, (time.monotonic() - started) * 1000.0, overloaded, f"invalid response: {exc}"
+            except RuntimeError as exc:
+                cause = exc.__cause__
+                status = cause.code if isinstance(cause, HTTPError) else None
+                if status is not None and status not in _RETRYABLE_STATUSES:
+                    return False, (time.monotonic() - started) * 1000.0, overloaded, str(exc)
+                overloaded = overloaded or status is None or status in _OVERLOAD_STATUSES
+                attempt += 1
+                if attempt >= _MAX_ATTEMPTS:
+                    raise BackfillAborted(str(exc)) from exc
+                time.sleep(self.retry_backoff_sec * (2 ** (attempt - 1)))
+
+    def _send_batch(self, pool: Optional[ThreadPoolExecutor], turns: List[_Turn]) -> None:
+        events = [self._turn_event(turn) for turn in turns]
+        if self.dry_run:
+            self.stats["turns_sent"] += len(events)
+            return
+        if pool is None:
+            results = [self._send(event) for event in events]
+        else:
+            results = list(pool.map(self._send, events))
+        latencies = [latency for sent, latency, _, _ in results if sent]
+        self.throttle.observe(latencies, any(overloaded for _, _, overloaded, _ in results))
+        for turn, event, (sent, _, _, error) in zip(turns, events, results):
+            if sent:
+                self.stats["turns_sent"] += 1
+            else:
+                self.stats["turns_failed"] += 1
+                if self._first_failed_id is None or turn.first_id < self._first_failed_id:
+                    self._first_failed_id = turn.first_id
+                if len(self.stats["failed_samples"]) < 5:
+                    self.stats["failed_samples"].append({"event_id": event["event_id"], "error": error})
+        self.stats["batches"] += 1
+
+    def _safe_after(self, last_read_id: int, open_turns: Dict[str, _Turn], ready: List[_Turn]) -> int:
+        pending = [turn.first_id for turn in open_turns.values()] + [turn.first_id for turn in ready]
+        if self._first_failed_id is not None:
+            pending.append(self._first_failed_id)
+        return min(pending) - 1 if pending else last_read_id
+
+    # -- run ----------------------------------------------------------------
+
+    def run(self) -> Dict[str, Any]:
+        after_id = self._load_checkpoint()
+        self.stats["start_after_message_id"] = self.stats["after_message_id"] = after_id
+        open_turns: Dict[str, _Turn] = {}
+        ready: List[_Turn] = []
+        last_read_id = after_id
+        conn = self._connect()
+        pool = ThreadPoolExecutor(self.concurrency, thread_name_prefix="harness-mem-backfill") if self.concurrency > 1 else None
+        try:
+            for page in self._pages(conn, after_id):
+                for row in page:
+                    self._fold(row, open_turns, ready)
+                last_read_id = int(page[-1]["id"])
+                while len(ready) >= self.batch_size:
+                    batch, ready = ready[: self.batch_size], ready[self.batch_size :]
+                    self.stats["turns_built"] += len(batch)
+                    self._send_batch(pool, batch)
+                    self._save_checkpoint(self._safe_after(last_read_id, open_turns, ready))
+            # End of the database: flush turns that will not grow any more.
+            cutoff = time.time() - self.idle_flush_sec
+            for session_id, turn in list(open_turns.items()):
+                if turn.ended or (turn.last_ts or 0) < cutoff:
+                    ready.append(open_turns.pop(session_id))
+            ready.sort(key=lambda turn: turn.first_id)
+            while ready:
+                batch, ready = ready[: self.batch_size], ready[self.batch_size :]
+                self.stats["turns_built"] += len(batch)
+                self._send_batch(pool, batch)
+                self._save_checkpoint(self._safe_after(last_read_id, open_turns, ready))
+            self._save_checkpoint(self._safe_after(last_read_id, open_turns, ready))
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True)
+            conn.close()
+            self.stats["turns_open"] = len(open_turns)
+            self.stats["rate"] = self.throttle.rate
+            self.stats["slowdowns"] = self.throttle.slowdowns
+        return self.stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m harness_mem.backfill",
+        description="Stream a Hermes state.db into harness-mem as compacted turns.",
+    )
+    parser.add_argument("--source", default=os.path.join(os.path.expanduser("~"), ".hermes", "state.db"), help="Hermes state.db path")
+    parser.add_argument("--project", default=None, help="project key (default: $HARNESS_MEM_PROJECT_KEY or 'default')")
+    parser.add_argument("--url", default=None, help="daemon base URL (default: $HARNESS_MEM_URL)")
+    parser.add_argument("--checkpoint", default=os.path.join(os.path.expanduser("~"), ".hermes", "harness_mem_backfill.json"))
+    parser.add_argument("--page-size", type=int, default=_DEFAULT_PAGE_SIZE)
+    parser.add_argument("--batch-size", type=int, default=_DEFAULT_BATCH_SIZE)
+    parser.add_argument("--concurrency", type=int, default=_DEFAULT_CONCURRENCY)
+    parser.add_argument("--max-rate", type=float, default=_DEFAULT_MAX_RATE, help="max events/s (0 = unlimited)")
+    parser.add_argument("--target-latency-ms", type=float, default=_DEFAULT_TARGET_LATENCY_MS)
+    parser.add_argument("--idle-flush-sec", type=float, default=_DEFAULT_IDLE_FLUSH_SEC)
+    parser.add_argument("--dry-run", action="store_true", help="read and compact without sending")
+    parser.add_argument("--json", action="store_true", help="print stats as JSON")
+    args = parser.parse_args(argv)
+
+    backfill = HermesStateBackfill(
+        args.source,
+        project=args.project,
+        base_url=args.url,
+        checkpoint_path=args.checkpoint,
+        page_size=args.page_size,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        max_rate=args.max_rate,
+        target_latency_ms=args.target_latency_ms,
+        idle_flush_sec=args.idle_flush_sec,
+        dry_run=args.dry_run,
+    )
+    code = 0
+    try:
+        stats = backfill.run()
+    except BackfillAborted as exc:
+        stats = dict(backfill.stats, error=str(exc))
+        code = 1
+    except KeyboardInterrupt:
+        stats = dict(backfill.stats, error="interrupted")
+        code = 130
+    if args.json:
+        print(json.dumps(stats, ensure_ascii=False, indent=2))
+    else:
+        print(
+            f"turns sent={stats['turns_sent']} failed={stats['turns_failed']} open={stats['turns_open']} "
+            f"messages={stats['messages_read']} checkpoint={stats['after_message_id']}"
+            + (f" error={stats['error']}" if "error" in stats else "")
+        )
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,315 @@
+"""Tests for the streaming Hermes state.db backfill (harness_mem.backfill)."""
+
+from __future__ import annotations
+
+import importlib
+import importlib.util
+import io
+import json
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from urllib.error import HTTPError
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[4]
+PROVIDER_DIR = REPO_ROOT / "integrations" / "hermes" / "provider" / "harness_mem"
+PACKAGE = "harness_mem_hermes_provider_backfill_under_test"
+
+
+def load_backfill_module():
+    spec = importlib.util.spec_from_file_location(
+        PACKAGE, PROVIDER_DIR / "__init__.py", submodule_search_locations=[str(PROVIDER_DIR)]
+    )
+    assert spec is not None and spec.loader is not None
+    package = importlib.util.module_from_spec(spec)
+    sys.modules[PACKAGE] = package
+    spec.loader.exec_module(package)
+    sys.modules.pop(f"{PACKAGE}.backfill", None)
+    return importlib.import_module(f"{PACKAGE}.backfill")
+
+
+class FakeHTTPResponse:
+    def __init__(self, payload: dict):
+        self._payload = payload
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def read(self):
+        return json.dumps(self._payload).encode("utf-8")
+
+
+class GarbageHTTPResponse(FakeHTTPResponse):
+    def __init__(self):
+        super().__init__({})
+
+    def read(self):
+        return b"<html>bad gateway</html>"
+
+
+class Recorder:
+    """urlopen stand-in; ``fail`` maps a call index to an HTTP status to raise, or to ``"garbage"`` for a non-JSON body."""
+
+    def __init__(self, fail=None, delay=0.0):
+        self.events = []
+        self.fail = dict(fail or {})
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, request, timeout=0):
+        with self._lock:
+            index = self.calls
+            self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        status = self.fail.get(index)
+        if status == "garbage":
+            return GarbageHTTPResponse()
+        if status:
+            raise HTTPError(request.full_url, status, "error", {}, io.BytesIO(b'{"ok":false}'))
+        body = json.loads(request.data.decode("utf-8"))
+        with self._lock:
+            self.events.append(body["event"])
+        return FakeHTTPResponse({"ok": True, "items": [{"id": "obs"}]})
+
+
+def make_state_db(path: Path, messages, sessions=None) -> Path:
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        """
+        CREATE TABLE sessions (id TEXT PRIMARY KEY, source TEXT, user_id TEXT, model TEXT, title TEXT,
+            started_at REAL, ended_at REAL, end_reason TEXT, message_count INTEGER, tool_call_count INTEGER);
+        CREATE TABLE messages (id INTEGER PRIMARY KEY, session_id TEXT, role TEXT, content TEXT,
+            tool_call_id TEXT, tool_calls TEXT, tool_name TEXT, timestamp REAL, token_count INTEGER,
+            finish_reason TEXT);
+        """
+    )
+    for session_id, ended_at in (sessions or {}).items():
+        conn.execute("INSERT INTO sessions (id, started_at, ended_at) VALUES (?, ?, ?)", (session_id, 1.0, ended_at))
+    for message_id, session_id, role, content, ts in messages:
+        conn.execute(
+            "INSERT INTO messages (id, session_id, role, content, timestamp) VALUES (?, ?, ?, ?, ?)",
+            (message_id, session_id, role, content, ts),
+        )
+    conn.commit()
+    conn.close()
+    return path
+
+
+def conversation(sessions=("s1",), turns=3, start_ts=1_700_000_000.0):
+    rows = []
+    message_id = 0
+    for turn in range(turns):
+        for session_id in sessions:
+            for role, content in (("user", f"question {turn} in {session_id}"), ("assistant", f"answer {turn}")):
+                message_id += 1
+                rows.append((message_id, session_id, role, content, start_ts + message_id))
+    return rows
+
+
+@pytest.fixture(autouse=True)
+def _clean_env(monkeypatch):
+    for key in ("HARNESS_MEM_URL", "HARNESS_MEM_TOKEN", "HARNESS_MEM_PROJECT_KEY", "HARNESS_MEM_TRACE_FILE"):
+        monkeypatch.delenv(key, raising=False)
+
+
+@pytest.fixture
+def backfill_module(monkeypatch):
+    module = load_backfill_module()
+    return module
+
+
+def _patch(monkeypatch, module, recorder):
+    monkeypatch.setattr(sys.modules[PACKAGE].request, "urlopen", recorder)
+
+
+class TestTurnCompaction:
+    def test_turns_are_compacted_like_sync_turn(self, backfill_module, monkeypatch, tmp_path):
+        recorder = Recorder()
+        _patch(monkeypatch, backfill_module, recorder)
+        db = make_state_db(
+            tmp_path / "state.db",
+            [
+                (1, "s1", "user", "How do I run tests?", 1_700_000_001.0),
+                (2, "s1", "assistant", "", 1_700_000_002.0),
+                (3, "s1", "tool", "pytest output", 1_700_000_003.0),
+                (4, "s1", "assistant", "Run pytest.", 1_700_000_004.0),
+                (5, "s1", "user", "Thanks", 1_700_000_005.0),
+            ],
+            sessions={"s1": 1_700_000_006.0},
+        )
+        stats = backfill_module.HermesStateBackfill(str(db), project="proj", max_rate=0).run()
+
+        assert stats["turns_sent"] == 2
+        assert stats["messages_read"] == 5
+        assert stats["messages_skipped"] == 2
+        first = recorder.events[0]
+        assert first["content"] == backfill_module._compact_turn("How do I run tests?", "Run pytest.")
+        assert first["event_type"] == "assistant_response"
+        assert first["project"] == "proj"
+        assert first["session_id"] == "s1"
+        assert first["ts"] == "2023-11-14T22:13:21.000Z"
+        assert {"hermes", "turn", "hermes_state_db", "backfill"} <= set(first["tags"])
+        assert stats["after_message_id"] == 5
+
+    def test_event_ids_are_stable_across_runs(self, backfill_module, monkeypatch, tmp_path):
+        recorder = Recorder()
+        _patch(monkeypatch, backfill_module, recorder)
+        db = make_state_db(tmp_path / "state.db", conversation(turns=2), sessions={"s1": 2e9})
+        backfill_module.HermesStateBackfill(str(db), project="p", max_rate=0).run()
+        backfill_module.HermesStateBackfill(str(db), project="p", max_rate=0).run()
+        ids = [event["event_id"] for event in recorder.events]
+        assert ids[:2] == ids[2:]
+        assert len(set(ids)) == 2
+
+
+class TestStreaming:
+    def test_pages_and_batches_with_interleaved_sessions(self, backfill_module, monkeypatch, tmp_path):
+        recorder = Recorder()
+        _patch(monkeypatch, backfill_module, recorder)
+        db = make_state_db(
+            tmp_path / "state.db", conversation(sessions=("a", "b", "c"), turns=10), sessions={"a": 1, "b": 1, "c": 1}
+        )
+        checkpoint = tmp_path / "checkpoint.json"
+        stats = backfill_module.HermesStateBackfill(
+            str(db), project="p", checkpoint_path=str(checkpoint), page_size=7, batch_size=4, concurrency=3, max_rate=0
+        ).run()
+
+        assert stats["turns_sent"] == 30
+        assert stats["batches"] == 8
+        assert len({event["event_id"] for event in recorder.events}) == 30
+        assert sorted(event["content"] for event in recorder.events) == sorted(
+            backfill_module._compact_turn(f"question {t} in {s}", f"answer {t}") for t in range(10) for s in "abc"
+        )
+        saved = json.loads(checkpoint.read_text())
+        assert [entry["after_message_id"] for entry in saved.values()] == [60]
+
+    def test_open_turn_is_left_for_the_next_run(self, backfill_module, monkeypatch, tmp_path):
+        recorder = Recorder()
+        _patch(monkeypatch, backfill_module, recorder)
+        now = time.time()
+        rows = [
+            (1, "s1", "user", "first", now - 10),
+            (2, "s1", "assistant", "reply", now - 9),
+            (3, "s1", "user", "still typing", now - 1),
+        ]
+        path = make_state_db(tmp_path / "state.db", rows, sessions={"s1": None})
+        checkpoint = tmp_path / "checkpoint.json"
+
+        def run():
+            return backfill_module.HermesStateBackfill(
+                str(path), project="p", checkpoint_path=str(checkpoint), max_rate=0
+            ).run()
+
+        stats = run()
+        assert (stats["turns_sent"], stats["turns_open"], stats["after_message_id"]) == (1, 1, 2)
+
+        conn = sqlite3.connect(path)
+        conn.execute("INSERT INTO messages (id, session_id, role, content, timestamp) VALUES (4, 's1', 'assistant', 'done', ?)", (now,))
+        conn.execute("UPDATE sessions SET ended_at = ? WHERE id = 's1'", (now,))
+        conn.commit()
+        conn.close()
+
+        stats = run()
+        assert stats["start_after_message_id"] == 2
+        assert (stats["turns_sent"], stats["turns_open"], stats["after_message_id"]) == (1, 0, 4)
+        assert recorder.events[-1]["content"] == backfill_module._compact_turn("still typing", "done")
+
+    def test_dry_run_sends_nothing(self, backfill_module, monkeypatch, tmp_path):
+        recorder = Recorder()
+        _patch(monkeypatch, backfill_module, recorder)
+        db = make_state_db(tmp_path / "state.db", conversation(turns=3), sessions={"s1": 1})
+        checkpoint = tmp_path / "checkpoint.json"
+        stats = backfill_module.HermesStateBackfill(
+            str(db), checkpoint_path=str(checkpoint), dry_run=True, max_rate=0
+        ).run()
+        assert stats["turns_sent"] == 3
+        assert recorder.calls == 0
+        assert not checkpoint.exists()
+
+    def test_rejects_non_hermes_database(self, backfill_module, tmp_path):
+        path = tmp_path / "other.db"
+        sqlite3.connect(path).execute("CREATE TABLE x (id INTEGER)").connection.close()
+        with pytest.raises(ValueError):
+            backfill_module.HermesStateBackfill(str(path)).run()
+
+
+class TestThrottling:
+    def test_retries_and_slows_down_on_overload(self, backfill_module, monkeypatch, tmp_path):
+        recorder = Recorder(fail={0: 503, 1: 429})
+        _patch(monkeypatch, backfill_module, recorder)
+        db = make_state_db(tmp_path / "state.db", conversation(turns=2), sessions={"s1": 1})
+        backfill = backfill_module.HermesStateBackfill(str(db), max_rate=1000, retry_backoff_sec=0.001, concurrency=1)
+        stats = backfill.run()
+        assert stats["turns_sent"] == 2
+        assert stats["slowdowns"] >= 1
+        assert stats["rate"] < 1000
+
+    def test_client_error_counts_as_failed_turn(self, backfill_module, monkeypatch, tmp_path):
+        recorder = Recorder(fail={0: 400})
+        _patch(monkeypatch, backfill_module, recorder)
+        db = make_state_db(tmp_path / "state.db", conversation(turns=2), sessions={"s1": 1})
+        stats = backfill_module.HermesStateBackfill(str(db), max_rate=0, concurrency=1).run()
+        assert (stats["turns_sent"], stats["turns_failed"]) == (1, 1)
+        assert len(stats["failed_samples"]) == 1
+
+    def test_checkpoint_stays_before_a_failed_turn(self, backfill_module, monkeypatch, tmp_path):
+        recorder = Recorder(fail={1: 400, 2: "garbage"})
+        _patch(monkeypatch, backfill_module, recorder)
+        db = make_state_db(tmp_path / "state.db", conversation(turns=4), sessions={"s1": 1})
+        checkpoint = tmp_path / "checkpoint.json"
+
+        def run():
+            return backfill_module.HermesStateBackfill(
+                str(db), checkpoint_path=str(checkpoint), batch_size=2, concurrency=1, max_rate=0
+            ).run()
+
+        stats = run()
+        assert (stats["turns_sent"], stats["turns_failed"], stats["after_message_id"]) == (2, 2, 2)
+        assert stats["failed_samples"][1]["error"].startswith("invalid response")
+
+        stats = run()
+        assert stats["start_after_message_id"] == 2
+        assert (stats["turns_sent"], stats["turns_failed"], stats["after_message_id"]) == (3, 0, 8)
+
+    def test_unreachable_daemon_aborts_and_keeps_checkpoint(self, backfill_module, monkeypatch, tmp_path):
+        recorder = Recorder(fail={index: 503 for index in range(2, 100)})
+        _patch(monkeypatch, backfill_module, recorder)
+        db = make_state_db(tmp_path / "state.db", conversation(turns=4), sessions={"s1": 1})
+        checkpoint = tmp_path / "checkpoint.json"
+        backfill = backfill_module.HermesStateBackfill(
+            str(db), checkpoint_path=str(checkpoint), batch_size=2, concurrency=1, max_rate=0, retry_backoff_sec=0.001
+        )
+        with pytest.raises(backfill_module.BackfillAborted):
+            backfill.run()
+        saved = json.loads(checkpoint.read_text())
+        assert [entry["after_message_id"] for entry in saved.values()] == [4]
+
+    def test_rate_limit_spaces_requests(self, backfill_module, monkeypatch, tmp_path):
+        recorder = Recorder()
+        _patch(monkeypatch, backfill_module, recorder)
+        db = make_state_db(tmp_path / "state.db", conversation(turns=6), sessions={"s1": 1})
+        started = time.monotonic()
+        backfill_module.HermesStateBackfill(str(db), max_rate=100, target_latency_ms=10_000).run()
+        assert time.monotonic() - started >= 0.05
+
+
+class TestCli:
+    def test_main_prints_json_stats(self, backfill_module, monkeypatch, tmp_path, capsys):
+        recorder = Recorder()
+        _patch(monkeypatch, backfill_module, recorder)
+        db = make_state_db(tmp_path / "state.db", conversation(turns=2), sessions={"s1": 1})
+        code = backfill_module.main(
+            ["--source", str(db), "--project", "cli", "--checkpoint", str(tmp_path / "cp.json"), "--json", "--max-rate", "0"]
+        )
+        assert code == 0
+        stats = json.loads(capsys.readouterr().out)
+        assert (stats["project"], stats["turns_sent"]) == ("cli", 2)
@@ -75,6 +75,8 @@ def _clean_env(monkeypatch):
         "HARNESS_MEM_TOKEN",
         "HARNESS_MEM_PROJECT_KEY",
         "HARNESS_MEM_HERMES_CONSOLIDATE_ON_END",
+        "HARNESS_MEM_TRACE_FILE",
+        "HARNESS_MEM_TRACE_RAW",
     ):
         monkeypatch.delenv(key, raising=False)
 
@@ -377,6 +379,40 @@ class TestOnSessionEnd:
         assert call["body"]["limit"] == 50
 
 
+class TestTraceCapture:
+    def test_trace_file_records_replayable_requests(self, monkeypatch, tmp_path):
+        module = load_provider_module()
+        recorder = URLopenerRecorder({"ok": True, "items": []})
+        monkeypatch.setattr(module.request, "urlopen", recorder)
+        trace = tmp_path / "trace.jsonl"
+        monkeypatch.setenv("HARNESS_MEM_TRACE_FILE", str(trace))
+
+        provider = module.HarnessMemMemoryProvider()
+        provider.initialize("sess-123")
+        provider.prefetch("local-first memory", session_id="sess-123")
+        provider.handle_tool_call("harness_mem_status", {})
+
+        lines = [json.loads(line) for line in trace.read_text(encoding="utf-8").splitlines()]
+        assert [line["path"] for line in lines] == ["/v1/search"]
+        assert lines[0]["method"] == "POST"
+        assert lines[0]["body"]["query"] == "x" * len("local-first memory")
+        assert isinstance(lines[0]["ts"], float)
+
+    def test_trace_file_masks_turn_content_by_default(self, monkeypatch, tmp_path):
+        module = load_provider_module()
+        body = {"event": {"session_id": "sess-123", "payload": {"content": "secret plan", "turn": 2}}}
+        trace = tmp_path / "trace.jsonl"
+        monkeypatch.setenv("HARNESS_MEM_TRACE_FILE", str(trace))
+
+        module._append_trace("POST", "/v1/events/record", body)
+        monkeypatch.setenv("HARNESS_MEM_TRACE_RAW", "1")
+        module._append_trace("POST", "/v1/events/record", body)
+
+        masked, raw = [json.loads(line)["body"] for line in trace.read_text(encoding="utf-8").splitlines()]
+        assert masked == {"event": {"session_id": "sess-123", "payload": {"content": "x" * 11, "turn": 2}}}
+        assert raw == body
+
+
 class TestShutdown:
     def test_shutdown_joins_alive_pending_sync_thread_with_10_second_timeout(self):
         """Regression: shutdown() waits up to SHUTDOWN_JOIN_TIMEOUT_SECONDS for _sync_thread."""
@@ -1,3 +1,21 @@
-from .adapter import HarnessMemLangChainChatMemory, HarnessMemLangChainRetriever
+from .adapter import HarnessMemLangChainChatMemory, HarnessMemLangChainRetriever, reciprocal_rank_fusion
+from .transport import (
+    HarnessMemAPIError,
+    HarnessMemError,
+    HarnessMemTransport,
+    HarnessMemTransportError,
+    RetryPolicy,
+    shared_transport,
+)
 
-__all__ = ["HarnessMemLangChainRetriever", "HarnessMemLangChainChatMemory"]
+__all__ = [
+    "HarnessMemLangChainRetriever",
+    "HarnessMemLangChainChatMemory",
+    "reciprocal_rank_fusion",
+    "HarnessMemTransport",
+    "RetryPolicy",
+    "shared_transport",
+    "HarnessMemError",
+    "HarnessMemTransportError",
+    "HarnessMemAPIError",
+]
@@ -1,44 +1,62 @@
 from __future__ import annotations
 
-import json
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
-from urllib.request import Request, urlopen
-
-
-def _request(
-    base_url: str,
-    method: str,
-    path: str,
-    payload: Optional[Dict[str, Any]] = None,
-    token: Optional[str] = None,
-) -> Dict[str, Any]:
-    body = json.dumps(payload or {}).encode("utf-8") if method.upper() == "POST" else None
-    headers = {"content-type": "application/json"}
-    if token:
-        headers["x-harness-mem-token"] = token
-        headers["authorization"] = f"Bearer {token}"
-    request = Request(
-        url=f"{base_url}{path}",
-        data=body,
-        headers=headers,
-        method=method.upper(),
-    )
-    with urlopen(request, timeout=8) as response:
-        raw = response.read().decode("utf-8")
-        return json.loads(raw) if raw else {}
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Union
+
+from .transport import DEFAULT_BASE_URL, HarnessMemTransport, shared_transport
+
+
+def _item_key(item: Dict[str, Any]) -> Hashable:
+    observation_id = item.get("id")
+    if isinstance(observation_id, str) and observation_id:
+        return observation_id
+    return (item.get("title"), item.get("content"))
+
+
+def reciprocal_rank_fusion(result_lists: Sequence[Sequence[Dict[str, Any]]], *, k: int = 60) -> List[Dict[str, Any]]:
+    """Merge ranked lists: score = sum of 1 / (k + rank) over the lists an item appears in.
+
+    Items are deduplicated by ``id`` (title + content when missing). Each merged
+    item is a copy of its best-ranked occurrence with ``rrf_score`` added.
+    """
+    scores: Dict[Hashable, float] = {}
+    best: Dict[Hashable, Dict[str, Any]] = {}
+    best_rank: Dict[Hashable, int] = {}
+    for results in result_lists:
+        seen = set()
+        for rank, item in enumerate(results, start=1):
+            key = _item_key(item)
+            if key in seen:
+                continue
+            seen.add(key)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+            if rank < best_rank.get(key, rank + 1):
+                best[key], best_rank[key] = item, rank
+    ordered = sorted(scores, key=lambda key: (-scores[key], best_rank[key]))
+    return [{**best[key], "rrf_score": scores[key]} for key in ordered]
 
 
 @dataclass
 class HarnessMemLangChainRetriever:
-    base_url: str = "http://127.0.0.1:37888"
+    base_url: str = DEFAULT_BASE_URL
     project: str = "default"
     include_private: bool = False
     token: Optional[str] = None
+    timeout_sec: float = 8.0
+    transport: Optional[HarnessMemTransport] = field(default=None, repr=False, compare=False)
+    max_concurrency: int = 4
+    rrf_k: int = 60
+
+    def __post_init__(self) -> None:
+        if self.transport is None:
+            self.transport = shared_transport(self.base_url, timeout_sec=self.timeout_sec)
+        if self.max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
 
     def invoke(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
-        response = _request(
-            self.base_url,
+        response = self.transport.request(
             "POST",
             "/v1/search",
             {
@@ -54,18 +72,74 @@ class HarnessMemLangChainRetriever:
     def get_relevant_documents(self, query: str) -> List[Dict[str, Any]]:
         return self.invoke(query)
 
+    def batch(
+        self, queries: Sequence[str], limit: int = 5, *, return_exceptions: bool = False
+    ) -> List[Union[List[Dict[str, Any]], Exception]]:
+        """``invoke`` for each query, at most ``max_concurrency`` at a time; results keep query order.
+
+        Repeated queries are sent once. With ``return_exceptions`` a failed query
+        yields its exception instead of raising.
+        """
+        unique = list(dict.fromkeys(queries))
+        if not unique:
+            return []
+        workers = min(self.max_concurrency, len(unique), self.transport.max_connections)
+
+        def _run(query: str) -> Union[List[Dict[str, Any]], Exception]:
+            try:
+                return self.invoke(query, limit=limit)
+            except Exception as exc:
+                if not return_exceptions:
+                    raise
+                return exc
+
+        if workers == 1:
+            results = [_run(query) for query in unique]
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="harness-mem-retriever") as pool:
+                results = list(pool.map(_run, unique))
+        by_query = dict(zip(unique, results))
+        return [by_query[query] for query in queries]
+
+    def multi_query(self, queries: Sequence[str], limit: int = 5) -> List[Dict[str, Any]]:
+        """Search every query concurrently and fuse the rankings (RRF), deduplicated by ``id``.
+
+        Failed queries are skipped; the first error is raised only if all of them failed.
+        """
+        results = self.batch(queries, limit=limit, return_exceptions=True)
+        ranked = [result for result in results if not isinstance(result, Exception)]
+        if results and not ranked:
+            raise results[0]  # type: ignore[misc]
+        return reciprocal_rank_fusion(ranked, k=self.rrf_k)[:limit]
+
+    async def ainvoke(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self.invoke, query, limit)
+
+    async def abatch(
+        self, queries: Sequence[str], limit: int = 5, *, return_exceptions: bool = False
+    ) -> List[Union[List[Dict[str, Any]], Exception]]:
+        return await asyncio.to_thread(self.batch, queries, limit, return_exceptions=return_exceptions)
+
+    async def amulti_query(self, queries: Sequence[str], limit: int = 5) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self.multi_query, queries, limit)
+
 
 @dataclass
 class HarnessMemLangChainChatMemory:
-    base_url: str = "http://127.0.0.1:37888"
+    base_url: str = DEFAULT_BASE_URL
     project: str = "default"
     session_id: str = "langchain-session"
     include_private: bool = False
     token: Optional[str] = None
+    timeout_sec: float = 8.0
+    transport: Optional[HarnessMemTransport] = field(default=None, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        if self.transport is None:
+            self.transport = shared_transport(self.base_url, timeout_sec=self.timeout_sec)
 
     def load_memory_variables(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
-        response = _request(
-            self.base_url,
+        response = self.transport.request(
             "POST",
             "/v1/resume-pack",
             {
@@ -86,8 +160,7 @@ class HarnessMemLangChainChatMemory:
     def save_context(self, inputs: Dict[str, Any], outputs: Dict[str, Any]) -> None:
         title = str(inputs.get("input") or "langchain-input")
         content = str(outputs.get("output") or "")
-        _request(
-            self.base_url,
+        self.transport.request(
             "POST",
             "/v1/checkpoints/record",
             {
@@ -103,8 +176,7 @@ class HarnessMemLangChainChatMemory:
         )
 
     def clear(self) -> None:
-        _request(
-            self.base_url,
+        self.transport.request(
             "POST",
             "/v1/sessions/finalize",
             {
@@ -0,0 +1,251 @@
+"""Pooled HTTP transport shared by the LangChain retriever and memory classes.
+
+Every retriever / memory instance pointed at the same daemon with the same
+settings uses one ``HarnessMemTransport`` (see ``shared_transport``), so
+creating a retriever per request does not open a socket per request. The
+transport keeps up to ``max_connections`` keep-alive connections, applies one
+timeout per request and retries read-only calls (``/v1/search``,
+``/v1/resume-pack``, ``/v1/timeline``, ``/v1/observations/get`` and GETs) on
+connection errors and HTTP 429 / 502 / 503 / 504 with exponential backoff.
+When a reused keep-alive connection drops before a response arrives, only
+those read-only requests are replayed on a fresh connection. Writes are never
+re-sent, because the daemon may already have applied them.
+"""
+
+from __future__ import annotations
+
+import http.client
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+DEFAULT_BASE_URL = "http://127.0.0.1:37888"
+
+_READ_ONLY_POST_PATHS = frozenset({"/v1/search", "/v1/resume-pack", "/v1/timeline", "/v1/observations/get"})
+
+
+class HarnessMemError(Exception):
+    """Base error of the LangChain adapter transport."""
+
+
+class HarnessMemTransportError(HarnessMemError):
+    """The daemon could not be reached or sent an unreadable response."""
+
+
+class HarnessMemAPIError(HarnessMemError):
+    """The daemon answered with an HTTP error or ``ok: false``."""
+
+    def __init__(self, status_code: int, message: str, response_body: Optional[Dict[str, Any]] = None) -> None:
+        super().__init__(f"HarnessMemAPIError(status={status_code}, message={message})")
+        self.status_code = status_code
+        self.message = message
+        self.response_body = response_body
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_retries: int = 2
+    backoff_sec: float = 0.05
+    max_backoff_sec: float = 1.0
+    retry_statuses: FrozenSet[int] = frozenset({429, 502, 503, 504})
+
+    def delay(self, attempt: int) -> float:
+        return min(self.backoff_sec * (2**attempt), self.max_backoff_sec)
+
+
+class _StaleConnection(Exception):
+    """A pooled connection was closed by the daemon before it answered an idempotent request."""
+
+
+class HarnessMemTransport:
+    def __init__(
+        self,
+        base_url: str = DEFAULT_BASE_URL,
+        *,
+        timeout_sec: float = 8.0,
+        max_connections: int = 10,
+        keepalive_expiry_sec: float = 5.0,
+        retry: RetryPolicy = RetryPolicy(),
+    ) -> None:
+        parts = urlsplit(base_url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError("base_url must be an http:// or https:// URL")
+        if max_connections < 1:
+            raise ValueError("max_connections must be >= 1")
+        self.base_url = base_url.rstrip("/")
+        self.timeout_sec = timeout_sec
+        self.max_connections = max_connections
+        self.keepalive_expiry_sec = keepalive_expiry_sec
+        self.retry = retry
+        self._connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self._host = parts.hostname
+        self._port = parts.port
+        self._path_prefix = parts.path.rstrip("/")
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._idle: List[Tuple[http.client.HTTPConnection, float]] = []
+        self._pid = os.getpid()
+        self.opened = 0
+        self.reused = 0
+        self.retries = 0
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        payload: Optional[Dict[str, Any]] = None,
+        token: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        method = method.upper()
+        body = json.dumps(payload or {}).encode("utf-8") if method == "POST" else None
+        headers = {"content-type": "application/json"}
+        if token:
+            headers["x-harness-mem-token"] = token
+            headers["authorization"] = f"Bearer {token}"
+        read_only = method == "GET" or path in _READ_ONLY_POST_PATHS
+        retries = self.retry.max_retries if read_only else 0
+        attempt = 0
+        while True:
+            try:
+                return self._send(method, f"{self._path_prefix}{path}", body, headers, read_only)
+            except HarnessMemError as exc:
+                retryable = isinstance(exc, HarnessMemTransportError) or (
+                    isinstance(exc, HarnessMemAPIError) and exc.status_code in self.retry.retry_statuses
+                )
+                if attempt >= retries or not retryable:
+                    raise
+                with self._lock:
+                    self.retries += 1
+                time.sleep(self.retry.delay(attempt))
+                attempt += 1
+
+    def _send(
+        self, method: str, target: str, body: Optional[bytes], headers: Dict[str, str], idempotent: bool
+    ) -> Dict[str, Any]:
+        if not self._slots.acquire(timeout=self.timeout_sec):
+            raise HarnessMemTransportError(f"no free connection to {self.base_url} within {self.timeout_sec}s")
+        try:
+            connection, reused = self._checkout()
+            try:
+                try:
+                    status, raw, keep_alive = self._roundtrip(
+                        connection, method, target, body, headers, reused and idempotent
+                    )
+                except _StaleConnection:
+                    connection.close()
+                    connection = self._connect()
+                    status, raw, keep_alive = self._roundtrip(connection, method, target, body, headers, False)
+            except (OSError, http.client.HTTPException) as exc:
+                connection.close()
+                raise HarnessMemTransportError(f"{method} {self.base_url}{target} failed: {exc}") from exc
+            if keep_alive:
+                with self._lock:
+                    self._idle.append((connection, time.monotonic()))
+            else:
+                connection.close()
+        finally:
+            self._slots.release()
+        return self._parse(status, raw)
+
+    def _roundtrip(
+        self,
+        connection: http.client.HTTPConnection,
+        method: str,
+        target: str,
+        body: Optional[bytes],
+        headers: Dict[str, str],
+        replayable: bool,
+    ) -> Tuple[int, bytes, bool]:
+        try:
+            connection.request(method, target, body=body, headers=headers)
+            response = connection.getresponse()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            # Usually an idle keep-alive connection the daemon already closed, but the request may
+            # have been read and acted on, so only idempotent requests on reused connections are replayed.
+            if not replayable:
+                raise
+            raise _StaleConnection()
+        raw = response.read()
+        return response.status, raw, not response.will_close
+
+    def _parse(self, status: int, raw: bytes) -> Dict[str, Any]:
+        try:
+            parsed = json.loads(raw.decode("utf-8")) if raw else {}
+        except ValueError as exc:
+            if status >= 400:
+                raise HarnessMemAPIError(status, f"HTTP {status}") from exc
+            raise HarnessMemTransportError(f"invalid JSON response: {exc}") from exc
+        if not isinstance(parsed, dict):
+            raise HarnessMemTransportError("API response is not a JSON object")
+        if status >= 400 or parsed.get("ok") is False:
+            message = next(
+                (parsed[key] for key in ("error", "message", "detail") if isinstance(parsed.get(key), str) and parsed[key]),
+                f"HTTP {status}",
+            )
+            raise HarnessMemAPIError(status, message, parsed)
+        return parsed
+
+    def _checkout(self) -> Tuple[http.client.HTTPConnection, bool]:
+        now = time.monotonic()
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked child: never share the parent's sockets.
+                self._idle, self._pid = [], os.getpid()
+            while self._idle:
+                connection, idle_since = self._idle.pop()
+                if now - idle_since < self.keepalive_expiry_sec:
+                    self.reused += 1
+                    return connection, True
+                connection.close()
+        return self._connect(), False
+
+    def _connect(self) -> http.client.HTTPConnection:
+        connection = self._connection_class(self._host, self._port, timeout=self.timeout_sec)
+        with self._lock:
+            self.opened += 1
+        return connection
+
+    def close(self) -> None:
+        """Close idle connections; the transport stays usable."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            connection.close()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"opened": self.opened, "reused": self.reused, "retries": self.retries, "idle": len(self._idle)}
+
+
+_shared: Dict[Tuple[Any, ...], HarnessMemTransport] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_transport(
+    base_url: str = DEFAULT_BASE_URL,
+    *,
+    timeout_sec: float = 8.0,
+    max_connections: int = 10,
+    retry: RetryPolicy = RetryPolicy(),
+) -> HarnessMemTransport:
+    """Process-wide transport for these settings, created on first use."""
+    key = (base_url.rstrip("/"), timeout_sec, max_connections, retry)
+    with _shared_lock:
+        transport = _shared.get(key)
+        if transport is None:
+            transport = HarnessMemTransport(
+                base_url, timeout_sec=timeout_sec, max_connections=max_connections, retry=retry
+            )
+            _shared[key] = transport
+        return transport
+
+
+def close_shared_transports() -> None:
+    with _shared_lock:
+        transports = list(_shared.values())
+    for transport in transports:
+        transport.close()
@@ -1,7 +1,78 @@
+import asyncio
+import json
+import socket
+import threading
+import time
 import unittest
-from unittest.mock import MagicMock, patch
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
-from harness_mem_langchain.adapter import HarnessMemLangChainRetriever, HarnessMemLangChainChatMemory
+from harness_mem_langchain.adapter import (
+    HarnessMemLangChainChatMemory,
+    HarnessMemLangChainRetriever,
+    reciprocal_rank_fusion,
+)
+from harness_mem_langchain.transport import (
+    HarnessMemAPIError,
+    HarnessMemTransport,
+    HarnessMemTransportError,
+    RetryPolicy,
+    shared_transport,
+)
+
+
+class _StubDaemon:
+    """Keep-alive HTTP stub that records requests and the client ports it saw."""
+
+    def __init__(self, fail_first: int = 0, search=None, delay_sec: float = 0.0) -> None:
+        self.requests = []
+        self.connections = set()
+        self.failures_left = fail_first
+        stub = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("content-length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                stub.connections.add(self.client_address)
+                stub.requests.append({"path": self.path, "headers": {k.lower(): v for k, v in self.headers.items()}, "body": body})
+                if delay_sec:
+                    time.sleep(delay_sec)
+                if stub.failures_left > 0:
+                    stub.failures_left -= 1
+                    self._reply(503, {"ok": False, "error": "busy"})
+                elif search is not None and self.path == "/v1/search":
+                    items = search(body["query"])
+                    if items is None:
+                        self._reply(500, {"ok": False, "error": "boom"})
+                    else:
+                        self._reply(200, {"ok": True, "items": items})
+                else:
+                    self._reply(200, {"ok": True, "items": [{"id": "obs_1"}]})
+
+            def _reply(self, status, payload) -> None:
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def __enter__(self) -> "_StubDaemon":
+        threading.Thread(target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
 
 
 class LangChainAdapterTest(unittest.TestCase):
@@ -15,36 +86,169 @@ class LangChainAdapterTest(unittest.TestCase):
         self.assertTrue(callable(memory.load_memory_variables))
         self.assertTrue(callable(memory.save_context))
 
-    @patch("harness_mem_langchain.adapter.urlopen")
-    def test_token_headers_are_forwarded_when_token_is_set(self, mock_urlopen: MagicMock) -> None:
-        response = MagicMock()
-        response.read.return_value = b'{"items":[]}'
-        context = MagicMock()
-        context.__enter__.return_value = response
-        context.__exit__.return_value = False
-        mock_urlopen.return_value = context
-
-        retriever = HarnessMemLangChainRetriever(
-            base_url="http://127.0.0.1:37888",
-            project="langchain-test",
-            token="secret-token",
-        )
-        retriever.invoke("token header test", limit=1)
-
-        memory = HarnessMemLangChainChatMemory(
-            base_url="http://127.0.0.1:37888",
-            project="langchain-test",
-            session_id="lc-1",
-            token="secret-token",
-        )
-        memory.save_context({"input": "hello"}, {"output": "world"})
-
-        self.assertGreaterEqual(mock_urlopen.call_count, 2)
-        for called in mock_urlopen.call_args_list:
-            request = called.args[0]
-            headers = {key.lower(): value for key, value in request.header_items()}
-            self.assertEqual(headers.get("x-harness-mem-token"), "secret-token")
-            self.assertEqual(headers.get("authorization"), "Bearer secret-token")
+    def test_token_headers_are_forwarded_when_token_is_set(self) -> None:
+        with _StubDaemon() as daemon:
+            transport = HarnessMemTransport(daemon.base_url)
+            retriever = HarnessMemLangChainRetriever(
+                base_url=daemon.base_url,
+                project="langchain-test",
+                token="secret-token",
+                transport=transport,
+            )
+            retriever.invoke("token header test", limit=1)
+
+            memory = HarnessMemLangChainChatMemory(
+                base_url=daemon.base_url,
+                project="langchain-test",
+                session_id="lc-1",
+                token="secret-token",
+                transport=transport,
+            )
+            memory.save_context({"input": "hello"}, {"output": "world"})
+
+        self.assertEqual([request["path"] for request in daemon.requests], ["/v1/search", "/v1/checkpoints/record"])
+        for request in daemon.requests:
+            self.assertEqual(request["headers"].get("x-harness-mem-token"), "secret-token")
+            self.assertEqual(request["headers"].get("authorization"), "Bearer secret-token")
+
+
+class SharedTransportTest(unittest.TestCase):
+    def test_instances_share_one_pooled_connection(self) -> None:
+        with _StubDaemon() as daemon:
+            retrievers = [HarnessMemLangChainRetriever(base_url=daemon.base_url, timeout_sec=3.5) for _ in range(5)]
+            memory = HarnessMemLangChainChatMemory(base_url=daemon.base_url, timeout_sec=3.5)
+            for retriever in retrievers:
+                self.assertEqual(retriever.invoke("pooled", limit=1), [{"id": "obs_1"}])
+            memory.load_memory_variables({"input": "x"})
+
+            self.assertIs(memory.transport, retrievers[0].transport)
+            self.assertEqual(len(daemon.connections), 1)
+            self.assertEqual(memory.transport.stats()["reused"], 5)
+            memory.transport.close()
+
+    def test_read_only_calls_are_retried(self) -> None:
+        with _StubDaemon(fail_first=2) as daemon:
+            transport = HarnessMemTransport(daemon.base_url, retry=RetryPolicy(max_retries=2, backoff_sec=0.001))
+            retriever = HarnessMemLangChainRetriever(base_url=daemon.base_url, transport=transport)
+            self.assertEqual(retriever.invoke("retry"), [{"id": "obs_1"}])
+            self.assertEqual(transport.stats()["retries"], 2)
+
+    def _dropping_daemon(self, seen):
+        """Answers every request except the second, which is read and then dropped without a response."""
+        listener = socket.create_server(("127.0.0.1", 0))
+        body = json.dumps({"ok": True, "items": [], "meta": {}}).encode()
+
+        def _serve() -> None:
+            while True:
+                try:
+                    connection, _ = listener.accept()
+                except OSError:
+                    return
+                with connection, connection.makefile("rb") as stream:
+                    while True:
+                        request_line = stream.readline()
+                        if not request_line:
+                            break
+                        seen.append(request_line.split(b" ")[1])
+                        length = 0
+                        for header in iter(stream.readline, b"\r\n"):
+                            if header.lower().startswith(b"content-length:"):
+                                length = int(header.split(b":")[1])
+                        stream.read(length)
+                        if len(seen) == 2:
+                            break
+                        connection.sendall(b"HTTP/1.1 200 OK\r\ncontent-length: %d\r\n\r\n%s" % (len(body), body))
+
+        threading.Thread(target=_serve, daemon=True).start()
+        self.addCleanup(listener.close)
+        return f"http://127.0.0.1:{listener.getsockname()[1]}"
+
+    def test_write_is_not_replayed_on_a_dropped_connection(self) -> None:
+        seen = []
+        transport = HarnessMemTransport(self._dropping_daemon(seen))
+        transport.request("POST", "/v1/search", {"query": "x"})
+        with self.assertRaises(HarnessMemTransportError):
+            transport.request("POST", "/v1/checkpoints/record", {"session_id": "s", "title": "t", "content": "c"})
+        self.assertEqual(seen, [b"/v1/search", b"/v1/checkpoints/record"])
+        transport.request("POST", "/v1/search", {"query": "x"})  # the pool recovers with a new connection
+        transport.close()
+
+    def test_writes_are_not_retried_and_errors_are_typed(self) -> None:
+        with _StubDaemon(fail_first=1) as daemon:
+            transport = HarnessMemTransport(daemon.base_url, retry=RetryPolicy(max_retries=2, backoff_sec=0.001))
+            memory = HarnessMemLangChainChatMemory(base_url=daemon.base_url, transport=transport)
+            with self.assertRaises(HarnessMemAPIError) as ctx:
+                memory.save_context({"input": "hello"}, {"output": "world"})
+            self.assertEqual(ctx.exception.status_code, 503)
+            self.assertEqual(len(daemon.requests), 1)
+
+    def test_unreachable_daemon_raises_transport_error(self) -> None:
+        with _StubDaemon() as daemon:
+            base_url = daemon.base_url
+        transport = HarnessMemTransport(base_url, timeout_sec=0.5, retry=RetryPolicy(max_retries=0))
+        with self.assertRaises(HarnessMemTransportError):
+            HarnessMemLangChainRetriever(base_url=base_url, transport=transport).invoke("down")
+
+    def test_shared_transport_is_keyed_by_settings(self) -> None:
+        first = shared_transport("http://127.0.0.1:1", timeout_sec=2.0)
+        self.assertIs(shared_transport("http://127.0.0.1:1/", timeout_sec=2.0), first)
+        self.assertIsNot(shared_transport("http://127.0.0.1:1", timeout_sec=3.0), first)
+
+
+_RESULTS = {
+    "wal": [{"id": "a"}, {"id": "b"}, {"id": "c"}],
+    "sqlite": [{"id": "b"}, {"id": "d"}],
+    "journal": [{"id": "b"}, {"id": "a"}],
+    "broken": None,
+}
+
+
+class BatchRetrievalTest(unittest.TestCase):
+    def test_batch_runs_queries_concurrently_in_order(self) -> None:
+        with _StubDaemon(search=_RESULTS.get, delay_sec=0.1) as daemon:
+            retriever = HarnessMemLangChainRetriever(base_url=daemon.base_url, max_concurrency=3)
+            started = time.perf_counter()
+            results = retriever.batch(["wal", "sqlite", "journal", "wal"])
+            elapsed = time.perf_counter() - started
+
+        self.assertEqual(results[0], _RESULTS["wal"])
+        self.assertEqual(results[1], _RESULTS["sqlite"])
+        self.assertEqual(results[3], _RESULTS["wal"])
+        self.assertEqual(len(daemon.requests), 3)  # repeated query sent once
+        self.assertLess(elapsed, 0.25)
+
+    def test_batch_return_exceptions(self) -> None:
+        with _StubDaemon(search=_RESULTS.get) as daemon:
+            transport = HarnessMemTransport(daemon.base_url, retry=RetryPolicy(max_retries=0))
+            retriever = HarnessMemLangChainRetriever(base_url=daemon.base_url, transport=transport)
+            results = retriever.batch(["wal", "broken"], return_exceptions=True)
+            with self.assertRaises(HarnessMemAPIError):
+                retriever.batch(["wal", "broken"])
+        self.assertEqual(results[0], _RESULTS["wal"])
+        self.assertIsInstance(results[1], HarnessMemAPIError)
+
+    def test_multi_query_fuses_and_deduplicates(self) -> None:
+        with _StubDaemon(search=_RESULTS.get) as daemon:
+            transport = HarnessMemTransport(daemon.base_url, retry=RetryPolicy(max_retries=0))
+            retriever = HarnessMemLangChainRetriever(base_url=daemon.base_url, transport=transport)
+            fused = retriever.multi_query(["wal", "sqlite", "journal", "broken"], limit=3)
+            fused_async = asyncio.run(retriever.amulti_query(["wal", "sqlite", "journal"], limit=3))
+
+        self.assertEqual([item["id"] for item in fused], ["b", "a", "d"])
+        self.assertEqual(fused, fused_async)
+        self.assertAlmostEqual(fused[0]["rrf_score"], 1 / 62 + 1 / 61 + 1 / 61)
+
+    def test_multi_query_raises_when_every_query_failed(self) -> None:
+        with _StubDaemon(search=_RESULTS.get) as daemon:
+            transport = HarnessMemTransport(daemon.base_url, retry=RetryPolicy(max_retries=0))
+            retriever = HarnessMemLangChainRetriever(base_url=daemon.base_url, transport=transport)
+            with self.assertRaises(HarnessMemAPIError):
+                retriever.multi_query(["broken"])
+
+    def test_reciprocal_rank_fusion_without_ids(self) -> None:
+        fused = reciprocal_rank_fusion([[{"title": "t", "content": "c"}], [{"title": "t", "content": "c"}]], k=1)
+        self.assertEqual(len(fused), 1)
+        self.assertAlmostEqual(fused[0]["rrf_score"], 1.0)
 
 
 if __name__ == "__main__":
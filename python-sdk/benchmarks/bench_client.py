@@ -0,0 +1,280 @@
+"""Micro-benchmarks for HarnessMemClient against ``FakeHarnessMemServer``.
+
+The fake daemon runs in-process over a seeded ``FakeStore``, so the numbers
+are dominated by the client (request building, urllib, decoding).
+
+Suites (all enabled by default, select with ``--suite``):
+
+- ``overhead``: median wall time of one call for each client method the fake
+  daemon serves
+- ``scaling``: ``search`` / ``get_observations`` time as the number of
+  returned observations grows (``--sizes``; search results are capped at 100
+  like the daemon's)
+- ``concurrency``: ``search`` requests per second from N threads sharing one
+  client (``--threads``)
+- ``import``: cold ``import harness_mem`` time in a fresh interpreter, minus
+  interpreter start-up
+
+Results can be saved as a JSON baseline and compared with a later run; any
+metric that got worse by more than ``--threshold`` is reported as a regression
+and the script exits with status 1.
+
+Usage::
+
+    cd python-sdk
+    python3 benchmarks/bench_client.py --save benchmarks/baseline.json
+    python3 benchmarks/bench_client.py --baseline benchmarks/baseline.json
+    python3 benchmarks/bench_client.py --compare old.json new.json
+    python3 benchmarks/bench_client.py --suite overhead,scaling --codec orjson
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence
+
+SDK_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SDK_ROOT))
+
+from harness_mem.client import HarnessMemClient  # noqa: E402
+from harness_mem.codec import get_codec  # noqa: E402
+from harness_mem.errors import HarnessMemError  # noqa: E402
+from harness_mem.testing import FakeHarnessMemServer, FakeStore  # noqa: E402
+
+SUITES = ("overhead", "scaling", "concurrency", "import")
+SEARCH_MAX_ITEMS = 100
+Metrics = Dict[str, Dict[str, Any]]
+
+METHOD_CALLS: Dict[str, Callable[[HarnessMemClient], Any]] = {
+    "health": lambda client: client.health(),
+    "search": lambda client: client.search(query="sqlite wal", project="harness-mem", limit=10),
+    "timeline": lambda client: client.timeline("obs_00000001"),
+    "get_observations": lambda client: client.get_observations(ids=["obs_00000001", "obs_00000002"]),
+    "record_event": lambda client: client.record_event(
+        {"platform": "claude", "project": "harness-mem", "session_id": "bench", "event_type": "user_prompt",
+         "event_id": "evt_bench", "payload": {"content": "benchmark prompt"}}
+    ),
+    "record_checkpoint": lambda client: client.record_checkpoint(session_id="bench", title="t", content="c"),
+    "resume_pack": lambda client: client.resume_pack(project="harness-mem", limit=10),
+    "run_consolidation": lambda client: client.run_consolidation(),
+    "consolidation_status": lambda client: client.consolidation_status(),
+    "feed": lambda client: client.feed(limit=10),
+}
+
+
+def seed(store: FakeStore, count: int) -> None:
+    """Upsert ``count`` search-shaped observations, ``obs_00000000`` onwards, all matching "sqlite wal"."""
+    for index in range(count):
+        store.add_observation(
+            {
+                "id": f"obs_{index:08d}",
+                "event_id": f"evt_{index:08d}",
+                "platform": "claude",
+                "project": "harness-mem",
+                "session_id": f"session-{index % 16}",
+                "title": f"Observation {index}",
+                "content": "Decided to keep the SQLite WAL checkpoint off the event loop. " * 4,
+                "tags": ["decision", "sqlite", "perf"],
+            }
+        )
+
+
+def _metric(value: float, unit: str, better: str = "lower") -> Dict[str, Any]:
+    return {"value": round(value, 3), "unit": unit, "better": better}
+
+
+def _median_call_us(call: Callable[[], Any], rounds: int, warmup: int = 5) -> float:
+    for _ in range(warmup):
+        call()
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - started) * 1_000_000)
+    return statistics.median(samples)
+
+
+def bench_overhead(server: FakeHarnessMemServer, client: HarnessMemClient, rounds: int) -> Metrics:
+    return {
+        f"overhead.{name}.median_us": _metric(_median_call_us(lambda: call(client), rounds), "us")
+        for name, call in METHOD_CALLS.items()
+    }
+
+
+def bench_scaling(server: FakeHarnessMemServer, client: HarnessMemClient, sizes: Sequence[int], rounds: int) -> Metrics:
+    metrics: Metrics = {}
+    for size in sizes:
+        seed(server.store, size)
+        ids = [f"obs_{index:08d}" for index in range(max(size, 1))]
+        scaled_rounds = max(5, rounds * 10 // max(size, 10))
+        if size <= SEARCH_MAX_ITEMS:
+            search_us = _median_call_us(lambda: client.search(query="sqlite wal", limit=size), scaled_rounds)
+            metrics[f"scaling.search.items_{size}.median_ms"] = _metric(search_us / 1000, "ms")
+        get_us = _median_call_us(lambda: client.get_observations(ids=ids), scaled_rounds)
+        metrics[f"scaling.get_observations.items_{size}.median_ms"] = _metric(get_us / 1000, "ms")
+    return metrics
+
+
+def bench_concurrency(
+    server: FakeHarnessMemServer, client: HarnessMemClient, thread_counts: Sequence[int], duration_sec: float
+) -> Metrics:
+    metrics: Metrics = {}
+    for thread_count in thread_counts:
+        counts = [0] * thread_count
+        errors = [0] * thread_count
+        stop = threading.Event()
+
+        def _worker(slot: int) -> None:
+            while not stop.is_set():
+                try:
+                    client.search(query="sqlite wal", limit=10)
+                except HarnessMemError:
+                    errors[slot] += 1
+                else:
+                    counts[slot] += 1
+
+        threads = [threading.Thread(target=_worker, args=(slot,), daemon=True) for slot in range(thread_count)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(duration_sec)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        metrics[f"concurrency.search.threads_{thread_count}.rps"] = _metric(sum(counts) / elapsed, "req/s", "higher")
+        metrics[f"concurrency.search.threads_{thread_count}.errors"] = _metric(sum(errors), "count")
+    return metrics
+
+
+def _interpreter_ms(code: str, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=SDK_ROOT, check=True)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def bench_import(runs: int) -> Metrics:
+    startup = _interpreter_ms("pass", runs)
+    with_import = _interpreter_ms("import harness_mem", runs)
+    return {"import.harness_mem.median_ms": _metric(max(with_import - startup, 0.0), "ms")}
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    suites = [suite.strip() for suite in args.suite.split(",") if suite.strip()]
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        raise SystemExit(f"unknown suite(s): {', '.join(sorted(unknown))}")
+    metrics: Metrics = {}
+    with FakeHarnessMemServer() as server:
+        seed(server.store, 10)
+        client = server.client(codec=get_codec(args.codec))
+        if "overhead" in suites:
+            metrics.update(bench_overhead(server, client, args.rounds))
+        if "scaling" in suites:
+            sizes = [int(size) for size in args.sizes.split(",")]
+            metrics.update(bench_scaling(server, client, sizes, args.rounds))
+        if "concurrency" in suites:
+            thread_counts = [int(count) for count in args.threads.split(",")]
+            metrics.update(bench_concurrency(server, client, thread_counts, args.duration))
+    if "import" in suites:
+        metrics.update(bench_import(args.import_runs))
+    return {
+        "version": 1,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "codec": args.codec,
+        "metrics": metrics,
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """One row per shared metric; ``regression`` is set when it got worse than ``threshold``."""
+    rows = []
+    for name, metric in current["metrics"].items():
+        previous = baseline.get("metrics", {}).get(name)
+        if not previous or not previous["value"]:
+            continue
+        ratio = metric["value"] / previous["value"]
+        worse = ratio - 1 if metric["better"] == "lower" else 1 - ratio
+        rows.append(
+            {
+                "metric": name,
+                "baseline": previous["value"],
+                "current": metric["value"],
+                "unit": metric["unit"],
+                "change": ratio - 1,
+                "regression": worse > threshold,
+            }
+        )
+    return rows
+
+
+def print_report(results: Dict[str, Any]) -> None:
+    print(f"python {results['python']} / codec {results['codec']}")
+    for name, metric in results["metrics"].items():
+        print(f"{name:<52}{metric['value']:>14,.1f} {metric['unit']}")
+
+
+def print_comparison(rows: List[Dict[str, Any]], threshold: float) -> int:
+    print(f"{'metric':<52}{'baseline':>12}{'current':>12}{'change':>10}")
+    regressions = 0
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        regressions += row["regression"]
+        print(f"{row['metric']:<52}{row['baseline']:>12,.1f}{row['current']:>12,.1f}{row['change']:>+9.1%}{flag}")
+    print(f"{regressions} regression(s) over {threshold:.0%} in {len(rows)} metric(s)")
+    return regressions
+
+
+def _load(path: str) -> Dict[str, Any]:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--suite", default=",".join(SUITES), help=f"comma-separated subset of {', '.join(SUITES)}")
+    parser.add_argument("--rounds", type=int, default=200, help="calls per overhead / scaling measurement")
+    parser.add_argument("--sizes", default="10,100,1000", help="observation counts for the scaling suite")
+    parser.add_argument("--threads", default="1,4,16", help="thread counts for the concurrency suite")
+    parser.add_argument("--duration", type=float, default=2.0, help="seconds per concurrency measurement")
+    parser.add_argument("--import-runs", type=int, default=10)
+    parser.add_argument("--codec", default="json", help="codec name passed to get_codec()")
+    parser.add_argument("--save", help="write results as a JSON baseline to this path")
+    parser.add_argument("--baseline", help="compare results with this JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown before flagging (0.15 = 15%%)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"), help="compare two saved results")
+    parser.add_argument("--json", action="store_true", help="emit results as JSON")
+    args = parser.parse_args()
+
+    if args.compare:
+        rows = compare(_load(args.compare[0]), _load(args.compare[1]), args.threshold)
+        sys.exit(1 if print_comparison(rows, args.threshold) else 0)
+
+    results = run(args)
+    if args.save:
+        Path(args.save).write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results)
+    if args.baseline:
+        print()
+        rows = compare(_load(args.baseline), results, args.threshold)
+        sys.exit(1 if print_comparison(rows, args.threshold) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Compare per-response CPU time and allocations of the SDK codecs.
+
+Builds a synthetic ``/v1/search``-shaped response body and measures, for each
+codec installed in the current environment, the mean decode time and the peak
+traced allocation of a single decode. Encoding of a ``record_event`` body is
+measured the same way.
+
+Usage::
+
+    cd python-sdk
+    python3 benchmarks/bench_codec.py --items 2000 --rounds 50
+    python3 benchmarks/bench_codec.py --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from harness_mem.codec import JsonCodec, get_codec  # noqa: E402
+from harness_mem.types import SearchResponse  # noqa: E402
+
+
+def build_search_body(items: int) -> bytes:
+    rows = [
+        {
+            "id": f"obs_{index:08d}",
+            "event_id": f"evt_{index:08d}",
+            "platform": "claude",
+            "project": "harness-mem",
+            "session_id": f"session-{index % 16}",
+            "title": f"Observation {index}",
+            "content": "Decided to keep the SQLite WAL checkpoint off the event loop. " * 4,
+            "created_at": "2026-10-01T12:00:00.000Z",
+            "updated_at": "2026-10-01T12:00:00.000Z",
+            "tags": ["decision", "sqlite", "perf"],
+            "privacy_tags": [],
+            "similarity": 0.8123,
+            "recency": 0.5,
+            "hybrid_score": 0.7012,
+            "rerank_score": 0.6634,
+        }
+        for index in range(items)
+    ]
+    payload = {
+        "ok": True,
+        "source": "core",
+        "items": rows,
+        "meta": {"count": items, "latency_ms": 12, "ranking": "hybrid_v3"},
+    }
+    return json.dumps(payload).encode("utf-8")
+
+
+def available_codecs() -> Dict[str, JsonCodec]:
+    codecs: Dict[str, JsonCodec] = {"json": get_codec("json")}
+    for name, kwargs in (("orjson", {}), ("msgspec", {}), ("msgspec-typed", {"typed": True})):
+        try:
+            codecs[name] = get_codec(name.split("-")[0], **kwargs)
+        except ImportError:
+            continue
+    return codecs
+
+
+def measure(codec: JsonCodec, body: bytes, event: Dict[str, Any], rounds: int) -> Dict[str, float]:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        codec.decode(body, SearchResponse)
+    decode_ms = (time.perf_counter() - started) * 1000 / rounds
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        codec.encode(event)
+    encode_us = (time.perf_counter() - started) * 1_000_000 / rounds
+
+    tracemalloc.start()
+    decoded = codec.decode(body, SearchResponse)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del decoded
+
+    return {"decode_ms": decode_ms, "encode_us": encode_us, "decode_peak_kib": peak / 1024}
+
+
+def run(items: int, rounds: int) -> List[Dict[str, Any]]:
+    body = build_search_body(items)
+    event = {"event": {"event_type": "checkpoint", "content": "x" * 2000, "tags": ["a", "b"]}}
+    results = []
+    for name, codec in available_codecs().items():
+        row: Dict[str, Any] = {"codec": name, "items": items, "body_kib": len(body) / 1024}
+        row.update(measure(codec, body, event, rounds))
+        results.append(row)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=30)
+    parser.add_argument("--json", action="store_true", help="emit results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.items, args.rounds)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    baseline = results[0]
+    print(f"search body: {baseline['items']} items, {baseline['body_kib']:.0f} KiB")
+    print(f"{'codec':<15}{'decode ms':>12}{'speedup':>10}{'peak KiB':>12}{'encode us':>12}")
+    for row in results:
+        speedup = baseline["decode_ms"] / row["decode_ms"] if row["decode_ms"] else 0.0
+        print(
+            f"{row['codec']:<15}{row['decode_ms']:>12.3f}{speedup:>9.2f}x"
+            f"{row['decode_peak_kib']:>12.0f}{row['encode_us']:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,91 @@
+import importlib
+from typing import Any, List
+
+from .cache import ObservationCache
 from .client import HarnessMemClient
+from .codec import JsonCodec, MsgspecCodec, OrjsonCodec, StdlibJsonCodec, get_codec
+from .columns import DictionaryColumn, ObservationColumns, to_arrow, to_columns, to_numpy
 from .crewai_memory import HarnessMemCrewAIMemory
-from .errors import HarnessMemAPIError, HarnessMemError, HarnessMemTransportError
+from .errors import HarnessMemAPIError, HarnessMemError, HarnessMemLeaseLostError, HarnessMemTransportError
+from .history import HistoryWindow, estimate_tokens
+from .instrumentation import ClientHooks, LatencyHistogram, MetricsCollector, RequestEvent
 from .langchain_memory import HarnessMemLangChainMemory
+from .rerank import Reranker, WeightedReranker, content_signature
+from .rows import LazyObservationRows, ObservationRow, ObservationRows, ObservationStream
+from .singleflight import SingleFlight
 from .types import (
     AuditLogResponse,
     ConsolidationStatusResponse,
+    ExportResponse,
+    FeedResponse,
     FinalizeSessionResponse,
+    ForgetResponse,
     GetObservationsResponse,
+    GraphEntitiesResponse,
+    GraphNeighborsResponse,
+    GraphResponse,
     HealthResponse,
+    IngestResponse,
+    LeaseResponse,
     ResumePackResponse,
     SearchResponse,
+    SignalReadResponse,
+    SignalResponse,
+    SyncPullResponse,
+    SyncPushResponse,
     TimelineResponse,
     WriteResponse,
 )
 
 __all__ = [
     "HarnessMemClient",
+    "AsyncHarnessMemClient",
+    "BackgroundWriter",
     "HarnessMemCrewAIMemory",
     "HarnessMemLangChainMemory",
+    "JsonCodec",
+    "StdlibJsonCodec",
+    "OrjsonCodec",
+    "MsgspecCodec",
+    "get_codec",
+    "ObservationRow",
+    "ObservationRows",
+    "LazyObservationRows",
+    "ObservationStream",
+    "Reranker",
+    "WeightedReranker",
+    "content_signature",
+    "SingleFlight",
+    "ObservationLoader",
+    "ObservationCache",
+    "HistoryWindow",
+    "estimate_tokens",
+    "DocumentIngester",
+    "IngestReport",
+    "Lease",
+    "LeaseManager",
+    "SignalInbox",
+    "ConsolidationScheduler",
+    "SyncEngine",
+    "SyncReport",
+    "RetentionExecutor",
+    "RetentionReport",
+    "GraphExpander",
+    "GraphNeighborhood",
+    "AdjacencyCache",
+    "ClientHooks",
+    "RequestEvent",
+    "LatencyHistogram",
+    "MetricsCollector",
+    "ObservationColumns",
+    "DictionaryColumn",
+    "to_columns",
+    "to_numpy",
+    "to_arrow",
     "HarnessMemError",
     "HarnessMemTransportError",
     "HarnessMemAPIError",
+    "HarnessMemLeaseLostError",
     "HealthResponse",
     "SearchResponse",
     "TimelineResponse",
@@ -30,4 +95,51 @@ __all__ = [
     "ResumePackResponse",
     "ConsolidationStatusResponse",
     "AuditLogResponse",
+    "FeedResponse",
+    "ExportResponse",
+    "IngestResponse",
+    "LeaseResponse",
+    "SignalResponse",
+    "SignalReadResponse",
+    "SyncPushResponse",
+    "SyncPullResponse",
+    "ForgetResponse",
+    "GraphResponse",
+    "GraphNeighborsResponse",
+    "GraphEntitiesResponse",
 ]
+
+
+# Exports whose modules the client itself does not need (the async client pulls
+# in asyncio); they are imported when first accessed to keep `import harness_mem` cheap.
+_LAZY_EXPORTS = {
+    "AsyncHarnessMemClient": "aio",
+    "BackgroundWriter": "aio",
+    "ConsolidationScheduler": "consolidation",
+    "AdjacencyCache": "graph",
+    "GraphExpander": "graph",
+    "GraphNeighborhood": "graph",
+    "DocumentIngester": "ingest",
+    "IngestReport": "ingest",
+    "Lease": "lease",
+    "LeaseManager": "lease",
+    "ObservationLoader": "loader",
+    "RetentionExecutor": "retention",
+    "RetentionReport": "retention",
+    "SignalInbox": "signals",
+    "SyncEngine": "sync",
+    "SyncReport": "sync",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
@@ -0,0 +1,766 @@
+"""Asyncio client and background writer for the harness-mem daemon.
+
+``AsyncHarnessMemClient`` offers the methods the framework integrations use
+(``health``, ``search``, ``timeline``, ``get_observations``, ``record_event``,
+``record_checkpoint``, ``finalize_session``, ``resume_pack``, ``feed``) as
+coroutines. Requests go over a small HTTP/1.1 keep-alive connection pool on
+``asyncio`` streams, so waiting for the daemon never blocks a thread. Codec,
+result mode, hooks, retries and the observation cache behave as on
+``HarnessMemClient``.
+
+Connections belong to the event loop that opened them; a client used from
+several loops keeps one pool per loop.
+
+``BackgroundWriter`` runs fire-and-forget writes on a private event-loop
+thread. Its queue is bounded, failures are logged instead of raised, and it
+drains on ``flush()`` / ``close()`` and at interpreter exit::
+
+    client = AsyncHarnessMemClient()
+    writer = BackgroundWriter(max_pending=500)
+    writer.submit(lambda: client.record_checkpoint(session_id="s1", title="t", content="c"))
+    items = (await client.search(query="sqlite wal"))["items"]
+    writer.close()
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import logging
+import ssl as _ssl
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union, cast
+from urllib.parse import urlencode, urlsplit
+
+from .cache import ObservationCache, split_cached
+from .client import (
+    _DEFAULT_SEARCH_LIMIT,
+    _MAX_SEARCH_LIMIT,
+    _READ_ONLY_POST_PATHS,
+    HarnessMemClient,
+    _is_retryable,
+    _replace_items,
+)
+from .codec import JsonCodec, StdlibJsonCodec
+from .errors import HarnessMemAPIError, HarnessMemError, HarnessMemTransportError
+from .instrumentation import ClientHooks, RequestEvent, endpoint_label
+from .rerank import Reranker
+from .rows import ObservationRows
+from .types import (
+    ApiResponse,
+    EventEnvelope,
+    FeedResponse,
+    FinalizeSessionResponse,
+    GetObservationsResponse,
+    HealthResponse,
+    JsonDict,
+    OptionalJsonDict,
+    ResumePackResponse,
+    SearchResponse,
+    TimelineResponse,
+    WriteResponse,
+)
+
+_logger = logging.getLogger("harness_mem")
+
+OVERFLOW_POLICIES = ("block", "drop")
+
+
+class _ConnectionClosed(ConnectionError):
+    """The peer closed the connection before sending a status line."""
+
+
+class _ProtocolError(Exception):
+    """The response is not valid HTTP/1.x."""
+
+
+@dataclass
+class _Response:
+    status: int
+    reason: str
+    body: bytes
+    headers_at: float
+    keep_alive: bool
+
+
+class _ConnectionPool:
+    """Keep-alive HTTP/1.1 connections to one host, owned by one event loop."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        use_ssl: bool,
+        host_header: str,
+        max_connections: int,
+        keepalive_expiry_sec: float,
+        stats: Dict[str, int],
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.ssl = _ssl.create_default_context() if use_ssl else None
+        self.host_header = host_header
+        self.keepalive_expiry_sec = keepalive_expiry_sec
+        self._slots = asyncio.Semaphore(max_connections)
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter, float]] = []
+        self.stats = stats
+
+    async def exchange(
+        self, method: str, target: str, headers: Dict[str, str], body: Optional[bytes], *, idempotent: bool
+    ) -> _Response:
+        head = _request_head(method, target, self.host_header, headers, body)
+        async with self._slots:
+            reader, writer, reused = await self._acquire()
+            try:
+                try:
+                    response = await _roundtrip(reader, writer, method, head, body)
+                except _ConnectionClosed:
+                    if not (reused and idempotent):
+                        raise
+                    # Most likely the server dropped an idle keep-alive connection, but it may
+                    # have read (and acted on) the request first, so only idempotent ones are re-sent.
+                    writer.close()
+                    reader, writer = await self._open()
+                    response = await _roundtrip(reader, writer, method, head, body)
+            except BaseException:
+                writer.close()
+                raise
+            if response.keep_alive:
+                self._idle.append((reader, writer, time.monotonic()))
+            else:
+                writer.close()
+            return response
+
+    async def _acquire(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter, bool]:
+        now = time.monotonic()
+        while self._idle:
+            reader, writer, idle_since = self._idle.pop()
+            if now - idle_since < self.keepalive_expiry_sec and not reader.at_eof() and not writer.is_closing():
+                self.stats["reused"] += 1
+                return reader, writer, True
+            writer.close()
+        reader, writer = await self._open()
+        return reader, writer, False
+
+    async def _open(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        reader, writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+        self.stats["opened"] += 1
+        return reader, writer
+
+    async def aclose(self) -> None:
+        idle, self._idle = self._idle, []
+        for _, writer, _ in idle:
+            writer.close()
+        for _, writer, _ in idle:
+            try:
+                await writer.wait_closed()
+            except (OSError, asyncio.CancelledError):
+                pass
+
+
+def _request_head(method: str, target: str, host_header: str, headers: Dict[str, str], body: Optional[bytes]) -> bytes:
+    lines = [f"{method} {target} HTTP/1.1", f"host: {host_header}", "accept: application/json", "connection: keep-alive"]
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    if body is not None:
+        lines.append(f"content-length: {len(body)}")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+async def _roundtrip(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter, method: str, head: bytes, body: Optional[bytes]
+) -> _Response:
+    try:
+        writer.write(head + body if body else head)
+        await writer.drain()
+        status_line = await reader.readline()
+    except ConnectionError:
+        status_line = b""
+    if not status_line:
+        raise _ConnectionClosed("connection closed before response")
+    version, _, rest = status_line.decode("latin-1").strip().partition(" ")
+    code, _, reason = rest.partition(" ")
+    if not version.startswith("HTTP/1.") or not code.isdigit():
+        raise _ProtocolError(f"invalid status line: {status_line[:80]!r}")
+    status = int(code)
+
+    headers: Dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    headers_at = time.perf_counter()
+
+    connection = headers.get("connection", "").lower()
+    keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+    if method == "HEAD" or status in (204, 304) or status < 200:
+        payload = b""
+    elif "chunked" in headers.get("transfer-encoding", "").lower():
+        payload = await _read_chunked(reader)
+    elif "content-length" in headers:
+        try:
+            length = int(headers["content-length"])
+        except ValueError:
+            raise _ProtocolError(f"invalid content-length: {headers['content-length']!r}") from None
+        payload = await reader.readexactly(length)
+    else:
+        payload = await reader.read()
+        keep_alive = False
+    return _Response(status=status, reason=reason, body=payload, headers_at=headers_at, keep_alive=keep_alive)
+
+
+async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+    chunks = []
+    while True:
+        size_line = await reader.readline()
+        try:
+            size = int(size_line.split(b";", 1)[0].strip(), 16)
+        except ValueError:
+            raise _ProtocolError(f"invalid chunk size: {size_line[:40]!r}") from None
+        if size == 0:
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            return b"".join(chunks)
+        chunks.append(await reader.readexactly(size))
+        await reader.readexactly(2)
+
+
+def _is_retryable_async(error: HarnessMemError) -> bool:
+    return _is_retryable(error) or isinstance(error.__context__, (asyncio.TimeoutError, EOFError))
+
+
+@dataclass
+class AsyncHarnessMemClient:
+    base_url: str = "http://127.0.0.1:37888"
+    timeout_sec: float = 8.0
+    token: Optional[str] = None
+    codec: JsonCodec = field(default_factory=StdlibJsonCodec)
+    result_mode: str = "dict"
+    observation_cache: Optional[ObservationCache] = None
+    hooks: List[ClientHooks] = field(default_factory=list)
+    max_retries: int = 0
+    retry_backoff_sec: float = 0.05
+    max_connections: int = 10
+    keepalive_expiry_sec: float = 5.0
+
+    def __post_init__(self) -> None:
+        if self.max_connections < 1:
+            raise ValueError("max_connections must be >= 1")
+        parts = urlsplit(self.base_url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError("base_url must be an http:// or https:// URL")
+        self._host = parts.hostname
+        self._port = parts.port or (443 if parts.scheme == "https" else 80)
+        self._use_ssl = parts.scheme == "https"
+        self._host_header = parts.netloc
+        self._path_prefix = parts.path.rstrip("/")
+        # Option validation, headers, decoding, envelope checks and hook dispatch are shared with the sync client.
+        self._sync = HarnessMemClient(
+            base_url=self.base_url,
+            timeout_sec=self.timeout_sec,
+            token=self.token,
+            codec=self.codec,
+            result_mode=self.result_mode,
+            observation_cache=self.observation_cache,
+            hooks=self.hooks,
+            max_retries=self.max_retries,
+            retry_backoff_sec=self.retry_backoff_sec,
+        )
+        self._stats = {"opened": 0, "reused": 0}
+        self._pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _ConnectionPool]" = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def from_client(cls, client: HarnessMemClient, **overrides: Any) -> "AsyncHarnessMemClient":
+        """Async client with the connection, codec, cache and hook settings of ``client``."""
+        settings: Dict[str, Any] = {
+            "base_url": client.base_url,
+            "timeout_sec": client.timeout_sec,
+            "token": client.token,
+            "codec": client.codec,
+            "result_mode": client.result_mode,
+            "observation_cache": client.observation_cache,
+            "hooks": client.hooks,
+            "max_retries": client.max_retries,
+            "retry_backoff_sec": client.retry_backoff_sec,
+        }
+        settings.update(overrides)
+        return cls(**settings)
+
+    def _pool(self) -> _ConnectionPool:
+        loop = asyncio.get_running_loop()
+        pool = self._pools.get(loop)
+        if pool is None:
+            pool = _ConnectionPool(
+                self._host,
+                self._port,
+                self._use_ssl,
+                self._host_header,
+                self.max_connections,
+                self.keepalive_expiry_sec,
+                self._stats,
+            )
+            self._pools[loop] = pool
+        return pool
+
+    def connection_stats(self) -> Dict[str, int]:
+        """Connections opened, keep-alive reuses and currently idle connections, over every event loop."""
+        return {**self._stats, "idle": sum(len(pool._idle) for pool in list(self._pools.values()))}
+
+    async def aclose(self) -> None:
+        """Close the idle connections opened on the running event loop."""
+        loop = asyncio.get_running_loop()
+        pool = self._pools.pop(loop, None)
+        if pool is not None:
+            await pool.aclose()
+
+    async def __aenter__(self) -> "AsyncHarnessMemClient":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.aclose()
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        payload: OptionalJsonDict = None,
+        query: Optional[Dict[str, Any]] = None,
+        response_type: Optional[type] = None,
+    ) -> ApiResponse:
+        method = method.upper()
+        query_str = f"?{urlencode({k: v for k, v in (query or {}).items() if v is not None})}" if query else ""
+        body = self.codec.encode(payload or {}) if method in {"POST", "PUT", "PATCH"} else None
+        read_only = method == "GET" or path in _READ_ONLY_POST_PATHS
+        retries = self.max_retries if read_only else 0
+        attempt = 0
+        while True:
+            event = RequestEvent(
+                method=method,
+                endpoint=endpoint_label(path),
+                url=f"{self.base_url}{path}{query_str}",
+                attempt=attempt,
+                bytes_out=len(body) if body else 0,
+                request_body=body,
+            )
+            try:
+                return await self._send(
+                    method, f"{self._path_prefix}{path}{query_str}", body, response_type, event, idempotent=read_only
+                )
+            except HarnessMemError as exc:
+                if attempt >= retries or not _is_retryable_async(exc):
+                    raise
+                delay = self.retry_backoff_sec * (2**attempt)
+                self._sync._emit("on_retry", event, delay)
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    async def _send(
+        self,
+        method: str,
+        target: str,
+        body: Optional[bytes],
+        response_type: Optional[type],
+        event: RequestEvent,
+        *,
+        idempotent: bool,
+    ) -> ApiResponse:
+        self._sync._emit("on_request_start", event)
+        started = time.perf_counter()
+        try:
+            parsed = await self._send_timed(method, target, body, response_type, event, started, idempotent)
+        except BaseException as exc:
+            event.error = exc
+            event.duration_ms = (time.perf_counter() - started) * 1000.0
+            self._sync._emit("on_error", event)
+            self._sync._emit("on_request_end", event)
+            raise
+        event.duration_ms = (time.perf_counter() - started) * 1000.0
+        meta = parsed.get("meta")
+        latency = meta.get("latency_ms") if hasattr(meta, "get") else None
+        if isinstance(latency, (int, float)) and not isinstance(latency, bool):
+            event.server_latency_ms = float(latency)
+        self._sync._emit("on_request_end", event)
+        return parsed
+
+    async def _send_timed(
+        self,
+        method: str,
+        target: str,
+        body: Optional[bytes],
+        response_type: Optional[type],
+        event: RequestEvent,
+        started: float,
+        idempotent: bool,
+    ) -> ApiResponse:
+        try:
+            response = await asyncio.wait_for(
+                self._pool().exchange(method, target, self._sync._headers(), body, idempotent=idempotent),
+                self.timeout_sec,
+            )
+        except asyncio.TimeoutError:
+            raise HarnessMemTransportError(message=f"timed out after {self.timeout_sec}s")
+        except (OSError, EOFError, _ProtocolError) as exc:
+            raise HarnessMemTransportError(message=str(exc) or type(exc).__name__)
+        read_at = time.perf_counter()
+        event.status = response.status
+        event.wait_ms = (response.headers_at - started) * 1000.0
+        event.read_ms = (read_at - response.headers_at) * 1000.0
+        event.bytes_in = len(response.body)
+
+        if response.status >= 400:
+            try:
+                body_json = self.codec.decode(response.body)
+            except Exception:
+                body_json = None
+            message = self._sync._extract_error_message(body_json, f"HTTP Error {response.status}: {response.reason}")
+            raise HarnessMemAPIError(status_code=response.status, message=str(message), response_body=body_json)
+        try:
+            parsed = self._sync._decode_body(response.body, response_type)
+        except ValueError as exc:
+            raise HarnessMemTransportError(message=f"Invalid JSON response: {exc}")
+        event.decode_ms = (time.perf_counter() - read_at) * 1000.0
+        return self._sync._accept(parsed, response_type)
+
+    async def health(self) -> HealthResponse:
+        return cast(HealthResponse, await self._request("GET", "/health"))
+
+    async def search(
+        self,
+        *,
+        query: str,
+        project: Optional[str] = None,
+        limit: Optional[int] = None,
+        include_private: bool = False,
+        debug: bool = False,
+        reranker: Optional[Reranker] = None,
+    ) -> SearchResponse:
+        """Search observations. Maps to POST /v1/search; see ``HarnessMemClient.search``."""
+        request_limit = limit
+        if reranker is not None:
+            limit = limit or _DEFAULT_SEARCH_LIMIT
+            request_limit = min(limit * reranker.overfetch, _MAX_SEARCH_LIMIT)
+        payload: JsonDict = {
+            "query": query,
+            "project": project,
+            "limit": request_limit,
+            "include_private": include_private,
+            "debug": debug,
+        }
+        response = cast(SearchResponse, await self._request("POST", "/v1/search", payload, response_type=SearchResponse))
+        if reranker is not None and limit is not None:
+            response = _replace_items(response, reranker.rerank(response.get("items") or [], limit=limit))
+        return response
+
+    async def timeline(
+        self, observation_id: str, *, before: int = 5, after: int = 5, include_private: bool = False
+    ) -> TimelineResponse:
+        payload: JsonDict = {"id": observation_id, "before": before, "after": after, "include_private": include_private}
+        return cast(TimelineResponse, await self._request("POST", "/v1/timeline", payload, response_type=TimelineResponse))
+
+    async def get_observations(
+        self, *, ids: Union[Iterable[str], str], include_private: bool = False, compact: bool = True
+    ) -> GetObservationsResponse:
+        normalized_ids = HarnessMemClient._normalize_ids(ids)
+        cache = self.observation_cache
+        if cache is None:
+            return await self._fetch_observations(normalized_ids, include_private=include_private, compact=compact)
+
+        by_id, missing = split_cached(cache, normalized_ids, compact=compact, include_private=include_private)
+        if self.hooks:
+            self._sync._emit("on_cache", "POST /v1/observations/get", len(by_id), len(missing))
+        if missing:
+            response = await self._fetch_observations(missing, include_private=include_private, compact=compact)
+            for item in response.get("items") or []:
+                cache.put(item, compact=compact, include_private=include_private)
+                by_id.setdefault(item.get("id"), item)
+        else:
+            response = cast(
+                GetObservationsResponse,
+                {
+                    "ok": True,
+                    "source": "core",
+                    "items": [] if self.result_mode == "dict" else ObservationRows([]),
+                    "meta": {"count": 0, "latency_ms": 0},
+                },
+            )
+        items = [by_id[observation_id] for observation_id in dict.fromkeys(normalized_ids) if observation_id in by_id]
+        return _replace_items(response, items)
+
+    async def _fetch_observations(
+        self, ids: List[str], *, include_private: bool, compact: bool
+    ) -> GetObservationsResponse:
+        payload: JsonDict = {"ids": ids, "include_private": include_private, "compact": compact}
+        return cast(
+            GetObservationsResponse,
+            await self._request("POST", "/v1/observations/get", payload, response_type=GetObservationsResponse),
+        )
+
+    async def record_event(self, event: EventEnvelope) -> WriteResponse:
+        return cast(WriteResponse, await self._request("POST", "/v1/events/record", {"event": event}))
+
+    async def record_checkpoint(
+        self,
+        *,
+        session_id: str,
+        title: str,
+        content: str,
+        platform: Optional[str] = None,
+        project: Optional[str] = None,
+        tags: Optional[Sequence[str]] = None,
+        privacy_tags: Optional[Sequence[str]] = None,
+    ) -> WriteResponse:
+        payload: JsonDict = {
+            "platform": platform,
+            "project": project,
+            "session_id": session_id,
+            "title": title,
+            "content": content,
+            "tags": list(tags or []),
+            "privacy_tags": list(privacy_tags or []),
+        }
+        return cast(WriteResponse, await self._request("POST", "/v1/checkpoints/record", payload))
+
+    async def finalize_session(
+        self,
+        *,
+        session_id: str,
+        platform: Optional[str] = None,
+        project: Optional[str] = None,
+        summary_mode: str = "standard",
+    ) -> FinalizeSessionResponse:
+        payload: JsonDict = {
+            "platform": platform,
+            "project": project,
+            "session_id": session_id,
+            "summary_mode": summary_mode,
+        }
+        return cast(FinalizeSessionResponse, await self._request("POST", "/v1/sessions/finalize", payload))
+
+    async def resume_pack(
+        self,
+        *,
+        project: str,
+        session_id: Optional[str] = None,
+        limit: Optional[int] = None,
+        include_private: bool = False,
+    ) -> ResumePackResponse:
+        payload: JsonDict = {
+            "project": project,
+            "session_id": session_id,
+            "limit": limit,
+            "include_private": include_private,
+        }
+        return cast(
+            ResumePackResponse, await self._request("POST", "/v1/resume-pack", payload, response_type=ResumePackResponse)
+        )
+
+    async def feed(
+        self,
+        *,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        project: Optional[str] = None,
+        type: Optional[str] = None,
+        include_private: bool = False,
+        user_id: Optional[str] = None,
+        team_id: Optional[str] = None,
+        memory_type: Optional[str] = None,
+    ) -> FeedResponse:
+        query = {
+            "cursor": cursor,
+            "limit": limit,
+            "project": project,
+            "type": type,
+            "include_private": include_private or None,
+            "user_id": user_id,
+            "team_id": team_id,
+            "memory_type": memory_type,
+        }
+        return cast(FeedResponse, await self._request("GET", "/v1/feed", query=query, response_type=FeedResponse))
+
+
+class BackgroundWriter:
+    """Fire-and-forget writes on a private event-loop thread.
+
+    ``submit(factory)`` schedules ``factory()`` (a coroutine function, e.g. a
+    bound ``AsyncHarnessMemClient.record_checkpoint`` wrapped in a lambda) and
+    returns at once. At most ``max_pending`` writes are queued or running and at
+    most ``concurrency`` run at the same time; when the queue is full,
+    ``overflow="block"`` waits for room (up to ``block_timeout_sec``) and
+    ``overflow="drop"`` discards the write. Both count as ``dropped`` when
+    nothing is queued. Failed writes are logged, counted and passed to
+    ``on_error``; they are never raised to the submitter.
+
+    ``flush()`` waits for every write submitted so far. ``close()`` flushes,
+    awaits ``on_close`` on the writer loop (use it to close connections opened
+    there) and stops the thread. ``close`` also runs at interpreter exit.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_pending: int = 1000,
+        concurrency: int = 4,
+        overflow: str = "block",
+        block_timeout_sec: Optional[float] = None,
+        close_timeout_sec: float = 5.0,
+        on_error: Optional[Callable[[BaseException], Any]] = None,
+        on_close: Optional[Callable[[], Awaitable[Any]]] = None,
+        name: str = "harness-mem-writer",
+    ) -> None:
+        if max_pending < 1:
+            raise ValueError("max_pending must be >= 1")
+        if concurrency < 1:
+            raise ValueError("concurrency must be >= 1")
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {', '.join(OVERFLOW_POLICIES)}")
+        self.max_pending = max_pending
+        self.concurrency = concurrency
+        self.overflow = overflow
+        self.block_timeout_sec = block_timeout_sec
+        self.close_timeout_sec = close_timeout_sec
+        self.on_error = on_error
+        self.on_close = on_close
+        self.name = name
+        self._cond = threading.Condition()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._closed = False
+        self._pending = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def submit(self, factory: Callable[[], Awaitable[Any]]) -> bool:
+        """Queue ``factory()``; ``False`` when the write was dropped."""
+        with self._cond:
+            if not self._try_reserve_locked():
+                waited = (
+                    self.overflow == "block"
+                    and threading.current_thread() is not self._thread
+                    and self._cond.wait_for(lambda: self._pending < self.max_pending or self._closed, self.block_timeout_sec)
+                )
+                if not waited or not self._try_reserve_locked():
+                    self.dropped += 1
+                    return False
+            loop = self._start_locked()
+        asyncio.run_coroutine_threadsafe(self._execute(factory), loop)
+        return True
+
+    async def asubmit(self, factory: Callable[[], Awaitable[Any]]) -> bool:
+        """``submit`` for coroutines: waits for room without blocking the caller's loop."""
+        with self._cond:
+            reserved = self._try_reserve_locked()
+            if reserved:
+                loop = self._start_locked()
+            elif self.overflow == "drop":
+                self.dropped += 1
+                return False
+        if reserved:
+            asyncio.run_coroutine_threadsafe(self._execute(factory), loop)
+            return True
+        return await asyncio.get_running_loop().run_in_executor(None, self.submit, factory)
+
+    def _try_reserve_locked(self) -> bool:
+        if self._closed:
+            raise RuntimeError("BackgroundWriter is closed")
+        if self._pending >= self.max_pending:
+            return False
+        self._pending += 1
+        self.submitted += 1
+        return True
+
+    def _start_locked(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._run, args=(self._loop,), name=self.name, daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+        return self._loop
+
+    @staticmethod
+    def _run(loop: asyncio.AbstractEventLoop) -> None:
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+        finally:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    async def _execute(self, factory: Callable[[], Awaitable[Any]]) -> None:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        try:
+            async with self._semaphore:
+                await factory()
+        except Exception as exc:
+            _logger.warning("harness-mem background write failed: %s", exc)
+            with self._cond:
+                self.failed += 1
+            if self.on_error is not None:
+                try:
+                    self.on_error(exc)
+                except Exception:
+                    _logger.exception("harness-mem background writer on_error callback failed")
+        else:
+            with self._cond:
+                self.completed += 1
+        finally:
+            with self._cond:
+                self._pending -= 1
+                self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every submitted write finished; ``False`` on timeout."""
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("flush() cannot be called from the writer thread")
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending == 0, timeout=timeout)
+
+    async def aflush(self, timeout: Optional[float] = None) -> bool:
+        return await asyncio.get_running_loop().run_in_executor(None, self.flush, timeout)
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """Flush, run ``on_close`` and stop the writer thread; ``False`` if writes were left pending."""
+        timeout = self.close_timeout_sec if timeout is None else timeout
+        with self._cond:
+            if self._closed:
+                return self._pending == 0
+            self._closed = True
+            self._cond.notify_all()
+            loop, thread = self._loop, self._thread
+        atexit.unregister(self.close)
+        if loop is None or thread is None:
+            return True
+        deadline = time.monotonic() + timeout
+        drained = self.flush(timeout)
+        if not drained:
+            _logger.warning("harness-mem background writer closed with %d write(s) pending", self._pending)
+        if self.on_close is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(self.on_close(), loop).result(max(deadline - time.monotonic(), 0.1))
+            except Exception:
+                _logger.exception("harness-mem background writer on_close failed")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(max(deadline - time.monotonic(), 0.1))
+        return drained
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "dropped": self.dropped,
+                "pending": self._pending,
+            }
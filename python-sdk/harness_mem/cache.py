@@ -0,0 +1,196 @@
+"""Bounded, id-keyed observation cache for HarnessMemClient.
+
+Observations are fetched by id repeatedly but rarely change. Attach an
+``ObservationCache`` to a client and ``get_observations`` only asks the daemon
+for ids it has not seen::
+
+    cache = ObservationCache(max_entries=50_000, max_bytes=128 * 1024 * 1024)
+    client = HarnessMemClient(observation_cache=cache)
+    client.get_observations(ids=["obs_1", "obs_2"])   # daemon
+    client.get_observations(ids=["obs_1"])            # cache
+    print(cache.stats())
+
+Entries are keyed by ``(id, compact, include_private)`` so a private or full
+item is never served to a request that did not ask for it. Eviction is LRU
+within both an entry budget and an estimated byte budget.
+
+Freshness: an entry is served for at most ``ttl_sec`` (default 300 s) after
+it was fetched, so an edit made by another writer or device shows up within
+that window. Sooner than that, every observation the client sees in any
+response (search, timeline, feed, resume-pack, export) is compared against
+the cached ``updated_at``, and a differing value evicts the stale entry.
+Deletes made through the same client invalidate their ids. ``ttl_sec=None``
+drops the time bound, which is only safe when this client is the sole writer.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+_Key = Tuple[str, bool, bool]  # (id, compact, include_private)
+_VARIANTS = ((True, False), (True, True), (False, False), (False, True))
+
+
+def estimate_bytes(value: Any) -> int:
+    """Rough retained size of a decoded JSON value."""
+    if isinstance(value, str):
+        return sys.getsizeof(value)
+    if isinstance(value, (int, float, bool)) or value is None:
+        return 32
+    if hasattr(value, "items") and hasattr(value, "get"):
+        return 64 + sum(estimate_bytes(key) + estimate_bytes(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return 56 + sum(8 + estimate_bytes(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class _Entry:
+    __slots__ = ("item", "size", "updated_at", "stored_at")
+
+    def __init__(self, item: Any, size: int, updated_at: Optional[str], stored_at: float) -> None:
+        self.item = item
+        self.size = size
+        self.updated_at = updated_at
+        self.stored_at = stored_at
+
+
+class ObservationCache:
+    def __init__(
+        self,
+        *,
+        max_entries: int = 10_000,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_sec: Optional[float] = 300.0,
+    ) -> None:
+        if max_entries < 1 or max_bytes < 1:
+            raise ValueError("max_entries and max_bytes must be positive")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_sec = ttl_sec
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[_Key, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.stale = 0
+
+    def get(self, observation_id: str, *, compact: bool = True, include_private: bool = False) -> Optional[Any]:
+        key = (observation_id, compact, include_private)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_sec is not None and time.monotonic() - entry.stored_at > self.ttl_sec:
+                self._remove_locked(key)
+                self.stale += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            item = entry.item
+        return dict(item) if isinstance(item, dict) else item
+
+    def put(self, item: Any, *, compact: bool = True, include_private: bool = False) -> None:
+        observation_id = item.get("id") if hasattr(item, "get") else None
+        if not isinstance(observation_id, str) or not observation_id:
+            return
+        size = estimate_bytes(item)
+        if size > self.max_bytes:
+            return
+        key = (observation_id, compact, include_private)
+        stored = dict(item) if isinstance(item, dict) else item
+        with self._lock:
+            if key in self._entries:
+                self._remove_locked(key)
+            self._entries[key] = _Entry(stored, size, _updated_at(item), time.monotonic())
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove_locked(oldest)
+                self.evictions += 1
+
+    def observe(self, items: Iterable[Any]) -> None:
+        """Drop cached entries whose ``updated_at`` differs from a fresh copy."""
+        with self._lock:
+            if not self._entries:
+                return
+            for item in items:
+                if not hasattr(item, "get"):
+                    continue
+                observation_id = item.get("id")
+                updated_at = _updated_at(item)
+                if not isinstance(observation_id, str) or updated_at is None:
+                    continue
+                for compact, include_private in _VARIANTS:
+                    key = (observation_id, compact, include_private)
+                    entry = self._entries.get(key)
+                    if entry is not None and entry.updated_at is not None and entry.updated_at != updated_at:
+                        self._remove_locked(key)
+                        self.stale += 1
+
+    def invalidate(self, observation_ids: Iterable[str]) -> int:
+        removed = 0
+        with self._lock:
+            for observation_id in observation_ids:
+                for compact, include_private in _VARIANTS:
+                    key = (observation_id, compact, include_private)
+                    if key in self._entries:
+                        self._remove_locked(key)
+                        removed += 1
+            self.invalidations += removed
+        return removed
+
+    def clear(self) -> None:
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "stale": self.stale,
+            }
+
+    def _remove_locked(self, key: _Key) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+
+def _updated_at(item: Any) -> Optional[str]:
+    value = item.get("updated_at")
+    return value if isinstance(value, str) and value else None
+
+
+def split_cached(
+    cache: ObservationCache, ids: List[str], *, compact: bool, include_private: bool
+) -> Tuple[Dict[str, Any], List[str]]:
+    """Return ``(hits_by_id, missing_ids)`` for the requested ids."""
+    hits: Dict[str, Any] = {}
+    missing: List[str] = []
+    for observation_id in dict.fromkeys(ids):
+        item = cache.get(observation_id, compact=compact, include_private=include_private)
+        if item is None:
+            missing.append(observation_id)
+        else:
+            hits[observation_id] = item
+    return hits, missing
@@ -1,39 +1,101 @@
 from __future__ import annotations
 
-import json
-from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List, Optional, Sequence, Union, cast
+import copy
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union, cast
 from urllib.error import HTTPError, URLError
-from urllib.parse import urlencode
+from urllib.parse import quote, urlencode
 from urllib.request import Request, urlopen
 
-from .errors import HarnessMemAPIError, HarnessMemTransportError
+from .cache import ObservationCache, split_cached
+from .codec import JsonCodec, StdlibJsonCodec
+from .errors import HarnessMemAPIError, HarnessMemError, HarnessMemTransportError
+from .instrumentation import ClientHooks, RequestEvent, endpoint_label
+from .rerank import Reranker
+from .rows import LAZY_ROWS_AVAILABLE, RESULT_MODES, ObservationRows, ObservationStream, decode_lazy, to_rows
+from .singleflight import SingleFlight, canonical_key
 from .types import (
     ApiResponse,
     AuditLogResponse,
     ConsolidationStatusResponse,
     EventEnvelope,
+    ExportResponse,
     FeedResponse,
     FinalizeSessionResponse,
+    ForgetResponse,
     GetObservationsResponse,
+    GraphEntitiesResponse,
+    GraphNeighborsResponse,
+    GraphResponse,
     HealthResponse,
+    IngestResponse,
     JsonDict,
+    LeaseResponse,
     OptionalJsonDict,
     ResumePackResponse,
     SearchFacetsResponse,
     SearchResponse,
+    SignalReadResponse,
+    SignalResponse,
+    SyncPullResponse,
+    SyncPushResponse,
+    SyncRecord,
     TeamMemberResponse,
     TeamResponse,
     TimelineResponse,
     WriteResponse,
 )
 
+# Server-side clamp for /v1/search ``limit`` (default 20, max 100).
+_DEFAULT_SEARCH_LIMIT = 20
+_MAX_SEARCH_LIMIT = 100
+
+# Server-side cap on ids per /v1/observations/bulk-delete (and per hard purge).
+BULK_DELETE_MAX_IDS = 500
+
+# Server-side cap on records per /v1/sync/push.
+SYNC_PUSH_MAX_RECORDS = 10_000
+
+# Server-side clamp for /v1/graph and /v1/graph/neighbors ``depth``.
+GRAPH_MAX_DEPTH = 5
+
+# Read-only POST endpoints: safe to coalesce when ``coalesce=True`` and to retry
+# when ``max_retries > 0``. Every GET is treated as read-only.
+_READ_ONLY_POST_PATHS = frozenset(
+    {"/v1/search", "/v1/timeline", "/v1/observations/get", "/v1/resume-pack", "/v1/signal/read"}
+)
+
+# HTTP statuses worth retrying for read-only requests.
+_RETRYABLE_STATUSES = frozenset({429, 502, 503, 504})
+
+# Responses whose ``items`` are observations and can be returned as compact rows.
+_ROW_RESPONSE_TYPES = frozenset(
+    {SearchResponse, TimelineResponse, GetObservationsResponse, ResumePackResponse, FeedResponse, ExportResponse}
+)
+
 
 @dataclass
 class HarnessMemClient:
     base_url: str = "http://127.0.0.1:37888"
     timeout_sec: float = 8.0
     token: Optional[str] = None
+    codec: JsonCodec = field(default_factory=StdlibJsonCodec)
+    result_mode: str = "dict"
+    coalesce: bool = False
+    observation_cache: Optional[ObservationCache] = None
+    hooks: List[ClientHooks] = field(default_factory=list)
+    max_retries: int = 0
+    retry_backoff_sec: float = 0.05
+    _singleflight: SingleFlight = field(default_factory=SingleFlight, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        if self.result_mode not in RESULT_MODES:
+            raise ValueError(f"result_mode must be one of {', '.join(RESULT_MODES)}")
+        if self.result_mode == "lazy" and not LAZY_ROWS_AVAILABLE:
+            raise ImportError("result_mode='lazy' requires the 'msgspec' package")
+        if self.max_retries < 0:
+            raise ValueError("max_retries must be >= 0")
 
     def _headers(self) -> Dict[str, str]:
         headers = {"content-type": "application/json"}
@@ -47,47 +109,141 @@ class HarnessMemClient:
         path: str,
         payload: OptionalJsonDict = None,
         query: Optional[Dict[str, Any]] = None,
+        response_type: Optional[type] = None,
     ) -> ApiResponse:
+        method = method.upper()
         query_str = f"?{urlencode({k: v for k, v in (query or {}).items() if v is not None})}" if query else ""
-        body = json.dumps(payload or {}).encode("utf-8") if method.upper() in {"POST", "PUT", "PATCH"} else None
+        body = self.codec.encode(payload or {}) if method in {"POST", "PUT", "PATCH"} else None
         req = Request(
             url=f"{self.base_url}{path}{query_str}",
             data=body,
             headers=self._headers(),
-            method=method.upper(),
+            method=method,
         )
+        read_only = method == "GET" or path in _READ_ONLY_POST_PATHS
+        retries = self.max_retries if read_only else 0
 
+        if self.coalesce and read_only:
+            key = canonical_key(method, path, payload, query_str)
+            return self._singleflight.do(key, lambda: self._send_with_retries(req, path, response_type, retries))
+        return self._send_with_retries(req, path, response_type, retries)
+
+    def _send_with_retries(
+        self, req: Request, path: str, response_type: Optional[type], retries: int
+    ) -> ApiResponse:
+        attempt = 0
+        while True:
+            event = RequestEvent(
+                method=req.get_method(),
+                endpoint=endpoint_label(path),
+                url=req.full_url,
+                attempt=attempt,
+                bytes_out=len(req.data) if req.data else 0,
+                request_body=req.data,
+            )
+            try:
+                return self._send(req, response_type, event)
+            except HarnessMemError as exc:
+                if attempt >= retries or not _is_retryable(exc):
+                    raise
+                delay = self.retry_backoff_sec * (2**attempt)
+                self._emit("on_retry", event, delay)
+                time.sleep(delay)
+                attempt += 1
+
+    def _send(self, req: Request, response_type: Optional[type], event: RequestEvent) -> ApiResponse:
+        self._emit("on_request_start", event)
+        started = time.perf_counter()
+        try:
+            parsed = self._send_timed(req, response_type, event, started)
+        except BaseException as exc:
+            event.error = exc
+            event.duration_ms = (time.perf_counter() - started) * 1000.0
+            self._emit("on_error", event)
+            self._emit("on_request_end", event)
+            raise
+        event.duration_ms = (time.perf_counter() - started) * 1000.0
+        meta = parsed.get("meta")
+        latency = meta.get("latency_ms") if hasattr(meta, "get") else None
+        if isinstance(latency, (int, float)) and not isinstance(latency, bool):
+            event.server_latency_ms = float(latency)
+        self._emit("on_request_end", event)
+        return parsed
+
+    def _send_timed(
+        self, req: Request, response_type: Optional[type], event: RequestEvent, started: float
+    ) -> ApiResponse:
         try:
             with urlopen(req, timeout=self.timeout_sec) as response:
-                raw = response.read().decode("utf-8")
-                parsed = json.loads(raw) if raw else {}
+                headers_at = time.perf_counter()
+                event.wait_ms = (headers_at - started) * 1000.0
+                event.status = getattr(response, "status", None)
+                raw = response.read()
+            read_at = time.perf_counter()
+            event.read_ms = (read_at - headers_at) * 1000.0
+            event.bytes_in = len(raw)
+            parsed = self._decode_body(raw, response_type)
+            event.decode_ms = (time.perf_counter() - read_at) * 1000.0
         except HTTPError as exc:
+            event.status = exc.code
             try:
-                body_json = json.loads(exc.read().decode("utf-8"))
+                body_json = self.codec.decode(exc.read())
             except Exception:
                 body_json = None
             message = self._extract_error_message(body_json, str(exc))
             raise HarnessMemAPIError(status_code=exc.code, message=str(message), response_body=body_json)
         except (URLError, OSError) as exc:
             raise HarnessMemTransportError(message=str(exc))
-        except json.JSONDecodeError as exc:
+        except ValueError as exc:
             raise HarnessMemTransportError(message=f"Invalid JSON response: {exc}")
+        return self._accept(parsed, response_type)
 
-        if not isinstance(parsed, dict):
+    def _accept(self, parsed: Any, response_type: Optional[type]) -> ApiResponse:
+        """Validate a decoded response envelope and feed the observation cache."""
+        if not isinstance(parsed, dict) and not hasattr(parsed, "__struct_fields__"):
             raise HarnessMemTransportError(message="API response is not a JSON object")
 
         if parsed.get("ok") is False:
             raise HarnessMemAPIError(
                 status_code=200,
                 message=self._extract_error_message(parsed, "harness-mem API returned ok=false"),
-                response_body=parsed,
+                response_body=parsed if isinstance(parsed, dict) else parsed.to_dict(),
             )
 
+        if self.observation_cache is not None and response_type in _ROW_RESPONSE_TYPES:
+            self.observation_cache.observe(parsed.get("items") or [])
+
         return parsed  # type: ignore[return-value]
 
+    def _emit(self, name: str, *args: Any) -> None:
+        for hook in self.hooks:
+            try:
+                getattr(hook, name)(*args)
+            except Exception:
+                import logging  # only needed on this error path; kept off the import-time path
+
+                logging.getLogger("harness_mem").exception(
+                    "harness-mem client hook %s.%s failed", type(hook).__name__, name
+                )
+
+    def coalesce_stats(self) -> Dict[str, int]:
+        """Counters of the request coalescer: executed, deduplicated, in_flight."""
+        return self._singleflight.stats()
+
+    def _decode_body(self, raw: bytes, response_type: Optional[type]) -> Any:
+        if not raw:
+            return {}
+        rows_enabled = self.result_mode != "dict" and response_type in _ROW_RESPONSE_TYPES
+        if rows_enabled and self.result_mode == "lazy":
+            return decode_lazy(raw)
+        parsed = self.codec.decode(raw, response_type)
+        if rows_enabled:
+            to_rows(parsed)
+        return parsed
+
     @staticmethod
     def _extract_error_message(payload: Any, fallback: str) -> str:
-        if isinstance(payload, dict):
+        if isinstance(payload, dict) or hasattr(payload, "__struct_fields__"):
             for key in ("error", "message", "detail"):
                 value = payload.get(key)
                 if isinstance(value, str) and value.strip():
@@ -116,15 +272,28 @@ class HarnessMemClient:
         limit: Optional[int] = None,
         include_private: bool = False,
         debug: bool = False,
+        reranker: Optional[Reranker] = None,
     ) -> SearchResponse:
+        """Search observations. Maps to POST /v1/search.
+
+        With ``reranker``, ``reranker.overfetch * limit`` candidates are fetched
+        (capped at the server maximum) and re-ranked locally down to ``limit``.
+        """
+        request_limit = limit
+        if reranker is not None:
+            limit = limit or _DEFAULT_SEARCH_LIMIT
+            request_limit = min(limit * reranker.overfetch, _MAX_SEARCH_LIMIT)
         payload: JsonDict = {
             "query": query,
             "project": project,
-            "limit": limit,
+            "limit": request_limit,
             "include_private": include_private,
             "debug": debug,
         }
-        return cast(SearchResponse, self._request("POST", "/v1/search", payload))
+        response = cast(SearchResponse, self._request("POST", "/v1/search", payload, response_type=SearchResponse))
+        if reranker is not None and limit is not None:
+            response = _replace_items(response, reranker.rerank(response.get("items") or [], limit=limit))
+        return response
 
     def timeline(
         self, observation_id: str, *, before: int = 5, after: int = 5, include_private: bool = False
@@ -140,6 +309,7 @@ class HarnessMemClient:
                 "after": after,
                 "include_private": include_private,
             },
+            response_type=TimelineResponse,
             ),
         )
 
@@ -147,19 +317,67 @@ class HarnessMemClient:
         self, *, ids: Union[Iterable[str], str], include_private: bool = False, compact: bool = True
     ) -> GetObservationsResponse:
         normalized_ids = self._normalize_ids(ids)
+        cache = self.observation_cache
+        if cache is None:
+            return self._fetch_observations(normalized_ids, include_private=include_private, compact=compact)
+
+        by_id, missing = split_cached(cache, normalized_ids, compact=compact, include_private=include_private)
+        if self.hooks:
+            self._emit("on_cache", "POST /v1/observations/get", len(by_id), len(missing))
+        if missing:
+            response = self._fetch_observations(missing, include_private=include_private, compact=compact)
+            for item in response.get("items") or []:
+                cache.put(item, compact=compact, include_private=include_private)
+                by_id.setdefault(item.get("id"), item)
+        else:
+            response = cast(
+                GetObservationsResponse,
+                {
+                    "ok": True,
+                    "source": "core",
+                    "items": [] if self.result_mode == "dict" else ObservationRows([]),
+                    "meta": {"count": 0, "latency_ms": 0},
+                },
+            )
+        items = [by_id[observation_id] for observation_id in dict.fromkeys(normalized_ids) if observation_id in by_id]
+        return _replace_items(response, items)
+
+    def _fetch_observations(
+        self, ids: List[str], *, include_private: bool, compact: bool
+    ) -> GetObservationsResponse:
         return cast(
             GetObservationsResponse,
             self._request(
             "POST",
             "/v1/observations/get",
             {
-                "ids": normalized_ids,
+                "ids": ids,
                 "include_private": include_private,
                 "compact": compact,
             },
+            response_type=GetObservationsResponse,
             ),
         )
 
+    def delete_observation(self, observation_id: str) -> WriteResponse:
+        """Delete one observation. Maps to DELETE /v1/observations/:id."""
+        response = cast(
+            WriteResponse, self._request("DELETE", f"/v1/observations/{quote(observation_id, safe='')}")
+        )
+        self._invalidate_cached([observation_id])
+        return response
+
+    def bulk_delete_observations(self, ids: Union[Iterable[str], str]) -> WriteResponse:
+        """Delete observations by id. Maps to POST /v1/observations/bulk-delete."""
+        normalized_ids = self._normalize_ids(ids)
+        response = cast(WriteResponse, self._request("POST", "/v1/observations/bulk-delete", {"ids": normalized_ids}))
+        self._invalidate_cached(normalized_ids)
+        return response
+
+    def _invalidate_cached(self, ids: Iterable[str]) -> None:
+        if self.observation_cache is not None:
+            self.observation_cache.invalidate(ids)
+
     def record_event(self, event: EventEnvelope) -> WriteResponse:
         return cast(WriteResponse, self._request("POST", "/v1/events/record", {"event": event}))
 
@@ -232,6 +450,7 @@ class HarnessMemClient:
                 "limit": limit,
                 "include_private": include_private,
             },
+            response_type=ResumePackResponse,
             ),
         )
 
@@ -313,6 +532,363 @@ class HarnessMemClient:
                 "team_id": team_id,
                 "memory_type": memory_type,
             },
+            response_type=FeedResponse,
+            ),
+        )
+
+    def iter_feed(
+        self,
+        *,
+        page_size: int = 100,
+        project: Optional[str] = None,
+        type: Optional[str] = None,
+        include_private: bool = False,
+        user_id: Optional[str] = None,
+        team_id: Optional[str] = None,
+        memory_type: Optional[str] = None,
+    ) -> ObservationStream:
+        """Stream every feed item, following ``meta.next_cursor`` page by page."""
+
+        def _pages() -> Iterator[Any]:
+            cursor: Optional[str] = None
+            while True:
+                response = self.feed(
+                    cursor=cursor,
+                    limit=page_size,
+                    project=project,
+                    type=type,
+                    include_private=include_private,
+                    user_id=user_id,
+                    team_id=team_id,
+                    memory_type=memory_type,
+                )
+                yield from response.get("items") or []
+                meta = response.get("meta") or {}
+                cursor = meta.get("next_cursor")
+                if not cursor or meta.get("has_more") is False:
+                    return
+
+        return ObservationStream(_pages())
+
+    def export(
+        self, *, project: Optional[str] = None, limit: Optional[int] = None, include_private: bool = False
+    ) -> ExportResponse:
+        """Export observations. Maps to GET /v1/export."""
+        return cast(
+            ExportResponse,
+            self._request(
+            "GET",
+            "/v1/export",
+            query={"project": project, "limit": limit, "include_private": include_private or None},
+            response_type=ExportResponse,
+            ),
+        )
+
+    def iter_export(
+        self, *, project: Optional[str] = None, limit: Optional[int] = None, include_private: bool = False
+    ) -> ObservationStream:
+        """Stream the items of ``export``. /v1/export is not paginated, so this is one request."""
+
+        def _items() -> Iterator[Any]:
+            response = self.export(project=project, limit=limit, include_private=include_private)
+            yield from response.get("items") or []
+
+        return ObservationStream(_items())
+
+    # ────────────────────────────────────────
+    # Forget API
+    # Admin retention endpoints. ``forget_plan`` never mutates memory; it
+    # returns the forget policy's candidates with ``candidate_ids`` and a
+    # ``manifest_sha256``. ``forget_hard_purge`` is a plan unless
+    # ``execute=True``; execution is gated by the daemon (manifest hash and
+    # expiry, backup evidence, retention / archive acks and the exact
+    # ``confirmation`` phrase returned by the plan), which ``gates`` carries.
+    # See harness_mem.retention.RetentionExecutor for throttled bulk deletes.
+    # ────────────────────────────────────────
+
+    def forget_plan(
+        self,
+        *,
+        project: Optional[str] = None,
+        limit: Optional[int] = None,
+        score_threshold: Optional[float] = None,
+        protect_accessed: Optional[bool] = None,
+    ) -> ForgetResponse:
+        """Dry-run forget policy. Maps to POST /v1/admin/forget/plan."""
+        payload: JsonDict = {}
+        for key, value in (
+            ("project", project),
+            ("limit", limit),
+            ("score_threshold", score_threshold),
+            ("protect_accessed", protect_accessed),
+        ):
+            if value is not None:
+                payload[key] = value
+        return cast(ForgetResponse, self._request("POST", "/v1/admin/forget/plan", payload))
+
+    def forget_hard_purge(
+        self,
+        *,
+        target_ids: Optional[Sequence[str]] = None,
+        project: Optional[str] = None,
+        limit: Optional[int] = None,
+        execute: bool = False,
+        **gates: Any,
+    ) -> ForgetResponse:
+        """Plan (or, with ``execute=True``, run) a hard purge. Maps to POST /v1/admin/forget/hard-purge."""
+        payload: JsonDict = {"execute": execute, **gates}
+        if target_ids is not None:
+            payload["target_ids"] = list(target_ids)
+        if project is not None:
+            payload["project"] = project
+        if limit is not None:
+            payload["limit"] = limit
+        response = cast(ForgetResponse, self._request("POST", "/v1/admin/forget/hard-purge", payload))
+        if execute and self.observation_cache is not None:
+            purged = ((response.get("items") or [{}])[0]).get("candidate_ids")
+            if isinstance(purged, list):
+                self._invalidate_cached(purged)
+            elif target_ids is not None:
+                self._invalidate_cached(target_ids)
+            else:
+                self.observation_cache.clear()
+        return response
+
+    # ────────────────────────────────────────
+    # Ingest API
+    # Markdown knowledge files. ``kind`` is "decisions_md" (one observation
+    # per ``## `` section) or "adr" (one observation per file, needs an H1);
+    # when omitted the daemon picks "decisions_md" for paths containing
+    # "decisions". Observations are deduplicated by file path + heading, so
+    # re-sending a file is idempotent. See harness_mem.ingest for bulk ingest.
+    # ────────────────────────────────────────
+
+    def ingest_document(
+        self,
+        *,
+        file_path: str,
+        content: str,
+        kind: Optional[str] = None,
+        project: Optional[str] = None,
+        platform: Optional[str] = None,
+        session_id: Optional[str] = None,
+        branch: Optional[str] = None,
+        expires_at: Optional[str] = None,
+    ) -> IngestResponse:
+        """Ingest one document. Maps to POST /v1/ingest/document."""
+        payload: JsonDict = {"file_path": file_path, "content": content}
+        for key, value in (
+            ("kind", kind),
+            ("project", project),
+            ("platform", platform),
+            ("session_id", session_id),
+            ("branch", branch),
+            ("expires_at", expires_at),
+        ):
+            if value is not None:
+                payload[key] = value
+        return cast(IngestResponse, self._request("POST", "/v1/ingest/document", payload))
+
+    def ingest_knowledge_file(
+        self,
+        *,
+        file_path: str,
+        content: str,
+        kind: Optional[str] = None,
+        project: Optional[str] = None,
+        platform: Optional[str] = None,
+        session_id: Optional[str] = None,
+    ) -> IngestResponse:
+        """Ingest one knowledge file. Maps to POST /v1/ingest/knowledge-file."""
+        payload: JsonDict = {"file_path": file_path, "content": content}
+        for key, value in (("kind", kind), ("project", project), ("platform", platform), ("session_id", session_id)):
+            if value is not None:
+                payload[key] = value
+        return cast(IngestResponse, self._request("POST", "/v1/ingest/knowledge-file", payload))
+
+    # ────────────────────────────────────────
+    # Lease API
+    # Exclusive, time-bounded claims on a target string. A held target
+    # answers ``ok: false`` with ``error="already_leased"``, which is raised
+    # as HarnessMemAPIError(status_code=200, message="already_leased").
+    # See harness_mem.lease.LeaseManager for renewal and job partitioning.
+    # ────────────────────────────────────────
+
+    def acquire_lease(
+        self,
+        *,
+        target: str,
+        agent_id: str,
+        project: Optional[str] = None,
+        ttl_ms: Optional[int] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> LeaseResponse:
+        """Acquire a lease on ``target``. Maps to POST /v1/lease/acquire."""
+        payload: JsonDict = {"target": target, "agent_id": agent_id}
+        if project is not None:
+            payload["project"] = project
+        if ttl_ms is not None:
+            payload["ttl_ms"] = ttl_ms
+        if metadata is not None:
+            payload["metadata"] = metadata
+        return cast(LeaseResponse, self._request("POST", "/v1/lease/acquire", payload))
+
+    def renew_lease(self, *, lease_id: str, agent_id: str, ttl_ms: Optional[int] = None) -> LeaseResponse:
+        """Extend a held lease by ``ttl_ms`` (default: its current TTL). Maps to POST /v1/lease/renew."""
+        payload: JsonDict = {"lease_id": lease_id, "agent_id": agent_id}
+        if ttl_ms is not None:
+            payload["ttl_ms"] = ttl_ms
+        return cast(LeaseResponse, self._request("POST", "/v1/lease/renew", payload))
+
+    def release_lease(self, *, lease_id: str, agent_id: str) -> LeaseResponse:
+        """Release a held lease. Maps to POST /v1/lease/release."""
+        return cast(
+            LeaseResponse,
+            self._request("POST", "/v1/lease/release", {"lease_id": lease_id, "agent_id": agent_id}),
+        )
+
+    # ────────────────────────────────────────
+    # Signal API
+    # Agent-to-agent messages. ``to=None`` broadcasts. Errors such as
+    # ``already_acked`` arrive as ``ok: false`` and raise HarnessMemAPIError.
+    # See harness_mem.signals.SignalInbox for batched, adaptive consumption.
+    # ────────────────────────────────────────
+
+    def send_signal(
+        self,
+        *,
+        from_agent: str,
+        content: str,
+        to: Optional[str] = None,
+        thread_id: Optional[str] = None,
+        reply_to: Optional[str] = None,
+        project: Optional[str] = None,
+        expires_in_ms: Optional[int] = None,
+    ) -> SignalResponse:
+        """Send a signal. Maps to POST /v1/signal/send."""
+        payload: JsonDict = {"from": from_agent, "content": content}
+        for key, value in (
+            ("to", to),
+            ("thread_id", thread_id),
+            ("reply_to", reply_to),
+            ("project", project),
+            ("expires_in_ms", expires_in_ms),
+        ):
+            if value is not None:
+                payload[key] = value
+        return cast(SignalResponse, self._request("POST", "/v1/signal/send", payload))
+
+    def read_signals(
+        self,
+        *,
+        agent_id: str,
+        project: Optional[str] = None,
+        thread_id: Optional[str] = None,
+        include_broadcast: bool = True,
+        limit: Optional[int] = None,
+    ) -> SignalReadResponse:
+        """Unacked signals for ``agent_id``, oldest first. Maps to POST /v1/signal/read."""
+        payload: JsonDict = {"agent_id": agent_id, "include_broadcast": include_broadcast}
+        if project is not None:
+            payload["project"] = project
+        if thread_id is not None:
+            payload["thread_id"] = thread_id
+        if limit is not None:
+            payload["limit"] = limit
+        return cast(SignalReadResponse, self._request("POST", "/v1/signal/read", payload))
+
+    def ack_signal(self, *, signal_id: str, agent_id: str) -> SignalResponse:
+        """Mark a signal read. Maps to POST /v1/signal/ack."""
+        return cast(
+            SignalResponse,
+            self._request("POST", "/v1/signal/ack", {"signal_id": signal_id, "agent_id": agent_id}),
+        )
+
+    # ────────────────────────────────────────
+    # Sync API
+    # Cross-device changeset exchange; requires admin authentication. A push
+    # carries at most SYNC_PUSH_MAX_RECORDS records and is merged per record
+    # id with ``conflict_policy`` ("last-write-wins" by default, comparing
+    # ``updated_at`` as ISO 8601 strings). See harness_mem.sync.SyncEngine
+    # for incremental, resumable sync.
+    # ────────────────────────────────────────
+
+    def sync_push(
+        self,
+        *,
+        device_id: str,
+        records: Sequence[SyncRecord],
+        since: Optional[str] = None,
+        conflict_policy: Optional[str] = None,
+    ) -> SyncPushResponse:
+        """Merge ``records`` into the server store. Maps to POST /v1/sync/push."""
+        payload: JsonDict = {"device_id": device_id, "records": list(records), "since": since}
+        if conflict_policy is not None:
+            payload["conflict_policy"] = conflict_policy
+        return cast(SyncPushResponse, self._request("POST", "/v1/sync/push", payload))
+
+    def sync_pull(self, *, device_id: Optional[str] = None, since: Optional[str] = None) -> SyncPullResponse:
+        """Records updated after ``since`` (all when omitted). Maps to GET /v1/sync/pull."""
+        return cast(
+            SyncPullResponse,
+            self._request("GET", "/v1/sync/pull", query={"device_id": device_id, "since": since}),
+        )
+
+    # ────────────────────────────────────────
+    # Graph API
+    # ``graph`` is the daemon's entity-seeded subgraph (links followed in both
+    # directions, at most 100 nodes) and returns a raw ``{ok, nodes, edges,
+    # center_entity, depth}`` body. ``graph_neighbors`` lists the outgoing
+    # ``mem_links`` rows reachable from one observation within ``depth`` hops;
+    # it and ``graph_entities`` require admin authentication. See
+    # harness_mem.graph.GraphExpander for cached multi-hop expansion.
+    # ────────────────────────────────────────
+
+    def graph(
+        self,
+        *,
+        entity: str,
+        depth: Optional[int] = None,
+        limit: Optional[int] = None,
+        project: Optional[str] = None,
+    ) -> GraphResponse:
+        """Subgraph around observations mentioning ``entity``. Maps to GET /v1/graph."""
+        return cast(
+            GraphResponse,
+            self._request(
+                "GET", "/v1/graph", query={"entity": entity, "depth": depth, "limit": limit, "project": project}
+            ),
+        )
+
+    def graph_neighbors(
+        self,
+        *,
+        observation_id: str,
+        relation: Optional[str] = None,
+        depth: Optional[int] = None,
+    ) -> GraphNeighborsResponse:
+        """Outgoing links within ``depth`` hops (1..GRAPH_MAX_DEPTH). Maps to GET /v1/graph/neighbors."""
+        return cast(
+            GraphNeighborsResponse,
+            self._request(
+                "GET",
+                "/v1/graph/neighbors",
+                query={"observation_id": observation_id, "relation": relation, "depth": depth},
+            ),
+        )
+
+    def graph_entities(
+        self,
+        *,
+        project: Optional[str] = None,
+        session_id: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> GraphEntitiesResponse:
+        """Extracted entities and their relations. Maps to GET /v1/graph/entities."""
+        return cast(
+            GraphEntitiesResponse,
+            self._request(
+                "GET", "/v1/graph/entities", query={"project": project, "session_id": session_id, "limit": limit}
             ),
         )
 
@@ -376,3 +952,25 @@ class HarnessMemClient:
     def teams_remove_member(self, team_id: str, user_id: str) -> ApiResponse:
         """Remove a member from a team. Maps to DELETE /v1/admin/teams/:id/members/:userId."""
         return self._request("DELETE", f"/v1/admin/teams/{team_id}/members/{user_id}")
+
+
+def _replace_items(response: Any, items: List[Any]) -> Any:
+    """Return ``response`` with new ``items``, keeping its row / struct flavour."""
+    previous = response.get("items")
+    if isinstance(response, dict):
+        response["items"] = ObservationRows(items) if isinstance(previous, ObservationRows) else items
+        meta = response.get("meta")
+        if isinstance(meta, dict) and "count" in meta:
+            response["meta"] = {**meta, "count": len(items)}
+        return response
+    # msgspec Struct from a typed codec; copy so coalesced callers are unaffected.
+    response = copy.copy(response)
+    setattr(response, "items", items)
+    return response
+
+
+def _is_retryable(error: HarnessMemError) -> bool:
+    if isinstance(error, HarnessMemAPIError):
+        return error.status_code in _RETRYABLE_STATUSES
+    # Connection-level failures only; a malformed body will not fix itself.
+    return isinstance(error.__context__, (URLError, OSError))
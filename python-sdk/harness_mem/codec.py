@@ -0,0 +1,147 @@
+"""Pluggable JSON codecs for HarnessMemClient.
+
+The client encodes request bodies and decodes response bodies through a codec
+object instead of calling ``json`` directly. ``StdlibJsonCodec`` is the default
+and has no dependencies. ``OrjsonCodec`` and ``MsgspecCodec`` are optional
+backends that are only importable when the corresponding package is installed.
+
+``MsgspecCodec(typed=True)`` decodes ``search`` and ``get_observations``
+responses straight from bytes into ``msgspec.Struct`` items that declare every
+field the daemon returns for those endpoints; ``meta`` stays a plain dict. The
+structs keep dict-style ``get`` / ``[]`` access, so callers written against the
+TypedDict responses continue to work. Every other response (timeline,
+resume-pack, feed, export, ...) is decoded untyped, so switching codecs never
+changes the fields callers get back.
+
+The optional backends are imported only when a codec that needs them is
+created, and the Struct types (``msgspec_structs``) only for a typed codec, so
+``import harness_mem`` stays cheap with the default codec.
+"""
+
+from __future__ import annotations
+
+import importlib
+import importlib.util
+import json
+from typing import Any, Dict, Optional, Protocol
+
+_optional_modules: Dict[str, Any] = {}
+
+
+def _optional(module: str) -> Any:
+    """Import an optional backend on first use; ``None`` when it is not installed."""
+    if module not in _optional_modules:
+        try:
+            _optional_modules[module] = importlib.import_module(module)
+        except ImportError:  # pragma: no cover - depends on environment
+            _optional_modules[module] = None
+    return _optional_modules[module]
+
+
+def _installed(module: str) -> bool:
+    """Whether an optional backend can be imported, without importing it."""
+    if module in _optional_modules:
+        return _optional_modules[module] is not None
+    return importlib.util.find_spec(module) is not None
+
+
+class JsonCodec(Protocol):
+    """Interface every codec implements.
+
+    ``decode`` receives the raw response bytes and the TypedDict response type
+    the client method declares; codecs may ignore the type hint. Malformed input
+    must raise ``ValueError``.
+    """
+
+    name: str
+
+    def encode(self, payload: Any) -> bytes:
+        ...
+
+    def decode(self, data: bytes, response_type: Optional[type] = None) -> Any:
+        ...
+
+
+class StdlibJsonCodec:
+    """Default codec backed by the standard library ``json`` module."""
+
+    name = "json"
+
+    def encode(self, payload: Any) -> bytes:
+        return json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    def decode(self, data: bytes, response_type: Optional[type] = None) -> Any:
+        # json.loads accepts UTF-8 bytes directly; skip the intermediate str copy.
+        return json.loads(data)
+
+
+class OrjsonCodec:
+    """Codec backed by ``orjson``. Raises ImportError when orjson is missing."""
+
+    name = "orjson"
+
+    def __init__(self) -> None:
+        self._orjson = _optional("orjson")
+        if self._orjson is None:
+            raise ImportError("OrjsonCodec requires the 'orjson' package")
+
+    def encode(self, payload: Any) -> bytes:
+        return self._orjson.dumps(payload)
+
+    def decode(self, data: bytes, response_type: Optional[type] = None) -> Any:
+        return self._orjson.loads(data)
+
+
+class MsgspecCodec:
+    """Codec backed by ``msgspec``.
+
+    With ``typed=False`` responses decode to plain dicts, like the other codecs.
+    With ``typed=True`` search and get_observations responses decode directly
+    into Struct types; everything else decodes to dicts.
+    """
+
+    name = "msgspec"
+
+    def __init__(self, *, typed: bool = False) -> None:
+        msgspec = self._msgspec = _optional("msgspec")
+        if msgspec is None:
+            raise ImportError("MsgspecCodec requires the 'msgspec' package")
+        self.typed = typed
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+        self._typed_decoders: Dict[type, Any] = {}
+        if typed:
+            from .msgspec_structs import STRUCT_TYPES
+
+            for response_type, struct_type in STRUCT_TYPES.items():
+                self._typed_decoders[response_type] = msgspec.json.Decoder(struct_type)
+
+    def encode(self, payload: Any) -> bytes:
+        return self._encoder.encode(payload)
+
+    def decode(self, data: bytes, response_type: Optional[type] = None) -> Any:
+        decoder = self._typed_decoders.get(response_type, self._decoder) if response_type else self._decoder
+        try:
+            return decoder.decode(data)
+        except (self._msgspec.DecodeError, self._msgspec.ValidationError) as exc:
+            raise ValueError(str(exc)) from exc
+
+
+def get_codec(name: str = "json", **kwargs: Any) -> JsonCodec:
+    """Resolve a codec by name: ``json``, ``orjson``, ``msgspec`` or ``auto``.
+
+    ``auto`` prefers msgspec, then orjson, then the standard library.
+    """
+    if name == "json":
+        return StdlibJsonCodec()
+    if name == "orjson":
+        return OrjsonCodec()
+    if name == "msgspec":
+        return MsgspecCodec(**kwargs)
+    if name == "auto":
+        if _installed("msgspec"):
+            return MsgspecCodec(**kwargs)
+        if _installed("orjson"):
+            return OrjsonCodec()
+        return StdlibJsonCodec()
+    raise ValueError(f"unknown codec: {name}")
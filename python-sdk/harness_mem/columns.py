@@ -0,0 +1,169 @@
+"""Columnar views of observation results for vectorized post-processing.
+
+``to_columns`` turns the ``items`` of a search / feed / export response (dicts,
+``ObservationRow`` objects or msgspec structs) into an ``ObservationColumns``:
+
+- score fields (``similarity``, ``recency``, ``hybrid_score``, ``rerank_score``)
+  as contiguous ``array("d")`` buffers, with NaN where the server sent no value
+- low-cardinality strings (``project``, ``platform``, ``session_id``, ...) as
+  dictionary-encoded columns: an ``array("i")`` of codes plus the distinct values
+- ``id`` / ``title`` / ``created_at`` / ``updated_at`` as plain string lists and
+  ``tags`` as a list of lists
+
+The float buffers are zero-copy convertible with ``numpy.frombuffer``;
+``to_numpy()`` and ``to_arrow()`` do that conversion when numpy / pyarrow are
+installed. Neither is required for ``to_columns`` itself, and both are imported
+only when those methods are called, so ``import harness_mem`` stays stdlib-only.
+"""
+
+from __future__ import annotations
+
+import importlib
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+SCORE_FIELDS: Tuple[str, ...] = ("similarity", "recency", "hybrid_score", "rerank_score")
+DICTIONARY_FIELDS: Tuple[str, ...] = ("project", "platform", "session_id", "event_type", "memory_type")
+STRING_FIELDS: Tuple[str, ...] = ("id", "title", "created_at", "updated_at")
+
+_NAN = float("nan")
+
+
+def _require(module: str, caller: str) -> Any:
+    """Import an optional dependency on first use."""
+    try:
+        return importlib.import_module(module)
+    except ImportError:
+        raise ImportError(f"{caller} requires the '{module}' package") from None
+
+
+class DictionaryColumn:
+    """Dictionary-encoded string column. A code of -1 marks a missing value."""
+
+    __slots__ = ("codes", "values", "_index")
+
+    def __init__(self) -> None:
+        self.codes: array = array("i")
+        self.values: List[str] = []
+        self._index: Dict[str, int] = {}
+
+    def append(self, value: Any) -> None:
+        if not isinstance(value, str):
+            self.codes.append(-1)
+            return
+        code = self._index.get(value)
+        if code is None:
+            code = len(self.values)
+            self._index[value] = code
+            self.values.append(value)
+        self.codes.append(code)
+
+    def decode(self) -> List[Optional[str]]:
+        values = self.values
+        return [values[code] if code >= 0 else None for code in self.codes]
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+
+class NumpyDictionary(NamedTuple):
+    codes: Any
+    dictionary: Any
+
+
+@dataclass
+class ObservationColumns:
+    length: int = 0
+    scores: Dict[str, array] = field(default_factory=lambda: {name: array("d") for name in SCORE_FIELDS})
+    dictionaries: Dict[str, DictionaryColumn] = field(
+        default_factory=lambda: {name: DictionaryColumn() for name in DICTIONARY_FIELDS}
+    )
+    strings: Dict[str, List[Optional[str]]] = field(default_factory=lambda: {name: [] for name in STRING_FIELDS})
+    tags: List[List[str]] = field(default_factory=list)
+
+    def append(self, item: Mapping[str, Any]) -> None:
+        get = item.get
+        for name, column in self.scores.items():
+            value = get(name)
+            column.append(float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else _NAN)
+        for name, column in self.dictionaries.items():
+            column.append(get(name))
+        for name, values in self.strings.items():
+            value = get(name)
+            values.append(value if isinstance(value, str) else None)
+        raw_tags = get("tags")
+        self.tags.append([str(tag) for tag in raw_tags] if isinstance(raw_tags, (list, tuple)) else [])
+        self.length += 1
+
+    def extend(self, items: Iterable[Mapping[str, Any]]) -> "ObservationColumns":
+        for item in items:
+            self.append(item)
+        return self
+
+    def __len__(self) -> int:
+        return self.length
+
+    def to_numpy(self) -> Dict[str, Any]:
+        """Score columns as float64 arrays, dictionary columns as (codes, dictionary)."""
+        _np = _require("numpy", "to_numpy()")
+        result: Dict[str, Any] = {}
+        for name, column in self.scores.items():
+            result[name] = _np.frombuffer(column, dtype=_np.float64) if len(column) else _np.empty(0, dtype=_np.float64)
+        for name, column in self.dictionaries.items():
+            codes = _np.frombuffer(column.codes, dtype=_np.intc) if len(column) else _np.empty(0, dtype=_np.intc)
+            result[name] = NumpyDictionary(codes=codes, dictionary=_np.array(column.values, dtype=object))
+        for name, values in self.strings.items():
+            result[name] = _np.array(values, dtype=object)
+        return result
+
+    def to_arrow(self) -> Any:
+        """Return a ``pyarrow.Table`` with dictionary-typed string columns."""
+        _pa = _require("pyarrow", "to_arrow()")
+        arrays: Dict[str, Any] = {}
+        for name in STRING_FIELDS[:1]:
+            arrays[name] = _pa.array(self.strings[name], type=_pa.string())
+        for name, column in self.scores.items():
+            arrays[name] = _pa.array(column, type=_pa.float64(), from_pandas=True)
+        for name, column in self.dictionaries.items():
+            codes = _pa.array([code if code >= 0 else None for code in column.codes], type=_pa.int32())
+            arrays[name] = _pa.DictionaryArray.from_arrays(codes, _pa.array(column.values, type=_pa.string()))
+        for name in STRING_FIELDS[1:]:
+            arrays[name] = _pa.array(self.strings[name], type=_pa.string())
+        arrays["tags"] = _pa.array(self.tags, type=_pa.list_(_pa.string()))
+        return _pa.table(arrays)
+
+
+def _items_of(source: Any) -> Iterable[Mapping[str, Any]]:
+    if isinstance(source, Mapping) or hasattr(source, "__struct_fields__"):
+        items = source.get("items")
+        return items if items is not None else []
+    return source
+
+
+def to_columns(source: Any) -> ObservationColumns:
+    """Build columns from a response, an ``items`` sequence or any item iterable."""
+    return ObservationColumns().extend(_items_of(source))
+
+
+def to_numpy(source: Any) -> Dict[str, Any]:
+    return to_columns(source).to_numpy()
+
+
+def to_arrow(source: Any) -> Any:
+    return to_columns(source).to_arrow()
+
+
+class ColumnarMixin:
+    """Adds ``to_columns`` / ``to_numpy`` / ``to_arrow`` to an iterable of items."""
+
+    __slots__ = ()
+
+    def to_columns(self) -> ObservationColumns:
+        return to_columns(self)
+
+    def to_numpy(self) -> Dict[str, Any]:
+        return to_columns(self).to_numpy()
+
+    def to_arrow(self) -> Any:
+        return to_columns(self).to_arrow()
@@ -0,0 +1,260 @@
+"""Write-volume-aware consolidation scheduling.
+
+Running ``run_consolidation`` on every session end makes consolidation cost
+follow the number of sessions, not the amount written. ``ConsolidationScheduler``
+counts writes per project instead (attach it to a client as a hook, or call
+``record_write``) and runs consolidation for a project when either
+
+- ``write_threshold`` writes accumulated since its last run, or
+- it had writes and then stayed idle for ``idle_sec``,
+
+but never more often than ``min_interval_sec`` per project. A due run starts
+after a random delay of up to ``jitter_sec`` so that many processes sharing a
+daemon do not fire together. Before each run ``consolidation_status()`` is
+checked, and a run is postponed while the daemon reports ``running_jobs``.
+With a ``LeaseManager`` the run also takes the ``consolidation:<project>``
+lease, so only one process consolidates a project at a time.
+
+Each run consolidates exactly the sessions written: one targeted
+``(project, session_id)`` request per session, oldest first, at most
+``max_sessions_per_run`` of them (the rest stay pending for the next run).
+The daemon ignores ``project`` without ``session_id`` and would consolidate
+its global queue instead, so writes recorded without a session are dropped
+when their project runs::
+
+    scheduler = ConsolidationScheduler(client, write_threshold=200, idle_sec=120)
+    client.hooks.append(scheduler)
+    scheduler.start()  # background thread; or call run_due() from your own loop
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from .errors import HarnessMemError
+from .instrumentation import ClientHooks, RequestEvent
+
+_logger = logging.getLogger("harness_mem")
+
+_WRITE_ENDPOINTS = frozenset({"/v1/events/record", "/v1/checkpoints/record"})
+
+
+@dataclass
+class _ProjectWrites:
+    writes: int = 0
+    sessions: Dict[str, None] = field(default_factory=dict)  # insertion-ordered set
+    last_write_at: Optional[float] = None
+    last_run_at: Optional[float] = None
+    due_at: Optional[float] = None
+
+
+class ConsolidationScheduler(ClientHooks):
+    """Runs consolidation per project when its write volume or idleness calls for it."""
+
+    def __init__(
+        self,
+        client: Any,
+        *,
+        write_threshold: int = 200,
+        idle_sec: float = 120.0,
+        min_interval_sec: float = 300.0,
+        jitter_sec: float = 30.0,
+        check_interval_sec: float = 5.0,
+        reason: str = "python-sdk-scheduler",
+        max_sessions_per_run: int = 20,
+        lease_manager: Any = None,
+        seed: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if write_threshold < 1 or max_sessions_per_run < 1:
+            raise ValueError("write_threshold and max_sessions_per_run must be >= 1")
+        if idle_sec <= 0 or check_interval_sec <= 0:
+            raise ValueError("idle_sec and check_interval_sec must be > 0")
+        if min_interval_sec < 0 or jitter_sec < 0:
+            raise ValueError("min_interval_sec and jitter_sec must be >= 0")
+        self.client = client
+        self.write_threshold = write_threshold
+        self.idle_sec = idle_sec
+        self.min_interval_sec = min_interval_sec
+        self.jitter_sec = jitter_sec
+        self.check_interval_sec = check_interval_sec
+        self.reason = reason
+        self.max_sessions_per_run = max_sessions_per_run
+        self.lease_manager = lease_manager
+        self.clock = clock
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._projects: Dict[str, _ProjectWrites] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.runs = 0
+        self.postponed = 0
+        self.failures = 0
+
+    # -- write tracking -----------------------------------------------------
+
+    def record_write(self, project: Optional[str], session_id: Optional[str] = None, count: int = 1) -> None:
+        now = self.clock()
+        with self._lock:
+            state = self._projects.setdefault(project or "default", _ProjectWrites())
+            state.writes += count
+            if session_id:
+                state.sessions.setdefault(session_id, None)
+            state.last_write_at = now
+
+    def on_request_end(self, event: RequestEvent) -> None:
+        if event.error is not None or event.method != "POST" or event.endpoint not in _WRITE_ENDPOINTS:
+            return
+        try:
+            body = json.loads(event.request_body or b"{}")
+        except ValueError:
+            return
+        if not isinstance(body, dict):
+            return
+        if isinstance(body.get("event"), dict):
+            body = body["event"]
+        self.record_write(body.get("project"), body.get("session_id"))
+
+    # -- scheduling ---------------------------------------------------------
+
+    def _ready_locked(self, state: _ProjectWrites, now: float) -> bool:
+        if state.writes == 0:
+            return False
+        if state.last_run_at is not None and now - state.last_run_at < self.min_interval_sec:
+            return False
+        if state.writes >= self.write_threshold:
+            return True
+        return state.last_write_at is not None and now - state.last_write_at >= self.idle_sec
+
+    def due(self) -> List[str]:
+        """Projects whose run is due now (the jittered start time has passed)."""
+        now = self.clock()
+        ready: List[str] = []
+        with self._lock:
+            for project, state in self._projects.items():
+                if not self._ready_locked(state, now):
+                    state.due_at = None
+                    continue
+                if state.due_at is None:
+                    state.due_at = now + self._random.uniform(0, self.jitter_sec)
+                if now >= state.due_at:
+                    ready.append(project)
+        return ready
+
+    def run_due(self) -> List[str]:
+        """Run every due project once; returns the projects consolidated."""
+        ran: List[str] = []
+        for project in self.due():
+            if self._run(project):
+                ran.append(project)
+        return ran
+
+    def _daemon_busy(self) -> bool:
+        try:
+            status = self.client.consolidation_status()
+        except HarnessMemError as exc:
+            _logger.warning("harness-mem consolidation status failed: %s", exc)
+            return True
+        items = status.get("items") or [{}]
+        return int(items[0].get("running_jobs") or 0) > 0
+
+    def _postpone(self, project: str) -> None:
+        with self._lock:
+            state = self._projects[project]
+            state.due_at = self.clock() + self.check_interval_sec + self._random.uniform(0, self.jitter_sec)
+            self.postponed += 1
+
+    def _run(self, project: str) -> bool:
+        with self._lock:
+            state = self._projects[project]
+            if not state.sessions:
+                state.writes = 0
+                state.last_write_at = state.due_at = None
+                return False
+        if self._daemon_busy():
+            self._postpone(project)
+            return False
+        lease = None
+        if self.lease_manager is not None:
+            lease = self.lease_manager.acquire(f"consolidation:{project}")
+            if lease is None:
+                self._postpone(project)
+                return False
+        with self._lock:
+            state = self._projects[project]
+            writes = state.writes
+            sessions = list(state.sessions)[: self.max_sessions_per_run]
+            for session_id in sessions:
+                del state.sessions[session_id]
+            # Sessions beyond the cap keep the project pending.
+            state.writes = writes if state.sessions else 0
+            state.last_write_at = self.clock() if state.sessions else None
+            state.due_at = None
+            state.last_run_at = self.clock()
+        try:
+            for index, session_id in enumerate(sessions):
+                try:
+                    self.client.run_consolidation(reason=self.reason, project=project, session_id=session_id)
+                except HarnessMemError as exc:
+                    _logger.warning("harness-mem consolidation for %s/%s failed: %s", project, session_id, exc)
+                    with self._lock:
+                        # Keep the unconsolidated sessions so the next check retries them.
+                        state.writes = max(state.writes, writes)
+                        state.sessions = {**dict.fromkeys(sessions[index:]), **state.sessions}
+                        state.last_write_at = self.clock()
+                        self.failures += 1
+                    return False
+        finally:
+            if lease is not None:
+                lease.release()
+        with self._lock:
+            self.runs += 1
+        return True
+
+    # -- background thread --------------------------------------------------
+
+    def start(self) -> "ConsolidationScheduler":
+        with self._lock:
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._loop, name="harness-mem-consolidation", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+        return self
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.check_interval_sec):
+            try:
+                self.run_due()
+            except Exception:
+                _logger.exception("harness-mem consolidation scheduler tick failed")
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        self._stop.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        atexit.unregister(self.close)
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def __enter__(self) -> "ConsolidationScheduler":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "runs": self.runs,
+                "postponed": self.postponed,
+                "failures": self.failures,
+                "pending_writes": {project: state.writes for project, state in self._projects.items() if state.writes},
+            }
@@ -1,7 +1,173 @@
 """CrewAI Memory integration for harness-mem."""
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+import atexit
+import threading
+import time
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from .singleflight import SingleFlight
+
+if TYPE_CHECKING:
+    from concurrent.futures import ThreadPoolExecutor
+
+    from .rerank import Reranker
+
+
+def _logger() -> Any:
+    # logging and concurrent.futures are only needed with write_behind=True;
+    # importing them lazily keeps `import harness_mem` cheap.
+    import logging
+
+    return logging.getLogger("harness_mem")
+
+
+class _WriteBehindBuffer:
+    """
+    save() されたイベントを溜め、専用スレッドからまとめて送る書き込みバッファ。
+
+    ``batch_size`` 件たまるか ``flush_interval_sec`` が経過するとバッチを取り出し、
+    最大 ``concurrency`` 件を並列に ``client.record_event`` へ送る。
+    デーモンに一括記録 API はないため、1 バッチは並列な個別リクエストになる。
+    ``max_pending`` 件を超える save() は空きができるまでブロックする。
+    送信失敗はログに残して数えるだけで、呼び出し側には送出しない。
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        *,
+        batch_size: int,
+        flush_interval_sec: float,
+        max_pending: int,
+        concurrency: int,
+        on_flushed: Any = None,
+    ) -> None:
+        self.client = client
+        self.batch_size = batch_size
+        self.flush_interval_sec = flush_interval_sec
+        self.max_pending = max_pending
+        self.concurrency = concurrency
+        self.on_flushed = on_flushed
+        self._cond = threading.Condition()
+        self._buffer: List[Dict[str, Any]] = []
+        self._in_flight = 0
+        self._flush_requested = False
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.batches = 0
+
+    def add(self, event: Dict[str, Any], block: bool = True) -> bool:
+        """イベントを積む。``block=False`` で満杯なら ``False`` を返す。"""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("write-behind buffer is closed")
+            if self._pending_locked() >= self.max_pending:
+                if not block:
+                    return False
+                self._cond.wait_for(lambda: self._pending_locked() < self.max_pending or self._closed)
+                if self._closed:
+                    raise RuntimeError("write-behind buffer is closed")
+            self._buffer.append(event)
+            self.submitted += 1
+            if self._thread is None:
+                from concurrent.futures import ThreadPoolExecutor
+
+                self._pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="harness-mem-crewai")
+                self._thread = threading.Thread(target=self._run, name="harness-mem-crewai-flusher", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+            if len(self._buffer) >= self.batch_size:
+                self._cond.notify_all()
+            return True
+
+    def _pending_locked(self) -> int:
+        return len(self._buffer) + self._in_flight
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self.flush_interval_sec
+                while (
+                    len(self._buffer) < self.batch_size
+                    and not self._flush_requested
+                    and not self._closed
+                    and time.monotonic() < deadline
+                ):
+                    self._cond.wait(max(deadline - time.monotonic(), 0.0))
+                batch, self._buffer = self._buffer[: self.batch_size], self._buffer[self.batch_size :]
+                if not self._buffer:
+                    self._flush_requested = False
+                self._in_flight += len(batch)
+                stop = self._closed and not batch and not self._buffer
+            if batch:
+                self._send(batch)
+            if stop:
+                return
+
+    def _send(self, batch: List[Dict[str, Any]]) -> None:
+        assert self._pool is not None
+        futures = [self._pool.submit(self.client.record_event, event) for event in batch]
+        completed = failed = 0
+        for future in futures:
+            try:
+                future.result()
+            except Exception as exc:
+                failed += 1
+                _logger().warning("harness-mem write-behind save failed: %s", exc)
+            else:
+                completed += 1
+        if completed and self.on_flushed is not None:
+            self.on_flushed()
+        with self._cond:
+            self.completed += completed
+            self.failed += failed
+            self.batches += 1
+            self._in_flight -= len(batch)
+            self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """溜まっているイベントをすぐ送り、送信完了を待つ。タイムアウトなら ``False``。"""
+        with self._cond:
+            if self._pending_locked() == 0:
+                return True
+            self._flush_requested = True
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._pending_locked() == 0, timeout=timeout)
+
+    def close(self, timeout: Optional[float] = 5.0) -> bool:
+        """残りを送ってからスレッドを止める。インタプリタ終了時にも呼ばれる。"""
+        with self._cond:
+            if self._closed:
+                return self._pending_locked() == 0
+            self._closed = True
+            self._cond.notify_all()
+            thread, pool = self._thread, self._pool
+        atexit.unregister(self.close)
+        if thread is None:
+            return True
+        thread.join(timeout)
+        drained = not thread.is_alive()
+        if not drained:
+            _logger().warning("harness-mem write-behind buffer closed with %d save(s) pending", self.stats()["pending"])
+        if pool is not None:
+            pool.shutdown(wait=drained)
+        return drained
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "batches": self.batches,
+                "pending": self._pending_locked(),
+            }
 
 
 class HarnessMemCrewAIMemory:
@@ -16,6 +182,14 @@ class HarnessMemCrewAIMemory:
         client = HarnessMemClient()
         memory = HarnessMemCrewAIMemory(client, project="my-project")
         # crew = Crew(memory=memory)
+
+    同じクルーの複数エージェントが同じ検索を投げた場合、実行中の検索の結果を
+    共有する（失敗は共有しない）。``coalesce_window_ms`` を指定すると、その時間
+    以内に終わった検索の結果も再利用する（既定の 0 では再利用しない）。
+    ``write_behind=True`` では save() はイベントを溜めてすぐに戻り、
+    バックグラウンドでまとめて送信する。溜まった分は reset()・flush()・close()
+    とインタプリタ終了時に送られる。
+    ``reranker`` を渡すと検索結果をクライアント側で並べ替えてから返す。
     """
 
     def __init__(
@@ -23,10 +197,38 @@ class HarnessMemCrewAIMemory:
         client: Any,
         project: Optional[str] = None,
         max_results: int = 5,
+        *,
+        coalesce_window_ms: float = 0.0,
+        write_behind: bool = False,
+        batch_size: int = 20,
+        flush_interval_sec: float = 1.0,
+        max_pending: int = 1000,
+        write_concurrency: int = 4,
+        reranker: Optional[Reranker] = None,
     ) -> None:
+        if coalesce_window_ms < 0:
+            raise ValueError("coalesce_window_ms must be >= 0")
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+        if max_pending < 1:
+            raise ValueError("max_pending must be >= 1")
+        if write_concurrency < 1:
+            raise ValueError("write_concurrency must be >= 1")
         self.client = client
         self.project = project
         self.max_results = max_results
+        self.reranker = reranker
+        self._searches = SingleFlight(window_sec=coalesce_window_ms / 1000.0)
+        self._write_behind: Optional[_WriteBehindBuffer] = None
+        if write_behind:
+            self._write_behind = _WriteBehindBuffer(
+                client,
+                batch_size=batch_size,
+                flush_interval_sec=flush_interval_sec,
+                max_pending=max_pending,
+                concurrency=write_concurrency,
+                on_flushed=self._searches.forget,
+            )
 
     def search(self, query: str, **kwargs: Any) -> List[Dict[str, Any]]:
         """
@@ -37,10 +239,12 @@ class HarnessMemCrewAIMemory:
         :returns: CrewAI が期待する形式の辞書リスト
         """
         limit: int = kwargs.get("limit", self.max_results)
-        response = self.client.search(
-            query=query,
-            limit=limit,
-            project=self.project,
+        search_kwargs: Dict[str, Any] = {"query": query, "limit": limit, "project": self.project}
+        if self.reranker is not None:
+            search_kwargs["reranker"] = self.reranker
+        response = self._searches.do(
+            (query, limit, self.project),
+            lambda: self.client.search(**search_kwargs),
         )
         items: List[Any] = response.get("items", []) if isinstance(response, dict) else []
         return [
@@ -57,13 +261,13 @@ class HarnessMemCrewAIMemory:
             if isinstance(r, dict)
         ]
 
-    def save(self, content: str, metadata: Optional[Dict[str, Any]] = None) -> None:
-        """
-        CrewAI の memory.save() に準拠。
+    async def asearch(self, query: str, **kwargs: Any) -> List[Dict[str, Any]]:
+        """search() の非同期版。イベントループをブロックしない。"""
+        import asyncio
 
-        :param content: 保存するコンテンツ文字列
-        :param metadata: タイトル・タグ等の追加メタデータ
-        """
+        return await asyncio.to_thread(self.search, query, **kwargs)
+
+    def _build_event(self, content: str, metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         meta = metadata or {}
         title: str = meta.get("title", content[:80]) if meta else content[:80]
         tags: List[str] = list(meta.get("tags", [])) if meta else []
@@ -76,12 +280,66 @@ class HarnessMemCrewAIMemory:
         }
         if self.project:
             event["project"] = self.project
+        return event
+
+    def save(self, content: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """
+        CrewAI の memory.save() に準拠。
+
+        :param content: 保存するコンテンツ文字列
+        :param metadata: タイトル・タグ等の追加メタデータ
+        """
+        event = self._build_event(content, metadata)
+        if self._write_behind is not None:
+            # 送信が遅れても記録時刻は save() の時点にする。
+            event["ts"] = datetime.now(timezone.utc).isoformat()
+            self._write_behind.add(event)
+            return
 
         self.client.record_event(event)
+        self._searches.forget()
+
+    async def asave(self, content: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """save() の非同期版。write-behind ではバッファに空きがあれば即座に戻る。"""
+        import asyncio
+
+        if self._write_behind is not None:
+            event = self._build_event(content, metadata)
+            event["ts"] = datetime.now(timezone.utc).isoformat()
+            if self._write_behind.add(event, block=False):
+                return
+            await asyncio.to_thread(self._write_behind.add, event)
+            return
+        await asyncio.to_thread(self.save, content, metadata)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """write-behind の未送信分を送り切るまで待つ。タイムアウトなら ``False``。"""
+        if self._write_behind is None:
+            return True
+        return self._write_behind.flush(timeout)
+
+    def close(self, timeout: Optional[float] = 5.0) -> bool:
+        """未送信分を送り、write-behind のスレッドを止める。"""
+        if self._write_behind is None:
+            return True
+        return self._write_behind.close(timeout)
+
+    def write_stats(self) -> Dict[str, int]:
+        """write-behind の送信件数（submitted / completed / failed / batches / pending）。"""
+        if self._write_behind is None:
+            return {"submitted": 0, "completed": 0, "failed": 0, "batches": 0, "pending": 0}
+        return self._write_behind.stats()
+
+    def search_stats(self) -> Dict[str, int]:
+        """検索の実行回数と共有された回数（executed / deduplicated / in_flight）。"""
+        return self._searches.stats()
 
     def reset(self) -> None:
         """
         CrewAI の memory.reset() に準拠。
 
-        harness-mem の記憶は永続的なため、このメソッドは noop。
+        harness-mem の記憶は永続的なため削除はしない。write-behind で
+        未送信の save() があれば送り切り、共有中の検索結果を破棄する。
         """
+        self.flush()
+        self._searches.forget()
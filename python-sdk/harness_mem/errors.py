@@ -24,3 +24,15 @@ class HarnessMemAPIError(HarnessMemError):
 
     def __str__(self) -> str:  # pragma: no cover
         return f"HarnessMemAPIError(status={self.status_code}, message={self.message})"
+
+
+@dataclass
+class HarnessMemLeaseLostError(HarnessMemError):
+    """A lease this process relied on expired, was released or is held by another agent."""
+
+    target: str
+    lease_id: str
+    reason: str
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"HarnessMemLeaseLostError(target={self.target}, lease_id={self.lease_id}, reason={self.reason})"
@@ -0,0 +1,264 @@
+"""Cached multi-hop expansion over the daemon's observation link graph.
+
+Building two- or three-hop context for a prompt by calling
+``graph_neighbors(depth=1)`` once per node costs one round-trip per node, and
+the same hub observations are fetched again for every prompt.
+``GraphExpander`` walks the graph breadth-first and keeps the request count
+close to the number of seeds:
+
+- Each level's frontier is deduplicated against every node already visited,
+  so a node is expanded at most once per walk however many paths reach it.
+- A node with no cached adjacency is fetched with ``depth`` set to the hops
+  still remaining. The daemon answers with every link within that many hops,
+  and the adjacency of each node it expanded (all nodes closer than
+  ``depth``) is cached from that single response, so the following levels
+  are mostly served from the cache.
+- The uncached nodes of one level are fetched in parallel by up to
+  ``concurrency`` threads. Identical fetches from concurrent walks share one
+  request through ``SingleFlight``.
+- Adjacency lists live in an ``AdjacencyCache`` for ``ttl_sec`` and are
+  evicted LRU beyond ``max_entries``. One cache can be shared by several
+  expanders; ``invalidate`` drops nodes whose links changed.
+
+::
+
+    expander = GraphExpander(client, ttl_sec=600)
+    hood = expander.expand(["obs_1", "obs_2"], hops=3)
+    context = client.get_observations(ids=hood.ids(), compact=True)
+    print(hood.requests, hood.cache_hits, hood.hops)
+
+Links are followed from ``from_observation_id`` to ``to_observation_id``, as
+``/v1/graph/neighbors`` does; ``relation`` restricts the walk to one link
+type. ``/v1/graph/neighbors`` requires admin authentication. For an
+entity-seeded, bidirectional subgraph capped at 100 nodes, use
+``HarnessMemClient.graph`` instead.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .client import GRAPH_MAX_DEPTH
+from .singleflight import SingleFlight
+
+_Key = Tuple[str, Optional[str]]  # (observation_id, relation)
+
+
+class AdjacencyCache:
+    """Thread-safe TTL + LRU cache of outgoing link rows per observation."""
+
+    def __init__(
+        self,
+        *,
+        ttl_sec: Optional[float] = 300.0,
+        max_entries: int = 50_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be positive")
+        self.ttl_sec = ttl_sec
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[_Key, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, observation_id: str, relation: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+        key = (observation_id, relation)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_sec is not None and self._clock() - entry[0] > self.ttl_sec:
+                del self._entries[key]
+                self.expired += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, observation_id: str, rows: List[Dict[str, Any]], relation: Optional[str] = None) -> None:
+        key = (observation_id, relation)
+        with self._lock:
+            self._entries[key] = (self._clock(), rows)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, observation_ids: Optional[Iterable[str]] = None) -> int:
+        """Drop the given nodes (every relation), or everything when ``None``. Returns entries removed."""
+        with self._lock:
+            if observation_ids is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                return removed
+            wanted = set(observation_ids)
+            stale = [key for key in self._entries if key[0] in wanted]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expired": self.expired,
+            }
+
+
+def complete_adjacency(root: str, rows: List[Dict[str, Any]], depth: int) -> Dict[str, List[Dict[str, Any]]]:
+    """Adjacency lists a ``graph_neighbors(root, depth)`` response fully determines.
+
+    The daemon expands every node closer than ``depth`` to ``root``, so those
+    nodes' outgoing rows are all present (possibly none); nodes at exactly
+    ``depth`` were not expanded and are left out.
+    """
+    outgoing: Dict[str, List[Dict[str, Any]]] = {}
+    for row in rows:
+        outgoing.setdefault(row["from_observation_id"], []).append(row)
+    distance = {root: 0}
+    frontier = [root]
+    for hop in range(1, depth):
+        next_frontier = []
+        for node in frontier:
+            for row in outgoing.get(node, ()):
+                target = row["to_observation_id"]
+                if target not in distance:
+                    distance[target] = hop
+                    next_frontier.append(target)
+        frontier = next_frontier
+    return {node: outgoing.get(node, []) for node in distance}
+
+
+@dataclass
+class GraphNeighborhood:
+    seeds: List[str]
+    hops: Dict[str, int] = field(default_factory=dict)
+    levels: List[List[str]] = field(default_factory=list)
+    edges: List[Dict[str, Any]] = field(default_factory=list)
+    requests: int = 0
+    cache_hits: int = 0
+    truncated: bool = False
+
+    def ids(self, max_hops: Optional[int] = None) -> List[str]:
+        """Visited observation ids in breadth-first order, optionally only up to ``max_hops``."""
+        return [node for hop, level in enumerate(self.levels) if max_hops is None or hop <= max_hops for node in level]
+
+
+class GraphExpander:
+    """Breadth-first neighbourhood expansion with batched levels and cached adjacency."""
+
+    def __init__(
+        self,
+        client: Any,
+        *,
+        relation: Optional[str] = None,
+        concurrency: int = 8,
+        max_nodes: int = 1000,
+        cache: Optional[AdjacencyCache] = None,
+        ttl_sec: Optional[float] = 300.0,
+        max_entries: int = 50_000,
+    ) -> None:
+        if concurrency < 1 or max_nodes < 1:
+            raise ValueError("concurrency and max_nodes must be >= 1")
+        self.client = client
+        self.relation = relation
+        self.concurrency = concurrency
+        self.max_nodes = max_nodes
+        self.cache = cache if cache is not None else AdjacencyCache(ttl_sec=ttl_sec, max_entries=max_entries)
+        self._singleflight = SingleFlight()
+
+    def _fetch(self, observation_id: str, depth: int) -> Tuple[List[Dict[str, Any]], bool]:
+        """``observation_id``'s outgoing rows, caching every adjacency the response determines."""
+        requested = False
+
+        def _call() -> Dict[str, List[Dict[str, Any]]]:
+            nonlocal requested
+            requested = True
+            response = self.client.graph_neighbors(observation_id=observation_id, relation=self.relation, depth=depth)
+            learned = complete_adjacency(observation_id, list(response.get("items") or []), depth)
+            for node, rows in learned.items():
+                self.cache.put(node, rows, self.relation)
+            return learned
+
+        learned = self._singleflight.do((observation_id, self.relation, depth), _call)
+        return learned[observation_id], requested
+
+    def neighbors(self, observation_id: str) -> List[Dict[str, Any]]:
+        """Outgoing link rows of one observation, from the cache when fresh."""
+        cached = self.cache.get(observation_id, self.relation)
+        return cached if cached is not None else self._fetch(observation_id, 1)[0]
+
+    def expand(self, seeds: Iterable[str], hops: int = 2) -> GraphNeighborhood:
+        """Every observation within ``hops`` outgoing links of ``seeds``, level by level."""
+        if hops < 0:
+            raise ValueError("hops must be >= 0")
+        frontier = list(dict.fromkeys(seeds))[: self.max_nodes]
+        hood = GraphNeighborhood(seeds=list(frontier), hops={seed: 0 for seed in frontier})
+        if frontier:
+            hood.levels.append(list(frontier))
+        pool: Optional[ThreadPoolExecutor] = None
+        try:
+            for hop in range(hops):
+                if not frontier:
+                    break
+                adjacency: Dict[str, List[Dict[str, Any]]] = {}
+                missing = []
+                for node in frontier:
+                    cached = self.cache.get(node, self.relation)
+                    if cached is None:
+                        missing.append(node)
+                    else:
+                        adjacency[node] = cached
+                        hood.cache_hits += 1
+                depth = min(hops - hop, GRAPH_MAX_DEPTH)
+                if len(missing) == 1 or (missing and self.concurrency == 1):
+                    results = [self._fetch(node, depth) for node in missing]
+                elif missing:
+                    if pool is None:
+                        pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="harness-mem-graph")
+                    results = list(pool.map(lambda node: self._fetch(node, depth), missing))
+                else:
+                    results = []
+                for node, (rows, requested) in zip(missing, results):
+                    adjacency[node] = rows
+                    hood.requests += requested
+                next_frontier: List[str] = []
+                for node in frontier:
+                    for row in adjacency[node]:
+                        target = row["to_observation_id"]
+                        if target not in hood.hops:
+                            if len(hood.hops) >= self.max_nodes:
+                                hood.truncated = True
+                                continue
+                            hood.hops[target] = hop + 1
+                            next_frontier.append(target)
+                        hood.edges.append(row)
+                if next_frontier:
+                    hood.levels.append(next_frontier)
+                frontier = next_frontier
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True)
+        return hood
+
+    def invalidate(self, observation_ids: Optional[Iterable[str]] = None) -> int:
+        """Forget cached adjacency for ``observation_ids`` (everything when ``None``)."""
+        return self.cache.invalidate(observation_ids)
@@ -0,0 +1,179 @@
+"""Token-budgeted conversation history with incremental refresh.
+
+``HistoryWindow`` keeps the candidate observations of one session, formats each
+of them once (per ``updated_at``) and packs the most valuable ones into a fixed
+token budget. New observations are merged as they arrive instead of rebuilding
+the whole history, and the rendered text is reused until the candidates or the
+query terms change.
+
+An item's value is its server relevance score (``rerank_score``,
+``hybrid_score``, ``score`` or ``similarity``; rank order when none is present)
+plus the share of the current query's terms found in its text, so the packing
+follows the conversation between full re-searches. Observations merged from
+the feed carry no server score and compete on query terms alone.
+
+``estimate_tokens`` is the daemon's own heuristic (``meta.token_estimate``
+uses ``ceil(len(text) / 4)``); pass ``token_counter`` to use a real tokenizer.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+_TERM = re.compile(r"\w+", re.UNICODE)
+_SCORE_FIELDS = ("rerank_score", "hybrid_score", "score", "similarity")
+
+
+def estimate_tokens(text: str) -> int:
+    """Token estimate matching the daemon's ``estimateTokenCount``."""
+    return max(1, math.ceil(len(text) / 4)) if text.strip() else 1
+
+
+def _terms(text: str) -> FrozenSet[str]:
+    return frozenset(_TERM.findall(text.lower()))
+
+
+def _base_value(item: Any, rank: Optional[int]) -> float:
+    for name in _SCORE_FIELDS:
+        value = item.get(name)
+        if isinstance(value, (int, float)) and not isinstance(value, bool) and not math.isnan(value):
+            return float(value)
+    return 0.0 if rank is None else 1.0 / (rank + 1)
+
+
+@dataclass
+class _Entry:
+    text: str
+    tokens: int
+    terms: FrozenSet[str]
+    base: float
+    updated_at: Any
+    seq: int
+
+
+class HistoryWindow:
+    """Candidate observations of one session, packed into ``max_tokens``."""
+
+    def __init__(
+        self,
+        *,
+        max_tokens: int,
+        format_item: Callable[[Any], str],
+        token_counter: Callable[[str], int] = estimate_tokens,
+        separator: str = "\n---\n",
+        max_candidates: int = 200,
+    ) -> None:
+        if max_tokens < 1:
+            raise ValueError("max_tokens must be >= 1")
+        self.max_tokens = max_tokens
+        self.format_item = format_item
+        self.token_counter = token_counter
+        self.separator = separator
+        self.max_candidates = max_candidates
+        self._separator_tokens = token_counter(separator) if separator else 0
+        self._entries: Dict[str, _Entry] = {}
+        self._seq = 0
+        self._version = 0
+        self._rendered: Optional[Tuple[int, FrozenSet[str], str]] = None
+        self.searched_at: Optional[float] = None
+        self.feed_head: Optional[str] = None
+        self.formatted = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def needs_search(self, refresh_sec: float) -> bool:
+        return self.searched_at is None or time.monotonic() - self.searched_at >= refresh_sec
+
+    def replace(self, items: Iterable[Any]) -> None:
+        """Start over from a fresh search result, keeping formatted text of unchanged items."""
+        previous, self._entries = self._entries, {}
+        self._merge(items, previous, ranked=True)
+        self.searched_at = time.monotonic()
+        self._version += 1
+
+    def merge(self, items: Iterable[Any]) -> int:
+        """Add newly arrived observations; returns how many were new or changed."""
+        changed = self._merge(items, self._entries, ranked=False)
+        if changed:
+            self._version += 1
+        return changed
+
+    def _merge(self, items: Iterable[Any], known: Dict[str, _Entry], *, ranked: bool) -> int:
+        changed = 0
+        for rank, item in enumerate(items):
+            observation_id = item.get("id")
+            if not isinstance(observation_id, str):
+                continue
+            base = _base_value(item, rank if ranked else None)
+            updated_at = item.get("updated_at")
+            entry = known.get(observation_id)
+            if entry is not None and entry.updated_at == updated_at:
+                if known is not self._entries:
+                    # Re-searched and unchanged: reuse the formatted text with the new score.
+                    entry.base = base
+                    self._entries[observation_id] = entry
+                continue
+            if entry is not None:
+                base = max(base, entry.base)
+            text = self.format_item(item)
+            if not text:
+                continue
+            self.formatted += 1
+            self._seq += 1
+            self._entries[observation_id] = _Entry(
+                text=text,
+                tokens=self.token_counter(text),
+                terms=_terms(text),
+                base=base,
+                updated_at=updated_at,
+                seq=self._seq,
+            )
+            changed += 1
+        if len(self._entries) > self.max_candidates:
+            keep = sorted(self._entries.items(), key=lambda pair: (pair[1].base, pair[1].seq), reverse=True)
+            self._entries = dict(keep[: self.max_candidates])
+        return changed
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._rendered = None
+        self.searched_at = None
+        self.feed_head = None
+        self._version += 1
+
+    def render(self, query: str) -> str:
+        """Highest-value candidates for ``query`` that fit the budget, best first."""
+        query_terms = _terms(query)
+        if self._rendered is not None and self._rendered[:2] == (self._version, query_terms):
+            return self._rendered[2]
+
+        def _value(entry: _Entry) -> float:
+            overlap = len(query_terms & entry.terms) / len(query_terms) if query_terms else 0.0
+            return entry.base + overlap
+
+        ranked = sorted(self._entries.values(), key=lambda entry: (_value(entry), entry.seq), reverse=True)
+        chunks: List[str] = []
+        used = 0
+        for entry in ranked:
+            cost = entry.tokens + (self._separator_tokens if chunks else 0)
+            if used + cost <= self.max_tokens:
+                chunks.append(entry.text)
+                used += cost
+            elif not chunks:
+                # The best item alone is over budget: keep its head rather than return nothing.
+                chunks.append(self._truncate(entry.text, self.max_tokens))
+                used = self.max_tokens
+        rendered = self.separator.join(chunks)
+        self._rendered = (self._version, query_terms, rendered)
+        return rendered
+
+    def _truncate(self, text: str, budget: int) -> str:
+        cut = max(1, len(text) * budget // max(self.token_counter(text), 1))
+        while cut > 1 and self.token_counter(text[:cut]) > budget:
+            cut = cut * 9 // 10
+        return text[:cut]
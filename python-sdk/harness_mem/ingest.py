@@ -0,0 +1,395 @@
+"""Parallel, resumable bulk ingestion of Markdown / text documents.
+
+``DocumentIngester`` walks files and directories and uploads them to
+``/v1/ingest/document`` (or ``/v1/ingest/knowledge-file``):
+
+- Unchanged files are skipped. A JSON manifest records every ingested file's
+  size, mtime and SHA-256. A file whose size and mtime match is not even read,
+  and one whose content hash matches is not re-sent. The manifest is
+  rewritten atomically as files complete, so an interrupted run resumes where
+  it stopped. A file is recorded only after all of its chunks were accepted;
+  re-sending a partly uploaded file is harmless because the daemon
+  deduplicates by file path + heading.
+- Large files are chunked. ``decisions_md`` files are split between ``## ``
+  sections, which is exactly how the daemon splits them, so chunking does not
+  change the resulting observations. Other files (``adr`` kind: one
+  observation per file path) are split at section and paragraph boundaries
+  into ``<path>#part-N`` documents, each with an ``# <title> (part i/n)``
+  heading so the daemon's parser accepts it. Files without an H1 get one
+  from their file name.
+- Chunks are uploaded by ``concurrency`` worker threads. At most
+  ``max_pending`` chunks are read ahead, so the directory walk blocks
+  (back-pressure) instead of loading a whole tree into memory. 429 / 5xx and
+  transport errors are retried with exponential backoff.
+
+::
+
+    ingester = DocumentIngester(client, project="wiki", manifest_path=".harness-mem-ingest.json")
+    report = ingester.ingest("docs/")
+    print(report.files_ingested, report.files_skipped, report.errors)
+
+When a re-ingested file produces fewer parts than before, the surplus
+``#part-N`` observations of the old version are left in place.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .errors import HarnessMemAPIError, HarnessMemError, HarnessMemTransportError
+
+_logger = logging.getLogger("harness_mem")
+
+DEFAULT_PATTERNS = ("*.md", "*.markdown", "*.mdx", "*.txt", "*.rst")
+
+_SECTION_BREAK = re.compile(r"^(?=## )", re.M)
+_PARAGRAPH_BREAK = re.compile(r"(?<=\n\n)")
+_H1 = re.compile(r"^# +(.+?)\s*$", re.M)
+_RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+_MANIFEST_VERSION = 1
+
+
+def infer_kind(file_path: str) -> str:
+    """The daemon's default: ``decisions_md`` for paths containing "decisions", else ``adr``."""
+    return "decisions_md" if "decisions" in file_path.lower() else "adr"
+
+
+def _pack(pieces: Iterable[str], max_chars: int) -> List[str]:
+    chunks: List[str] = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + len(piece) > max_chars:
+            chunks.append(current)
+            current = ""
+        current += piece
+    if current.strip():
+        chunks.append(current)
+    return chunks
+
+
+def _split_long(text: str, max_chars: int) -> List[str]:
+    pieces: List[str] = []
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        while len(paragraph) > max_chars:
+            pieces.append(paragraph[:max_chars])
+            paragraph = paragraph[max_chars:]
+        pieces.append(paragraph)
+    return _pack(pieces, max_chars)
+
+
+def chunk_text(text: str, max_chars: int, *, split_sections: bool = True) -> List[str]:
+    """Split ``text`` into chunks of at most ``max_chars`` characters.
+
+    Chunks break between ``## `` sections where possible. With
+    ``split_sections=False`` a section is never broken, so an oversized
+    section becomes a chunk of its own (needed for ``decisions_md``).
+    """
+    if max_chars < 1:
+        raise ValueError("max_chars must be >= 1")
+    pieces: List[str] = []
+    for section in _SECTION_BREAK.split(text):
+        if len(section) > max_chars and split_sections:
+            pieces.extend(_split_long(section, max_chars))
+        elif section:
+            pieces.append(section)
+    return _pack(pieces, max_chars)
+
+
+class IngestManifest:
+    """``{file_path: {sha256, size, mtime_ns, chunks, project, kind}}`` kept in a JSON file."""
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self.files: Dict[str, Dict[str, Any]] = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as fh:
+                    data = json.load(fh)
+                if isinstance(data, dict) and data.get("version") == _MANIFEST_VERSION:
+                    self.files = dict(data.get("files") or {})
+            except (OSError, ValueError) as exc:
+                _logger.warning("harness-mem ingest manifest %s unreadable, starting fresh: %s", path, exc)
+
+    def get(self, file_path: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self.files.get(file_path)
+
+    def update(self, file_path: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self.files[file_path] = entry
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        with self._lock:
+            data = json.dumps({"version": _MANIFEST_VERSION, "files": self.files}, ensure_ascii=False, sort_keys=True)
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            fh.write(data)
+        os.replace(tmp, self.path)
+
+
+@dataclass
+class IngestReport:
+    files_seen: int = 0
+    files_skipped: int = 0
+    files_ingested: int = 0
+    files_failed: int = 0
+    chunks_sent: int = 0
+    entries_imported: int = 0
+    entries_skipped: int = 0
+    parse_errors: int = 0
+    bytes_read: int = 0
+    elapsed_sec: float = 0.0
+    errors: List[Tuple[str, str]] = field(default_factory=list)
+
+
+@dataclass
+class _PendingFile:
+    file_path: str
+    entry: Dict[str, Any]
+    remaining: int
+    error: Optional[str] = None
+
+
+class DocumentIngester:
+    """Uploads documents with bounded concurrency, skipping files already ingested."""
+
+    def __init__(
+        self,
+        client: Any,
+        *,
+        project: Optional[str] = None,
+        manifest_path: Optional[str] = None,
+        endpoint: str = "document",
+        kind: Optional[str] = None,
+        platform: Optional[str] = None,
+        branch: Optional[str] = None,
+        expires_at: Optional[str] = None,
+        path_prefix: Optional[str] = None,
+        patterns: Sequence[str] = DEFAULT_PATTERNS,
+        exclude: Sequence[str] = (),
+        chunk_chars: int = 16_000,
+        concurrency: int = 4,
+        max_pending: Optional[int] = None,
+        retries: int = 3,
+        retry_backoff_sec: float = 0.5,
+        save_interval_sec: float = 2.0,
+        encoding: str = "utf-8",
+    ) -> None:
+        if endpoint not in ("document", "knowledge-file"):
+            raise ValueError('endpoint must be "document" or "knowledge-file"')
+        if endpoint == "knowledge-file" and (branch is not None or expires_at is not None):
+            raise ValueError("branch / expires_at are only supported by the document endpoint")
+        if kind not in (None, "adr", "decisions_md"):
+            raise ValueError('kind must be "adr" or "decisions_md"')
+        if concurrency < 1 or chunk_chars < 1 or retries < 0:
+            raise ValueError("concurrency and chunk_chars must be >= 1, retries >= 0")
+        self.client = client
+        self.project = project
+        self.manifest = IngestManifest(manifest_path)
+        self.endpoint = endpoint
+        self.kind = kind
+        self.platform = platform
+        self.branch = branch
+        self.expires_at = expires_at
+        self.path_prefix = path_prefix.strip("/") if path_prefix else None
+        self.patterns = tuple(patterns)
+        self.exclude = tuple(exclude)
+        self.chunk_chars = chunk_chars
+        self.concurrency = concurrency
+        self.max_pending = max_pending if max_pending is not None else concurrency * 2
+        if self.max_pending < 1:
+            raise ValueError("max_pending must be >= 1")
+        self.retries = retries
+        self.retry_backoff_sec = retry_backoff_sec
+        self.save_interval_sec = save_interval_sec
+        self.encoding = encoding
+        self._lock = threading.Lock()
+        self._random = random.Random()
+
+    # -- discovery ----------------------------------------------------------
+
+    def _wanted(self, rel_path: str) -> bool:
+        name = os.path.basename(rel_path)
+        if not any(fnmatch.fnmatch(name, pattern) for pattern in self.patterns):
+            return False
+        return not any(fnmatch.fnmatch(rel_path, pattern) or fnmatch.fnmatch(name, pattern) for pattern in self.exclude)
+
+    def iter_files(self, paths: Union[str, Iterable[str]]) -> Iterator[Tuple[str, str]]:
+        """``(local_path, document_path)`` for every matching file, in sorted order.
+
+        Directories are walked recursively (hidden entries skipped) and their
+        files are named relative to the directory. A file given directly is
+        named by its base name. ``path_prefix`` is prepended to both.
+        """
+        for path in [paths] if isinstance(paths, str) else paths:
+            if os.path.isdir(path):
+                for dirpath, dirnames, filenames in os.walk(path):
+                    dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+                    for name in sorted(filenames):
+                        if name.startswith("."):
+                            continue
+                        local = os.path.join(dirpath, name)
+                        rel = os.path.relpath(local, path).replace(os.sep, "/")
+                        if self._wanted(rel):
+                            yield local, self._document_path(rel)
+            elif os.path.isfile(path):
+                yield path, self._document_path(os.path.basename(path))
+
+    def _document_path(self, rel_path: str) -> str:
+        return f"{self.path_prefix}/{rel_path}" if self.path_prefix else rel_path
+
+    # -- planning -----------------------------------------------------------
+
+    def _plan(self, local: str, file_path: str, report: IngestReport) -> Optional[Tuple[Dict[str, Any], List[Tuple[str, str]]]]:
+        """``(manifest entry, [(file_path, content), ...])``; ``None`` if the file can be skipped."""
+        stat = os.stat(local)
+        kind = self.kind or infer_kind(file_path)
+        previous = self.manifest.get(file_path)
+        same_target = previous is not None and previous.get("project") == self.project and previous.get("kind") == kind
+        if same_target and previous.get("size") == stat.st_size and previous.get("mtime_ns") == stat.st_mtime_ns:
+            return None
+        with open(local, "rb") as fh:
+            raw = fh.read()
+        report.bytes_read += len(raw)
+        digest = hashlib.sha256(raw).hexdigest()
+        entry = {"sha256": digest, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "project": self.project, "kind": kind}
+        if same_target and previous.get("sha256") == digest:
+            # Touched but not changed: refresh size / mtime so the next run takes the fast path.
+            self.manifest.update(file_path, {**previous, **entry})
+            return None
+        text = raw.decode(self.encoding, errors="replace")
+        if not text.strip():
+            return None
+        documents = self._documents(file_path, text, kind)
+        entry["chunks"] = len(documents)
+        return entry, documents
+
+    def _documents(self, file_path: str, text: str, kind: str) -> List[Tuple[str, str]]:
+        if kind == "decisions_md":
+            return [(file_path, chunk) for chunk in chunk_text(text, self.chunk_chars, split_sections=False)]
+        match = _H1.search(text)
+        title = match.group(1) if match else os.path.splitext(os.path.basename(file_path))[0]
+        if len(text) <= self.chunk_chars:
+            return [(file_path, text if match else f"# {title}\n\n{text}")]
+        chunks = chunk_text(text, self.chunk_chars)
+        total = len(chunks)
+        return [
+            (f"{file_path}#part-{index}", f"# {title} (part {index}/{total})\n\n{chunk}")
+            for index, chunk in enumerate(chunks, start=1)
+        ]
+
+    # -- upload -------------------------------------------------------------
+
+    def _send(self, file_path: str, content: str, kind: str) -> Dict[str, Any]:
+        kwargs: Dict[str, Any] = {
+            "file_path": file_path,
+            "content": content,
+            "kind": kind,
+            "project": self.project,
+            "platform": self.platform,
+        }
+        if self.endpoint == "document":
+            kwargs.update(branch=self.branch, expires_at=self.expires_at)
+            send = self.client.ingest_document
+        else:
+            send = self.client.ingest_knowledge_file
+        attempt = 0
+        while True:
+            try:
+                response = send(**kwargs)
+                return dict((response.get("items") or [{}])[0])
+            except HarnessMemError as exc:
+                retryable = isinstance(exc, HarnessMemTransportError) or (
+                    isinstance(exc, HarnessMemAPIError) and exc.status_code in _RETRYABLE_STATUSES
+                )
+                if not retryable or attempt >= self.retries:
+                    raise
+                with self._lock:
+                    delay = self.retry_backoff_sec * (2 ** attempt) * (0.5 + self._random.random())
+                time.sleep(delay)
+                attempt += 1
+
+    def _chunk_done(self, pending: _PendingFile, future: "Future[Dict[str, Any]]", report: IngestReport) -> None:
+        exc = future.exception() if not future.cancelled() else None
+        with self._lock:
+            if future.cancelled():
+                pending.error = pending.error or "cancelled"
+            elif exc is not None:
+                pending.error = pending.error or str(exc)
+            else:
+                result = future.result()
+                report.chunks_sent += 1
+                report.entries_imported += int(result.get("entries_imported") or 0)
+                report.entries_skipped += int(result.get("entries_skipped") or 0)
+                report.parse_errors += int(result.get("parse_errors") or 0)
+            pending.remaining -= 1
+            if pending.remaining:
+                return
+            if pending.error is None:
+                report.files_ingested += 1
+                self.manifest.update(pending.file_path, {**pending.entry, "ingested_at": time.time()})
+            else:
+                report.files_failed += 1
+                report.errors.append((pending.file_path, pending.error))
+
+    def ingest(self, paths: Union[str, Iterable[str]]) -> IngestReport:
+        """Ingest every matching file under ``paths``; safe to interrupt and re-run."""
+        report = IngestReport()
+        started = time.monotonic()
+        slots = threading.BoundedSemaphore(self.max_pending)
+        last_save = started
+        pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="harness-mem-ingest")
+        try:
+            for local, file_path in self.iter_files(paths):
+                report.files_seen += 1
+                try:
+                    plan = self._plan(local, file_path, report)
+                except OSError as exc:
+                    with self._lock:
+                        report.files_failed += 1
+                        report.errors.append((file_path, str(exc)))
+                    continue
+                if plan is None:
+                    report.files_skipped += 1
+                    continue
+                entry, documents = plan
+                pending = _PendingFile(file_path, entry, remaining=len(documents))
+
+                def _done(future: "Future[Dict[str, Any]]", pending: _PendingFile = pending) -> None:
+                    try:
+                        self._chunk_done(pending, future, report)
+                    finally:
+                        slots.release()
+
+                for document_path, content in documents:
+                    slots.acquire()  # back-pressure: wait until a chunk in flight finishes
+                    pool.submit(self._send, document_path, content, entry["kind"]).add_done_callback(_done)
+                if self.manifest.path and time.monotonic() - last_save >= self.save_interval_sec:
+                    self.manifest.save()
+                    last_save = time.monotonic()
+        except BaseException:
+            # Interrupted: drop queued chunks, let in-flight ones finish and record them.
+            pool.shutdown(wait=True, cancel_futures=True)
+            raise
+        else:
+            pool.shutdown(wait=True)
+        finally:
+            self.manifest.save()
+            report.elapsed_sec = time.monotonic() - started
+        return report
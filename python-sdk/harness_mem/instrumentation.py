@@ -0,0 +1,384 @@
+"""Client-side request instrumentation for HarnessMemClient.
+
+``ApiMeta.latency_ms`` reports how long the daemon spent on a request. The
+hooks here report what the caller saw. Pass one or more ``ClientHooks`` to the
+client and each request emits:
+
+- ``on_request_start`` / ``on_request_end`` with a ``RequestEvent`` carrying
+  bytes out / in, the encoded request body, HTTP status and the timing phases
+  below
+- ``on_retry`` before a read-only request is retried (see ``max_retries``)
+- ``on_error`` when a request fails, before ``on_request_end``
+- ``on_cache`` when ``get_observations`` is answered partly from an
+  ``ObservationCache``
+
+Timing phases (milliseconds, ``time.perf_counter`` based):
+
+- ``wait_ms``: from calling ``urlopen`` until response headers arrive. This
+  covers connect, send and server time; urllib does not expose them separately.
+- ``read_ms``: reading the response body
+- ``decode_ms``: decoding the body with the client's codec
+- ``duration_ms``: the whole attempt, including encoding the request
+
+``MetricsCollector`` is a ready-made hook that keeps per-endpoint
+``LatencyHistogram`` objects for client latency, server latency and their
+difference (network plus serialization overhead), plus byte / retry / error /
+cache counters, and renders them in the Prometheus text format::
+
+    metrics = MetricsCollector()
+    client = HarnessMemClient(hooks=[metrics])
+    client.search(query="wal")
+    print(metrics.snapshot()["POST /v1/search"]["client_ms"]["p99"])
+    print(metrics.to_prometheus())
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+_STATIC_SEGMENT = re.compile(r"^[a-z][a-z-]*$")
+
+# Upper bounds (seconds) of the Prometheus histogram buckets.
+PROMETHEUS_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+DEFAULT_PERCENTILES: Tuple[float, ...] = (50.0, 95.0, 99.0, 99.9)
+
+
+def endpoint_label(path: str) -> str:
+    """Route template for ``path``: query dropped, id-like segments as ``:id``.
+
+    Static route segments in the harness-mem API are lowercase words joined by
+    hyphens (``resume-pack``, ``bulk-delete``); anything else is treated as an
+    identifier so metrics do not get one series per observation or team id.
+    """
+    path = path.split("?", 1)[0]
+    segments = [
+        segment if not segment or _STATIC_SEGMENT.match(segment) or index == 1 else ":id"
+        for index, segment in enumerate(path.split("/"))
+    ]
+    return "/".join(segments)
+
+
+@dataclass
+class RequestEvent:
+    method: str
+    endpoint: str
+    url: str
+    attempt: int = 0
+    bytes_out: int = 0
+    bytes_in: int = 0
+    status: Optional[int] = None
+    wait_ms: float = 0.0
+    read_ms: float = 0.0
+    decode_ms: float = 0.0
+    duration_ms: float = 0.0
+    server_latency_ms: Optional[float] = None
+    error: Optional[BaseException] = None
+    request_body: Optional[bytes] = field(default=None, repr=False)
+
+    @property
+    def key(self) -> str:
+        return f"{self.method} {self.endpoint}"
+
+    @property
+    def overhead_ms(self) -> Optional[float]:
+        """Client-observed time not spent inside the daemon."""
+        if self.server_latency_ms is None:
+            return None
+        return max(self.duration_ms - self.server_latency_ms, 0.0)
+
+
+class ClientHooks:
+    """Base class for client hooks. Override the callbacks you need.
+
+    Hooks run on the calling thread; keep them cheap. Exceptions raised by a
+    hook are logged and do not fail the request.
+    """
+
+    def on_request_start(self, event: RequestEvent) -> None:
+        pass
+
+    def on_request_end(self, event: RequestEvent) -> None:
+        pass
+
+    def on_retry(self, event: RequestEvent, delay_sec: float) -> None:
+        pass
+
+    def on_error(self, event: RequestEvent) -> None:
+        pass
+
+    def on_cache(self, endpoint: str, hits: int, misses: int) -> None:
+        pass
+
+
+class LatencyHistogram:
+    """Log-linear (HDR-style) histogram of millisecond latencies.
+
+    Values are stored in microseconds. Below ``2 ** sub_bucket_bits`` µs every
+    value has its own bucket; above that each power-of-two range is split into
+    ``2 ** sub_bucket_bits`` equal buckets, so any reported percentile is within
+    ``1 / 2 ** sub_bucket_bits`` (about 3% by default) of the recorded value.
+    Memory is fixed (under 1000 counters by default) regardless of the number of
+    samples. Values above ``highest_ms`` are clamped.
+    """
+
+    def __init__(self, *, sub_bucket_bits: int = 5, highest_ms: float = 3_600_000.0) -> None:
+        if not 1 <= sub_bucket_bits <= 16:
+            raise ValueError("sub_bucket_bits must be between 1 and 16")
+        self.sub_bucket_bits = sub_bucket_bits
+        self.max_us = int(highest_ms * 1000)
+        self._counts: List[int] = [0] * (self._index(self.max_us) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = math.inf
+        self.max_ms = 0.0
+
+    def _index(self, value_us: int) -> int:
+        bits = self.sub_bucket_bits
+        if value_us < (1 << bits):
+            return value_us
+        shift = value_us.bit_length() - bits - 1
+        return ((shift + 1) << bits) + (value_us >> shift) - (1 << bits)
+
+    def _bucket_upper_us(self, index: int) -> int:
+        bits = self.sub_bucket_bits
+        if index < (1 << bits):
+            return index
+        shift = (index >> bits) - 1
+        sub_bucket = (index & ((1 << bits) - 1)) + (1 << bits)
+        return ((sub_bucket + 1) << shift) - 1
+
+    def record(self, value_ms: float, count: int = 1) -> None:
+        if value_ms != value_ms or value_ms < 0:  # NaN or negative
+            return
+        value_us = min(int(value_ms * 1000), self.max_us)
+        self._counts[self._index(value_us)] += count
+        self.count += count
+        self.total_ms += value_ms * count
+        self.min_ms = min(self.min_ms, value_ms)
+        self.max_ms = max(self.max_ms, value_ms)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        if other.sub_bucket_bits != self.sub_bucket_bits or other.max_us != self.max_us:
+            raise ValueError("histograms must share sub_bucket_bits and highest_ms")
+        for index, bucket_count in enumerate(other._counts):
+            if bucket_count:
+                self._counts[index] += bucket_count
+        self.count += other.count
+        self.total_ms += other.total_ms
+        self.min_ms = min(self.min_ms, other.min_ms)
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def percentile(self, percentile: float) -> float:
+        """Value (ms) at or below which ``percentile`` percent of samples fall."""
+        if not self.count:
+            return 0.0
+        target = max(1, math.ceil(self.count * min(max(percentile, 0.0), 100.0) / 100.0))
+        seen = 0
+        for index, bucket_count in enumerate(self._counts):
+            seen += bucket_count
+            if seen >= target:
+                return min(self._bucket_upper_us(index) / 1000.0, self.max_ms)
+        return self.max_ms
+
+    def mean(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+    def cumulative_counts(self, bounds_ms: Iterable[float]) -> List[int]:
+        """Samples whose bucket lies entirely at or below each bound."""
+        results: List[int] = []
+        seen = 0
+        index = 0
+        limit = len(self._counts)
+        for bound in bounds_ms:
+            bound_us = bound * 1000
+            while index < limit and self._bucket_upper_us(index) <= bound_us:
+                seen += self._counts[index]
+                index += 1
+            results.append(seen)
+        return results
+
+    def summary(self, percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[str, float]:
+        result: Dict[str, float] = {
+            "count": self.count,
+            "mean": self.mean(),
+            "min": self.min_ms if self.count else 0.0,
+            "max": self.max_ms,
+        }
+        for percentile in percentiles:
+            result[_percentile_name(percentile)] = self.percentile(percentile)
+        return result
+
+
+def _percentile_name(percentile: float) -> str:
+    return "p" + f"{percentile:g}".replace(".", "")
+
+
+class _EndpointMetrics:
+    __slots__ = (
+        "client",
+        "server",
+        "overhead",
+        "requests",
+        "errors",
+        "retries",
+        "bytes_out",
+        "bytes_in",
+        "cache_hits",
+        "cache_misses",
+    )
+
+    def __init__(self, sub_bucket_bits: int) -> None:
+        self.client = LatencyHistogram(sub_bucket_bits=sub_bucket_bits)
+        self.server = LatencyHistogram(sub_bucket_bits=sub_bucket_bits)
+        self.overhead = LatencyHistogram(sub_bucket_bits=sub_bucket_bits)
+        self.requests = 0
+        self.errors: Dict[str, int] = {}
+        self.retries = 0
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+
+def error_kind(error: BaseException) -> str:
+    """Short label for an error: ``http_<status>``, ``transport`` or the class name."""
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return f"http_{status}"
+    if type(error).__name__ == "HarnessMemTransportError":
+        return "transport"
+    return type(error).__name__
+
+
+class MetricsCollector(ClientHooks):
+    """Per-endpoint latency histograms and counters, exportable to Prometheus."""
+
+    def __init__(self, *, sub_bucket_bits: int = 5, namespace: str = "harness_mem_client") -> None:
+        self.sub_bucket_bits = sub_bucket_bits
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._endpoints: Dict[Tuple[str, str], _EndpointMetrics] = {}
+
+    def _metrics_locked(self, method: str, endpoint: str) -> _EndpointMetrics:
+        key = (method, endpoint)
+        metrics = self._endpoints.get(key)
+        if metrics is None:
+            metrics = self._endpoints[key] = _EndpointMetrics(self.sub_bucket_bits)
+        return metrics
+
+    def on_request_end(self, event: RequestEvent) -> None:
+        with self._lock:
+            metrics = self._metrics_locked(event.method, event.endpoint)
+            metrics.requests += 1
+            metrics.bytes_out += event.bytes_out
+            metrics.bytes_in += event.bytes_in
+            metrics.client.record(event.duration_ms)
+            if event.server_latency_ms is not None:
+                metrics.server.record(event.server_latency_ms)
+                metrics.overhead.record(event.overhead_ms or 0.0)
+
+    def on_error(self, event: RequestEvent) -> None:
+        if event.error is None:
+            return
+        kind = error_kind(event.error)
+        with self._lock:
+            errors = self._metrics_locked(event.method, event.endpoint).errors
+            errors[kind] = errors.get(kind, 0) + 1
+
+    def on_retry(self, event: RequestEvent, delay_sec: float) -> None:
+        with self._lock:
+            self._metrics_locked(event.method, event.endpoint).retries += 1
+
+    def on_cache(self, endpoint: str, hits: int, misses: int) -> None:
+        method, _, path = endpoint.partition(" ")
+        with self._lock:
+            metrics = self._metrics_locked(method, path)
+            metrics.cache_hits += hits
+            metrics.cache_misses += misses
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+
+    def snapshot(self, percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[str, Dict[str, Any]]:
+        """Plain-dict view keyed by ``"METHOD /endpoint"``."""
+        with self._lock:
+            return {
+                f"{method} {endpoint}": {
+                    "requests": metrics.requests,
+                    "errors": dict(metrics.errors),
+                    "retries": metrics.retries,
+                    "bytes_out": metrics.bytes_out,
+                    "bytes_in": metrics.bytes_in,
+                    "cache_hits": metrics.cache_hits,
+                    "cache_misses": metrics.cache_misses,
+                    "client_ms": metrics.client.summary(percentiles),
+                    "server_ms": metrics.server.summary(percentiles),
+                    "overhead_ms": metrics.overhead.summary(percentiles),
+                }
+                for (method, endpoint), metrics in sorted(self._endpoints.items())
+            }
+
+    def to_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format (0.0.4)."""
+        ns = self.namespace
+        lines: List[str] = []
+        with self._lock:
+            endpoints = sorted(self._endpoints.items())
+            histograms = (
+                ("request_duration_seconds", "Client-observed request latency.", "client"),
+                ("server_latency_seconds", "Server-reported latency (meta.latency_ms).", "server"),
+                ("overhead_seconds", "Client latency minus server latency.", "overhead"),
+            )
+            for name, help_text, attr in histograms:
+                lines.append(f"# HELP {ns}_{name} {help_text}")
+                lines.append(f"# TYPE {ns}_{name} histogram")
+                for (method, endpoint), metrics in endpoints:
+                    histogram: LatencyHistogram = getattr(metrics, attr)
+                    labels = _labels(method=method, endpoint=endpoint)
+                    bounds_ms = [bound * 1000 for bound in PROMETHEUS_BUCKETS]
+                    for bound, cumulative in zip(PROMETHEUS_BUCKETS, histogram.cumulative_counts(bounds_ms)):
+                        bucket_labels = _labels(method=method, endpoint=endpoint, le=f"{bound:g}")
+                        lines.append(f"{ns}_{name}_bucket{bucket_labels} {cumulative}")
+                    lines.append(f'{ns}_{name}_bucket{_labels(method=method, endpoint=endpoint, le="+Inf")} {histogram.count}')
+                    lines.append(f"{ns}_{name}_sum{labels} {_format(histogram.total_ms / 1000.0)}")
+                    lines.append(f"{ns}_{name}_count{labels} {histogram.count}")
+
+            counters = (
+                ("requests_total", "Requests completed, including failures.", "requests"),
+                ("retries_total", "Retries of read-only requests.", "retries"),
+                ("bytes_sent_total", "Request body bytes sent.", "bytes_out"),
+                ("bytes_received_total", "Response body bytes received.", "bytes_in"),
+                ("cache_hits_total", "Observation ids served from the client cache.", "cache_hits"),
+                ("cache_misses_total", "Observation ids fetched because they were not cached.", "cache_misses"),
+            )
+            for name, help_text, attr in counters:
+                lines.append(f"# HELP {ns}_{name} {help_text}")
+                lines.append(f"# TYPE {ns}_{name} counter")
+                for (method, endpoint), metrics in endpoints:
+                    lines.append(f"{ns}_{name}{_labels(method=method, endpoint=endpoint)} {getattr(metrics, attr)}")
+
+            lines.append(f"# HELP {ns}_errors_total Failed requests by error kind.")
+            lines.append(f"# TYPE {ns}_errors_total counter")
+            for (method, endpoint), metrics in endpoints:
+                for kind, count in sorted(metrics.errors.items()):
+                    lines.append(f"{ns}_errors_total{_labels(method=method, endpoint=endpoint, kind=kind)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _format(value: float) -> str:
+    return repr(float(value))
@@ -9,14 +9,49 @@ LangChain BaseMemory 相当インターフェース:
 - save_context(inputs, outputs)           — 入力・出力をメモリに保存
 - load_memory_variables(inputs) -> dict   — クエリに関連するメモリを取得
 - clear()                                  — メモリをクリア（no-op）
+
+非同期版（LangChain の async チェーン向け）:
+- aload_memory_variables(inputs) -> dict  — AsyncHarnessMemClient で検索
+- asave_context(inputs, outputs)          — バックグラウンドライターに投入して即座に返る
+- aclear()                                 — clear() と同じ（no-op）
+
+asave_context の書き込みは BackgroundWriter（有界キュー）で非同期に送信される。
+flush() で送信完了を待ち、close() でキューを吐き出してから停止する（プロセス終了時も自動で吐き出す）。
+
+max_history_tokens を指定するとトークン予算モードになる:
+- 検索はセッションごとに初回と history_refresh_sec 経過後のみ実行
+- その間は /v1/feed で新着の観察だけを取り込み、整形済みテキストを再利用する
+- 価値（検索スコア + 入力との語の重なり）の高い順に予算内へ詰める
 """
 
 from __future__ import annotations
 
+import threading
 from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, List, Optional, Sequence
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence
 
 from .client import HarnessMemClient
+from .history import HistoryWindow, estimate_tokens
+
+if TYPE_CHECKING:  # imported lazily: asyncio is only needed by the async methods
+    from .aio import AsyncHarnessMemClient, BackgroundWriter
+
+# 予算モードで新着確認に使う /v1/feed の 1 ページの件数
+_FEED_PAGE_SIZE = 20
+_HISTORY_SEPARATOR = "\n---\n"
+
+
+def _advance_feed_head(window: HistoryWindow, page: Sequence[Any], *, merge: bool) -> None:
+    """feed の先頭ページ（新しい順）から前回の先頭より新しい観察を取り込む。"""
+    fresh = []
+    for item in page:
+        if item.get("id") == window.feed_head:
+            break
+        fresh.append(item)
+    if merge and fresh:
+        window.merge(fresh)
+    if page and isinstance(page[0].get("id"), str):
+        window.feed_head = page[0]["id"]
 
 
 def _default_format_history(items: Sequence[Dict[str, Any]]) -> str:
@@ -53,6 +88,10 @@ class HarnessMemLangChainMemory:
     format_history: Callable[[Sequence[Dict[str, Any]]], str] = field(
         default_factory=lambda: _default_format_history
     )
+    max_pending_writes: int = 1000
+    max_history_tokens: Optional[int] = None
+    token_counter: Callable[[str], int] = field(default_factory=lambda: estimate_tokens)
+    history_refresh_sec: float = 300.0
 
     def __post_init__(self) -> None:
         self._client = HarnessMemClient(
@@ -60,6 +99,21 @@ class HarnessMemLangChainMemory:
             timeout_sec=self.timeout_sec,
             token=self.token,
         )
+        self._aclient: Optional[AsyncHarnessMemClient] = None
+        self._writer: Optional[BackgroundWriter] = None
+        self._writer_lock = threading.Lock()
+        self._histories: Dict[str, HistoryWindow] = {}
+        if self.max_history_tokens is not None and self.max_history_tokens < 1:
+            raise ValueError("max_history_tokens must be >= 1")
+
+    @property
+    def _async_client(self) -> AsyncHarnessMemClient:
+        with self._writer_lock:
+            if self._aclient is None:
+                from .aio import AsyncHarnessMemClient
+
+                self._aclient = AsyncHarnessMemClient.from_client(self._client)
+            return self._aclient
 
     @property
     def memory_variables(self) -> List[str]:
@@ -75,25 +129,68 @@ class HarnessMemLangChainMemory:
         LangChain BaseMemory.save_context: 入出力ペアをメモリに保存する。
         input の内容と output の内容を結合してハーネスメムに記録する。
         """
+        checkpoint = self._build_checkpoint(inputs, outputs)
+        if checkpoint is not None:
+            self._client.record_checkpoint(**checkpoint)
+
+    async def asave_context(
+        self,
+        inputs: Dict[str, Any],
+        outputs: Dict[str, Any],
+    ) -> None:
+        """
+        save_context の非同期版。記録はバックグラウンドライターに投入するだけで、
+        サーバーの応答を待たずに返る。キューが満杯のときは空きが出るまで待つ。
+        """
+        checkpoint = self._build_checkpoint(inputs, outputs)
+        if checkpoint is None:
+            return
+        client = self._async_client
+        await self._background_writer().asubmit(lambda: client.record_checkpoint(**checkpoint))
+
+    def _build_checkpoint(self, inputs: Dict[str, Any], outputs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         input_text = "\n".join(str(v) for v in inputs.values() if v)
         output_text = "\n".join(str(v) for v in outputs.values() if v)
 
         if not input_text and not output_text:
-            return
+            return None
 
         parts = []
         if input_text:
             parts.append(f"Human: {input_text}")
         if output_text:
             parts.append(f"AI: {output_text}")
-        content = "\n".join(parts)
 
-        self._client.record_checkpoint(
-            session_id=self.session_id,
-            title=input_text[:120] or "conversation turn",
-            content=content,
-            project=self.project,
-        )
+        return {
+            "session_id": self.session_id,
+            "title": input_text[:120] or "conversation turn",
+            "content": "\n".join(parts),
+            "project": self.project,
+        }
+
+    def _background_writer(self) -> BackgroundWriter:
+        client = self._async_client
+        with self._writer_lock:
+            if self._writer is None or self._writer.closed:
+                from .aio import BackgroundWriter
+
+                self._writer = BackgroundWriter(
+                    max_pending=self.max_pending_writes,
+                    on_close=client.aclose,
+                    name=f"harness-mem-langchain-{self.session_id}",
+                )
+            return self._writer
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """asave_context で投入した書き込みの完了を待つ。タイムアウト時は False。"""
+        writer = self._writer
+        return True if writer is None else writer.flush(timeout)
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """未送信の書き込みを吐き出してからバックグラウンドライターを停止する。"""
+        with self._writer_lock:
+            writer, self._writer = self._writer, None
+        return True if writer is None else writer.close(timeout)
 
     def load_memory_variables(self, inputs: Dict[str, Any]) -> Dict[str, str]:
         """
@@ -105,6 +202,9 @@ class HarnessMemLangChainMemory:
         if not query:
             return {self.memory_key: ""}
 
+        if self.max_history_tokens is not None:
+            return {self.memory_key: self._budgeted_history(query, self.max_history_tokens)}
+
         try:
             response = self._client.search(
                 query=query,
@@ -119,9 +219,80 @@ class HarnessMemLangChainMemory:
         except Exception:
             return {self.memory_key: ""}
 
+    async def aload_memory_variables(self, inputs: Dict[str, Any]) -> Dict[str, str]:
+        """load_memory_variables の非同期版。スレッドをブロックせずに検索する。"""
+        query = " ".join(str(v) for v in inputs.values() if v).strip()
+
+        if not query:
+            return {self.memory_key: ""}
+
+        if self.max_history_tokens is not None:
+            return {self.memory_key: await self._abudgeted_history(query, self.max_history_tokens)}
+
+        try:
+            response = await self._async_client.search(
+                query=query,
+                project=self.project,
+                limit=self.search_limit,
+            )
+            items = response.get("items", [])
+            if not items:
+                return {self.memory_key: ""}
+            return {self.memory_key: self.format_history(items)}
+        except Exception:
+            return {self.memory_key: ""}
+
+    def _history_window(self, max_tokens: int) -> HistoryWindow:
+        window = self._histories.get(self.session_id)
+        if window is None or window.max_tokens != max_tokens:
+            window = HistoryWindow(
+                max_tokens=max_tokens,
+                format_item=lambda item: self.format_history([item]),
+                token_counter=self.token_counter,
+                separator=_HISTORY_SEPARATOR,
+            )
+            self._histories[self.session_id] = window
+        return window
+
+    def _budgeted_history(self, query: str, max_tokens: int) -> str:
+        """予算モードの履歴。検索は期限切れ時のみ、それ以外は新着の観察だけを取り込む。"""
+        window = self._history_window(max_tokens)
+        try:
+            if window.needs_search(self.history_refresh_sec):
+                head = self._client.feed(project=self.project, limit=1).get("items") or []
+                items = self._client.search(query=query, project=self.project, limit=self.search_limit).get("items") or []
+                window.replace(items)
+                _advance_feed_head(window, head, merge=False)
+            else:
+                page = self._client.feed(project=self.project, limit=_FEED_PAGE_SIZE).get("items") or []
+                _advance_feed_head(window, page, merge=True)
+        except Exception:
+            pass  # 取得に失敗しても手元の候補で組み立てる
+        return window.render(query)
+
+    async def _abudgeted_history(self, query: str, max_tokens: int) -> str:
+        window = self._history_window(max_tokens)
+        try:
+            if window.needs_search(self.history_refresh_sec):
+                head = (await self._async_client.feed(project=self.project, limit=1)).get("items") or []
+                response = await self._async_client.search(query=query, project=self.project, limit=self.search_limit)
+                window.replace(response.get("items") or [])
+                _advance_feed_head(window, head, merge=False)
+            else:
+                page = (await self._async_client.feed(project=self.project, limit=_FEED_PAGE_SIZE)).get("items") or []
+                _advance_feed_head(window, page, merge=True)
+        except Exception:
+            pass
+        return window.render(query)
+
     def clear(self) -> None:
         """
         LangChain BaseMemory.clear: メモリをクリアする。
-        harness-mem はサーバー側で永続管理するため、クライアント側では no-op とする。
+        harness-mem はサーバー側で永続管理するため、クライアント側では
+        予算モードの履歴キャッシュを捨てるのみとする。
         """
-        # no-op: harness-mem はサーバー側で管理される
+        self._histories.pop(self.session_id, None)
+
+    async def aclear(self) -> None:
+        """clear() の非同期版。予算モードの履歴キャッシュを捨てる。"""
+        self.clear()
@@ -0,0 +1,281 @@
+"""Auto-renewing daemon leases for coordinating worker processes.
+
+The daemon's lease API (``/v1/lease/acquire``, ``/renew``, ``/release``) grants
+one agent an exclusive, time-bounded claim on a target string. ``LeaseManager``
+wraps it for background jobs such as ``run_consolidation`` or reindexing:
+
+- ``acquire(target)`` returns a ``Lease`` or ``None`` when another agent holds
+  the target. A ``Lease`` is a context manager that releases it on exit.
+- Held leases are renewed on one background thread every
+  ``ttl_ms * renew_fraction``. Transport errors are retried until the lease's
+  local deadline; ``not_owner`` / ``expired`` / ``not_found`` mark it lost at
+  once and call ``on_lost``.
+- Fencing: the local deadline is measured from *before* each acquire / renew
+  request was sent, so it never outlives the daemon's. ``Lease.check()``
+  raises ``HarnessMemLeaseLostError`` once the lease was lost or that deadline
+  passed (for example after a long GC pause), so a stale holder stops before
+  its next side effect even if the renewal thread has not noticed yet.
+- ``claim(targets)`` lets N worker processes partition a shared job list:
+  every worker walks the same list from a different starting offset and only
+  yields the targets it could lease. ``Lease.finish(cooldown_ms)`` ends a job
+  without releasing its target, so workers that reach it later in the same
+  cycle skip it instead of running it again.
+
+::
+
+    with LeaseManager(client, project="my-project", ttl_ms=30_000) as leases:
+        for lease in leases.claim(["consolidation:my-project", "reindex:my-project"]):
+            with lease:
+                lease.check()
+                run_job(lease.target)
+                lease.finish(cooldown_ms=300_000)
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+import zlib
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from .errors import HarnessMemAPIError, HarnessMemError, HarnessMemLeaseLostError
+
+_logger = logging.getLogger("harness_mem")
+
+# Renew / release errors meaning the daemon no longer considers us the holder.
+_LOST_ERRORS = frozenset({"not_found", "not_owner", "expired"})
+
+
+def default_agent_id() -> str:
+    """``host:pid:random`` — unique per process, readable in ``heldBy``."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class Lease:
+    """One held lease. Use as a context manager or call ``release()``."""
+
+    def __init__(self, manager: "LeaseManager", target: str, lease_id: str, ttl_ms: int, sent_at: float) -> None:
+        self._manager = manager
+        self.target = target
+        self.lease_id = lease_id
+        self.ttl_ms = ttl_ms
+        self.renewals = 0
+        self.lost_reason: Optional[str] = None
+        self._deadline = sent_at + ttl_ms / 1000.0
+        self._next_renewal = sent_at + ttl_ms * manager.renew_fraction / 1000.0
+
+    @property
+    def agent_id(self) -> str:
+        return self._manager.agent_id
+
+    @property
+    def valid(self) -> bool:
+        return self.lost_reason is None and time.monotonic() < self._deadline
+
+    def remaining_sec(self) -> float:
+        """Seconds until the local deadline (0 once lost)."""
+        return max(self._deadline - time.monotonic(), 0.0) if self.lost_reason is None else 0.0
+
+    def check(self) -> None:
+        """Raise ``HarnessMemLeaseLostError`` unless the lease is still safely held."""
+        if self.lost_reason is not None:
+            raise HarnessMemLeaseLostError(target=self.target, lease_id=self.lease_id, reason=self.lost_reason)
+        if time.monotonic() >= self._deadline:
+            raise HarnessMemLeaseLostError(target=self.target, lease_id=self.lease_id, reason="deadline")
+
+    def release(self) -> None:
+        self._manager._release(self)
+
+    def finish(self, cooldown_ms: int) -> None:
+        """Stop renewing and keep the target leased for ``cooldown_ms`` more, then let it expire."""
+        self._manager._finish(self, cooldown_ms)
+
+    def __enter__(self) -> "Lease":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.release()
+
+    def __repr__(self) -> str:
+        return f"Lease(target={self.target!r}, lease_id={self.lease_id!r}, valid={self.valid})"
+
+
+class LeaseManager:
+    """Acquires, renews and releases daemon leases for one agent."""
+
+    def __init__(
+        self,
+        client: Any,
+        *,
+        agent_id: Optional[str] = None,
+        project: Optional[str] = None,
+        ttl_ms: int = 30_000,
+        renew_fraction: float = 1 / 3,
+        on_lost: Optional[Callable[[Lease], Any]] = None,
+    ) -> None:
+        if ttl_ms < 1:
+            raise ValueError("ttl_ms must be >= 1")
+        if not 0 < renew_fraction < 1:
+            raise ValueError("renew_fraction must be between 0 and 1")
+        self.client = client
+        self.agent_id = agent_id or default_agent_id()
+        self.project = project
+        self.ttl_ms = ttl_ms
+        self.renew_fraction = renew_fraction
+        self.on_lost = on_lost
+        self._cond = threading.Condition()
+        self._leases: Dict[str, Lease] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def acquire(
+        self, target: str, *, ttl_ms: Optional[int] = None, metadata: Optional[Dict[str, Any]] = None
+    ) -> Optional[Lease]:
+        """Lease ``target``; ``None`` when another agent holds it."""
+        if self._closed:
+            raise RuntimeError("LeaseManager is closed")
+        sent_at = time.monotonic()
+        try:
+            response = self.client.acquire_lease(
+                target=target,
+                agent_id=self.agent_id,
+                project=self.project,
+                ttl_ms=ttl_ms or self.ttl_ms,
+                metadata=metadata,
+            )
+        except HarnessMemAPIError as exc:
+            if exc.message == "already_leased":
+                return None
+            raise
+        row = response.get("lease") or {}
+        lease = Lease(self, target, str(row.get("leaseId")), int(row.get("ttlMs") or ttl_ms or self.ttl_ms), sent_at)
+        with self._cond:
+            self._leases[lease.lease_id] = lease
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="harness-mem-lease-renewer", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+            self._cond.notify_all()
+        return lease
+
+    def claim(self, targets: Iterable[str], **acquire_kwargs: Any) -> Iterator[Lease]:
+        """Yield a lease for every target in ``targets`` no other agent holds.
+
+        Each agent starts at a different offset (derived from ``agent_id``) so
+        workers sharing one job list spread out instead of racing for the first
+        entry. Targets are tried lazily, one per iteration.
+        """
+        targets = list(dict.fromkeys(targets))
+        if not targets:
+            return
+        offset = zlib.crc32(self.agent_id.encode("utf-8")) % len(targets)
+        for target in targets[offset:] + targets[:offset]:
+            lease = self.acquire(target, **acquire_kwargs)
+            if lease is not None:
+                yield lease
+
+    def held(self) -> List[Lease]:
+        with self._cond:
+            return list(self._leases.values())
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if self._closed:
+                    return
+                now = time.monotonic()
+                due = [lease for lease in self._leases.values() if lease._next_renewal <= now]
+                if not due:
+                    wake = min((lease._next_renewal for lease in self._leases.values()), default=None)
+                    self._cond.wait(None if wake is None else wake - now)
+                    continue
+            for lease in due:
+                self._renew(lease)
+
+    def _renew(self, lease: Lease) -> None:
+        sent_at = time.monotonic()
+        if sent_at >= lease._deadline:
+            self._mark_lost(lease, "expired")
+            return
+        try:
+            response = self.client.renew_lease(lease_id=lease.lease_id, agent_id=self.agent_id, ttl_ms=lease.ttl_ms)
+        except HarnessMemAPIError as exc:
+            if exc.message in _LOST_ERRORS:
+                self._mark_lost(lease, exc.message)
+                return
+            self._retry_later(lease, exc)
+            return
+        except HarnessMemError as exc:
+            self._retry_later(lease, exc)
+            return
+        ttl_ms = int((response.get("lease") or {}).get("ttlMs") or lease.ttl_ms)
+        with self._cond:
+            if lease.lease_id not in self._leases:
+                return
+            lease.ttl_ms = ttl_ms
+            lease.renewals += 1
+            lease._deadline = sent_at + ttl_ms / 1000.0
+            lease._next_renewal = sent_at + ttl_ms * self.renew_fraction / 1000.0
+
+    def _retry_later(self, lease: Lease, exc: Exception) -> None:
+        remaining = lease._deadline - time.monotonic()
+        _logger.warning("harness-mem lease renewal for %s failed (%.1fs left): %s", lease.target, remaining, exc)
+        with self._cond:
+            lease._next_renewal = time.monotonic() + max(min(remaining / 2, lease.ttl_ms * self.renew_fraction / 1000.0), 0.05)
+
+    def _mark_lost(self, lease: Lease, reason: str) -> None:
+        with self._cond:
+            if self._leases.pop(lease.lease_id, None) is None:
+                return
+            lease.lost_reason = reason
+        _logger.warning("harness-mem lease on %s lost: %s", lease.target, reason)
+        if self.on_lost is not None:
+            try:
+                self.on_lost(lease)
+            except Exception:
+                _logger.exception("harness-mem lease on_lost callback failed")
+
+    def _release(self, lease: Lease) -> None:
+        with self._cond:
+            if self._leases.pop(lease.lease_id, None) is None:
+                return
+            lease.lost_reason = "released"
+        try:
+            self.client.release_lease(lease_id=lease.lease_id, agent_id=self.agent_id)
+        except HarnessMemAPIError:
+            pass  # Already expired or taken over: nothing left to release.
+        except HarnessMemError as exc:
+            _logger.warning("harness-mem lease release for %s failed; it expires after its TTL: %s", lease.target, exc)
+
+    def _finish(self, lease: Lease, cooldown_ms: int) -> None:
+        with self._cond:
+            if self._leases.pop(lease.lease_id, None) is None:
+                return
+            lease.lost_reason = "finished"
+        try:
+            self.client.renew_lease(lease_id=lease.lease_id, agent_id=self.agent_id, ttl_ms=cooldown_ms)
+        except HarnessMemError as exc:
+            _logger.warning("harness-mem lease cooldown for %s failed; it expires after its TTL: %s", lease.target, exc)
+
+    def close(self) -> None:
+        """Release every held lease and stop the renewal thread."""
+        for lease in self.held():
+            lease.release()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        atexit.unregister(self.close)
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=5)
+
+    def __enter__(self) -> "LeaseManager":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
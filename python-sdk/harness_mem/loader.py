@@ -0,0 +1,136 @@
+"""DataLoader-style batching for ``get_observations``.
+
+Expansion code paths (timeline neighbours, follow-ups to search hits) tend to
+ask for one or two observation ids at a time. ``ObservationLoader`` collects
+the ``load(id)`` calls made from any thread within a short window and sends a
+single deduplicated ``/v1/observations/get`` per batch, then fans the items
+back out to the callers. Calls with different ``compact`` / ``include_private``
+settings are batched separately, because the server answers them differently.
+
+Example::
+
+    loader = ObservationLoader(client, batch_window_ms=2)
+    item = loader.load("obs_123")                # blocks until the batch returns
+    items = loader.load_many(["obs_1", "obs_2"])  # one request for both
+    item = await loader.aload("obs_456")          # asyncio-friendly
+
+Ids the server does not return resolve to ``None``.
+"""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+_Variant = Tuple[bool, bool]  # (compact, include_private)
+
+
+class ObservationLoader:
+    def __init__(
+        self,
+        client: Any,
+        *,
+        max_batch_size: int = 100,
+        batch_window_ms: float = 2.0,
+        compact: bool = True,
+        include_private: bool = False,
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        self.client = client
+        self.max_batch_size = max_batch_size
+        self.batch_window_sec = max(batch_window_ms, 0.0) / 1000.0
+        self.compact = compact
+        self.include_private = include_private
+        self._lock = threading.Lock()
+        self._pending: Dict[_Variant, Dict[str, List[Future]]] = {}
+        self._timers: Dict[_Variant, threading.Timer] = {}
+        self.batches_sent = 0
+        self.ids_requested = 0
+        self.loads = 0
+
+    def load_future(
+        self, observation_id: str, *, compact: Optional[bool] = None, include_private: Optional[bool] = None
+    ) -> "Future[Optional[Dict[str, Any]]]":
+        """Queue ``observation_id`` and return a Future for its item."""
+        if not isinstance(observation_id, str) or not observation_id.strip():
+            raise ValueError("observation_id must be a non-empty string")
+        variant = (
+            self.compact if compact is None else compact,
+            self.include_private if include_private is None else include_private,
+        )
+        future: "Future[Optional[Dict[str, Any]]]" = Future()
+        ready: Optional[Dict[str, List[Future]]] = None
+        with self._lock:
+            self.loads += 1
+            batch = self._pending.setdefault(variant, {})
+            batch.setdefault(observation_id, []).append(future)
+            if len(batch) >= self.max_batch_size:
+                ready = self._take_locked(variant)
+            elif variant not in self._timers:
+                timer = threading.Timer(self.batch_window_sec, self._dispatch_variant, args=(variant,))
+                timer.daemon = True
+                self._timers[variant] = timer
+                timer.start()
+        if ready:
+            self._send(variant, ready)
+        return future
+
+    def load(self, observation_id: str, **variant: Any) -> Optional[Dict[str, Any]]:
+        return self.load_future(observation_id, **variant).result()
+
+    def load_many(self, observation_ids: Iterable[str], **variant: Any) -> List[Optional[Dict[str, Any]]]:
+        futures = [self.load_future(observation_id, **variant) for observation_id in observation_ids]
+        return [future.result() for future in futures]
+
+    async def aload(self, observation_id: str, **variant: Any) -> Optional[Dict[str, Any]]:
+        import asyncio
+
+        return await asyncio.wrap_future(self.load_future(observation_id, **variant))
+
+    def dispatch(self) -> None:
+        """Send every pending batch now instead of waiting for the window."""
+        with self._lock:
+            variants = list(self._pending)
+        for variant in variants:
+            self._dispatch_variant(variant)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"loads": self.loads, "ids_requested": self.ids_requested, "batches_sent": self.batches_sent}
+
+    def _take_locked(self, variant: _Variant) -> Dict[str, List[Future]]:
+        timer = self._timers.pop(variant, None)
+        if timer is not None:
+            timer.cancel()
+        return self._pending.pop(variant, {})
+
+    def _dispatch_variant(self, variant: _Variant) -> None:
+        with self._lock:
+            batch = self._take_locked(variant)
+        if batch:
+            self._send(variant, batch)
+
+    def _send(self, variant: _Variant, batch: Dict[str, List[Future]]) -> None:
+        compact, include_private = variant
+        ids = list(batch)
+        with self._lock:
+            self.batches_sent += 1
+            self.ids_requested += len(ids)
+        try:
+            response = self.client.get_observations(ids=ids, include_private=include_private, compact=compact)
+        except BaseException as exc:
+            for futures in batch.values():
+                for future in futures:
+                    future.set_exception(exc)
+            return
+        by_id: Dict[str, Any] = {}
+        for item in response.get("items") or []:
+            item_id = item.get("id") if hasattr(item, "get") else None
+            if isinstance(item_id, str):
+                by_id[item_id] = item
+        for observation_id, futures in batch.items():
+            item = by_id.get(observation_id)
+            for future in futures:
+                future.set_result(item)
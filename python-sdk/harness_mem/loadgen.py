@@ -0,0 +1,414 @@
+"""Replay recorded harness-mem traffic and report latency percentiles.
+
+A trace is a JSONL file with one request per line::
+
+    {"ts": 1760000000.125, "method": "POST", "path": "/v1/search", "body": {"query": "wal", "limit": 5}}
+
+Capture one from a running agent with ``TraceRecorder`` (a client hook) or by
+setting ``HARNESS_MEM_TRACE_FILE`` for the Hermes memory provider, then replay
+it against a daemon (or the ``harness_mem.testing`` fake server)::
+
+    python -m harness_mem.loadgen trace.jsonl --base-url http://127.0.0.1:37888 --qps 200 --duration 60
+    python -m harness_mem.loadgen trace.jsonl --arrival poisson --qps 500 --concurrency 128 --json
+    python -m harness_mem.loadgen trace.jsonl --arrival trace --speed 4   # recorded timing, 4x faster
+    python -m harness_mem.loadgen trace.jsonl --fake --qps 300            # in-process fake server
+
+Arrival is open-loop: requests are scheduled on a clock (fixed interval,
+Poisson, or the recorded timestamps) regardless of how fast earlier requests
+complete. Latency is measured from the scheduled send time, so queueing behind
+a saturated client pool shows up in the percentiles instead of silently
+lowering the offered load. Requests run on ``--concurrency`` worker threads,
+each with its own ``HarnessMemClient``, driven from an asyncio scheduler.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from .client import HarnessMemClient
+from .instrumentation import DEFAULT_PERCENTILES, ClientHooks, LatencyHistogram, RequestEvent, error_kind
+
+# Trace paths and the SDK operation each one corresponds to.
+OPERATIONS: Dict[str, str] = {
+    "/v1/search": "search",
+    "/v1/events/record": "record_event",
+    "/v1/resume-pack": "resume_pack",
+    "/v1/timeline": "timeline",
+    "/v1/observations/get": "get_observations",
+}
+ARRIVALS = ("constant", "poisson", "trace")
+
+
+@dataclass
+class TraceEntry:
+    offset_sec: float
+    method: str
+    path: str
+    body: Optional[Dict[str, Any]] = None
+    query: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def operation(self) -> str:
+        return OPERATIONS.get(self.path, f"{self.method} {self.path}")
+
+
+# Body fields whose strings are masked in traces unless ``raw=True``: turn text and search queries.
+REDACTED_KEYS = frozenset({"content", "payload", "query"})
+
+
+def _mask(value: Any) -> Any:
+    """Same-shape copy of ``value`` with every string replaced by ``x`` of equal length."""
+    if isinstance(value, str):
+        return "x" * len(value)
+    if isinstance(value, dict):
+        return {key: _mask(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_mask(item) for item in value]
+    return value
+
+
+def _redact_body(value: Any) -> Any:
+    """Copy of a request body with the strings under ``REDACTED_KEYS`` masked."""
+    if isinstance(value, dict):
+        return {key: _mask(item) if key in REDACTED_KEYS else _redact_body(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_redact_body(item) for item in value]
+    return value
+
+
+class TraceRecorder(ClientHooks):
+    """Client hook that appends replayable requests to a JSONL trace.
+
+    Only first attempts are written (retries are the client's business, not
+    offered load), and only requests to ``paths`` (default: the five
+    replayable SDK operations in ``OPERATIONS``). Strings under
+    ``REDACTED_KEYS`` are masked so the trace keeps body sizes but no memory
+    content; ``raw=True`` records bodies verbatim.
+    """
+
+    def __init__(self, path_or_file: Any, *, paths: Optional[Iterable[str]] = None, raw: bool = False) -> None:
+        if hasattr(path_or_file, "write"):
+            self._file: IO[str] = path_or_file
+            self._owns_file = False
+        else:
+            self._file = open(path_or_file, "a", encoding="utf-8")
+            self._owns_file = True
+        self.paths = frozenset(paths) if paths is not None else frozenset(OPERATIONS)
+        self.raw = raw
+        self._lock = threading.Lock()
+        self.recorded = 0
+
+    def on_request_start(self, event: RequestEvent) -> None:
+        if event.attempt or event.endpoint not in self.paths:
+            return
+        parts = urlsplit(event.url)
+        line: Dict[str, Any] = {"ts": round(time.time(), 6), "method": event.method, "path": parts.path}
+        if parts.query:
+            line["query"] = dict(parse_qsl(parts.query))
+        if event.request_body:
+            body = json.loads(event.request_body)
+            line["body"] = body if self.raw else _redact_body(body)
+        encoded = json.dumps(line, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._file.write(encoded + "\n")
+            self.recorded += 1
+
+    def flush(self) -> None:
+        with self._lock:
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.flush()
+            if self._owns_file:
+                self._file.close()
+
+
+def load_trace(path: str, *, operations: Optional[Iterable[str]] = None) -> List[TraceEntry]:
+    """Read a JSONL trace; offsets are relative to the first kept entry."""
+    wanted = set(operations) if operations is not None else None
+    rows: List[Tuple[float, TraceEntry]] = []
+    with open(path, "r", encoding="utf-8") as handle:
+        for line_no, line in enumerate(handle, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+                method = str(record.get("method") or "POST").upper()
+                parts = urlsplit(str(record["path"]))
+            except (ValueError, KeyError, AttributeError) as exc:
+                raise ValueError(f"{path}:{line_no}: invalid trace line: {exc}") from exc
+            query = {str(key): str(value) for key, value in (record.get("query") or {}).items()}
+            query.update(parse_qsl(parts.query))
+            body = record.get("body")
+            entry = TraceEntry(0.0, method, parts.path, body if isinstance(body, dict) else None, query)
+            if wanted is not None and entry.operation not in wanted and entry.path not in wanted:
+                continue
+            rows.append((float(record.get("ts") or 0.0), entry))
+    if not rows:
+        return []
+    first = rows[0][0]
+    for ts, entry in rows:
+        entry.offset_sec = max(ts - first, 0.0)
+    return [entry for _, entry in rows]
+
+
+def schedule(
+    entries: Sequence[TraceEntry],
+    *,
+    arrival: str = "constant",
+    qps: Optional[float] = None,
+    duration_sec: Optional[float] = None,
+    speed: float = 1.0,
+    seed: Optional[int] = None,
+) -> Iterator[Tuple[float, TraceEntry]]:
+    """Yield ``(send_offset_sec, entry)`` pairs in send order.
+
+    Without ``duration_sec`` the trace is replayed once; with it, entries are
+    cycled until the duration is reached.
+    """
+    if not entries:
+        return
+    if arrival not in ARRIVALS:
+        raise ValueError(f"arrival must be one of {', '.join(ARRIVALS)}")
+    if arrival == "trace":
+        span = entries[-1].offset_sec + (1.0 / qps if qps else 0.001)
+        loop = 0
+        while True:
+            for entry in entries:
+                offset = (loop * span + entry.offset_sec) / speed
+                if duration_sec is not None and offset >= duration_sec:
+                    return
+                yield offset, entry
+            loop += 1
+            if duration_sec is None:
+                return
+    if not qps or qps <= 0:
+        raise ValueError("qps must be > 0 for constant and poisson arrival")
+    rng = random.Random(seed)
+    offset = 0.0
+    index = 0
+    while True:
+        if duration_sec is None and index >= len(entries):
+            return
+        if duration_sec is not None and offset >= duration_sec:
+            return
+        yield offset, entries[index % len(entries)]
+        index += 1
+        offset += rng.expovariate(qps) if arrival == "poisson" else 1.0 / qps
+
+
+@dataclass
+class OperationStats:
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    requests: int = 0
+    errors: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def error_count(self) -> int:
+        return sum(self.errors.values())
+
+
+@dataclass
+class LoadReport:
+    elapsed_sec: float = 0.0
+    scheduled: int = 0
+    dropped: int = 0
+    max_lag_ms: float = 0.0
+    operations: Dict[str, OperationStats] = field(default_factory=dict)
+
+    def record(self, operation: str, latency_ms: float, error: Optional[BaseException]) -> None:
+        stats = self.operations.setdefault(operation, OperationStats())
+        stats.requests += 1
+        stats.latency.record(latency_ms)
+        if error is not None:
+            kind = error_kind(error)
+            stats.errors[kind] = stats.errors.get(kind, 0) + 1
+
+    def to_dict(self, percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[str, Any]:
+        elapsed = self.elapsed_sec or 1e-9
+        total = LatencyHistogram()
+        operations: Dict[str, Any] = {}
+        for name, stats in sorted(self.operations.items()):
+            total.merge(stats.latency)
+            operations[name] = {
+                "requests": stats.requests,
+                "throughput_rps": stats.requests / elapsed,
+                "errors": dict(stats.errors),
+                "error_rate": stats.error_count / stats.requests if stats.requests else 0.0,
+                "latency_ms": stats.latency.summary(percentiles),
+            }
+        requests = sum(stats.requests for stats in self.operations.values())
+        errors = sum(stats.error_count for stats in self.operations.values())
+        return {
+            "elapsed_sec": self.elapsed_sec,
+            "scheduled": self.scheduled,
+            "completed": requests,
+            "dropped": self.dropped,
+            "max_scheduler_lag_ms": self.max_lag_ms,
+            "throughput_rps": requests / elapsed,
+            "error_rate": errors / requests if requests else 0.0,
+            "latency_ms": total.summary(percentiles),
+            "operations": operations,
+        }
+
+    def format_table(self) -> str:
+        data = self.to_dict()
+        header = f"{'operation':<20}{'requests':>10}{'rps':>10}{'errors':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'p999':>9}"
+        lines = [header]
+        rows = list(data["operations"].items()) + [("TOTAL", {**data, "requests": data["completed"]})]
+        for name, row in rows:
+            latency = row["latency_ms"]
+            lines.append(
+                f"{name:<20}{row['requests']:>10}{row['throughput_rps']:>10.1f}{row['error_rate']:>8.2%}"
+                f"{latency['p50']:>9.2f}{latency['p95']:>9.2f}{latency['p99']:>9.2f}{latency['p999']:>9.2f}"
+            )
+        lines.append(
+            f"elapsed {data['elapsed_sec']:.2f}s, scheduled {data['scheduled']}, dropped {data['dropped']}, "
+            f"latencies in ms from scheduled send time"
+        )
+        return "\n".join(lines)
+
+
+async def replay(
+    entries: Sequence[TraceEntry],
+    *,
+    base_url: str,
+    token: Optional[str] = None,
+    arrival: str = "constant",
+    qps: Optional[float] = None,
+    duration_sec: Optional[float] = None,
+    speed: float = 1.0,
+    concurrency: int = 32,
+    max_backlog: int = 10_000,
+    timeout_sec: float = 8.0,
+    seed: Optional[int] = None,
+) -> LoadReport:
+    """Replay ``entries`` open-loop and return per-operation statistics.
+
+    Requests that would push the number of scheduled-but-unfinished requests
+    above ``max_backlog`` are counted as ``dropped`` instead of being sent.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be >= 1")
+    report = LoadReport()
+    local = threading.local()
+    lock = threading.Lock()
+    pending = 0
+
+    def _client() -> HarnessMemClient:
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = HarnessMemClient(base_url=base_url, token=token, timeout_sec=timeout_sec)
+        return client
+
+    def _send(entry: TraceEntry, scheduled_at: float) -> None:
+        nonlocal pending
+        error: Optional[BaseException] = None
+        try:
+            _client()._request(entry.method, entry.path, entry.body, query=entry.query or None)
+        except Exception as exc:  # recorded per operation; one bad response must not abort the replay
+            error = exc
+        finally:
+            latency_ms = (time.perf_counter() - scheduled_at) * 1000.0
+            with lock:
+                pending -= 1
+                report.record(entry.operation, latency_ms, error)
+
+    loop = asyncio.get_running_loop()
+    in_flight: set = set()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="harness-mem-load") as executor:
+        started = time.perf_counter()
+        for offset, entry in schedule(
+            entries, arrival=arrival, qps=qps, duration_sec=duration_sec, speed=speed, seed=seed
+        ):
+            scheduled_at = started + offset
+            delay = scheduled_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                report.max_lag_ms = max(report.max_lag_ms, -delay * 1000.0)
+            report.scheduled += 1
+            with lock:
+                if pending >= max_backlog:
+                    report.dropped += 1
+                    continue
+                pending += 1
+            future = loop.run_in_executor(executor, _send, entry, scheduled_at)
+            in_flight.add(future)
+            future.add_done_callback(in_flight.discard)
+        if in_flight:
+            await asyncio.gather(*in_flight)
+        report.elapsed_sec = time.perf_counter() - started
+    return report
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m harness_mem.loadgen", description=__doc__.splitlines()[0])
+    parser.add_argument("trace", help="JSONL trace file")
+    parser.add_argument("--base-url", default="http://127.0.0.1:37888")
+    parser.add_argument("--token", default=None)
+    parser.add_argument("--fake", action="store_true", help="replay against an in-process fake server")
+    parser.add_argument("--arrival", choices=ARRIVALS, default="constant")
+    parser.add_argument("--qps", type=float, default=None, help="target requests per second")
+    parser.add_argument("--duration", type=float, default=None, help="seconds to run (default: one pass over the trace)")
+    parser.add_argument("--speed", type=float, default=1.0, help="time compression for --arrival trace")
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent clients / worker threads")
+    parser.add_argument("--max-backlog", type=int, default=10_000)
+    parser.add_argument("--timeout", type=float, default=8.0)
+    parser.add_argument("--operations", default=",".join(OPERATIONS.values()), help="comma-separated operations to replay")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    operations = [name.strip() for name in args.operations.split(",") if name.strip()]
+    entries = load_trace(args.trace, operations=operations)
+    if not entries:
+        print(f"no replayable requests in {args.trace}", file=sys.stderr)
+        return 1
+    if args.arrival != "trace" and args.qps is None:
+        parser.error("--qps is required unless --arrival trace")
+
+    fake = None
+    base_url = args.base_url
+    if args.fake:
+        from .testing import FakeHarnessMemServer
+
+        fake = FakeHarnessMemServer(token=args.token).start()
+        base_url = fake.base_url
+    try:
+        report = asyncio.run(
+            replay(
+                entries,
+                base_url=base_url,
+                token=args.token,
+                arrival=args.arrival,
+                qps=args.qps,
+                duration_sec=args.duration,
+                speed=args.speed,
+                concurrency=args.concurrency,
+                max_backlog=args.max_backlog,
+                timeout_sec=args.timeout,
+                seed=args.seed,
+            )
+        )
+    finally:
+        if fake is not None:
+            fake.stop()
+    print(json.dumps(report.to_dict(), indent=2) if args.json else report.format_table())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
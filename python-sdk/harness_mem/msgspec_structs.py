@@ -0,0 +1,112 @@
+"""msgspec Struct types for ``MsgspecCodec(typed=True)`` and lazy rows.
+
+Kept out of ``codec`` and ``rows`` so that msgspec is imported, and the
+Structs built, only when a typed codec or ``result_mode="lazy"`` is used.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Union
+
+import msgspec as _msgspec
+
+from .types import GetObservationsResponse, SearchResponse
+
+# msgspec Struct mirrors of the observation TypedDicts. Every field defaults
+# to UNSET so an absent key behaves like a missing key in a total=False dict.
+_UNSET = _msgspec.UNSET
+_UnsetType = _msgspec.UnsetType
+
+
+class _MappingAccess:
+    __slots__ = ()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key not in self.__struct_fields__:  # type: ignore[attr-defined]
+            return default
+        value = getattr(self, key)
+        return default if value is _UNSET else value
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key, _UNSET)
+        if value is _UNSET:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self.get(key, _UNSET) is not _UNSET
+
+    def keys(self) -> List[str]:
+        return [key for key in self.__struct_fields__ if getattr(self, key) is not _UNSET]  # type: ignore[attr-defined]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return _msgspec.to_builtins(self)
+
+
+class ObservationStruct(_msgspec.Struct, _MappingAccess, kw_only=True, omit_defaults=True):
+    id: Union[str, _UnsetType] = _UNSET
+    event_id: Union[str, None, _UnsetType] = _UNSET
+    platform: Union[str, None, _UnsetType] = _UNSET
+    project: Union[str, None, _UnsetType] = _UNSET
+    session_id: Union[str, None, _UnsetType] = _UNSET
+    title: Union[str, None, _UnsetType] = _UNSET
+    content: Union[str, None, _UnsetType] = _UNSET
+    created_at: Union[str, None, _UnsetType] = _UNSET
+    updated_at: Union[str, None, _UnsetType] = _UNSET
+    tags: Union[List[str], _UnsetType] = _UNSET
+    privacy_tags: Union[List[str], _UnsetType] = _UNSET
+    similarity: Union[float, None, _UnsetType] = _UNSET
+    recency: Union[float, None, _UnsetType] = _UNSET
+    hybrid_score: Union[float, None, _UnsetType] = _UNSET
+    rerank_score: Union[float, None, _UnsetType] = _UNSET
+    # Further fields of /v1/search and /v1/observations/get items. A field
+    # missing here would be silently dropped in typed mode.
+    evidence_id: Any = _UNSET
+    event_type: Any = _UNSET
+    observation_type: Any = _UNSET
+    memory_type: Any = _UNSET
+    raw_text: Any = _UNSET
+    event_time: Any = _UNSET
+    observed_at: Any = _UNSET
+    valid_from: Any = _UNSET
+    valid_to: Any = _UNSET
+    supersedes: Any = _UNSET
+    invalidated_at: Any = _UNSET
+    temporal_state: Any = _UNSET
+    temporal_anchor: Any = _UNSET
+    temporal_anchor_kind: Any = _UNSET
+    metadata: Any = _UNSET
+    decay_tier: Any = _UNSET
+    access_count: Any = _UNSET
+    reason: Any = _UNSET
+    shared_by: Any = _UNSET
+    shared_at: Any = _UNSET
+    scores: Any = _UNSET
+    recall_trace: Any = _UNSET
+    type: Any = _UNSET
+    summary: Any = _UNSET
+
+
+class SearchResponseStruct(_msgspec.Struct, _MappingAccess, kw_only=True, omit_defaults=True):
+    ok: Union[bool, _UnsetType] = _UNSET
+    source: Union[str, _UnsetType] = _UNSET
+    items: Union[List[ObservationStruct], _UnsetType] = _UNSET
+    meta: Union[Dict[str, Any], _UnsetType] = _UNSET  # open-ended; kept as a dict
+    error: Union[str, _UnsetType] = _UNSET
+
+
+# Only endpoints whose item shape is fully declared above are decoded typed.
+STRUCT_TYPES: Dict[type, type] = {
+    SearchResponse: SearchResponseStruct,
+    GetObservationsResponse: SearchResponseStruct,
+}
+
+
+class LazyEnvelope(_msgspec.Struct, kw_only=True):
+    """Response envelope whose ``items`` stay raw JSON slices (``result_mode="lazy"``)."""
+
+    ok: Union[bool, _UnsetType] = _UNSET
+    source: Union[str, _UnsetType] = _UNSET
+    items: Union[List[_msgspec.Raw], _UnsetType] = _UNSET
+    meta: Union[Dict[str, Any], _UnsetType] = _UNSET
+    error: Union[str, _UnsetType] = _UNSET
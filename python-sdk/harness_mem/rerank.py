@@ -0,0 +1,141 @@
+"""Client-side re-ranking of observation candidates.
+
+The server already returns ``similarity``, ``recency``, ``hybrid_score`` and
+``rerank_score`` for every hit. ``WeightedReranker`` blends those scores with
+per-tag boosts over the whole candidate batch at once (NumPy when installed,
+plain ``array`` loops otherwise), optionally drops duplicates, and keeps the
+top ``limit`` items.
+
+Use it through ``HarnessMemClient.search(..., reranker=...)``, which
+over-fetches ``reranker.overfetch * limit`` candidates, or call ``rerank``
+directly on items from any source::
+
+    reranker = WeightedReranker(
+        weights={"hybrid_score": 0.6, "recency": 0.4},
+        tag_boosts={"decision": 0.2, "backfill": -0.3},
+    )
+    top = client.search(query="sqlite wal", limit=5, reranker=reranker)["items"]
+"""
+
+from __future__ import annotations
+
+import math
+from itertools import chain
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, List, Optional, Protocol, Sequence
+
+from .columns import SCORE_FIELDS, to_columns
+
+_UNLOADED: Any = object()
+_np: Any = _UNLOADED  # optional: vectorized scoring; imported on first use, None when missing
+
+
+def _numpy() -> Any:
+    global _np
+    if _np is _UNLOADED:
+        try:
+            import numpy
+        except ImportError:  # pragma: no cover - depends on environment
+            numpy = None
+        _np = numpy
+    return _np
+
+
+class Reranker(Protocol):
+    overfetch: int
+
+    def rerank(self, items: Sequence[Any], *, limit: int) -> List[Any]:
+        ...
+
+
+def content_signature(item: Any) -> str:
+    """Dedupe key matching items whose title and content are identical."""
+    title = str(item.get("title") or "").strip()
+    content = str(item.get("content") or "").strip()
+    return " | ".join(part for part in (title, content) if part)
+
+
+@dataclass
+class WeightedReranker:
+    """Weighted blend of server scores plus additive tag boosts.
+
+    ``weights`` maps score fields to coefficients; a missing score counts as
+    ``missing_score``. ``tag_boosts`` adds a fixed amount for every matching tag
+    (negative values demote). Ties keep the server's order. ``dedupe_by`` keeps
+    only the best-scoring item per key.
+    """
+
+    weights: Dict[str, float] = field(default_factory=lambda: {"hybrid_score": 1.0})
+    tag_boosts: Dict[str, float] = field(default_factory=dict)
+    missing_score: float = 0.0
+    overfetch: int = 3
+    dedupe_by: Optional[Callable[[Any], Hashable]] = None
+
+    def __post_init__(self) -> None:
+        unknown = set(self.weights) - set(SCORE_FIELDS)
+        if unknown:
+            raise ValueError(f"unknown score fields: {', '.join(sorted(unknown))}")
+        if self.overfetch < 1:
+            raise ValueError("overfetch must be >= 1")
+        self.tag_boosts = {str(tag).strip().lower(): boost for tag, boost in self.tag_boosts.items()}
+
+    def scores(self, items: Sequence[Any]) -> List[float]:
+        """Blend score for every item, in input order."""
+        columns = to_columns(items)
+        if not len(columns):
+            return []
+        np = _numpy()
+        if np is not None:
+            return self._scores_numpy(np, columns).tolist()
+        return self._scores_python(columns)
+
+    def _scores_numpy(self, np: Any, columns: Any) -> Any:
+        total = np.zeros(len(columns), dtype=np.float64)
+        for name, weight in self.weights.items():
+            values = np.frombuffer(columns.scores[name], dtype=np.float64)
+            total += weight * np.where(np.isnan(values), self.missing_score, values)
+        if self.tag_boosts:
+            total += self._tag_boosts_numpy(np, columns.tags)
+        return total
+
+    def _tag_boosts_numpy(self, np: Any, tags: List[List[str]]) -> Any:
+        # Flatten every tag into one array, look each distinct tag up once and
+        # sum the boosts back per row with bincount.
+        lengths = np.fromiter(map(len, tags), dtype=np.intp, count=len(tags))
+        if not lengths.any():
+            return 0.0
+        flat = np.char.lower(np.array(list(chain.from_iterable(tags)), dtype=np.str_))
+        distinct, inverse = np.unique(flat, return_inverse=True)
+        table = np.array([self.tag_boosts.get(tag, 0.0) for tag in distinct.tolist()], dtype=np.float64)
+        rows = np.repeat(np.arange(len(tags)), lengths)
+        return np.bincount(rows, weights=table[inverse.ravel()], minlength=len(tags))
+
+    def _scores_python(self, columns: Any) -> List[float]:
+        total = [0.0] * len(columns)
+        missing = self.missing_score
+        for name, weight in self.weights.items():
+            for index, value in enumerate(columns.scores[name]):
+                total[index] += weight * (missing if math.isnan(value) else value)
+        if self.tag_boosts:
+            boosts = self.tag_boosts
+            for index, tags in enumerate(columns.tags):
+                total[index] += sum(boosts.get(tag.lower(), 0.0) for tag in tags)
+        return total
+
+    def rerank(self, items: Sequence[Any], *, limit: int) -> List[Any]:
+        candidates = [item for item in items if hasattr(item, "get")]
+        scores = self.scores(candidates)
+        order = sorted(range(len(candidates)), key=lambda index: (-scores[index], index))
+        selected: List[Any] = []
+        seen: set = set()
+        for index in order:
+            item = candidates[index]
+            if self.dedupe_by is not None:
+                key = self.dedupe_by(item)
+                if key in seen:
+                    continue
+                seen.add(key)
+            selected.append(item)
+            if len(selected) >= limit:
+                break
+        return selected
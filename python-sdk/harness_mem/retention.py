@@ -0,0 +1,252 @@
+"""Throttled bulk deletion for retention jobs.
+
+Deleting hundreds of thousands of observations in a tight loop keeps the
+daemon's SQLite writer busy, and interactive users see it as search latency.
+``RetentionExecutor`` streams ids, deletes them through
+``/v1/observations/bulk-delete`` in batches, and paces itself by how searches
+are doing:
+
+- Ids come from ``iter_feed`` (default) or ``iter_export`` with ``filters``,
+  narrowed by an optional ``select(item)`` predicate, or from any iterable
+  passed to ``run(ids)``. They are consumed lazily, one batch at a time.
+- The executor is a client hook that keeps the daemon's ``meta.latency_ms`` of
+  recent ``/v1/search`` calls. ``run`` attaches it to its own client; attach
+  it to other in-process clients that serve users as well. When no search was
+  seen within ``window_sec`` and ``probe_query`` is set, a ``limit=1`` probe
+  search is issued.
+- Batch size and pace follow the median of that latency. Under half of
+  ``target_latency_ms`` (or with no searches at all), the batch grows by
+  ``min_batch_size`` up to ``max_batch_size`` (the daemon caps bulk deletes
+  at 500 ids) and the pause between batches halves. Above the target, the
+  batch halves and the pause doubles, up to ``max_interval_sec``.
+- ``on_progress(report)`` is called after every batch. 429 / 5xx and
+  transport errors are retried with backoff; a batch that still fails is
+  counted in ``report.failed`` and the job moves on. Other errors (such as a
+  missing admin token) stop the job.
+- ``dry_run=True`` deletes nothing and only counts the ids the job would
+  delete (``report.selected``). The daemon's ``forget_plan`` applies its own
+  policy rather than this job's selection, so it is not consulted.
+
+::
+
+    executor = RetentionExecutor(
+        client,
+        project="my-project",
+        filters={"type": "tool_use"},
+        select=lambda item: item["created_at"] < "2025-01-01",
+        target_latency_ms=150,
+        on_progress=lambda r: print(r.deleted, r.batch_size, r.search_latency_ms),
+    )
+    report = executor.run()
+
+Deletes are the daemon's soft delete (archived, tagged ``deleted``). Hard
+purge stays a separate step: the daemon requires a per-manifest confirmation
+phrase for it, see ``HarnessMemClient.forget_hard_purge``.
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import random
+import statistics
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .client import BULK_DELETE_MAX_IDS
+from .errors import HarnessMemAPIError, HarnessMemError, HarnessMemTransportError
+from .instrumentation import ClientHooks, RequestEvent
+
+_logger = logging.getLogger("harness_mem")
+
+_RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+_SOURCES = ("feed", "export")
+_MAX_SAMPLES = 64
+
+
+@dataclass
+class RetentionReport:
+    dry_run: bool = False
+    scanned: int = 0
+    selected: int = 0
+    deleted: int = 0
+    skipped: int = 0
+    failed: int = 0
+    batches: int = 0
+    slowdowns: int = 0
+    probes: int = 0
+    batch_size: int = 0
+    interval_sec: float = 0.0
+    search_latency_ms: Optional[float] = None
+    elapsed_sec: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+
+class RetentionExecutor(ClientHooks):
+    """Deletes observations in batches sized and paced by concurrent search latency."""
+
+    def __init__(
+        self,
+        client: Any,
+        *,
+        project: Optional[str] = None,
+        source: str = "feed",
+        filters: Optional[Dict[str, Any]] = None,
+        select: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        batch_size: int = 100,
+        min_batch_size: int = 10,
+        max_batch_size: int = BULK_DELETE_MAX_IDS,
+        target_latency_ms: float = 200.0,
+        max_interval_sec: float = 5.0,
+        window_sec: float = 10.0,
+        probe_query: Optional[str] = None,
+        retries: int = 3,
+        retry_backoff_sec: float = 0.5,
+        on_progress: Optional[Callable[[RetentionReport], None]] = None,
+        dry_run: bool = False,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if source not in _SOURCES:
+            raise ValueError('source must be "feed" or "export"')
+        if not 1 <= min_batch_size <= batch_size <= max_batch_size <= BULK_DELETE_MAX_IDS:
+            raise ValueError(f"need 1 <= min_batch_size <= batch_size <= max_batch_size <= {BULK_DELETE_MAX_IDS}")
+        if target_latency_ms <= 0 or window_sec <= 0 or max_interval_sec < 0 or retries < 0:
+            raise ValueError("target_latency_ms and window_sec must be > 0, max_interval_sec and retries >= 0")
+        self.client = client
+        self.project = project
+        self.source = source
+        self.filters = dict(filters or {})
+        self.select = select
+        self.batch_size = batch_size
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max_batch_size
+        self.target_latency_ms = target_latency_ms
+        self.max_interval_sec = max_interval_sec
+        self.window_sec = window_sec
+        self.probe_query = probe_query
+        self.retries = retries
+        self.retry_backoff_sec = retry_backoff_sec
+        self.on_progress = on_progress
+        self.dry_run = dry_run
+        self.interval_sec = 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._samples: Deque[Tuple[float, float]] = deque(maxlen=_MAX_SAMPLES)
+        self._random = random.Random()
+
+    # -- latency signal -----------------------------------------------------
+
+    def on_request_end(self, event: RequestEvent) -> None:
+        if event.endpoint != "/v1/search" or event.error is not None:
+            return
+        latency = event.server_latency_ms if event.server_latency_ms is not None else event.duration_ms
+        with self._lock:
+            self._samples.append((self._clock(), latency))
+
+    def search_latency_ms(self) -> Optional[float]:
+        """Median daemon latency of the searches seen within ``window_sec``; ``None`` if there were none."""
+        cutoff = self._clock() - self.window_sec
+        with self._lock:
+            recent = [latency for at, latency in self._samples if at >= cutoff]
+        return statistics.median(recent) if recent else None
+
+    def _probe(self, report: RetentionReport) -> None:
+        try:
+            self.client.search(query=self.probe_query, project=self.project, limit=1)
+            report.probes += 1
+        except HarnessMemError as exc:
+            _logger.debug("harness-mem retention probe search failed: %s", exc)
+
+    def _adapt(self, report: RetentionReport) -> None:
+        latency = self.search_latency_ms()
+        if latency is None and self.probe_query:
+            self._probe(report)
+            latency = self.search_latency_ms()
+        report.search_latency_ms = latency
+        if latency is not None and latency > self.target_latency_ms:
+            self.batch_size = max(self.min_batch_size, self.batch_size // 2)
+            self.interval_sec = min(self.max_interval_sec, max(self.interval_sec * 2, 0.05))
+            report.slowdowns += 1
+        elif latency is None or latency < self.target_latency_ms / 2:
+            self.batch_size = min(self.max_batch_size, self.batch_size + self.min_batch_size)
+            self.interval_sec = self.interval_sec / 2 if self.interval_sec > 0.01 else 0.0
+        report.batch_size = self.batch_size
+        report.interval_sec = self.interval_sec
+
+    # -- ids ----------------------------------------------------------------
+
+    def _iter_ids(self, report: RetentionReport) -> Iterator[str]:
+        if self.source == "feed":
+            stream = self.client.iter_feed(project=self.project, **self.filters)
+        else:
+            stream = self.client.iter_export(project=self.project, **self.filters)
+        for item in stream:
+            report.scanned += 1
+            if self.select is None or self.select(item):
+                yield item["id"]
+
+    # -- delete -------------------------------------------------------------
+
+    def _delete(self, batch: List[str], report: RetentionReport) -> None:
+        attempt = 0
+        while True:
+            try:
+                response = self.client.bulk_delete_observations(batch)
+                break
+            except HarnessMemError as exc:
+                retryable = isinstance(exc, HarnessMemTransportError) or (
+                    isinstance(exc, HarnessMemAPIError) and exc.status_code in _RETRYABLE_STATUSES
+                )
+                if not retryable:
+                    raise
+                if attempt >= self.retries:
+                    report.failed += len(batch)
+                    report.errors.append(str(exc))
+                    return
+                self._sleep(self.retry_backoff_sec * (2 ** attempt) * (0.5 + self._random.random()))
+                attempt += 1
+        item = (response.get("items") or [{}])[0]
+        meta = response.get("meta") or {}
+        deleted, skipped = item.get("deleted"), item.get("skipped")
+        report.deleted += int(meta.get("deleted_count", len(deleted) if isinstance(deleted, list) else deleted or 0))
+        report.skipped += int(meta.get("skipped_count", len(skipped) if isinstance(skipped, list) else skipped or 0))
+
+    def run(self, ids: Optional[Iterable[str]] = None) -> RetentionReport:
+        """Delete ``ids`` (default: every id the feed / export filters yield)."""
+        started = self._clock()
+        report = RetentionReport(dry_run=self.dry_run, batch_size=self.batch_size)
+        hooks = getattr(self.client, "hooks", None)
+        attached = hooks is not None and self not in hooks
+        if attached:
+            hooks.append(self)
+        try:
+            if ids is None:
+                pending = self._iter_ids(report)
+            else:
+                pending = iter(ids)
+            while True:
+                batch = list(itertools.islice(pending, self.batch_size))
+                if not batch:
+                    break
+                if ids is not None:
+                    report.scanned += len(batch)
+                report.selected += len(batch)
+                if self.dry_run:
+                    continue
+                if report.batches and self.interval_sec > 0:
+                    self._sleep(self.interval_sec)
+                self._delete(batch, report)
+                report.batches += 1
+                self._adapt(report)
+                if self.on_progress is not None:
+                    self.on_progress(report)
+        finally:
+            if attached:
+                hooks.remove(self)
+            report.elapsed_sec = self._clock() - started
+        return report
@@ -0,0 +1,235 @@
+"""Compact result rows for large search / feed / timeline responses.
+
+``ObservationItem`` responses are plain dicts by default. For jobs that keep
+hundreds of thousands of observations in memory, the client can instead return
+``ObservationRow`` objects (``result_mode="rows"``):
+
+- fixed ``__slots__`` storage instead of a per-row dict
+- ``project`` / ``platform`` / ``session_id`` strings interned across rows
+- tag lists stored as shared, interned tuples and materialised as a list only
+  when a caller reads ``row["tags"]``
+
+``result_mode="lazy"`` goes further and keeps each item as a slice of the raw
+response buffer, decoding it into an ``ObservationRow`` only when indexed. Lazy
+mode requires msgspec.
+
+Rows implement the read-only ``Mapping`` interface, so ``row["title"]``,
+``row.get("tags", [])``, ``"id" in row`` and ``dict(row)`` behave as they do for
+the dict items. Rows are read-only; use ``row.to_dict()`` for a mutable copy.
+"""
+
+from __future__ import annotations
+
+import sys
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union, overload
+
+from .codec import _installed, _optional
+from .columns import ColumnarMixin
+
+RESULT_MODES = ("dict", "rows", "lazy")
+# msgspec is needed only for result_mode="lazy" and is imported on first use.
+LAZY_ROWS_AVAILABLE = _installed("msgspec")
+
+_MISSING: Any = object()
+
+# Fields with a dedicated slot. Anything else the server sends goes to ``_extra``.
+_ROW_FIELDS: Tuple[str, ...] = (
+    "id",
+    "event_id",
+    "platform",
+    "project",
+    "session_id",
+    "title",
+    "content",
+    "created_at",
+    "updated_at",
+    "tags",
+    "privacy_tags",
+    "similarity",
+    "recency",
+    "hybrid_score",
+    "rerank_score",
+)
+_ROW_FIELD_SET = frozenset(_ROW_FIELDS)
+_INTERNED_FIELDS = frozenset({"platform", "project", "session_id"})
+_TAG_FIELDS = frozenset({"tags", "privacy_tags"})
+
+_TAG_CACHE_LIMIT = 65536
+_tag_cache: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+def _intern_tags(value: Any) -> Any:
+    if not isinstance(value, list):
+        return value
+    key = tuple(sys.intern(tag) if isinstance(tag, str) else tag for tag in value)
+    cached = _tag_cache.get(key)
+    if cached is not None:
+        return cached
+    if len(_tag_cache) >= _TAG_CACHE_LIMIT:
+        _tag_cache.clear()
+    _tag_cache[key] = key
+    return key
+
+
+class ObservationRow(Mapping):
+    """Slotted, read-only view of one observation item."""
+
+    __slots__ = _ROW_FIELDS + ("_extra",)
+
+    def __init__(self, item: Mapping) -> None:
+        extra: Optional[Dict[str, Any]] = None
+        for name in _ROW_FIELDS:
+            object.__setattr__(self, name, _MISSING)
+        for key, value in item.items():
+            if key in _ROW_FIELD_SET:
+                if key in _INTERNED_FIELDS and isinstance(value, str):
+                    value = sys.intern(value)
+                elif key in _TAG_FIELDS:
+                    value = _intern_tags(value)
+                object.__setattr__(self, key, value)
+            else:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+        object.__setattr__(self, "_extra", extra)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("ObservationRow is read-only; use to_dict() for a mutable copy")
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _ROW_FIELD_SET:
+            value = object.__getattribute__(self, key)
+            if value is _MISSING:
+                raise KeyError(key)
+            if key in _TAG_FIELDS and isinstance(value, tuple):
+                return list(value)
+            return value
+        extra = self._extra
+        if extra is None:
+            raise KeyError(key)
+        return extra[key]
+
+    def __iter__(self) -> Iterator[str]:
+        for name in _ROW_FIELDS:
+            if object.__getattribute__(self, name) is not _MISSING:
+                yield name
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        count = sum(1 for name in _ROW_FIELDS if object.__getattribute__(self, name) is not _MISSING)
+        return count + (len(self._extra) if self._extra else 0)
+
+    def __contains__(self, key: object) -> bool:
+        if key in _ROW_FIELD_SET:
+            return object.__getattribute__(self, key) is not _MISSING  # type: ignore[arg-type]
+        return bool(self._extra) and key in self._extra  # type: ignore[operator]
+
+    def __repr__(self) -> str:
+        return f"ObservationRow(id={self.get('id')!r}, title={self.get('title')!r})"
+
+    def __reduce__(self) -> Any:
+        return (ObservationRow, (self.to_dict(),))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: self[key] for key in self}
+
+
+class ObservationRows(ColumnarMixin, Sequence):
+    """List-like container of ``ObservationRow`` items."""
+
+    __slots__ = ("_rows",)
+
+    def __init__(self, items: Iterable[Mapping]) -> None:
+        self._rows: List[ObservationRow] = [
+            item if isinstance(item, ObservationRow) else ObservationRow(item) for item in items
+        ]
+
+    @overload
+    def __getitem__(self, index: int) -> ObservationRow: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "ObservationRows": ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return ObservationRows(self._rows[index])
+        return self._rows[index]
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (list, Sequence)) and not isinstance(other, (str, bytes)):
+            return len(self) == len(other) and all(row == item for row, item in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ObservationRows({len(self)} rows)"
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        return [row.to_dict() for row in self]
+
+
+class LazyObservationRows(ObservationRows):
+    """Rows kept as raw JSON slices of the response and decoded on access."""
+
+    __slots__ = ()
+
+    def __init__(self, raw_items: Iterable[Any]) -> None:
+        self._rows = list(raw_items)  # type: ignore[arg-type]
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return LazyObservationRows(self._rows[index])
+        raw = self._rows[index]
+        return ObservationRow(_optional("msgspec").json.decode(raw))
+
+
+class ObservationStream(ColumnarMixin):
+    """Single-use iterator over observation items from a paginated endpoint.
+
+    ``to_columns()`` / ``to_numpy()`` / ``to_arrow()`` consume the stream and
+    build the columns incrementally, without keeping the items in a list.
+    """
+
+    __slots__ = ("_iterator",)
+
+    def __init__(self, iterator: Iterable[Any]) -> None:
+        self._iterator = iter(iterator)
+
+    def __iter__(self) -> Iterator[Any]:
+        return self._iterator
+
+    def __next__(self) -> Any:
+        return next(self._iterator)
+
+
+def decode_lazy(raw: bytes) -> Dict[str, Any]:
+    """Decode a response envelope while keeping each of ``items`` undecoded."""
+    _msgspec = _optional("msgspec")
+    if _msgspec is None:
+        raise ImportError("result_mode='lazy' requires the 'msgspec' package")
+    from .msgspec_structs import LazyEnvelope as _LazyEnvelope
+
+    try:
+        envelope = _msgspec.json.decode(raw, type=_LazyEnvelope)
+    except (_msgspec.DecodeError, _msgspec.ValidationError) as exc:
+        raise ValueError(str(exc)) from exc
+    decoded: Dict[str, Any] = {}
+    for name in envelope.__struct_fields__:
+        value = getattr(envelope, name)
+        if value is not _msgspec.UNSET:
+            decoded[name] = value
+    if "items" in decoded:
+        decoded["items"] = LazyObservationRows(decoded["items"])
+    return decoded
+
+
+def to_rows(response: Any) -> Any:
+    """Replace ``response["items"]`` with compact ``ObservationRows`` in place."""
+    items = response.get("items") if isinstance(response, dict) else None
+    if isinstance(items, list):
+        response["items"] = ObservationRows(item for item in items if isinstance(item, Mapping))
+    return response
@@ -0,0 +1,323 @@
+"""Batched, adaptively polled agent signal inbox.
+
+``SignalInbox`` consumes ``/v1/signal/read`` for one agent without hammering
+the daemon:
+
+- reads up to ``batch_size`` signals per request and acks a processed batch
+  with up to ``ack_concurrency`` concurrent ``/v1/signal/ack`` calls (the
+  daemon acks one signal per request);
+- adapts the poll interval: a full batch is re-polled immediately, a partial
+  one after ``min_interval_sec``, and every empty poll multiplies the interval
+  by ``backoff`` up to ``max_interval_sec``;
+- with ``wake_on_stream=True`` (opt-in) it also listens on ``GET /v1/stream`` and polls at
+  once when a ``signal.*`` event for this agent arrives. Only after such an
+  event was actually seen does the idle interval stretch to
+  ``stream_max_interval_sec``, so against a daemon whose stream does not carry
+  signals the inbox keeps plain adaptive polling. A stream that answers 404
+  is not retried.
+
+::
+
+    inbox = SignalInbox(client, "reviewer-1", project="my-project")
+    for signal in inbox.consume(stop=stop_event):
+        handle(signal["content"])  # acked in batches after handling
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+from .errors import HarnessMemAPIError, HarnessMemError
+from .types import SignalItem
+
+_logger = logging.getLogger("harness_mem")
+
+# A stream that answers one of these is not there; stop trying.
+_STREAM_UNAVAILABLE = frozenset({404, 405, 501})
+_STREAM_READ_TIMEOUT_SEC = 60.0
+_STREAM_MAX_RECONNECT_SEC = 30.0
+
+
+class SignalInbox:
+    """Signals addressed to ``agent_id`` (and broadcasts), read in batches."""
+
+    def __init__(
+        self,
+        client: Any,
+        agent_id: str,
+        *,
+        project: Optional[str] = None,
+        thread_id: Optional[str] = None,
+        include_broadcast: bool = True,
+        batch_size: int = 50,
+        min_interval_sec: float = 0.05,
+        max_interval_sec: float = 5.0,
+        backoff: float = 2.0,
+        ack_concurrency: int = 4,
+        wake_on_stream: bool = False,
+        stream_max_interval_sec: float = 30.0,
+    ) -> None:
+        if not agent_id:
+            raise ValueError("agent_id is required")
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+        if not 0 < min_interval_sec <= max_interval_sec:
+            raise ValueError("need 0 < min_interval_sec <= max_interval_sec")
+        if backoff < 1:
+            raise ValueError("backoff must be >= 1")
+        if ack_concurrency < 1:
+            raise ValueError("ack_concurrency must be >= 1")
+        self.client = client
+        self.agent_id = agent_id
+        self.project = project
+        self.thread_id = thread_id
+        self.include_broadcast = include_broadcast
+        self.batch_size = batch_size
+        self.min_interval_sec = min_interval_sec
+        self.max_interval_sec = max_interval_sec
+        self.backoff = backoff
+        self.ack_concurrency = ack_concurrency
+        self.wake_on_stream = wake_on_stream
+        self.stream_max_interval_sec = stream_max_interval_sec
+        self.interval_sec = min_interval_sec
+        self.stream_state = "off"
+        self._stream_signals_seen = False
+        self._wake = threading.Event()
+        self._closed = threading.Event()
+        self._lock = threading.Lock()
+        self._stream_thread: Optional[threading.Thread] = None
+        self._stream_response: Any = None
+        self._ack_pool: Optional[ThreadPoolExecutor] = None
+        self.polls = 0
+        self.empty_polls = 0
+        self.received = 0
+        self.acked = 0
+        self.ack_failures = 0
+        self.wakeups = 0
+
+    # -- polling ------------------------------------------------------------
+
+    def poll(self) -> List[SignalItem]:
+        """One ``/v1/signal/read`` call; adjusts ``interval_sec`` for the next one."""
+        try:
+            response = self.client.read_signals(
+                agent_id=self.agent_id,
+                project=self.project,
+                thread_id=self.thread_id,
+                include_broadcast=self.include_broadcast,
+                limit=self.batch_size,
+            )
+        except HarnessMemError:
+            self._back_off()
+            raise
+        signals: List[SignalItem] = list(response.get("signals") or [])
+        with self._lock:
+            self.polls += 1
+            self.received += len(signals)
+            if len(signals) >= self.batch_size:
+                self.interval_sec = 0.0
+            elif signals:
+                self.interval_sec = self.min_interval_sec
+            else:
+                self.empty_polls += 1
+        if not signals:
+            self._back_off()
+        return signals
+
+    def _back_off(self) -> None:
+        cap = self.stream_max_interval_sec if self._stream_signals_seen else self.max_interval_sec
+        with self._lock:
+            self.interval_sec = min(max(self.interval_sec, self.min_interval_sec) * self.backoff, cap)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Sleep for ``timeout`` (default: ``interval_sec``); ``True`` if woken early."""
+        if self.wake_on_stream:
+            self._ensure_stream()
+        woken = self._wake.wait(self.interval_sec if timeout is None else timeout)
+        self._wake.clear()
+        return woken
+
+    def wake(self) -> None:
+        """Make a pending ``wait()`` return now (e.g. after sending a signal in-process)."""
+        with self._lock:
+            self.wakeups += 1
+            self.interval_sec = 0.0
+        self._wake.set()
+
+    # -- acking -------------------------------------------------------------
+
+    def ack(self, signals: Iterable[Union[SignalItem, str]]) -> int:
+        """Ack signals (items or ids) concurrently; returns how many are now acked.
+
+        ``already_acked`` counts as acked. Other failures are logged and counted
+        in ``ack_failures``; those signals come back on a later ``poll``.
+        """
+        ids = list(dict.fromkeys(item if isinstance(item, str) else str(item.get("signalId")) for item in signals))
+        if not ids:
+            return 0
+        if len(ids) == 1 or self.ack_concurrency == 1:
+            results = [self._ack_one(signal_id) for signal_id in ids]
+        else:
+            with self._lock:
+                if self._ack_pool is None:
+                    self._ack_pool = ThreadPoolExecutor(
+                        max_workers=self.ack_concurrency, thread_name_prefix="harness-mem-signal-ack"
+                    )
+                pool = self._ack_pool
+            results = list(pool.map(self._ack_one, ids))
+        acked = sum(results)
+        with self._lock:
+            self.acked += acked
+            self.ack_failures += len(ids) - acked
+        return acked
+
+    def _ack_one(self, signal_id: str) -> bool:
+        try:
+            self.client.ack_signal(signal_id=signal_id, agent_id=self.agent_id)
+        except HarnessMemAPIError as exc:
+            if exc.message == "already_acked":
+                return True
+            _logger.warning("harness-mem signal ack %s failed: %s", signal_id, exc.message)
+            return False
+        except HarnessMemError as exc:
+            _logger.warning("harness-mem signal ack %s failed: %s", signal_id, exc)
+            return False
+        return True
+
+    # -- consuming ----------------------------------------------------------
+
+    def consume(self, stop: Optional[threading.Event] = None, *, auto_ack: bool = True) -> Iterator[SignalItem]:
+        """Yield signals until ``stop`` is set or the inbox is closed.
+
+        With ``auto_ack`` every signal is acked after the consumer resumed the
+        generator, batch by batch (at-least-once: a crash before the ack
+        redelivers the batch). Read errors are logged and retried with backoff.
+        """
+        while not self._closed.is_set() and not (stop is not None and stop.is_set()):
+            try:
+                batch = self.poll()
+            except HarnessMemError as exc:
+                _logger.warning("harness-mem signal read failed: %s", exc)
+                batch = []
+            handled: List[SignalItem] = []
+            try:
+                for signal in batch:
+                    yield signal
+                    handled.append(signal)
+            finally:
+                if auto_ack and handled:
+                    self.ack(handled)
+            if self.interval_sec > 0:
+                self.wait()
+
+    def __iter__(self) -> Iterator[SignalItem]:
+        return self.consume()
+
+    # -- stream wake-ups ----------------------------------------------------
+
+    def _ensure_stream(self) -> None:
+        with self._lock:
+            if self._stream_thread is not None or self._closed.is_set():
+                return
+            self.stream_state = "connecting"
+            self._stream_thread = threading.Thread(
+                target=self._stream_loop, name="harness-mem-signal-stream", daemon=True
+            )
+            self._stream_thread.start()
+
+    def _stream_loop(self) -> None:
+        query = {"replay": "0"}
+        if self.project:
+            query["project"] = self.project
+        url = f"{self.client.base_url}/v1/stream?{urlencode(query)}"
+        delay = 1.0
+        while not self._closed.is_set():
+            try:
+                req = Request(url, headers={**self.client._headers(), "accept": "text/event-stream"})
+                with urlopen(req, timeout=_STREAM_READ_TIMEOUT_SEC) as response:
+                    self._stream_response = response
+                    self.stream_state = "connected"
+                    delay = 1.0
+                    self._read_stream(response)
+            except HTTPError as exc:
+                if exc.code in _STREAM_UNAVAILABLE:
+                    self.stream_state = "unavailable"
+                    return
+            except (URLError, OSError, ValueError):
+                pass
+            finally:
+                self._stream_response = None
+            if self._closed.is_set():
+                break
+            self.stream_state = "reconnecting"
+            self._closed.wait(delay)
+            delay = min(delay * 2, _STREAM_MAX_RECONNECT_SEC)
+        self.stream_state = "off"
+
+    def _read_stream(self, response: Any) -> None:
+        event: Optional[str] = None
+        data: List[str] = []
+        for raw in response:
+            if self._closed.is_set():
+                return
+            line = raw.decode("utf-8", "replace").rstrip("\r\n")
+            if line.startswith("event:"):
+                event = line[6:].strip()
+            elif line.startswith("data:"):
+                data.append(line[5:].strip())
+            elif not line:
+                if event and event.startswith("signal.") and self._addressed_to_me(data):
+                    self._stream_signals_seen = True
+                    self.wake()
+                event, data = None, []
+
+    def _addressed_to_me(self, data: List[str]) -> bool:
+        try:
+            payload: Dict[str, Any] = json.loads("\n".join(data)) if data else {}
+        except ValueError:
+            return True
+        recipient = payload.get("to") if isinstance(payload, dict) else None
+        return recipient is None or recipient == self.agent_id
+
+    # -- lifecycle ----------------------------------------------------------
+
+    def close(self) -> None:
+        """Stop consuming, the stream listener and the ack pool."""
+        self._closed.set()
+        self._wake.set()
+        response = self._stream_response
+        if response is not None:
+            try:
+                response.close()
+            except Exception:
+                pass
+        with self._lock:
+            pool, self._ack_pool = self._ack_pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    def __enter__(self) -> "SignalInbox":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "polls": self.polls,
+                "empty_polls": self.empty_polls,
+                "received": self.received,
+                "acked": self.acked,
+                "ack_failures": self.ack_failures,
+                "wakeups": self.wakeups,
+                "interval_sec": self.interval_sec,
+                "stream": self.stream_state,
+            }
@@ -0,0 +1,126 @@
+"""Single-flight coalescing of identical concurrent calls.
+
+When several threads ask for the same key while a call for it is already in
+flight, only the first one (the leader) runs the function. The others wait and
+receive the leader's result, or re-raise the leader's exception. By default
+nothing is cached: once the leader finishes, the next call for the key runs
+again. With ``window_sec`` a successful result is also handed to callers that
+arrive up to ``window_sec`` after it finished (errors are never reused).
+
+``HarnessMemClient(coalesce=True)`` routes read-only requests through a
+``SingleFlight`` keyed on method, path and the canonical request payload. Async
+callers that run the sync client on worker threads are coalesced the same way.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# Finished calls kept for ``window_sec`` before expired ones are pruned.
+_MAX_RECENT = 1024
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+def canonical_key(method: str, path: str, payload: Any = None, query: Any = None) -> str:
+    """Stable key for a request: key order and whitespace do not matter."""
+    return json.dumps(
+        [method.upper(), path, payload, query],
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    )
+
+
+class SingleFlight:
+    """Thread-safe single-flight group with deduplication counters."""
+
+    def __init__(self, window_sec: float = 0.0) -> None:
+        self.window_sec = window_sec
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._recent: Dict[Hashable, Tuple[_Call, float]] = {}
+        self.executed = 0
+        self.deduplicated = 0
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None and key in self._recent:
+                recent, expires_at = self._recent[key]
+                if expires_at > time.monotonic():
+                    call = recent
+                else:
+                    del self._recent[key]
+            if call is not None:
+                self.deduplicated += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return _share(call.result)
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        else:
+            return _share(call.result)
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+                if self.window_sec > 0 and call.error is None:
+                    self._remember_locked(key, call)
+            call.done.set()
+
+    def _remember_locked(self, key: Hashable, call: _Call) -> None:
+        now = time.monotonic()
+        self._recent.pop(key, None)
+        self._recent[key] = (call, now + self.window_sec)
+        if len(self._recent) > _MAX_RECENT:
+            for stale in [k for k, (_, expires_at) in self._recent.items() if expires_at <= now]:
+                del self._recent[stale]
+            while len(self._recent) > _MAX_RECENT:
+                del self._recent[next(iter(self._recent))]
+
+    def forget(self) -> None:
+        """Drop finished results kept for ``window_sec``; in-flight calls are unaffected."""
+        with self._lock:
+            self._recent.clear()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"executed": self.executed, "deduplicated": self.deduplicated, "in_flight": len(self._calls)}
+
+
+def _share(result: Any) -> Any:
+    # Every caller, leader included, gets its own top-level dict so that
+    # replacing ``items`` (for example in a reranked search) does not leak
+    # between callers. Nested values are shared and should be treated as
+    # read-only.
+    return dict(result) if isinstance(result, dict) else result
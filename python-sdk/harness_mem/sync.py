@@ -0,0 +1,343 @@
+"""Incremental, resumable cross-device sync over ``/v1/sync/push`` and ``/v1/sync/pull``.
+
+``SyncEngine`` exchanges records between a local store and the daemon:
+
+- Only the delta is pushed. The engine keeps a push mark: the newest
+  ``updated_at`` it has pushed, plus the ids pushed at exactly that
+  timestamp. Records at or before the mark are skipped, as are records
+  carrying another device's ``device_id`` (they arrived through a pull and
+  must not be echoed back). Several versions of one id collapse to the newest.
+- The delta is pushed oldest first, in batches bounded by record count (never
+  above the server cap of ``SYNC_PUSH_MAX_RECORDS``) and by encoded size. The
+  batch size follows push latency: it doubles while full batches finish well
+  under ``target_push_ms`` and halves when one runs over. A batch the daemon
+  rejects as too large is split in two and re-sent. 429 / 5xx and transport
+  errors are retried with exponential backoff.
+- The pull is pipelined. It is issued on a worker thread alongside the first
+  push, and the pulled records are handed to ``apply`` between pushes as
+  soon as they arrive. Records this device pushed are filtered out. When the
+  daemon resolves a conflict in favour of another device's version, that
+  winner is applied locally too.
+- Progress is checkpointed. The push and pull marks are rewritten atomically
+  to ``state_path`` after every acknowledged batch and every applied pull,
+  so an interrupted sync resumes from the last batch instead of re-sending
+  everything. Marks are kept per ``device_id`` and daemon URL.
+
+::
+
+    def changed_since(mark):            # ISO 8601 string or None
+        return db.records_updated_after(mark)  # returning more is harmless
+
+    engine = SyncEngine(client, device_id="laptop", source=changed_since,
+                        apply=db.upsert_many, state_path=".harness-mem-sync.json")
+    report = engine.sync()
+    print(report.pushed, report.applied, report.conflicts)
+
+The daemon compares ``updated_at`` as plain strings, so every device should
+write UTC timestamps in one ISO 8601 format (``2026-01-01T00:00:00.000Z``).
+``apply`` must keep the ``device_id`` of the records it stores; otherwise
+they look local and are pushed back.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, TypeVar
+
+from .client import SYNC_PUSH_MAX_RECORDS
+from .errors import HarnessMemAPIError, HarnessMemError, HarnessMemTransportError
+from .types import SyncPushItem, SyncRecord
+
+_logger = logging.getLogger("harness_mem")
+
+_RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+_STATE_VERSION = 1
+_CONFLICT_POLICIES = ("last-write-wins", "local-wins", "remote-wins")
+_WIRE_KEYS = ("id", "content", "updated_at", "device_id")
+
+_T = TypeVar("_T")
+
+
+class SyncState:
+    """``{"<device_id>@<base_url>": {push_mark, push_mark_ids, pull_mark}}`` kept in a JSON file."""
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self.peers: Dict[str, Dict[str, Any]] = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as fh:
+                    data = json.load(fh)
+                if isinstance(data, dict) and data.get("version") == _STATE_VERSION:
+                    self.peers = dict(data.get("peers") or {})
+            except (OSError, ValueError) as exc:
+                _logger.warning("harness-mem sync state %s unreadable, starting fresh: %s", path, exc)
+
+    def get(self, key: str) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.peers.get(key) or {})
+
+    def update(self, key: str, **fields: Any) -> None:
+        with self._lock:
+            self.peers[key] = {**self.peers.get(key, {}), **fields}
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        with self._lock:
+            data = json.dumps({"version": _STATE_VERSION, "peers": self.peers}, ensure_ascii=False, sort_keys=True)
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            fh.write(data)
+        os.replace(tmp, self.path)
+
+
+@dataclass
+class SyncReport:
+    pushed: int = 0
+    batches: int = 0
+    splits: int = 0
+    bytes_sent: int = 0
+    skipped: int = 0
+    pulled: int = 0
+    applied: int = 0
+    conflicts: int = 0
+    push_mark: Optional[str] = None
+    pull_mark: Optional[str] = None
+    batch_size: int = 0
+    elapsed_sec: float = 0.0
+
+
+class SyncEngine:
+    """Pushes local changes past a persisted mark and pulls remote ones in the same round."""
+
+    def __init__(
+        self,
+        client: Any,
+        *,
+        device_id: str,
+        source: Callable[[Optional[str]], Iterable[SyncRecord]],
+        apply: Optional[Callable[[List[SyncRecord]], Any]] = None,
+        state_path: Optional[str] = None,
+        conflict_policy: Optional[str] = None,
+        batch_size: int = 1000,
+        max_batch_bytes: int = 4 * 1024 * 1024,
+        target_push_ms: float = 1000.0,
+        retries: int = 3,
+        retry_backoff_sec: float = 0.5,
+    ) -> None:
+        if not device_id:
+            raise ValueError("device_id is required")
+        if conflict_policy not in (None,) + _CONFLICT_POLICIES:
+            raise ValueError(f"conflict_policy must be one of {', '.join(_CONFLICT_POLICIES)}")
+        if batch_size < 1 or max_batch_bytes < 1 or retries < 0:
+            raise ValueError("batch_size and max_batch_bytes must be >= 1, retries >= 0")
+        self.client = client
+        self.device_id = device_id
+        self.source = source
+        self.apply = apply
+        self.state = SyncState(state_path)
+        self.conflict_policy = conflict_policy
+        self.max_batch_bytes = max_batch_bytes
+        self.target_push_ms = target_push_ms
+        self.retries = retries
+        self.retry_backoff_sec = retry_backoff_sec
+        self.batch_size = min(batch_size, SYNC_PUSH_MAX_RECORDS)
+        self._key = f"{device_id}@{getattr(client, 'base_url', '')}"
+        self._random = random.Random()
+
+    @property
+    def push_mark(self) -> Optional[str]:
+        return self.state.get(self._key).get("push_mark")
+
+    @property
+    def pull_mark(self) -> Optional[str]:
+        return self.state.get(self._key).get("pull_mark")
+
+    # -- delta --------------------------------------------------------------
+
+    def pending(self) -> List[SyncRecord]:
+        """The records the next ``sync()`` would push, oldest first."""
+        return self._delta(SyncReport())
+
+    def _delta(self, report: SyncReport) -> List[SyncRecord]:
+        entry = self.state.get(self._key)
+        mark: Optional[str] = entry.get("push_mark")
+        pushed_at_mark: Set[str] = set(entry.get("push_mark_ids") or ())
+        latest: Dict[str, SyncRecord] = {}
+        for record in self.source(mark):
+            record_id, updated_at = record.get("id"), record.get("updated_at")
+            if not (isinstance(record_id, str) and record_id and isinstance(updated_at, str) and updated_at):
+                raise ValueError("sync records need non-empty string 'id' and 'updated_at'")
+            owner = record.get("device_id")
+            if (owner and owner != self.device_id) or (
+                mark is not None and (updated_at < mark or (updated_at == mark and record_id in pushed_at_mark))
+            ):
+                report.skipped += 1
+                continue
+            previous = latest.get(record_id)
+            if previous is not None:
+                report.skipped += 1
+                if previous["updated_at"] >= updated_at:
+                    continue
+            latest[record_id] = record
+        return sorted(latest.values(), key=lambda r: (r["updated_at"], r["id"]))
+
+    def _wire(self, record: SyncRecord) -> SyncRecord:
+        wire: Dict[str, Any] = {key: record[key] for key in _WIRE_KEYS if key in record}  # type: ignore[literal-required]
+        wire.setdefault("content", "")
+        wire["device_id"] = self.device_id
+        return wire  # type: ignore[return-value]
+
+    def _batches(self, delta: Sequence[SyncRecord], report: SyncReport) -> Iterator[List[SyncRecord]]:
+        """Cut ``delta`` into batches, reading ``batch_size`` afresh for each batch."""
+        batch: List[SyncRecord] = []
+        size = 0
+        for record in delta:
+            wire = self._wire(record)
+            encoded = len(json.dumps(wire, ensure_ascii=False).encode("utf-8")) + 1
+            if batch and (len(batch) >= self.batch_size or size + encoded > self.max_batch_bytes):
+                yield batch
+                batch, size = [], 0
+            batch.append(wire)
+            size += encoded
+            report.bytes_sent += encoded
+        if batch:
+            yield batch
+
+    # -- transport ----------------------------------------------------------
+
+    def _call(self, fn: Callable[[], _T]) -> _T:
+        attempt = 0
+        while True:
+            try:
+                return fn()
+            except HarnessMemError as exc:
+                retryable = isinstance(exc, HarnessMemTransportError) or (
+                    isinstance(exc, HarnessMemAPIError) and exc.status_code in _RETRYABLE_STATUSES
+                )
+                if not retryable or attempt >= self.retries:
+                    raise
+                time.sleep(self.retry_backoff_sec * (2 ** attempt) * (0.5 + self._random.random()))
+                attempt += 1
+
+    @staticmethod
+    def _too_large(exc: HarnessMemError) -> bool:
+        return isinstance(exc, HarnessMemAPIError) and (
+            exc.status_code == 413 or (exc.status_code == 400 and "exceed" in exc.message)
+        )
+
+    def _push_batch(self, batch: List[SyncRecord], report: SyncReport) -> None:
+        started = time.perf_counter()
+        try:
+            response = self._call(
+                lambda: self.client.sync_push(
+                    device_id=self.device_id,
+                    records=batch,
+                    since=self.push_mark,
+                    conflict_policy=self.conflict_policy,
+                )
+            )
+        except HarnessMemError as exc:
+            if not self._too_large(exc) or len(batch) < 2:
+                raise
+            half = len(batch) // 2
+            self.batch_size = max(1, min(self.batch_size, half))
+            report.splits += 1
+            self._push_batch(batch[:half], report)
+            self._push_batch(batch[half:], report)
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        if elapsed_ms > self.target_push_ms:
+            self.batch_size = max(1, self.batch_size // 2)
+        elif elapsed_ms < self.target_push_ms / 2 and len(batch) >= self.batch_size:
+            self.batch_size = min(SYNC_PUSH_MAX_RECORDS, self.batch_size * 2)
+
+        report.pushed += len(batch)
+        report.batches += 1
+        item: SyncPushItem = (response.get("items") or [{}])[0]
+        self._apply_conflicts(item.get("conflicts") or [], report)
+        self._advance_push_mark(batch)
+
+    def _advance_push_mark(self, batch: List[SyncRecord]) -> None:
+        entry = self.state.get(self._key)
+        last = batch[-1]["updated_at"]
+        ids = {record["id"] for record in batch if record["updated_at"] == last}
+        if entry.get("push_mark") == last:
+            ids.update(entry.get("push_mark_ids") or ())
+        self.state.update(self._key, push_mark=last, push_mark_ids=sorted(ids))
+        self.state.save()
+
+    def _apply_conflicts(self, conflicts: Iterable[Dict[str, Any]], report: SyncReport) -> None:
+        winners: List[SyncRecord] = []
+        for conflict in conflicts:
+            report.conflicts += 1
+            winner = conflict.get("winner")
+            # The daemon sees our pushed record as the "remote" side of the conflict.
+            if winner and winner != conflict.get("remote"):
+                winners.append(winner)
+        if winners and self.apply is not None:
+            self.apply(winners)
+            report.applied += len(winners)
+
+    def _pull(self, mark: Optional[str]) -> List[SyncRecord]:
+        response = self._call(lambda: self.client.sync_pull(device_id=self.device_id, since=mark))
+        changeset = (response.get("items") or [{}])[0]
+        return list(changeset.get("records") or [])
+
+    def _apply_pull(self, future: "Future[List[SyncRecord]]", report: SyncReport) -> None:
+        records = future.result()
+        mark = self.pull_mark
+        foreign: List[SyncRecord] = []
+        for record in records:
+            updated_at = record.get("updated_at")
+            if isinstance(updated_at, str) and (mark is None or updated_at > mark):
+                mark = updated_at
+            if record.get("device_id") != self.device_id:
+                foreign.append(record)
+        report.pulled += len(records)
+        if foreign and self.apply is not None:
+            self.apply(foreign)
+            report.applied += len(foreign)
+        self.state.update(self._key, pull_mark=mark)
+        self.state.save()
+
+    # -- public -------------------------------------------------------------
+
+    def sync(self) -> SyncReport:
+        """Push the local delta and, when ``apply`` is set, pull remote changes alongside it."""
+        started = time.monotonic()
+        report = SyncReport()
+        delta = self._delta(report)
+        executor: Optional[ThreadPoolExecutor] = None
+        pull: Optional["Future[List[SyncRecord]]"] = None
+        if self.apply is not None:
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="harness-mem-sync-pull")
+            pull = executor.submit(self._pull, self.pull_mark)
+        try:
+            for batch in self._batches(delta, report):
+                self._push_batch(batch, report)
+                if pull is not None and pull.done():
+                    self._apply_pull(pull, report)
+                    pull = None
+            if pull is not None:
+                self._apply_pull(pull, report)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False)
+        entry = self.state.get(self._key)
+        report.push_mark = entry.get("push_mark")
+        report.pull_mark = entry.get("pull_mark")
+        report.batch_size = self.batch_size
+        report.elapsed_sec = time.monotonic() - started
+        return report
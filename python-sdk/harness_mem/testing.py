@@ -0,0 +1,1148 @@
+"""In-process fake harness-mem daemon for tests, load tests and offline work.
+
+``FakeHarnessMemServer`` speaks the subset of the daemon's HTTP API that the
+SDK and its integrations use, backed by an in-memory ``FakeStore``:
+
+- ``GET /health``
+- ``POST /v1/events/record``
+- ``POST /v1/checkpoints/record``
+- ``POST /v1/search`` (token-overlap scoring over an inverted index)
+- ``POST /v1/observations/get``
+- ``POST /v1/timeline``
+- ``POST /v1/resume-pack``
+- ``GET /v1/feed`` (cursor paging, newest first)
+- ``GET /v1/stream`` (server-sent events: ``ready``, ``observation.created``,
+  ``ping``)
+- ``POST /v1/lease/acquire``, ``/v1/lease/renew``, ``/v1/lease/release``
+  (raw ``{ok, lease}`` bodies like the daemon's lease store)
+- ``POST /v1/signal/send``, ``/v1/signal/read``, ``/v1/signal/ack`` (with
+  ``publish_signals=True`` every send is also streamed as ``signal.sent``,
+  which the real daemon does not do yet)
+- ``POST /v1/ingest/document``, ``/v1/ingest/knowledge-file`` (``decisions_md``
+  and ``adr`` parsing reduced to headings, deduplicated like the daemon)
+- ``POST /v1/admin/consolidation/run``, ``GET /v1/admin/consolidation/status``
+  (runs are recorded, not executed; ``running_jobs`` is settable)
+- ``GET /v1/graph``, ``/v1/graph/neighbors``, ``/v1/graph/entities`` over
+  links and entities added to ``server.graph`` (``add_link`` / ``add_entity``)
+
+Latency and failures can be injected globally or per path, so client retry,
+timeout and backpressure logic can be exercised without the Bun daemon::
+
+    with FakeHarnessMemServer(latency_ms=2, error_rate=0.01, seed=7) as server:
+        server.inject("/v1/search", latency_ms=50, error_status=503, error_rate=0.2)
+        client = server.client()
+        client.record_event({"platform": "claude", "project": "demo", "session_id": "s1",
+                             "event_type": "user_prompt", "payload": {"content": "hello"}})
+        client.search(query="hello", project="demo")
+
+Only the stdlib is used. The server runs on a background thread with one
+handler thread per connection and keeps handlers cheap (pre-tokenized search,
+no per-request logging), so it sustains thousands of requests per second and
+is not the bottleneck in client benchmarks.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import heapq
+import itertools
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from .client import HarnessMemClient
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+_PRIVATE_TAGS = frozenset({"private", "sensitive"})
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def _tokens(text: str) -> Set[str]:
+    return set(_TOKEN.findall(text.lower()))
+
+
+def _is_private(item: Dict[str, Any]) -> bool:
+    return any(tag in _PRIVATE_TAGS for tag in item.get("privacy_tags") or [])
+
+
+def envelope(items: List[Any], *, latency_ms: float = 0.0, **meta: Any) -> Dict[str, Any]:
+    """Response body in the daemon's ``makeResponse`` shape."""
+    return {
+        "ok": True,
+        "source": "core",
+        "items": items,
+        "meta": {"count": len(items), "latency_ms": round(latency_ms, 2), "ranking": "fake", **meta},
+    }
+
+
+def error_envelope(message: str) -> Dict[str, Any]:
+    return {"ok": False, "source": "core", "items": [], "meta": {"count": 0, "ranking": "error"}, "error": message}
+
+
+class FakeStore:
+    """Thread-safe in-memory observation store with a stream event log.
+
+    Observations are indexed by project and session, and deleted ones leave a
+    tombstone in the insertion order, so reads and deletes do not scan the
+    whole store. The stream log keeps the newest ``max_events`` events; a
+    stream that falls further behind skips the dropped ones.
+    """
+
+    def __init__(self, max_events: int = 10000) -> None:
+        if max_events < 1:
+            raise ValueError("max_events must be >= 1")
+        self._lock = threading.Lock()
+        self.changed = threading.Condition(self._lock)
+        self._observations: Dict[str, Dict[str, Any]] = {}
+        # Insertion order; index ``seq - 1`` holds the id, or None once deleted.
+        self._order: List[Optional[str]] = []
+        self._seq: Dict[str, int] = {}
+        self._projects: Dict[str, Any] = {}
+        self._by_project: Dict[Any, Dict[str, None]] = {}
+        self._by_session: Dict[Any, Dict[str, None]] = {}
+        self._private: Set[str] = set()
+        self._next_seq = 0
+        self._tokens: Dict[str, Set[str]] = {}
+        self._index: Dict[str, Set[str]] = {}
+        self._dedupe: Dict[str, str] = {}
+        self._events: deque = deque(maxlen=max_events)
+        self._last_event_id = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._observations)
+
+    def add_observation(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert a ready-made observation (``id`` is generated when missing)."""
+        stored = dict(item)
+        stored.setdefault("id", f"obs_{uuid.uuid4().hex[:16]}")
+        stored.setdefault("created_at", _now_iso())
+        stored.setdefault("updated_at", stored["created_at"])
+        stored.setdefault("tags", [])
+        stored.setdefault("privacy_tags", [])
+        with self.changed:
+            self._insert_locked(stored)
+            self.changed.notify_all()
+        return dict(stored)
+
+    def _insert_locked(self, stored: Dict[str, Any]) -> None:
+        observation_id = stored["id"]
+        previous = self._observations.get(observation_id)
+        if previous is None:
+            self._order.append(observation_id)
+            self._next_seq += 1
+            self._seq[observation_id] = self._next_seq
+        else:
+            self._unindex_locked(previous)
+        self._observations[observation_id] = stored
+        self._projects[observation_id] = stored.get("project")
+        self._by_project.setdefault(stored.get("project"), {})[observation_id] = None
+        self._by_session.setdefault(stored.get("session_id"), {})[observation_id] = None
+        if _is_private(stored):
+            self._private.add(observation_id)
+        else:
+            self._private.discard(observation_id)
+        tokens = _tokens(f"{stored.get('title') or ''} {stored.get('content') or ''}")
+        for token in self._tokens.get(observation_id, set()) - tokens:
+            self._index.get(token, set()).discard(observation_id)
+        self._tokens[observation_id] = tokens
+        for token in tokens:
+            self._index.setdefault(token, set()).add(observation_id)
+        self._append_event_locked("observation.created", stored)
+
+    def _unindex_locked(self, item: Dict[str, Any]) -> None:
+        observation_id = item["id"]
+        for index, key in ((self._by_project, item.get("project")), (self._by_session, item.get("session_id"))):
+            members = index.get(key)
+            if members is not None:
+                members.pop(observation_id, None)
+                if not members:
+                    del index[key]
+
+    def _append_event_locked(self, event_type: str, data: Dict[str, Any]) -> None:
+        self._last_event_id += 1
+        self._events.append((self._last_event_id, event_type, dict(data)))
+
+    def record_event(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        payload = event.get("payload") if isinstance(event.get("payload"), dict) else {}
+        content = payload.get("content") or payload.get("prompt") or payload.get("text")
+        if not isinstance(content, str):
+            content = json.dumps(payload, ensure_ascii=False, sort_keys=True)
+        event_type = str(event.get("event_type"))
+        dedupe_hash = str(event.get("dedupe_hash") or event.get("event_id") or "")
+        with self.changed:
+            if dedupe_hash and dedupe_hash in self._dedupe:
+                existing = self._observations.get(self._dedupe[dedupe_hash])
+                if existing is not None:
+                    return {**existing, "deduped": True}
+            timestamp = str(event.get("ts") or _now_iso())
+            stored = {
+                "id": f"obs_{uuid.uuid4().hex[:16]}",
+                "event_id": str(event.get("event_id") or f"evt_{uuid.uuid4().hex[:16]}"),
+                "platform": event.get("platform"),
+                "project": event.get("project"),
+                "session_id": event.get("session_id"),
+                "event_type": event_type,
+                "card_type": "session_summary" if event_type == "session_end" else event_type,
+                "title": str(payload.get("title") or event_type),
+                "content": content[:1200],
+                "memory_type": "semantic",
+                "created_at": timestamp,
+                "updated_at": timestamp,
+                "tags": list(event.get("tags") or []),
+                "privacy_tags": list(event.get("privacy_tags") or []),
+            }
+            self._insert_locked(stored)
+            if dedupe_hash:
+                self._dedupe[dedupe_hash] = stored["id"]
+            self.changed.notify_all()
+        return dict(stored)
+
+    def delete(self, ids: Iterable[str]) -> int:
+        removed = 0
+        with self.changed:
+            for observation_id in ids:
+                item = self._observations.pop(observation_id, None)
+                if item is None:
+                    continue
+                removed += 1
+                self._order[self._seq.pop(observation_id) - 1] = None
+                self._unindex_locked(item)
+                self._projects.pop(observation_id, None)
+                self._private.discard(observation_id)
+                for token in self._tokens.pop(observation_id, set()):
+                    self._index.get(token, set()).discard(observation_id)
+        return removed
+
+    def _visible(self, item: Dict[str, Any], project: Optional[str], include_private: bool) -> bool:
+        if project and item.get("project") != project:
+            return False
+        return include_private or not _is_private(item)
+
+    def search(
+        self, query: str, *, project: Optional[str] = None, limit: int = 20, include_private: bool = False
+    ) -> List[Dict[str, Any]]:
+        query_tokens = _tokens(query)
+        if not query_tokens:
+            return []
+        limit = max(1, min(limit, 100))
+        with self._lock:
+            matches: Counter = Counter()
+            for token in query_tokens:
+                matches.update(self._index.get(token, ()))
+            hidden = frozenset() if include_private else self._private
+            projects, sequence = self._projects, self._seq
+            # Most matched query tokens first, newest first among equals.
+            top = heapq.nlargest(
+                limit,
+                (
+                    (hits, sequence[observation_id], observation_id)
+                    for observation_id, hits in matches.items()
+                    if observation_id not in hidden and (not project or projects[observation_id] == project)
+                ),
+            )
+            total = self._next_seq or 1
+            rows = [(self._observations[observation_id], hits, seq) for hits, seq, observation_id in top]
+        results = []
+        for item, hits, seq in rows:
+            similarity = hits / len(query_tokens)
+            recency = seq / total
+            hybrid = round(0.8 * similarity + 0.2 * recency, 6)
+            results.append(
+                {**item, "similarity": round(similarity, 6), "recency": round(recency, 6), "hybrid_score": hybrid,
+                 "rerank_score": hybrid}
+            )
+        return results
+
+    def get(self, ids: Iterable[str], *, include_private: bool = False) -> List[Dict[str, Any]]:
+        with self._lock:
+            items = [self._observations.get(observation_id) for observation_id in ids]
+        return [dict(item) for item in items if item is not None and self._visible(item, None, include_private)]
+
+    def timeline(
+        self, observation_id: str, *, before: int = 5, after: int = 5, include_private: bool = False
+    ) -> List[Dict[str, Any]]:
+        with self._lock:
+            center = self._observations.get(observation_id)
+            if center is None:
+                return []
+            session = [self._observations[candidate] for candidate in self._by_session[center.get("session_id")]]
+        session = [item for item in session if item is center or self._visible(item, None, include_private)]
+        position = next(index for index, item in enumerate(session) if item is center)
+        start = max(0, position - before)
+        items = []
+        for offset, item in enumerate(session[start : position + after + 1], start=start):
+            label = "center" if offset == position else ("before" if offset < position else "after")
+            items.append({**item, "position": label})
+        return items
+
+    def resume_pack(
+        self, project: str, *, session_id: Optional[str] = None, limit: int = 5, include_private: bool = False
+    ) -> List[Dict[str, Any]]:
+        limit = max(1, limit)
+        items: List[Dict[str, Any]] = []
+        with self._lock:
+            candidates = reversed(self._by_project.get(project, {})) if project else self._newest_first_locked(None)
+            for observation_id in candidates:
+                item = self._observations[observation_id]
+                if self._visible(item, None, include_private) and (session_id is None or item.get("session_id") != session_id):
+                    items.append(dict(item))
+                    if len(items) == limit:
+                        break
+        return items
+
+    def _newest_first_locked(self, before: Optional[int]) -> Iterator[str]:
+        """Live ids newest first, starting below insertion sequence ``before``."""
+        order = self._order
+        start = len(order) if before is None else min(max(before - 1, 0), len(order))
+        for index in range(start - 1, -1, -1):
+            observation_id = order[index]
+            if observation_id is not None:
+                yield observation_id
+
+    def feed(
+        self,
+        *,
+        cursor: Optional[str] = None,
+        limit: int = 40,
+        project: Optional[str] = None,
+        type: Optional[str] = None,
+        include_private: bool = False,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """One page, newest first.
+
+        Like the daemon's ``(created_at, id)`` cursor, the cursor is a position
+        (the insertion sequence of the last item returned), so deleting items
+        between pages does not disturb pagination.
+        """
+        with self._lock:
+            before = int(cursor) if cursor and cursor.isdigit() else None
+            page: List[Dict[str, Any]] = []
+            has_more = False
+            for observation_id in self._newest_first_locked(before):
+                item = self._observations[observation_id]
+                if not self._visible(item, project, include_private) or (type and item.get("event_type") != type):
+                    continue
+                if len(page) == limit:
+                    has_more = True
+                    break
+                page.append(dict(item))
+            next_cursor = str(self._seq[page[-1]["id"]]) if has_more and page else None
+        return page, next_cursor
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> None:
+        """Append a non-observation event to the stream log."""
+        with self.changed:
+            self._append_event_locked(event_type, data)
+            self.changed.notify_all()
+
+    def events_since(self, last_id: int, limit: int = 200) -> List[Tuple[int, str, Dict[str, Any]]]:
+        with self._lock:
+            # Event ids are consecutive, so the oldest retained one fixes the offset.
+            first_id = self._last_event_id - len(self._events) + 1
+            start = max(last_id + 1 - first_id, 0)
+            return list(itertools.islice(self._events, start, start + limit))
+
+    def wait_for_events(self, last_id: int, timeout: float) -> bool:
+        """Block until an event newer than ``last_id`` exists or ``timeout`` passes."""
+        with self.changed:
+            return self.changed.wait_for(lambda: self._last_event_id > last_id, timeout=timeout)
+
+    def latest_event_id(self) -> int:
+        with self._lock:
+            return self._last_event_id
+
+
+class FakeLeaseStore:
+    """In-memory twin of the daemon's lease store (``lease/lease-store.ts``).
+
+    Exclusivity is per ``(project, target)``; a lease past ``expiresAt`` no
+    longer blocks acquires. ``clock`` (epoch milliseconds) can be replaced to
+    expire leases without sleeping.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._leases: Dict[str, Dict[str, Any]] = {}
+        self.clock = lambda: time.time() * 1000.0
+
+    @staticmethod
+    def _iso(ms: float) -> str:
+        return datetime.fromtimestamp(ms / 1000.0, timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+    def _active_locked(self, lease: Dict[str, Any], now: float) -> bool:
+        return lease["status"] == "active" and lease["_expires_ms"] > now
+
+    def _public(self, lease: Dict[str, Any], now: float) -> Dict[str, Any]:
+        if lease["status"] == "active" and lease["_expires_ms"] <= now:
+            lease["status"] = "expired"
+        return {key: value for key, value in lease.items() if not key.startswith("_")}
+
+    def acquire(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        target = str(body.get("target") or "").strip()
+        agent_id = str(body.get("agent_id") or "").strip()
+        if not target:
+            return {"ok": False, "error": "invalid_target"}
+        if not agent_id:
+            return {"ok": False, "error": "invalid_agent_id"}
+        ttl_ms = body.get("ttl_ms") if isinstance(body.get("ttl_ms"), (int, float)) and body["ttl_ms"] > 0 else 600_000
+        if ttl_ms > 3_600_000:
+            return {"ok": False, "error": "invalid_ttl"}
+        project = body.get("project")
+        with self._lock:
+            now = self.clock()
+            for lease in self._leases.values():
+                if lease["target"] == target and lease["project"] == project and self._active_locked(lease, now):
+                    return {
+                        "ok": False,
+                        "error": "already_leased",
+                        "heldBy": lease["agentId"],
+                        "expiresAt": lease["expiresAt"],
+                        "leaseId": lease["leaseId"],
+                    }
+            lease = {
+                "leaseId": uuid.uuid4().hex,
+                "target": target,
+                "agentId": agent_id,
+                "project": project,
+                "status": "active",
+                "ttlMs": ttl_ms,
+                "acquiredAt": self._iso(now),
+                "renewedAt": None,
+                "expiresAt": self._iso(now + ttl_ms),
+                "releasedAt": None,
+                "metadata": body.get("metadata"),
+                "_expires_ms": now + ttl_ms,
+            }
+            self._leases[lease["leaseId"]] = lease
+            return {"ok": True, "lease": self._public(lease, now)}
+
+    def _owned_locked(self, body: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        lease = self._leases.get(str(body.get("lease_id") or ""))
+        if lease is None:
+            return None, "not_found"
+        if lease["agentId"] != body.get("agent_id"):
+            return None, "not_owner"
+        return lease, None
+
+    def renew(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            lease, error = self._owned_locked(body)
+            if lease is None:
+                return {"ok": False, "error": error}
+            now = self.clock()
+            if not self._active_locked(lease, now):
+                return {"ok": False, "error": "expired"}
+            ttl_ms = body.get("ttl_ms") if isinstance(body.get("ttl_ms"), (int, float)) and body["ttl_ms"] > 0 else lease["ttlMs"]
+            if ttl_ms > 3_600_000:
+                return {"ok": False, "error": "invalid_ttl"}
+            lease.update(
+                ttlMs=ttl_ms, renewedAt=self._iso(now), expiresAt=self._iso(now + ttl_ms), _expires_ms=now + ttl_ms
+            )
+            return {"ok": True, "lease": self._public(lease, now)}
+
+    def release(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            lease, error = self._owned_locked(body)
+            if lease is None:
+                return {"ok": False, "error": error}
+            now = self.clock()
+            lease.update(status="released", releasedAt=self._iso(now))
+            return {"ok": True, "lease": self._public(lease, now)}
+
+    def active(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            now = self.clock()
+            return [self._public(lease, now) for lease in self._leases.values() if self._active_locked(lease, now)]
+
+
+class FakeSignalStore:
+    """In-memory twin of the daemon's signal store (``lease/signal-store.ts``)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._signals: Dict[str, Dict[str, Any]] = {}
+
+    def send(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        sender = str(body.get("from") or "").strip()
+        content = body.get("content")
+        if not sender:
+            return {"ok": False, "error": "invalid_from"}
+        if not isinstance(content, str) or not content:
+            return {"ok": False, "error": "invalid_content"}
+        with self._lock:
+            thread_id = body.get("thread_id") or None
+            project = body.get("project")
+            reply_to = body.get("reply_to") or None
+            if reply_to:
+                parent = self._signals.get(reply_to)
+                if parent is None:
+                    return {"ok": False, "error": "reply_target_missing"}
+                thread_id = parent["threadId"]
+                project = parent["project"] if project is None else project
+            signal_id = uuid.uuid4().hex
+            now = time.time() * 1000.0
+            expires_in_ms = body.get("expires_in_ms")
+            signal = {
+                "signalId": signal_id,
+                "threadId": thread_id or signal_id,
+                "from": sender,
+                "to": body.get("to") or None,
+                "replyTo": reply_to,
+                "content": content,
+                "project": project,
+                "sentAt": FakeLeaseStore._iso(now),
+                "expiresAt": FakeLeaseStore._iso(now + expires_in_ms)
+                if isinstance(expires_in_ms, (int, float)) and expires_in_ms > 0
+                else None,
+                "ackedAt": None,
+                "ackedBy": None,
+                "_seq": len(self._signals),
+            }
+            self._signals[signal_id] = signal
+            return {"ok": True, "signal": self._public(signal)}
+
+    @staticmethod
+    def _public(signal: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in signal.items() if not key.startswith("_")}
+
+    def read(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        agent_id = str(body.get("agent_id") or "")
+        include_broadcast = body.get("include_broadcast") is not False
+        project = body.get("project")
+        limit = int(body["limit"]) if isinstance(body.get("limit"), (int, float)) and body["limit"] > 0 else 100
+        now = FakeLeaseStore._iso(time.time() * 1000.0)
+        with self._lock:
+            matches = []
+            for signal in sorted(self._signals.values(), key=lambda item: item["_seq"]):
+                if signal["ackedAt"] is not None or (signal["expiresAt"] is not None and signal["expiresAt"] <= now):
+                    continue
+                if not (signal["to"] == agent_id or (include_broadcast and signal["to"] is None)):
+                    continue
+                if body.get("thread_id") and signal["threadId"] != body["thread_id"]:
+                    continue
+                if not body.get("all_projects") and signal["project"] not in (None, project):
+                    continue
+                matches.append(self._public(signal))
+                if len(matches) >= limit:
+                    break
+            return {"ok": True, "signals": matches}
+
+    def ack(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            signal = self._signals.get(str(body.get("signal_id") or ""))
+            if signal is None:
+                return {"ok": False, "error": "not_found"}
+            if signal["ackedAt"] is not None:
+                return {"ok": False, "error": "already_acked"}
+            if signal["to"] is not None and signal["to"] != body.get("agent_id"):
+                return {"ok": False, "error": "not_recipient"}
+            signal.update(ackedAt=_now_iso(), ackedBy=body.get("agent_id"))
+            return {"ok": True, "signal": self._public(signal)}
+
+
+@dataclass
+class Fault:
+    """Latency / failure injected on a path (or on every path)."""
+
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+def ingest_knowledge_file(store: FakeStore, body: Dict[str, Any]) -> Dict[str, Any]:
+    """Simplified ``ingestKnowledgeFile``: one observation per ``## `` section or per ADR file."""
+    file_path, content = body.get("file_path"), body.get("content")
+    kind = body.get("kind") or ("decisions_md" if "decisions" in str(file_path).lower() else "adr")
+    project = body.get("project") or "default"
+    documents: List[Tuple[str, str, str]] = []
+    parse_errors = 0
+    if kind == "decisions_md":
+        for section in re.split(r"^(?=## )", content, flags=re.M):
+            if section.startswith("## "):
+                heading = section.split("\n", 1)[0][3:].strip()
+                documents.append((f"decisions-md:{file_path}:{heading}", f"[Decision] {heading}", section))
+    else:
+        match = re.search(r"^# +(.+?)\s*$", content, flags=re.M)
+        if match:
+            documents.append((f"adr-file:{file_path}", f"[ADR] {match.group(1)}", content))
+        else:
+            parse_errors = 1
+    imported = skipped = 0
+    for key, title, text in documents:
+        stored = store.record_event(
+            {
+                "platform": body.get("platform") or "knowledge",
+                "project": project,
+                "session_id": body.get("session_id") or f"knowledge-{kind}",
+                "event_type": "context",
+                "payload": {"title": title, "content": text},
+                "dedupe_hash": hashlib.sha256(key.encode("utf-8")).hexdigest()[:16],
+            }
+        )
+        if stored.get("deduped"):
+            skipped += 1
+        else:
+            imported += 1
+    return {"entries_imported": imported, "entries_skipped": skipped, "parse_errors": parse_errors, "kind": kind}
+
+
+class FakeConsolidation:
+    """Records consolidation runs; ``running_jobs`` simulates a run in progress."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.runs: List[Dict[str, Any]] = []
+        self.running_jobs = 0
+
+    def run(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            self.runs.append(dict(body))
+        return {"reason": body.get("reason") or "manual", "jobs_processed": 1, "facts_extracted": 0}
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": True,
+                "pending_jobs": 0,
+                "running_jobs": self.running_jobs,
+                "failed_jobs": 0,
+                "completed_jobs": len(self.runs),
+            }
+
+
+class FakeSyncStore:
+    """``/v1/sync/*`` store mirroring the daemon's ``mergeChangeset`` / ``buildChangeset``."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.records: Dict[str, Dict[str, Any]] = {}
+        self.max_push_records = 10_000
+        self.pushes: List[int] = []
+
+    def push(self, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        device_id = body.get("device_id") if isinstance(body.get("device_id"), str) else ""
+        if not device_id:
+            return 400, error_envelope("device_id is required")
+        raw = [r for r in (body.get("records") or []) if isinstance(r, dict)]
+        if len(raw) > self.max_push_records:
+            return 400, error_envelope(f"records must not exceed {self.max_push_records} items per push")
+        policy = body.get("conflict_policy") or "last-write-wins"
+        conflicts: List[Dict[str, Any]] = []
+        with self._lock:
+            self.pushes.append(len(raw))
+            for r in raw:
+                remote = {
+                    "id": r.get("id") if isinstance(r.get("id"), str) else "",
+                    "content": r.get("content") if isinstance(r.get("content"), str) else "",
+                    "updated_at": r.get("updated_at") if isinstance(r.get("updated_at"), str) else _now_iso(),
+                    "device_id": r.get("device_id") if isinstance(r.get("device_id"), str) else device_id,
+                }
+                local = self.records.get(remote["id"])
+                if local is None:
+                    self.records[remote["id"]] = remote
+                elif local["updated_at"] != remote["updated_at"]:
+                    if policy == "local-wins":
+                        winner = local
+                    elif policy == "remote-wins":
+                        winner = remote
+                    else:
+                        winner = remote if remote["updated_at"] > local["updated_at"] else local
+                    self.records[remote["id"]] = winner
+                    conflicts.append({"id": remote["id"], "local": local, "remote": remote, "winner": winner})
+            merged = list(self.records.values())
+        return 200, {**envelope([{"merged": merged, "conflicts": conflicts}], ranking="sync_v1"), "source": "sync"}
+
+    def pull(self, query: Dict[str, str]) -> Tuple[int, Dict[str, Any]]:
+        since = query.get("since") or None
+        with self._lock:
+            records = [dict(r) for r in self.records.values() if since is None or r["updated_at"] > since]
+        changeset = {"device_id": query.get("device_id") or "server", "since": since, "records": records}
+        return 200, {**envelope([changeset], ranking="sync_v1"), "source": "sync"}
+
+
+class FakeGraphStore:
+    """``mem_links`` and entities behind ``/v1/graph*``, walked like the daemon's ``getLinks`` / ``getSubgraph``."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.links: List[Dict[str, Any]] = []
+        self.entities: Dict[str, Dict[str, Any]] = {}
+
+    def add_link(self, from_id: str, to_id: str, relation: str = "updates", weight: float = 1.0) -> Dict[str, Any]:
+        now = _now_iso()
+        link = {
+            "from_observation_id": from_id,
+            "to_observation_id": to_id,
+            "relation": relation,
+            "weight": weight,
+            "event_time": None,
+            "observed_at": now,
+            "valid_from": None,
+            "valid_to": None,
+            "supersedes": None,
+            "invalidated_at": None,
+            "created_at": now,
+        }
+        with self._lock:
+            self.links.append(link)
+        return dict(link)
+
+    def add_entity(self, name: str, observation_ids: Iterable[str], entity_type: str = "technology") -> None:
+        with self._lock:
+            entity = self.entities.setdefault(name, {"name": name, "entity_type": entity_type, "observation_ids": []})
+            entity["observation_ids"].extend(i for i in observation_ids if i not in entity["observation_ids"])
+
+    @staticmethod
+    def _depth(raw: Optional[str], default: int) -> int:
+        try:
+            value = int(raw) if raw else default
+        except ValueError:
+            value = default
+        return min(max(value or default, 1), 5)
+
+    def _public_entity(self, entity: Dict[str, Any]) -> Dict[str, Any]:
+        return {"id": entity["name"].lower(), "label": entity["name"], "kind": entity["entity_type"], "type": "other"}
+
+    def neighbors(self, query: Dict[str, str]) -> Tuple[int, Dict[str, Any]]:
+        observation_id = query.get("observation_id") or ""
+        if not observation_id:
+            return 400, error_envelope("observation_id is required")
+        relation = query.get("relation") or None
+        depth = self._depth(query.get("depth"), 1)
+        with self._lock:
+            outgoing: Dict[str, List[Dict[str, Any]]] = {}
+            for link in reversed(self.links):  # ORDER BY created_at DESC
+                if relation is None or link["relation"] == relation:
+                    outgoing.setdefault(link["from_observation_id"], []).append(dict(link))
+            entities = [self._public_entity(e) for e in self.entities.values() if observation_id in e["observation_ids"]]
+        rows: List[Dict[str, Any]] = []
+        processed = {observation_id}
+        frontier = [observation_id]
+        for _ in range(depth):
+            if not frontier:
+                break
+            next_frontier = []
+            for node in frontier:
+                for row in outgoing.get(node, ()):
+                    rows.append(row)
+                    if row["to_observation_id"] not in processed:
+                        processed.add(row["to_observation_id"])
+                        next_frontier.append(row["to_observation_id"])
+            frontier = next_frontier
+        payload = envelope(rows, filters={"observation_id": observation_id, "relation": relation, "depth": depth})
+        return 200, {**payload, "entities": entities, "entity_relations": []}
+
+    def subgraph(self, store: FakeStore, query: Dict[str, str]) -> Tuple[int, Dict[str, Any]]:
+        entity = query.get("entity") or ""
+        if not entity:
+            return 400, error_envelope("entity is required")
+        depth = self._depth(query.get("depth"), 2)
+        node_limit = min(int(query.get("limit") or 100), 100)
+        project = query.get("project") or None
+        with self._lock:
+            matches = [self.entities[entity]] if entity in self.entities else [
+                e for name, e in self.entities.items() if entity in name
+            ]
+            links = [dict(link) for link in self.links]
+            names: Dict[str, List[str]] = {}
+            for e in self.entities.values():
+                for observation_id in e["observation_ids"]:
+                    names.setdefault(observation_id, []).append(e["name"])
+        seeds: List[str] = []
+        for e in matches:
+            for item in store.get(e["observation_ids"], include_private=True):
+                if (project is None or item.get("project") == project) and item["id"] not in seeds:
+                    seeds.append(item["id"])
+        seeds = seeds[: min(50, node_limit)]
+        visited = list(seeds)
+        seen = set(seeds)
+        edges: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        frontier = set(seeds)
+        for _ in range(depth):
+            if not frontier or len(seen) >= node_limit:
+                break
+            next_frontier = set()
+            for link in links:
+                src, tgt = link["from_observation_id"], link["to_observation_id"]
+                if src not in frontier and tgt not in frontier:
+                    continue
+                edges.setdefault(
+                    (src, tgt), {"source": src, "target": tgt, "relation": link["relation"], "weight": link["weight"]}
+                )
+                for node in (src, tgt):
+                    if node not in seen and len(seen) < node_limit:
+                        seen.add(node)
+                        visited.append(node)
+                        next_frontier.add(node)
+            frontier = next_frontier
+        nodes = [
+            {
+                "id": item["id"],
+                "title": item.get("title") or "",
+                "observation_type": item.get("observation_type") or item.get("event_type") or "context",
+                "created_at": item.get("created_at"),
+                "entities": names.get(item["id"], []),
+            }
+            for item in store.get(visited, include_private=True)
+        ]
+        permitted = {node["id"] for node in nodes}
+        kept = [e for e in edges.values() if e["source"] in permitted and e["target"] in permitted]
+        return 200, {"ok": True, "nodes": nodes, "edges": kept, "center_entity": entity, "depth": depth}
+
+    def entity_list(self, store: FakeStore, query: Dict[str, str]) -> Tuple[int, Dict[str, Any]]:
+        project = query.get("project") or None
+        session_id = query.get("session_id") or None
+        limit = min(max(int(query.get("limit") or 50), 1), 200)
+        with self._lock:
+            entities = list(self.entities.values())
+        if project or session_id:
+            def _matches(entity: Dict[str, Any]) -> bool:
+                return any(
+                    (project is None or item.get("project") == project)
+                    and (session_id is None or item.get("session_id") == session_id)
+                    for item in store.get(entity["observation_ids"], include_private=True)
+                )
+
+            entities = [e for e in entities if _matches(e)]
+        entities = list(reversed(entities))[:limit]  # newest first
+        return 200, {"ok": True, "entities": [self._public_entity(e) for e in entities], "relations": []}
+
+
+class FakeHarnessMemServer:
+    def __init__(
+        self,
+        *,
+        store: Optional[FakeStore] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        token: Optional[str] = None,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        seed: Optional[int] = None,
+        stream_ping_sec: float = 5.0,
+        publish_signals: bool = False,
+    ) -> None:
+        self.store = store if store is not None else FakeStore()
+        self.leases = FakeLeaseStore()
+        self.signals = FakeSignalStore()
+        self.consolidation = FakeConsolidation()
+        self.sync = FakeSyncStore()
+        self.graph = FakeGraphStore()
+        self.publish_signals = publish_signals
+        self.token = token
+        self.default_fault = Fault(latency_ms, jitter_ms, error_rate, error_status)
+        self.stream_ping_sec = stream_ping_sec
+        self._faults: Dict[str, Fault] = {}
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._counts_lock = threading.Lock()
+        self.request_counts: Dict[str, int] = {}
+        self.injected_errors = 0
+        self._stopping = threading.Event()
+        self._server = _Server((host, port), self._handler_class())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def client(self, **kwargs: Any) -> HarnessMemClient:
+        """A ``HarnessMemClient`` pointed at this server."""
+        kwargs.setdefault("token", self.token)
+        return HarnessMemClient(base_url=self.base_url, **kwargs)
+
+    def inject(self, path: str, **fault: Any) -> None:
+        """Override latency / errors for ``path``; keys as in ``Fault``."""
+        self._faults[path] = Fault(**fault)
+
+    def clear_faults(self) -> None:
+        self._faults.clear()
+        self.default_fault = Fault()
+
+    def start(self) -> "FakeHarnessMemServer":
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, name="fake-harness-mem", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopping.set()
+        with self.store.changed:
+            self.store.changed.notify_all()
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "FakeHarnessMemServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    # -- request handling -------------------------------------------------
+
+    def _apply_fault(self, path: str) -> Optional[int]:
+        """Sleep for the injected latency; return an error status to send, if any."""
+        fault = self._faults.get(path, self.default_fault)
+        if not (fault.latency_ms or fault.jitter_ms or fault.error_rate):
+            return None
+        with self._random_lock:
+            jitter = self._random.uniform(0, fault.jitter_ms) if fault.jitter_ms else 0.0
+            failed = fault.error_rate > 0 and self._random.random() < fault.error_rate
+        delay = (fault.latency_ms + jitter) / 1000.0
+        if delay > 0:
+            time.sleep(delay)
+        if failed:
+            with self._counts_lock:
+                self.injected_errors += 1
+            return fault.error_status
+        return None
+
+    def _dispatch(self, method: str, path: str, query: Dict[str, str], body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        store = self.store
+        started = time.perf_counter()
+
+        def _ok(items: List[Any], **meta: Any) -> Tuple[int, Dict[str, Any]]:
+            return 200, envelope(items, latency_ms=(time.perf_counter() - started) * 1000, **meta)
+
+        include_private = bool(body.get("include_private")) or query.get("include_private") in ("1", "true")
+        if method == "GET" and path in ("/health", "/v1/health"):
+            return _ok([{"status": "ok", "pid": 0, "backend_mode": "fake", "counts": {"observations": len(store)}}])
+        if method == "POST" and path == "/v1/events/record":
+            event = body.get("event")
+            if not isinstance(event, dict) or not all(
+                event.get(key) for key in ("project", "session_id", "event_type", "platform")
+            ):
+                return 400, error_envelope("event.project / event.session_id / event.event_type / event.platform are required")
+            return _ok([store.record_event(event)])
+        if method == "POST" and path == "/v1/checkpoints/record":
+            if not all(isinstance(body.get(key), str) and body[key] for key in ("session_id", "title", "content")):
+                return 400, error_envelope("session_id / title / content are required")
+            checkpoint = {
+                "platform": body.get("platform") or "claude",
+                "project": body.get("project") or "default",
+                "session_id": body["session_id"],
+                "event_type": "checkpoint",
+                "payload": {"title": body["title"], "content": body["content"]},
+                "tags": body.get("tags") or [],
+                "privacy_tags": body.get("privacy_tags") or [],
+            }
+            return _ok([store.record_event(checkpoint)])
+        if method == "POST" and path == "/v1/search":
+            query_text = body.get("query")
+            if not isinstance(query_text, str) or not query_text.strip():
+                return 400, error_envelope("query is required")
+            items = store.search(
+                query_text, project=body.get("project"), limit=int(body.get("limit") or 20), include_private=include_private
+            )
+            return _ok(items)
+        if method == "POST" and path == "/v1/observations/get":
+            ids = [observation_id for observation_id in body.get("ids") or [] if isinstance(observation_id, str)]
+            if not ids:
+                return 400, error_envelope("ids is required")
+            return _ok(store.get(ids, include_private=include_private))
+        if method == "POST" and path == "/v1/timeline":
+            if not isinstance(body.get("id"), str):
+                return 400, error_envelope("id is required")
+            items = store.timeline(
+                body["id"],
+                before=int(body.get("before", 5)),
+                after=int(body.get("after", 5)),
+                include_private=include_private,
+            )
+            return _ok(items)
+        if method == "POST" and path == "/v1/resume-pack":
+            if not isinstance(body.get("project"), str):
+                return 400, error_envelope("project is required")
+            items = store.resume_pack(
+                body["project"],
+                session_id=body.get("session_id"),
+                limit=int(body.get("limit") or 5),
+                include_private=include_private,
+            )
+            return _ok(items)
+        if method == "GET" and path == "/v1/feed":
+            items, next_cursor = store.feed(
+                cursor=query.get("cursor"),
+                limit=max(1, min(int(query.get("limit") or 40), 200)),
+                project=query.get("project"),
+                type=query.get("type"),
+                include_private=include_private,
+            )
+            return _ok(items, ranking="feed_v1", next_cursor=next_cursor, has_more=next_cursor is not None)
+        if method == "POST" and path in ("/v1/lease/acquire", "/v1/lease/renew", "/v1/lease/release"):
+            if path != "/v1/lease/acquire" and not (body.get("lease_id") and body.get("agent_id")):
+                return 400, error_envelope("lease_id and agent_id are required")
+            return 200, getattr(self.leases, path.rsplit("/", 1)[1])(body)
+        if method == "POST" and path == "/v1/signal/send":
+            result = self.signals.send(body)
+            if result["ok"] and self.publish_signals:
+                signal = result["signal"]
+                store.publish("signal.sent", {"signal_id": signal["signalId"], "to": signal["to"], "project": signal["project"]})
+            return 200, result
+        if method == "POST" and path == "/v1/signal/read":
+            if not body.get("agent_id"):
+                return 400, error_envelope("agent_id is required")
+            return 200, self.signals.read(body)
+        if method == "POST" and path == "/v1/signal/ack":
+            if not (body.get("signal_id") and body.get("agent_id")):
+                return 400, error_envelope("signal_id and agent_id are required")
+            return 200, self.signals.ack(body)
+        if method == "POST" and path in ("/v1/ingest/document", "/v1/ingest/knowledge-file"):
+            if not (isinstance(body.get("file_path"), str) and body["file_path"] and isinstance(body.get("content"), str) and body["content"]):
+                return 200, error_envelope("file_path and content are required")
+            return _ok([ingest_knowledge_file(store, body)], ingest_mode="knowledge_file_v1")
+        if method == "POST" and path == "/v1/admin/consolidation/run":
+            return _ok([self.consolidation.run(body)])
+        if method == "GET" and path == "/v1/admin/consolidation/status":
+            return _ok([self.consolidation.status()])
+        if method == "POST" and path == "/v1/sync/push":
+            return self.sync.push(body)
+        if method == "GET" and path == "/v1/sync/pull":
+            return self.sync.pull(query)
+        if method == "GET" and path == "/v1/graph":
+            return self.graph.subgraph(store, query)
+        if method == "GET" and path == "/v1/graph/neighbors":
+            return self.graph.neighbors(query)
+        if method == "GET" and path == "/v1/graph/entities":
+            return self.graph.entity_list(store, query)
+        if method == "POST" and path == "/v1/observations/bulk-delete":
+            ids = [i for i in body.get("ids") or [] if isinstance(i, str)]
+            if not ids:
+                return 400, error_envelope("ids is required and must not be empty")
+            if len(ids) > 500:
+                return 200, error_envelope(f"ids length exceeds maximum of 500 (got {len(ids)})")
+            deleted = [i for i in ids if store.delete([i])]
+            deleted_set = set(deleted)
+            skipped = [i for i in ids if i not in deleted_set]
+            return _ok([{"deleted": deleted, "skipped": skipped}], deleted_count=len(deleted), skipped_count=len(skipped))
+        if method == "POST" and path == "/v1/admin/forget/plan":
+            candidate_ids = sorted(
+                item["id"] for item in store.feed(limit=len(store) or 1, project=body.get("project"), include_private=True)[0]
+            )[: int(body.get("limit") or 100)]
+            manifest = hashlib.sha256("\n".join(candidate_ids).encode("utf-8")).hexdigest()
+            plan = {"mode": "dry_run_plan", "candidate_ids": candidate_ids, "candidate_count": len(candidate_ids), "manifest_sha256": manifest}
+            return _ok([plan], ranking="forget_plan_v1", candidate_count=len(candidate_ids))
+        if method == "DELETE" and path.startswith("/v1/observations/"):
+            return _ok([{"deleted": store.delete([path[len("/v1/observations/"):]])}])
+        return 404, error_envelope(f"not found: {method} {path}")
+
+    def _stream(self, handler: BaseHTTPRequestHandler, query: Dict[str, str]) -> None:
+        store = self.store
+        include_private = query.get("include_private") in ("1", "true")
+        project = query.get("project") or None
+        type_filter = query.get("type") or None
+        last_id = int(query.get("since") or handler.headers.get("last-event-id") or 0)
+        if query.get("replay") in ("0", "false") and last_id <= 0:
+            last_id = store.latest_event_id()
+
+        def _send(event: str, data: Dict[str, Any], event_id: Optional[int] = None) -> None:
+            prefix = f"id: {event_id}\n" if event_id is not None else ""
+            chunk = f"{prefix}event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8")
+            handler.wfile.write(chunk)
+            handler.wfile.flush()
+
+        handler.send_response(200)
+        handler.send_header("content-type", "text/event-stream; charset=utf-8")
+        handler.send_header("cache-control", "no-store")
+        handler.end_headers()
+        handler.close_connection = True
+        try:
+            _send("ready", {"ts": _now_iso(), "include_private": include_private, "project": project, "type": type_filter})
+            last_ping = time.monotonic()
+            while not self._stopping.is_set():
+                for event_id, event_type, data in store.events_since(last_id):
+                    last_id = event_id
+                    if not self._visible_in_stream(data, project, type_filter, include_private):
+                        continue
+                    _send(event_type, data, event_id)
+                if time.monotonic() - last_ping >= self.stream_ping_sec:
+                    _send("ping", {"ts": _now_iso()})
+                    last_ping = time.monotonic()
+                store.wait_for_events(last_id, timeout=min(self.stream_ping_sec, 1.0))
+        except (BrokenPipeError, ConnectionResetError):
+            return
+
+    @staticmethod
+    def _visible_in_stream(
+        data: Dict[str, Any], project: Optional[str], type_filter: Optional[str], include_private: bool
+    ) -> bool:
+        if not include_private and _is_private(data):
+            return False
+        if project and data.get("project") and data.get("project") != project:
+            return False
+        return not type_filter or data.get("event_type") == type_filter
+
+    def _handler_class(self) -> type:
+        fake = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _respond(self) -> None:
+                parts = urlsplit(self.path)
+                path = parts.path
+                query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+                length = int(self.headers.get("content-length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                with fake._counts_lock:
+                    fake.request_counts[path] = fake.request_counts.get(path, 0) + 1
+
+                if fake.token and self.headers.get("x-harness-mem-token") != fake.token:
+                    return self._write(401, error_envelope("unauthorized"))
+                status = fake._apply_fault(path)
+                if status is not None:
+                    return self._write(status, error_envelope(f"injected fault ({status})"))
+                if self.command == "GET" and path == "/v1/stream":
+                    return fake._stream(self, query)
+                try:
+                    body = json.loads(raw) if raw else {}
+                except ValueError:
+                    return self._write(400, error_envelope("invalid JSON body"))
+                if not isinstance(body, dict):
+                    return self._write(400, error_envelope("JSON body must be an object"))
+                try:
+                    status, payload = fake._dispatch(self.command, path, query, body)
+                except (TypeError, ValueError) as exc:
+                    status, payload = 400, error_envelope(str(exc))
+                self._write(status, payload)
+
+            def _write(self, status: int, payload: Dict[str, Any]) -> None:
+                data = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                self.send_response(status)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_DELETE = _respond
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        return _Handler
@@ -90,6 +90,21 @@ class ResumePackResponse(ApiResponse, total=False):
     items: List[ObservationItem]
 
 
+class IngestItem(TypedDict, total=False):
+    entries_imported: int
+    entries_skipped: int
+    parse_errors: int
+    kind: str
+
+
+class IngestResponse(ApiResponse, total=False):
+    items: List[IngestItem]
+
+
+class ForgetResponse(ApiResponse, total=False):
+    items: List[Dict[str, Any]]
+
+
 class ConsolidationStatusResponse(ApiResponse, total=False):
     items: List[Dict[str, Any]]
 
@@ -106,6 +121,166 @@ class FeedResponse(ApiResponse, total=False):
     items: List[ObservationItem]
 
 
+class ExportResponse(ApiResponse, total=False):
+    items: List[ObservationItem]
+
+
+class LeaseItem(TypedDict, total=False):
+    """Lease row as returned by ``/v1/lease/*`` (camelCase, unlike observations)."""
+
+    leaseId: str
+    target: str
+    agentId: str
+    project: Optional[str]
+    status: Literal["active", "released", "expired"]
+    ttlMs: int
+    acquiredAt: str
+    renewedAt: Optional[str]
+    expiresAt: str
+    releasedAt: Optional[str]
+    metadata: Optional[Dict[str, Any]]
+
+
+class LeaseResponse(TypedDict, total=False):
+    ok: bool
+    lease: LeaseItem
+
+
+# Functional syntax: ``from`` is a keyword. camelCase keys, like leases.
+SignalItem = TypedDict(
+    "SignalItem",
+    {
+        "signalId": str,
+        "threadId": str,
+        "from": str,
+        "to": Optional[str],
+        "replyTo": Optional[str],
+        "content": str,
+        "project": Optional[str],
+        "sentAt": str,
+        "expiresAt": Optional[str],
+        "ackedAt": Optional[str],
+        "ackedBy": Optional[str],
+    },
+    total=False,
+)
+
+
+class SignalResponse(TypedDict, total=False):
+    ok: bool
+    signal: SignalItem
+
+
+class SignalReadResponse(TypedDict, total=False):
+    ok: bool
+    signals: List[SignalItem]
+
+
+class SyncRecord(TypedDict, total=False):
+    """Record exchanged by ``/v1/sync/*``; the daemon keeps only these keys."""
+
+    id: str
+    content: str
+    updated_at: str
+    device_id: str
+
+
+class SyncConflict(TypedDict, total=False):
+    id: str
+    local: SyncRecord
+    remote: SyncRecord
+    winner: SyncRecord
+
+
+class SyncPushItem(TypedDict, total=False):
+    merged: List[SyncRecord]
+    conflicts: List[SyncConflict]
+
+
+class SyncChangeset(TypedDict, total=False):
+    device_id: str
+    since: Optional[str]
+    records: List[SyncRecord]
+
+
+class SyncPushResponse(ApiResponse, total=False):
+    items: List[SyncPushItem]
+
+
+class SyncPullResponse(ApiResponse, total=False):
+    items: List[SyncChangeset]
+
+
+class GraphNode(TypedDict, total=False):
+    id: str
+    title: str
+    observation_type: str
+    created_at: str
+    entities: List[str]
+
+
+class GraphEdge(TypedDict, total=False):
+    source: str
+    target: str
+    relation: str
+    weight: float
+
+
+class GraphResponse(TypedDict, total=False):
+    """Raw ``/v1/graph`` body (no ``items`` / ``meta`` envelope)."""
+
+    ok: bool
+    nodes: List[GraphNode]
+    edges: List[GraphEdge]
+    center_entity: str
+    depth: int
+
+
+class GraphLinkItem(TypedDict, total=False):
+    """A ``mem_links`` row as returned by ``/v1/graph/neighbors``."""
+
+    from_observation_id: str
+    to_observation_id: str
+    relation: str
+    weight: float
+    event_time: Optional[str]
+    observed_at: Optional[str]
+    valid_from: Optional[str]
+    valid_to: Optional[str]
+    supersedes: Optional[str]
+    invalidated_at: Optional[str]
+    created_at: str
+
+
+class GraphEntity(TypedDict, total=False):
+    id: str
+    label: str
+    kind: str
+    type: str
+
+
+class GraphEntityRelation(TypedDict, total=False):
+    src: str
+    dst: str
+    kind: Literal["is_a", "uses", "fixes", "generic"]
+    strength: float
+    observation_id: str
+
+
+class GraphNeighborsResponse(ApiResponse, total=False):
+    items: List[GraphLinkItem]
+    entities: List[GraphEntity]
+    entity_relations: List[GraphEntityRelation]
+
+
+class GraphEntitiesResponse(TypedDict, total=False):
+    """Raw ``/v1/graph/entities`` body."""
+
+    ok: bool
+    entities: List[GraphEntity]
+    relations: List[GraphEntityRelation]
+
+
 class EventEnvelope(TypedDict, total=False):
     event_id: str
     platform: str
@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import subprocess
+import sys
+import threading
+import time
+import unittest
+from typing import List
+
+from harness_mem.aio import AsyncHarnessMemClient, BackgroundWriter
+from harness_mem.errors import HarnessMemAPIError, HarnessMemTransportError
+from harness_mem.instrumentation import ClientHooks, RequestEvent
+from harness_mem.testing import FakeHarnessMemServer, FakeStore
+
+
+def _seed(store: FakeStore) -> None:
+    store.add_observation({"id": "obs_1", "project": "demo", "title": "sqlite wal", "content": "enable wal mode"})
+    store.add_observation({"id": "obs_2", "project": "demo", "title": "bun", "content": "bun runtime notes"})
+
+
+class _Recorder(ClientHooks):
+    def __init__(self) -> None:
+        self.events: List[RequestEvent] = []
+
+    def on_request_end(self, event: RequestEvent) -> None:
+        self.events.append(event)
+
+
+class AsyncClientTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = FakeHarnessMemServer().start()
+        _seed(self.server.store)
+
+    def tearDown(self) -> None:
+        self.server.stop()
+
+    def test_requests_reuse_keep_alive_connection(self) -> None:
+        recorder = _Recorder()
+        client = AsyncHarnessMemClient(base_url=self.server.base_url, hooks=[recorder])
+
+        async def _main():
+            async with client:
+                search = await client.search(query="wal", project="demo")
+                observations = await client.get_observations(ids=["obs_2", "obs_1"])
+                written = await client.record_checkpoint(session_id="s1", title="t", content="async checkpoint", project="demo")
+                return search, observations, written
+
+        search, observations, written = asyncio.run(_main())
+        self.assertEqual([item["id"] for item in search["items"]], ["obs_1"])
+        self.assertEqual([item["id"] for item in observations["items"]], ["obs_2", "obs_1"])
+        self.assertEqual(written["items"][0]["content"], "async checkpoint")
+        self.assertEqual(client.connection_stats()["opened"], 1)
+        self.assertEqual(client.connection_stats()["reused"], 2)
+        self.assertEqual([event.status for event in recorder.events], [200, 200, 200])
+        self.assertEqual(recorder.events[0].endpoint, "/v1/search")
+        self.assertGreater(recorder.events[0].bytes_in, 0)
+
+    def test_api_error_maps_to_harness_mem_api_error(self) -> None:
+        client = AsyncHarnessMemClient(base_url=self.server.base_url)
+        with self.assertRaises(HarnessMemAPIError) as ctx:
+            asyncio.run(client.search(query=""))
+        self.assertEqual(ctx.exception.status_code, 400)
+        self.assertEqual(ctx.exception.message, "query is required")
+
+    def test_read_only_requests_are_retried(self) -> None:
+        self.server.inject("/v1/search", error_rate=1.0, error_status=503)
+        client = AsyncHarnessMemClient(base_url=self.server.base_url, max_retries=2, retry_backoff_sec=0.001)
+        with self.assertRaises(HarnessMemAPIError):
+            asyncio.run(client.search(query="wal"))
+        self.assertEqual(self.server.request_counts["/v1/search"], 3)
+
+    def test_timeout_raises_transport_error(self) -> None:
+        self.server.inject("/v1/search", latency_ms=300)
+        client = AsyncHarnessMemClient(base_url=self.server.base_url, timeout_sec=0.05)
+        with self.assertRaises(HarnessMemTransportError):
+            asyncio.run(client.search(query="wal"))
+
+
+class AsyncTransportTest(unittest.TestCase):
+    """Raw asyncio servers for framing cases the fake server does not produce."""
+
+    def _serve(self, handler, requests):
+        async def _main():
+            server = await asyncio.start_server(handler, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            client = AsyncHarnessMemClient(base_url=f"http://127.0.0.1:{port}")
+            try:
+                results = []
+                for _ in range(requests):
+                    results.append(await client.health())
+                return client, results
+            finally:
+                await client.aclose()
+                server.close()
+                await server.wait_closed()
+
+        return asyncio.run(_main())
+
+    def test_chunked_response(self) -> None:
+        body = json.dumps({"ok": True, "items": [{"status": "ok"}], "meta": {}}).encode()
+
+        async def _handler(reader, writer):
+            while await reader.readline() not in (b"\r\n", b""):
+                pass
+            chunks = b"".join(b"%x\r\n%s\r\n" % (len(part), part) for part in (body[:10], body[10:]))
+            writer.write(b"HTTP/1.1 200 OK\r\ntransfer-encoding: chunked\r\n\r\n" + chunks + b"0\r\n\r\n")
+            await writer.drain()
+            writer.close()
+
+        _, results = self._serve(_handler, 1)
+        self.assertEqual(results[0]["items"], [{"status": "ok"}])
+
+    def test_stale_keep_alive_connection_is_replaced(self) -> None:
+        body = json.dumps({"ok": True, "items": [], "meta": {}}).encode()
+
+        async def _handler(reader, writer):
+            # Answers one request, then drops the connection on the next one like an idle timeout would.
+            for served in range(2):
+                while await reader.readline() not in (b"\r\n", b""):
+                    pass
+                if served:
+                    break
+                writer.write(b"HTTP/1.1 200 OK\r\ncontent-length: %d\r\n\r\n%s" % (len(body), body))
+                await writer.drain()
+            writer.close()
+
+        client, results = self._serve(_handler, 3)
+        self.assertEqual(len(results), 3)
+        self.assertEqual(client.connection_stats()["opened"], 3)
+        self.assertEqual(client.connection_stats()["reused"], 2)
+
+
+    def test_write_is_not_resent_on_a_dropped_keep_alive_connection(self) -> None:
+        body = json.dumps({"ok": True, "items": [], "meta": {}}).encode()
+        seen: List[bytes] = []
+
+        async def _handler(reader, writer):
+            # Answers the first request, then reads the second and drops the connection without a response.
+            for served in range(2):
+                line = await reader.readline()
+                seen.append(line.split(b" ")[1] if line else b"")
+                length = 0
+                while True:
+                    header = await reader.readline()
+                    if header in (b"\r\n", b""):
+                        break
+                    if header.lower().startswith(b"content-length:"):
+                        length = int(header.split(b":")[1])
+                await reader.readexactly(length)
+                if served:
+                    break
+                writer.write(b"HTTP/1.1 200 OK\r\ncontent-length: %d\r\n\r\n%s" % (len(body), body))
+                await writer.drain()
+            writer.close()
+
+        async def _main():
+            server = await asyncio.start_server(_handler, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            client = AsyncHarnessMemClient(base_url=f"http://127.0.0.1:{port}")
+            try:
+                await client.health()
+                with self.assertRaises(HarnessMemTransportError):
+                    await client.record_event(
+                        {"platform": "claude", "project": "p", "session_id": "s", "event_type": "user_prompt"}
+                    )
+                await client.health()  # idempotent requests still recover on a fresh connection
+            finally:
+                await client.aclose()
+                server.close()
+                await server.wait_closed()
+
+        asyncio.run(_main())
+        self.assertEqual(seen.count(b"/v1/events/record"), 1)
+
+
+class BackgroundWriterTest(unittest.TestCase):
+    def test_flush_waits_for_submitted_writes(self) -> None:
+        done: List[int] = []
+        writer = BackgroundWriter(concurrency=2)
+
+        def _write(value: int):
+            async def _run() -> None:
+                await asyncio.sleep(0.01)
+                done.append(value)
+
+            return _run
+
+        for value in range(10):
+            self.assertTrue(writer.submit(_write(value)))
+        self.assertTrue(writer.flush(timeout=5))
+        self.assertEqual(sorted(done), list(range(10)))
+        self.assertEqual(writer.stats(), {"submitted": 10, "completed": 10, "failed": 0, "dropped": 0, "pending": 0})
+        writer.close()
+
+    def test_failures_are_counted_not_raised(self) -> None:
+        errors: List[BaseException] = []
+        writer = BackgroundWriter(on_error=errors.append)
+
+        async def _fail() -> None:
+            raise HarnessMemTransportError(message="down")
+
+        with self.assertLogs("harness_mem", level="WARNING"):
+            writer.submit(_fail)
+            writer.flush(timeout=5)
+        self.assertEqual(writer.stats()["failed"], 1)
+        self.assertEqual(len(errors), 1)
+        writer.close()
+
+    def test_drop_overflow_when_full(self) -> None:
+        release = threading.Event()
+        writer = BackgroundWriter(max_pending=2, concurrency=1, overflow="drop")
+
+        async def _wait() -> None:
+            while not release.is_set():
+                await asyncio.sleep(0.005)
+
+        results = [writer.submit(_wait) for _ in range(4)]
+        release.set()
+        writer.flush(timeout=5)
+        self.assertEqual(results, [True, True, False, False])
+        self.assertEqual(writer.stats()["dropped"], 2)
+        writer.close()
+
+    def test_block_overflow_waits_for_room(self) -> None:
+        writer = BackgroundWriter(max_pending=1, concurrency=1)
+
+        async def _slow() -> None:
+            await asyncio.sleep(0.05)
+
+        started = time.perf_counter()
+        self.assertTrue(writer.submit(_slow))
+        self.assertTrue(writer.submit(_slow))
+        self.assertGreaterEqual(time.perf_counter() - started, 0.04)
+        writer.close()
+        self.assertEqual(writer.stats()["completed"], 2)
+
+    def test_close_drains_runs_on_close_and_rejects_new_writes(self) -> None:
+        closed = []
+
+        async def _on_close() -> None:
+            closed.append(True)
+
+        writer = BackgroundWriter(on_close=_on_close)
+        done = []
+
+        async def _write() -> None:
+            await asyncio.sleep(0.02)
+            done.append(True)
+
+        writer.submit(_write)
+        self.assertTrue(writer.close(timeout=5))
+        self.assertEqual(done, [True])
+        self.assertEqual(closed, [True])
+        with self.assertRaises(RuntimeError):
+            writer.submit(_write)
+
+    def test_asubmit_does_not_block_the_event_loop(self) -> None:
+        writer = BackgroundWriter(max_pending=1, concurrency=1)
+        ticks = []
+
+        async def _slow() -> None:
+            await asyncio.sleep(0.05)
+
+        async def _ticker() -> None:
+            for _ in range(5):
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.005)
+
+        async def _main() -> None:
+            await asyncio.gather(writer.asubmit(_slow), writer.asubmit(_slow), _ticker())
+
+        asyncio.run(_main())
+        writer.close()
+        self.assertEqual(len(ticks), 5)
+        self.assertEqual(writer.stats()["completed"], 2)
+
+
+class LazyImportTest(unittest.TestCase):
+    def test_sync_import_does_not_load_asyncio(self) -> None:
+        code = (
+            "import sys, harness_mem, harness_mem.langchain_memory; "
+            "loaded = 'asyncio' in sys.modules; harness_mem.AsyncHarnessMemClient; "
+            "print(loaded, 'asyncio' in sys.modules)"
+        )
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.split(), ["False", "True"])
+
+
+if __name__ == "__main__":
+    unittest.main()
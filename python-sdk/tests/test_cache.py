@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import json
+import unittest
+from unittest.mock import patch
+
+from harness_mem.cache import ObservationCache, estimate_bytes
+from harness_mem.client import HarnessMemClient
+
+
+class _FakeResponse:
+    def __init__(self, payload: dict) -> None:
+        self._raw = json.dumps(payload).encode("utf-8")
+
+    def read(self) -> bytes:
+        return self._raw
+
+    def __enter__(self) -> "_FakeResponse":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
+def _item(observation_id: str, updated_at: str = "2026-01-01T00:00:00Z") -> dict:
+    return {"id": observation_id, "title": f"title {observation_id}", "updated_at": updated_at}
+
+
+def _observations_urlopen(requests: list):
+    def _urlopen(req, timeout=None):
+        body = json.loads(req.data.decode("utf-8")) if req.data else None
+        requests.append((req.get_method(), req.full_url, body))
+        if req.full_url.endswith("/v1/observations/get"):
+            items = [_item(observation_id) for observation_id in body["ids"] if observation_id != "missing"]
+            return _FakeResponse({"ok": True, "source": "core", "items": items, "meta": {"count": len(items)}})
+        if req.full_url.endswith("/v1/search"):
+            items = [_item("a", updated_at="2026-02-01T00:00:00Z")]
+            return _FakeResponse({"ok": True, "source": "core", "items": items, "meta": {"count": 1}})
+        if req.full_url.endswith("/v1/admin/forget/hard-purge"):
+            item = {"mode": "hard_purge_execute" if body["execute"] else "hard_purge_plan", "candidate_ids": ["b"]}
+            return _FakeResponse({"ok": True, "source": "core", "items": [item], "meta": {"count": 1}})
+        return _FakeResponse({"ok": True, "source": "core", "items": [{"deleted": 1}], "meta": {"count": 1}})
+
+    return _urlopen
+
+
+class ObservationCacheTest(unittest.TestCase):
+    def test_lru_entry_budget(self) -> None:
+        cache = ObservationCache(max_entries=2)
+        cache.put(_item("a"))
+        cache.put(_item("b"))
+        self.assertIsNotNone(cache.get("a"))
+        cache.put(_item("c"))
+
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_byte_budget(self) -> None:
+        size = estimate_bytes(_item("a"))
+        cache = ObservationCache(max_bytes=size * 2 + 1)
+        for observation_id in ("a", "b", "c"):
+            cache.put(_item(observation_id))
+        self.assertEqual(len(cache), 2)
+        self.assertLessEqual(cache.stats()["bytes"], cache.max_bytes)
+
+    def test_variants_are_cached_separately(self) -> None:
+        cache = ObservationCache()
+        cache.put(_item("a"), compact=True, include_private=False)
+        self.assertIsNone(cache.get("a", compact=False))
+        self.assertIsNone(cache.get("a", include_private=True))
+        self.assertIsNotNone(cache.get("a"))
+
+    def test_observe_drops_entries_with_newer_updated_at(self) -> None:
+        cache = ObservationCache()
+        cache.put(_item("a"))
+        cache.observe([_item("a")])
+        self.assertIsNotNone(cache.get("a"))
+        cache.observe([_item("a", updated_at="2026-03-01T00:00:00Z")])
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["stale"], 1)
+
+    def test_ttl_expires_entries(self) -> None:
+        cache = ObservationCache(ttl_sec=10)
+        with patch("harness_mem.cache.time.monotonic", return_value=100.0):
+            cache.put(_item("a"))
+        with patch("harness_mem.cache.time.monotonic", return_value=105.0):
+            self.assertIsNotNone(cache.get("a"))
+        with patch("harness_mem.cache.time.monotonic", return_value=111.0):
+            self.assertIsNone(cache.get("a"))
+
+    def test_entries_expire_by_default(self) -> None:
+        cache = ObservationCache()
+        with patch("harness_mem.cache.time.monotonic", return_value=100.0):
+            cache.put(_item("a"))
+        with patch("harness_mem.cache.time.monotonic", return_value=100.0 + cache.ttl_sec + 1):
+            self.assertIsNone(cache.get("a"))
+
+
+class ClientObservationCacheTest(unittest.TestCase):
+    def test_only_missing_ids_are_fetched(self) -> None:
+        requests: list = []
+        client = HarnessMemClient(observation_cache=ObservationCache())
+        with patch("harness_mem.client.urlopen", side_effect=_observations_urlopen(requests)):
+            client.get_observations(ids=["a", "b"])
+            response = client.get_observations(ids=["b", "c", "a", "missing"])
+
+        self.assertEqual([body["ids"] for _, _, body in requests], [["a", "b"], ["c", "missing"]])
+        self.assertEqual([item["id"] for item in response["items"]], ["b", "c", "a"])
+        self.assertEqual(response["meta"]["count"], 3)
+
+    def test_full_hit_sends_no_request(self) -> None:
+        requests: list = []
+        client = HarnessMemClient(observation_cache=ObservationCache())
+        with patch("harness_mem.client.urlopen", side_effect=_observations_urlopen(requests)):
+            client.get_observations(ids=["a"])
+            response = client.get_observations(ids="a")
+
+        self.assertEqual(len(requests), 1)
+        self.assertTrue(response["ok"])
+        self.assertEqual(response["items"][0]["id"], "a")
+
+    def test_search_results_invalidate_stale_entries(self) -> None:
+        requests: list = []
+        cache = ObservationCache()
+        client = HarnessMemClient(observation_cache=cache)
+        with patch("harness_mem.client.urlopen", side_effect=_observations_urlopen(requests)):
+            client.get_observations(ids=["a"])
+            client.search(query="anything")
+            client.get_observations(ids=["a"])
+
+        self.assertEqual(sum(1 for _, url, _ in requests if url.endswith("/v1/observations/get")), 2)
+
+    def test_deletes_invalidate_cached_ids(self) -> None:
+        requests: list = []
+        cache = ObservationCache()
+        client = HarnessMemClient(observation_cache=cache)
+        with patch("harness_mem.client.urlopen", side_effect=_observations_urlopen(requests)):
+            client.get_observations(ids=["a", "b", "c"])
+            client.delete_observation("a")
+            client.bulk_delete_observations(["b"])
+
+        self.assertEqual(requests[1][:2], ("DELETE", "http://127.0.0.1:37888/v1/observations/a"))
+        self.assertEqual(requests[2][2], {"ids": ["b"]})
+        self.assertEqual(len(cache), 1)
+        self.assertIsNotNone(cache.get("c"))
+
+    def test_executed_hard_purge_invalidates_purged_ids(self) -> None:
+        requests: list = []
+        cache = ObservationCache()
+        client = HarnessMemClient(observation_cache=cache)
+        with patch("harness_mem.client.urlopen", side_effect=_observations_urlopen(requests)):
+            client.get_observations(ids=["a", "b", "c"])
+            client.forget_hard_purge(target_ids=["b"])
+            self.assertEqual(len(cache), 3)  # a plan deletes nothing
+            client.forget_hard_purge(target_ids=["b"], execute=True, confirmation="purge")
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(len(cache), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+import unittest
+from unittest.mock import patch
+
+from harness_mem.client import HarnessMemClient
+from harness_mem.codec import StdlibJsonCodec, get_codec
+from harness_mem.errors import HarnessMemAPIError, HarnessMemTransportError
+
+try:
+    import orjson  # noqa: F401
+
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import msgspec  # noqa: F401
+
+    HAS_MSGSPEC = True
+except ImportError:
+    HAS_MSGSPEC = False
+
+
+class _FakeResponse:
+    def __init__(self, raw: bytes) -> None:
+        self._raw = raw
+
+    def read(self) -> bytes:
+        return self._raw
+
+    def __enter__(self) -> "_FakeResponse":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
+_SEARCH_PAYLOAD = {
+    "ok": True,
+    "source": "core",
+    "items": [
+        {
+            "id": "obs-1",
+            "project": "proj",
+            "title": "日本語タイトル",
+            "content": "content",
+            "tags": ["a", "b"],
+            "hybrid_score": 0.75,
+        }
+    ],
+    "meta": {"count": 1, "latency_ms": 3, "token_estimate": {"total_tokens": 12}},
+}
+
+
+class CodecTest(unittest.TestCase):
+    def test_stdlib_codec_round_trip_keeps_non_ascii(self) -> None:
+        codec = StdlibJsonCodec()
+        encoded = codec.encode({"title": "日本語"})
+        self.assertIn("日本語".encode("utf-8"), encoded)
+        self.assertEqual(codec.decode(encoded), {"title": "日本語"})
+
+    def test_get_codec_rejects_unknown_name(self) -> None:
+        with self.assertRaises(ValueError):
+            get_codec("yaml")
+
+    def test_client_uses_codec_for_request_body(self) -> None:
+        client = HarnessMemClient(base_url="http://example.local")
+        raw = json.dumps(_SEARCH_PAYLOAD).encode("utf-8")
+        with patch("harness_mem.client.urlopen", return_value=_FakeResponse(raw)) as mocked:
+            result = client.search(query="日本語")
+
+        request = mocked.call_args.args[0]
+        self.assertEqual(json.loads(request.data)["query"], "日本語")
+        self.assertEqual(result["items"][0]["id"], "obs-1")
+
+    def test_invalid_json_raises_transport_error(self) -> None:
+        client = HarnessMemClient(base_url="http://example.local")
+        with patch("harness_mem.client.urlopen", return_value=_FakeResponse(b"{not json")):
+            with self.assertRaises(HarnessMemTransportError):
+                client.health()
+
+    @unittest.skipUnless(HAS_ORJSON, "orjson is not installed")
+    def test_orjson_codec_decodes_search(self) -> None:
+        client = HarnessMemClient(base_url="http://example.local", codec=get_codec("orjson"))
+        raw = json.dumps(_SEARCH_PAYLOAD).encode("utf-8")
+        with patch("harness_mem.client.urlopen", return_value=_FakeResponse(raw)):
+            result = client.search(query="x")
+        self.assertEqual(result["items"][0]["tags"], ["a", "b"])
+
+
+@unittest.skipUnless(HAS_MSGSPEC, "msgspec is not installed")
+class MsgspecTypedCodecTest(unittest.TestCase):
+    def _client(self) -> HarnessMemClient:
+        return HarnessMemClient(base_url="http://example.local", codec=get_codec("msgspec", typed=True))
+
+    def test_search_decodes_into_structs_with_dict_access(self) -> None:
+        raw = json.dumps(_SEARCH_PAYLOAD).encode("utf-8")
+        with patch("harness_mem.client.urlopen", return_value=_FakeResponse(raw)):
+            result = self._client().search(query="x")
+
+        item = result["items"][0]
+        self.assertTrue(hasattr(item, "__struct_fields__"))
+        self.assertEqual(item["title"], "日本語タイトル")
+        self.assertEqual(item.get("hybrid_score"), 0.75)
+        self.assertIsNone(item.get("rerank_score"))
+        self.assertNotIn("rerank_score", item)
+        self.assertEqual(result["meta"]["token_estimate"]["total_tokens"], 12)
+
+    def test_typed_search_keeps_daemon_fields(self) -> None:
+        payload = {
+            "ok": True,
+            "items": [{"id": "a", "observation_type": "decision", "scores": {"final": 0.5}, "reason": "lexical"}],
+            "meta": {"count": 1, "sla_latency_ms": 200, "question_kind": "fact"},
+        }
+        with patch("harness_mem.client.urlopen", return_value=_FakeResponse(json.dumps(payload).encode("utf-8"))):
+            result = self._client().search(query="x")
+        item = result["items"][0]
+        self.assertEqual((item["observation_type"], item["scores"], item["reason"]), ("decision", {"final": 0.5}, "lexical"))
+        self.assertEqual(result["meta"]["sla_latency_ms"], 200)
+        self.assertEqual(result["meta"]["question_kind"], "fact")
+
+    def test_other_observation_responses_are_not_narrowed(self) -> None:
+        payload = {
+            "ok": True,
+            "items": [{"id": "a", "type": "observation", "summary": "s", "position": "center"}],
+            "meta": {"count": 1, "summary": "session summary", "continuity_briefing": {"title": "t"}},
+        }
+        client = self._client()
+        for call in (lambda: client.timeline("a"), lambda: client.resume_pack(project="p")):
+            with patch("harness_mem.client.urlopen", return_value=_FakeResponse(json.dumps(payload).encode("utf-8"))):
+                result = call()
+            self.assertEqual(result, payload)
+
+    def test_untyped_endpoints_still_return_dicts(self) -> None:
+        raw = json.dumps({"ok": True, "items": [{"status": "ok"}]}).encode("utf-8")
+        with patch("harness_mem.client.urlopen", return_value=_FakeResponse(raw)):
+            result = self._client().health()
+        self.assertIsInstance(result, dict)
+
+    def test_ok_false_raises_api_error_with_dict_body(self) -> None:
+        raw = json.dumps({"ok": False, "error": "boom"}).encode("utf-8")
+        with patch("harness_mem.client.urlopen", return_value=_FakeResponse(raw)):
+            with self.assertRaises(HarnessMemAPIError) as ctx:
+                self._client().search(query="x")
+        self.assertEqual(ctx.exception.message, "boom")
+        self.assertEqual(ctx.exception.response_body, {"ok": False, "error": "boom"})
+
+
+
+class LazyBackendImportTest(unittest.TestCase):
+    def test_import_loads_no_optional_backend(self) -> None:
+        code = (
+            "import sys, harness_mem; harness_mem.HarnessMemClient(); "
+            "print(sorted(m for m in ('msgspec', 'orjson', 'logging', 'concurrent.futures') if m in sys.modules))"
+        )
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.strip(), "[]")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import json
+import math
+import subprocess
+import sys
+import unittest
+from unittest.mock import patch
+
+from harness_mem.client import HarnessMemClient
+from harness_mem.columns import to_columns
+from harness_mem.rows import ObservationRows
+
+try:
+    import numpy as np
+
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+
+class _FakeResponse:
+    def __init__(self, payload: dict) -> None:
+        self._raw = json.dumps(payload).encode("utf-8")
+
+    def read(self) -> bytes:
+        return self._raw
+
+    def __enter__(self) -> "_FakeResponse":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
+_ITEMS = [
+    {"id": "a", "project": "p1", "platform": "codex", "similarity": 0.9, "hybrid_score": 0.8, "tags": ["x"]},
+    {"id": "b", "project": "p2", "platform": "codex", "similarity": 0.5, "rerank_score": 0.4},
+    {"id": "c", "project": "p1", "recency": 1},
+]
+
+
+class ToColumnsTest(unittest.TestCase):
+    def test_scores_are_contiguous_doubles_with_nan_for_missing(self) -> None:
+        columns = to_columns({"ok": True, "items": _ITEMS})
+
+        self.assertEqual(len(columns), 3)
+        self.assertEqual(columns.scores["similarity"].typecode, "d")
+        self.assertEqual(list(columns.scores["similarity"])[:2], [0.9, 0.5])
+        self.assertTrue(math.isnan(columns.scores["similarity"][2]))
+        self.assertEqual(columns.scores["recency"][2], 1.0)
+
+    def test_strings_are_dictionary_encoded(self) -> None:
+        columns = to_columns(_ITEMS)
+
+        project = columns.dictionaries["project"]
+        self.assertEqual(project.values, ["p1", "p2"])
+        self.assertEqual(list(project.codes), [0, 1, 0])
+        self.assertEqual(columns.dictionaries["platform"].decode(), ["codex", "codex", None])
+        self.assertEqual(columns.strings["id"], ["a", "b", "c"])
+        self.assertEqual(columns.tags, [["x"], [], []])
+
+    def test_rows_expose_to_columns(self) -> None:
+        rows = ObservationRows(_ITEMS)
+        self.assertEqual(rows.to_columns().strings["id"], ["a", "b", "c"])
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy is not installed")
+    def test_to_numpy_returns_float_arrays_and_codes(self) -> None:
+        arrays = to_columns(_ITEMS).to_numpy()
+
+        self.assertEqual(arrays["hybrid_score"].dtype, np.float64)
+        self.assertAlmostEqual(float(np.nansum(arrays["hybrid_score"])), 0.8)
+        project = arrays["project"]
+        self.assertEqual(list(project.dictionary[project.codes]), ["p1", "p2", "p1"])
+
+    def test_optional_backends_are_not_imported_eagerly(self) -> None:
+        code = "import sys, harness_mem; print(sorted(m for m in ('numpy', 'pyarrow') if m in sys.modules))"
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.strip(), "[]")
+
+
+class StreamingIteratorTest(unittest.TestCase):
+    def test_iter_feed_follows_next_cursor(self) -> None:
+        pages = [
+            {"ok": True, "items": _ITEMS[:2], "meta": {"next_cursor": "c1", "has_more": True}},
+            {"ok": True, "items": _ITEMS[2:], "meta": {"next_cursor": None, "has_more": False}},
+        ]
+        client = HarnessMemClient(base_url="http://example.local")
+        with patch(
+            "harness_mem.client.urlopen", side_effect=[_FakeResponse(page) for page in pages]
+        ) as mocked:
+            ids = [item["id"] for item in client.iter_feed(page_size=2, project="p1")]
+
+        self.assertEqual(ids, ["a", "b", "c"])
+        self.assertEqual(mocked.call_count, 2)
+        self.assertIn("cursor=c1", mocked.call_args_list[1].args[0].full_url)
+
+    def test_iter_export_to_columns(self) -> None:
+        client = HarnessMemClient(base_url="http://example.local")
+        with patch("harness_mem.client.urlopen", return_value=_FakeResponse({"ok": True, "items": _ITEMS})) as mocked:
+            columns = client.iter_export(project="p1", limit=10).to_columns()
+
+        self.assertIn("/v1/export", mocked.call_args.args[0].full_url)
+        self.assertEqual(len(columns), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
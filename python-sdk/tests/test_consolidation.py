@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import time
+import unittest
+
+from harness_mem.consolidation import ConsolidationScheduler
+from harness_mem.lease import LeaseManager
+from harness_mem.testing import FakeHarnessMemServer
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _event(project: str, session_id: str) -> dict:
+    return {
+        "platform": "claude",
+        "project": project,
+        "session_id": session_id,
+        "event_type": "user_prompt",
+        "payload": {"content": "hello"},
+    }
+
+
+class ConsolidationSchedulerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = FakeHarnessMemServer().start()
+        self.clock = _Clock()
+
+    def tearDown(self) -> None:
+        self.server.stop()
+
+    def _scheduler(self, **kwargs) -> ConsolidationScheduler:
+        client = self.server.client()
+        kwargs.setdefault("jitter_sec", 0)
+        scheduler = ConsolidationScheduler(client, clock=self.clock, seed=1, **kwargs)
+        client.hooks.append(scheduler)
+        return scheduler
+
+    def test_counts_successful_writes_per_project(self) -> None:
+        scheduler = self._scheduler()
+        client = scheduler.client
+        client.record_event(_event("a", "s1"))
+        client.record_event(_event("a", "s2"))
+        client.record_checkpoint(session_id="s3", title="t", content="c", project="b")
+        client.search(query="hello", project="a")
+        self.assertEqual(scheduler.stats()["pending_writes"], {"a": 2, "b": 1})
+
+    def test_threshold_triggers_one_targeted_run_per_session(self) -> None:
+        scheduler = self._scheduler(write_threshold=3)
+        for session_id in ("s1", "s2", "s2"):
+            scheduler.client.record_event(_event("a", session_id))
+        self.assertEqual(scheduler.run_due(), ["a"])
+        runs = self.server.consolidation.runs
+        self.assertEqual([(run["project"], run["session_id"]) for run in runs], [("a", "s1"), ("a", "s2")])
+        self.assertEqual(runs[0]["reason"], "python-sdk-scheduler")
+        self.assertEqual(scheduler.stats()["pending_writes"], {})
+
+    def test_sessions_beyond_the_cap_wait_for_the_next_run(self) -> None:
+        scheduler = self._scheduler(write_threshold=1, max_sessions_per_run=2, min_interval_sec=0, idle_sec=10)
+        for session_id in ("s1", "s2", "s3"):
+            scheduler.record_write("a", session_id)
+        self.assertEqual(scheduler.run_due(), ["a"])
+        self.assertEqual(scheduler.stats()["pending_writes"], {"a": 3})
+        self.assertEqual(scheduler.run_due(), ["a"])
+        self.assertEqual([run["session_id"] for run in self.server.consolidation.runs], ["s1", "s2", "s3"])
+        self.assertEqual(scheduler.stats()["pending_writes"], {})
+
+    def test_writes_without_a_session_are_not_run_untargeted(self) -> None:
+        scheduler = self._scheduler(write_threshold=1)
+        scheduler.record_write("a")
+        self.assertEqual(scheduler.run_due(), [])
+        self.assertEqual(self.server.consolidation.runs, [])
+        self.assertEqual(scheduler.stats()["pending_writes"], {})
+
+    def test_idle_window_triggers_below_threshold(self) -> None:
+        scheduler = self._scheduler(write_threshold=100, idle_sec=60)
+        scheduler.record_write("a", "s1")
+        self.clock.now += 30
+        self.assertEqual(scheduler.run_due(), [])
+        scheduler.record_write("a", "s1")
+        self.clock.now += 59
+        self.assertEqual(scheduler.run_due(), [])
+        self.clock.now += 1
+        self.assertEqual(scheduler.run_due(), ["a"])
+
+    def test_min_interval_limits_run_rate(self) -> None:
+        scheduler = self._scheduler(write_threshold=1, min_interval_sec=300)
+        scheduler.record_write("a", "s1")
+        self.assertEqual(scheduler.run_due(), ["a"])
+        scheduler.record_write("a", "s1")
+        self.clock.now += 100
+        self.assertEqual(scheduler.run_due(), [])
+        self.clock.now += 200
+        self.assertEqual(scheduler.run_due(), ["a"])
+        self.assertEqual(len(self.server.consolidation.runs), 2)
+
+    def test_jitter_delays_start(self) -> None:
+        scheduler = self._scheduler(write_threshold=1, jitter_sec=10)
+        scheduler.record_write("a", "s1")
+        self.assertEqual(scheduler.run_due(), [])
+        self.clock.now += 10
+        self.assertEqual(scheduler.run_due(), ["a"])
+
+    def test_postpones_while_daemon_is_running(self) -> None:
+        scheduler = self._scheduler(write_threshold=1, check_interval_sec=5)
+        scheduler.record_write("a", "s1")
+        self.server.consolidation.running_jobs = 1
+        self.assertEqual(scheduler.run_due(), [])
+        self.assertEqual(scheduler.stats()["postponed"], 1)
+        self.server.consolidation.running_jobs = 0
+        self.assertEqual(scheduler.run_due(), [])  # still inside the postponement
+        self.clock.now += 5
+        self.assertEqual(scheduler.run_due(), ["a"])
+
+    def test_failed_run_keeps_writes(self) -> None:
+        scheduler = self._scheduler(write_threshold=1, min_interval_sec=0)
+        self.server.inject("/v1/admin/consolidation/run", error_rate=1.0, error_status=500)
+        scheduler.record_write("a", "s1")
+        self.assertEqual(scheduler.run_due(), [])
+        self.assertEqual(scheduler.stats()["failures"], 1)
+        self.assertEqual(scheduler.stats()["pending_writes"], {"a": 1})
+        self.server.clear_faults()
+        self.assertEqual(scheduler.run_due(), ["a"])
+
+    def test_lease_makes_runs_exclusive(self) -> None:
+        with LeaseManager(self.server.client(), agent_id="other") as other:
+            held = other.acquire("consolidation:a")
+            with LeaseManager(self.server.client(), agent_id="me") as leases:
+                scheduler = self._scheduler(write_threshold=1, lease_manager=leases)
+                scheduler.record_write("a", "s1")
+                self.assertEqual(scheduler.run_due(), [])
+                held.release()
+                self.clock.now += 60
+                self.assertEqual(scheduler.run_due(), ["a"])
+        self.assertEqual(self.server.leases.active(), [])
+
+    def test_background_thread(self) -> None:
+        client = self.server.client()
+        with ConsolidationScheduler(client, write_threshold=1, jitter_sec=0, check_interval_sec=0.02) as scheduler:
+            scheduler.record_write("a", "s1")
+            deadline = time.monotonic() + 5
+            while not self.server.consolidation.runs and time.monotonic() < deadline:
+                time.sleep(0.01)
+        self.assertEqual(len(self.server.consolidation.runs), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,11 @@
 """harness_mem.crewai_memory のユニットテスト。"""
 from __future__ import annotations
 
+import asyncio
+import threading
+import time
 import unittest
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List
 from unittest.mock import MagicMock, call
 
 
@@ -82,6 +85,17 @@ class TestHarnessMemCrewAIMemorySearch(unittest.TestCase):
         kwargs = client.search.call_args.kwargs
         self.assertEqual(kwargs["project"], "my-project")
 
+    def test_search_passes_reranker(self) -> None:
+        """reranker が client.search に渡されること。"""
+        from harness_mem.rerank import WeightedReranker
+
+        client = _make_client()
+        reranker = WeightedReranker(tag_boosts={"decision": 0.2})
+        mem = self.cls(client, reranker=reranker)
+        mem.search("query")
+
+        self.assertIs(client.search.call_args.kwargs["reranker"], reranker)
+
     def test_search_returns_empty_list_when_no_results(self) -> None:
         """検索結果が空の場合、空リストを返すこと。"""
         client = _make_client([])
@@ -198,5 +212,186 @@ class TestHarnessMemCrewAIMemoryReset(unittest.TestCase):
         self.assertIsNone(result)
 
 
+class TestHarnessMemCrewAIMemorySearchCoalescing(unittest.TestCase):
+    """同一クエリの検索共有のテスト。"""
+
+    def setUp(self) -> None:
+        from harness_mem.crewai_memory import HarnessMemCrewAIMemory
+        self.cls = HarnessMemCrewAIMemory
+
+    def test_concurrent_identical_searches_hit_client_once(self) -> None:
+        """複数エージェントが同時に同じ検索をしても client.search は 1 回だけ呼ばれること。"""
+        client = _make_client([{"id": "obs-1", "content": "共有される結果"}])
+
+        def _slow_search(**kwargs: Any) -> Dict[str, Any]:
+            time.sleep(0.1)
+            return {"ok": True, "items": [{"id": "obs-1", "content": "共有される結果"}]}
+
+        client.search.side_effect = _slow_search
+        mem = self.cls(client, coalesce_window_ms=0)
+        results: List[Any] = []
+        threads = [threading.Thread(target=lambda: results.append(mem.search("TypeScript"))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        self.assertEqual(client.search.call_count, 1)
+        self.assertEqual(len(results), 4)
+        self.assertTrue(all(r[0]["content"] == "共有される結果" for r in results))
+
+    def test_results_are_reused_within_window(self) -> None:
+        """coalesce_window_ms 以内の同じ検索は結果を再利用すること。"""
+        client = _make_client()
+        mem = self.cls(client, coalesce_window_ms=500)
+        mem.search("query")
+        mem.search("query")
+        mem.search("query", limit=2)
+
+        self.assertEqual(client.search.call_count, 2)
+        self.assertEqual(mem.search_stats()["deduplicated"], 1)
+
+    def test_completed_results_are_not_reused_by_default(self) -> None:
+        """既定では終わった検索の結果を再利用しないこと。"""
+        client = _make_client()
+        mem = self.cls(client)
+        mem.search("query")
+        mem.search("query")
+        self.assertEqual(client.search.call_count, 2)
+
+    def test_window_expires(self) -> None:
+        """ウィンドウを過ぎた検索は再実行されること。"""
+        client = _make_client()
+        mem = self.cls(client, coalesce_window_ms=20)
+        mem.search("query")
+        time.sleep(0.05)
+        mem.search("query")
+        self.assertEqual(client.search.call_count, 2)
+
+    def test_failed_search_is_not_reused(self) -> None:
+        """失敗した検索結果は共有されないこと。"""
+        client = _make_client()
+        client.search.side_effect = [RuntimeError("daemon down"), {"ok": True, "items": []}]
+        mem = self.cls(client, coalesce_window_ms=500)
+        with self.assertRaises(RuntimeError):
+            mem.search("query")
+        self.assertEqual(mem.search("query"), [])
+
+    def test_save_invalidates_shared_results(self) -> None:
+        """save() の後の検索は新しく実行されること。"""
+        client = _make_client()
+        mem = self.cls(client, coalesce_window_ms=500)
+        mem.search("query")
+        mem.save("新しい判断")
+        mem.search("query")
+        self.assertEqual(client.search.call_count, 2)
+
+    def test_asearch(self) -> None:
+        """asearch() が search() と同じ結果を返すこと。"""
+        client = _make_client([{"id": "obs-1", "content": "非同期"}])
+        mem = self.cls(client)
+
+        async def _agents() -> List[Any]:
+            return await asyncio.gather(mem.asearch("q"), mem.asearch("q"))
+
+        first, second = asyncio.run(_agents())
+        self.assertEqual(first, second)
+        self.assertEqual(first[0]["content"], "非同期")
+
+
+class TestHarnessMemCrewAIMemoryWriteBehind(unittest.TestCase):
+    """write_behind モードのテスト。"""
+
+    def setUp(self) -> None:
+        from harness_mem.crewai_memory import HarnessMemCrewAIMemory
+        self.cls = HarnessMemCrewAIMemory
+
+    def test_save_returns_before_the_write(self) -> None:
+        """save() が送信を待たずに戻り、reset() で送り切ること。"""
+        client = _make_client()
+        mem = self.cls(client, write_behind=True, flush_interval_sec=60)
+        mem.save("後で送る")
+        client.record_event.assert_not_called()
+
+        mem.reset()
+        client.record_event.assert_called_once()
+        event = client.record_event.call_args.args[0]
+        self.assertEqual(event["content"], "後で送る")
+        self.assertIn("ts", event)
+        mem.close()
+
+    def test_full_batch_is_sent_without_waiting_for_interval(self) -> None:
+        """batch_size 件たまるとインターバルを待たずに送ること。"""
+        client = _make_client()
+        mem = self.cls(client, write_behind=True, batch_size=3, flush_interval_sec=60)
+        for index in range(3):
+            mem.save(f"item {index}")
+
+        deadline = time.monotonic() + 5
+        while client.record_event.call_count < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(client.record_event.call_count, 3)
+        mem.close()
+
+    def test_interval_flushes_partial_batch(self) -> None:
+        """flush_interval_sec が経過すると batch_size 未満でも送ること。"""
+        client = _make_client()
+        mem = self.cls(client, write_behind=True, batch_size=100, flush_interval_sec=0.05)
+        mem.save("partial")
+        deadline = time.monotonic() + 5
+        while client.record_event.call_count < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        client.record_event.assert_called_once()
+        mem.close()
+
+    def test_failures_are_counted_not_raised(self) -> None:
+        """送信失敗は例外にならず write_stats に数えられること。"""
+        client = _make_client()
+        client.record_event.side_effect = [RuntimeError("daemon down"), {"ok": True}]
+        mem = self.cls(client, write_behind=True)
+        mem.save("a")
+        mem.save("b")
+        with self.assertLogs("harness_mem", level="WARNING"):
+            self.assertTrue(mem.flush(timeout=5))
+        stats = mem.write_stats()
+        self.assertEqual((stats["completed"], stats["failed"], stats["pending"]), (1, 1, 0))
+        mem.close()
+
+    def test_close_drains_and_rejects_new_saves(self) -> None:
+        """close() が未送信分を送り、以降の save() を拒否すること。"""
+        client = _make_client()
+        mem = self.cls(client, write_behind=True, flush_interval_sec=60)
+        for index in range(5):
+            mem.save(f"item {index}")
+        self.assertTrue(mem.close(timeout=5))
+        self.assertEqual(client.record_event.call_count, 5)
+        with self.assertRaises(RuntimeError):
+            mem.save("too late")
+
+    def test_asave_enqueues(self) -> None:
+        """asave() が write-behind バッファに積むこと。"""
+        client = _make_client()
+        mem = self.cls(client, write_behind=True, flush_interval_sec=60)
+        asyncio.run(mem.asave("async item", metadata={"tags": ["crew"]}))
+        self.assertTrue(mem.flush(timeout=5))
+        event = client.record_event.call_args.args[0]
+        self.assertEqual(event["tags"], ["crew"])
+        mem.close()
+
+    def test_asave_without_write_behind(self) -> None:
+        """write_behind なしの asave() はそのまま record_event を呼ぶこと。"""
+        client = _make_client()
+        mem = self.cls(client)
+        asyncio.run(mem.asave("direct"))
+        client.record_event.assert_called_once()
+
+    def test_invalid_options(self) -> None:
+        """不正なオプションは ValueError になること。"""
+        with self.assertRaises(ValueError):
+            self.cls(_make_client(), batch_size=0)
+        with self.assertRaises(ValueError):
+            self.cls(_make_client(), coalesce_window_ms=-1)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import threading
+import unittest
+
+from harness_mem import HarnessMemAPIError
+from harness_mem.graph import AdjacencyCache, GraphExpander, complete_adjacency
+from harness_mem.testing import FakeHarnessMemServer
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _link(src: str, dst: str) -> dict:
+    return {"from_observation_id": src, "to_observation_id": dst, "relation": "updates"}
+
+
+class GraphClientTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = FakeHarnessMemServer().start()
+        self.client = self.server.client()
+        for name in ("a", "b", "c", "d"):
+            self.server.store.add_observation({"id": name, "project": "p", "title": name.upper()})
+        self.server.graph.add_link("a", "b")
+        self.server.graph.add_link("b", "c", relation="extends")
+        self.server.graph.add_link("c", "d")
+        self.server.graph.add_entity("SQLite", ["a"])
+
+    def tearDown(self) -> None:
+        self.server.stop()
+
+    def test_neighbors(self) -> None:
+        response = self.client.graph_neighbors(observation_id="a")
+        self.assertEqual([r["to_observation_id"] for r in response["items"]], ["b"])
+        self.assertEqual(response["entities"][0]["label"], "SQLite")
+        response = self.client.graph_neighbors(observation_id="a", depth=3)
+        self.assertEqual([r["to_observation_id"] for r in response["items"]], ["b", "c", "d"])
+        response = self.client.graph_neighbors(observation_id="a", depth=3, relation="updates")
+        self.assertEqual([r["to_observation_id"] for r in response["items"]], ["b"])
+        with self.assertRaises(HarnessMemAPIError) as ctx:
+            self.client.graph_neighbors(observation_id="")
+        self.assertEqual(ctx.exception.status_code, 400)
+
+    def test_subgraph_and_entities(self) -> None:
+        response = self.client.graph(entity="SQLite", depth=1)
+        self.assertEqual(sorted(node["id"] for node in response["nodes"]), ["a", "b"])
+        self.assertEqual(response["edges"], [{"source": "a", "target": "b", "relation": "updates", "weight": 1.0}])
+        self.assertEqual(self.client.graph(entity="SQL", depth=5)["center_entity"], "SQL")
+        self.assertEqual(len(self.client.graph(entity="SQL", depth=5)["nodes"]), 4)
+        entities = self.client.graph_entities(project="p")["entities"]
+        self.assertEqual([e["label"] for e in entities], ["SQLite"])
+        self.assertEqual(self.client.graph_entities(project="other")["entities"], [])
+
+
+class CompleteAdjacencyTest(unittest.TestCase):
+    def test_only_expanded_nodes_are_complete(self) -> None:
+        rows = [_link("a", "b"), _link("a", "c"), _link("b", "d"), _link("d", "e")]
+        learned = complete_adjacency("a", rows, 2)
+        self.assertEqual(sorted(learned), ["a", "b", "c"])
+        self.assertEqual(learned["c"], [])  # expanded, no outgoing links
+        self.assertEqual([r["to_observation_id"] for r in learned["b"]], ["d"])
+        self.assertEqual(sorted(complete_adjacency("a", rows, 1)), ["a"])
+
+
+class AdjacencyCacheTest(unittest.TestCase):
+    def test_ttl_lru_and_invalidate(self) -> None:
+        clock = FakeClock()
+        cache = AdjacencyCache(ttl_sec=10, max_entries=2, clock=clock)
+        cache.put("a", [])
+        cache.put("b", [_link("b", "c")])
+        self.assertEqual(cache.get("a"), [])
+        cache.put("c", [])  # evicts "b", the least recently used
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNone(cache.get("a", "extends"))  # keyed by relation too
+        clock.now += 11
+        self.assertIsNone(cache.get("a"))
+        cache.put("c", [], "extends")
+        self.assertEqual(cache.invalidate(["c"]), 2)
+        self.assertEqual(
+            cache.stats(), {"entries": 0, "hits": 1, "misses": 3, "evictions": 1, "expired": 1}
+        )
+
+
+class GraphExpanderTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = FakeHarnessMemServer().start()
+        self.client = self.server.client()
+        graph = self.server.graph
+        # Four roots, each fanning out to 4 children and 8 grandchildren; a shared
+        # hub links every grandchild to the same 5 observations.
+        for r in range(4):
+            for i in range(4):
+                graph.add_link(f"r{r}", f"r{r}.{i}")
+                for j in range(2):
+                    graph.add_link(f"r{r}.{i}", f"r{r}.{i}.{j}")
+                    graph.add_link(f"r{r}.{i}.{j}", "hub")
+        for k in range(5):
+            graph.add_link("hub", f"hub.{k}")
+        graph.add_link("hub.0", "r0")  # cycle back to a seed
+
+    def tearDown(self) -> None:
+        self.server.stop()
+
+    def _requests(self) -> int:
+        return self.server.request_counts.get("/v1/graph/neighbors", 0)
+
+    def test_one_request_per_seed(self) -> None:
+        hood = GraphExpander(self.client).expand(["r0"], hops=3)
+        self.assertEqual(hood.requests, 1)
+        self.assertEqual(self._requests(), 1)
+        self.assertEqual([len(level) for level in hood.levels], [1, 4, 8, 1])
+        self.assertEqual(hood.hops["r0.3.1"], 2)
+        self.assertEqual(hood.hops["hub"], 3)
+        self.assertEqual(len(hood.edges), 4 + 8 + 8)
+        self.assertEqual(hood.ids(max_hops=1), ["r0", "r0.3", "r0.2", "r0.1", "r0.0"])  # links newest first
+
+    def test_frontier_is_deduplicated_and_cache_reused(self) -> None:
+        expander = GraphExpander(self.client)
+        hood = expander.expand(["r0", "r1", "r2", "r3", "r0"], hops=4)
+        self.assertEqual(hood.seeds, ["r0", "r1", "r2", "r3"])
+        self.assertEqual(hood.requests, 4)
+        self.assertEqual(len(hood.hops), 4 + 16 + 32 + 1 + 5)
+        self.assertEqual(len([row for row in hood.edges if row["to_observation_id"] == "hub"]), 32)
+        self.assertEqual(hood.hops["hub.4"], 4)
+
+        again = expander.expand(["r1"], hops=3)
+        self.assertEqual(again.requests, 0)
+        self.assertEqual(again.cache_hits, 1 + 4 + 8)
+        self.assertEqual(self._requests(), 4)
+
+    def test_cached_shallow_nodes_are_extended_on_deeper_walks(self) -> None:
+        expander = GraphExpander(self.client)
+        expander.expand(["r0"], hops=1)
+        hood = expander.expand(["r0"], hops=3)
+        self.assertEqual(hood.requests, 4)  # r0 is cached; its children were not expanded by depth=1
+        self.assertEqual(len(hood.hops), 1 + 4 + 8 + 1)
+        self.assertEqual(len(expander.neighbors("r0.0.0")), 1)
+        self.assertEqual(self._requests(), 5)
+
+    def test_levels_are_fetched_in_parallel(self) -> None:
+        self.server.inject("/v1/graph/neighbors", latency_ms=50)
+        fetch = self.client.graph_neighbors
+        lock = threading.Lock()
+        in_flight = peak = 0
+
+        def _tracked(**kwargs):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            try:
+                return fetch(**kwargs)
+            finally:
+                with lock:
+                    in_flight -= 1
+
+        self.client.graph_neighbors = _tracked
+        hood = GraphExpander(self.client, concurrency=4).expand(["r0", "r1", "r2", "r3"], hops=2)
+        self.assertEqual(hood.requests, 4)
+        self.assertGreater(peak, 1)
+        self.assertLessEqual(peak, 4)
+
+    def test_ttl_expiry_and_invalidate(self) -> None:
+        clock = FakeClock()
+        expander = GraphExpander(self.client, cache=AdjacencyCache(ttl_sec=60, clock=clock))
+        expander.expand(["r0"], hops=2)
+        self.assertEqual(expander.expand(["r0"], hops=2).requests, 0)
+        clock.now += 61
+        self.assertEqual(expander.expand(["r0"], hops=2).requests, 1)
+        self.server.graph.add_link("r0", "late")
+        self.assertNotIn("late", expander.expand(["r0"], hops=1).hops)
+        self.assertEqual(expander.invalidate(["r0"]), 1)
+        self.assertIn("late", expander.expand(["r0"], hops=1).hops)
+
+    def test_relation_and_max_nodes(self) -> None:
+        self.server.graph.add_link("r0", "side", relation="extends")
+        hood = GraphExpander(self.client, relation="extends").expand(["r0"], hops=3)
+        self.assertEqual(hood.ids(), ["r0", "side"])
+        hood = GraphExpander(self.client, max_nodes=10).expand(["r0"], hops=3)
+        self.assertTrue(hood.truncated)
+        self.assertEqual(len(hood.hops), 10)
+        self.assertTrue(all(row["to_observation_id"] in hood.hops for row in hood.edges))
+
+    def test_zero_hops_and_validation(self) -> None:
+        hood = GraphExpander(self.client).expand(["r0"], hops=0)
+        self.assertEqual((hood.ids(), hood.requests), (["r0"], 0))
+        with self.assertRaises(ValueError):
+            GraphExpander(self.client).expand(["r0"], hops=-1)
+        with self.assertRaises(ValueError):
+            GraphExpander(self.client, concurrency=0)
+
+    def test_errors_propagate(self) -> None:
+        self.server.token = "secret"
+        with self.assertRaises(HarnessMemAPIError):
+            GraphExpander(self.client).expand(["r0", "r1"], hops=2)
+
+
+if __name__ == "__main__":
+    unittest.main()
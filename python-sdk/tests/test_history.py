@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import unittest
+
+from harness_mem.history import HistoryWindow, estimate_tokens
+
+
+def _item(observation_id: str, content: str, score=None, updated_at="2026-01-01T00:00:00Z"):
+    item = {"id": observation_id, "content": content, "updated_at": updated_at}
+    if score is not None:
+        item["hybrid_score"] = score
+    return item
+
+
+class EstimateTokensTest(unittest.TestCase):
+    def test_matches_daemon_heuristic(self) -> None:
+        self.assertEqual(estimate_tokens(""), 1)
+        self.assertEqual(estimate_tokens("abcd"), 1)
+        self.assertEqual(estimate_tokens("abcde"), 2)
+        self.assertEqual(estimate_tokens("x" * 400), 100)
+
+
+class HistoryWindowTest(unittest.TestCase):
+    def _window(self, max_tokens: int) -> HistoryWindow:
+        return HistoryWindow(max_tokens=max_tokens, format_item=lambda item: item.get("content", ""), separator="\n")
+
+    def test_packs_highest_value_items_within_budget(self) -> None:
+        window = self._window(max_tokens=10)
+        window.replace(
+            [
+                _item("a", "a" * 16, score=0.2),  # 4 tokens
+                _item("b", "b" * 24, score=0.9),  # 6 tokens
+                _item("c", "c" * 12, score=0.5),  # 3 tokens
+            ]
+        )
+        # b (6) + separator (1) + c (3) = 10; a no longer fits.
+        self.assertEqual(window.render("anything"), "b" * 24 + "\n" + "c" * 12)
+
+    def test_query_terms_lift_matching_items(self) -> None:
+        window = self._window(max_tokens=100)
+        window.replace([_item("a", "sqlite wal mode", score=0.5), _item("b", "bun runtime", score=0.6)])
+        self.assertTrue(window.render("bun").startswith("bun runtime"))
+        self.assertTrue(window.render("sqlite wal").startswith("sqlite wal mode"))
+
+    def test_formats_each_observation_once_per_version(self) -> None:
+        window = self._window(max_tokens=100)
+        window.replace([_item("a", "first"), _item("b", "second")])
+        self.assertEqual(window.merge([_item("a", "first")]), 0)
+        window.replace([_item("b", "second"), _item("a", "first")])
+        self.assertEqual(window.formatted, 2)
+
+        self.assertEqual(window.merge([_item("a", "first edited", updated_at="2026-01-02T00:00:00Z")]), 1)
+        self.assertEqual(window.formatted, 3)
+        self.assertIn("first edited", window.render("first"))
+
+    def test_render_is_cached_until_candidates_or_query_change(self) -> None:
+        window = self._window(max_tokens=100)
+        window.replace([_item("a", "alpha"), _item("b", "beta")])
+        first = window.render("alpha")
+        self.assertIs(window.render("alpha"), first)
+        self.assertIs(window.render("ALPHA"), first)
+        window.merge([_item("c", "gamma")])
+        self.assertIn("gamma", window.render("alpha"))
+
+    def test_truncates_single_oversized_item(self) -> None:
+        window = self._window(max_tokens=5)
+        window.replace([_item("a", "x" * 100)])
+        rendered = window.render("x")
+        self.assertTrue(rendered)
+        self.assertLessEqual(estimate_tokens(rendered), 5)
+
+    def test_max_candidates_keeps_best(self) -> None:
+        window = HistoryWindow(max_tokens=1000, format_item=lambda item: item["content"], max_candidates=2)
+        window.replace([_item("a", "a", score=0.1), _item("b", "b", score=0.9), _item("c", "c", score=0.5)])
+        self.assertEqual(len(window), 2)
+        self.assertNotIn("a", window.render("").split("\n---\n"))
+
+    def test_needs_search(self) -> None:
+        window = self._window(max_tokens=10)
+        self.assertTrue(window.needs_search(60))
+        window.replace([])
+        self.assertFalse(window.needs_search(60))
+        self.assertTrue(window.needs_search(0))
+
+
+if __name__ == "__main__":
+    unittest.main()
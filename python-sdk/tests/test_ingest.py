@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from harness_mem import HarnessMemAPIError
+from harness_mem.ingest import DocumentIngester, IngestManifest, chunk_text, infer_kind
+from harness_mem.testing import FakeHarnessMemServer
+
+
+def _write(root: str, rel: str, text: str) -> str:
+    path = os.path.join(root, rel)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write(text)
+    return path
+
+
+class ChunkTextTest(unittest.TestCase):
+    def test_small_text_is_one_chunk(self) -> None:
+        self.assertEqual(chunk_text("# T\n\nbody\n", 100), ["# T\n\nbody\n"])
+
+    def test_breaks_between_sections(self) -> None:
+        text = "# T\n\n" + "".join(f"## S{i}\n{'x' * 30}\n\n" for i in range(6))
+        chunks = chunk_text(text, 80)
+        self.assertEqual("".join(chunks), text)
+        self.assertTrue(all(len(chunk) <= 80 for chunk in chunks))
+        self.assertTrue(all(chunk.startswith("## ") for chunk in chunks[1:]))
+
+    def test_oversized_section(self) -> None:
+        text = "## Big\n" + ("p" * 40 + "\n\n") * 5
+        split = chunk_text(text, 50)
+        self.assertEqual("".join(split), text)
+        self.assertTrue(all(len(chunk) <= 50 for chunk in split))
+        self.assertEqual(chunk_text(text, 50, split_sections=False), [text])
+
+    def test_infer_kind(self) -> None:
+        self.assertEqual(infer_kind("memory/Decisions.md"), "decisions_md")
+        self.assertEqual(infer_kind("docs/adr/0001-x.md"), "adr")
+
+
+class DocumentIngesterTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = FakeHarnessMemServer().start()
+        self.client = self.server.client()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, "docs")
+        self.manifest = os.path.join(self.tmp.name, "manifest.json")
+
+    def tearDown(self) -> None:
+        self.server.stop()
+        self.tmp.cleanup()
+
+    def _ingester(self, **kwargs) -> DocumentIngester:
+        kwargs.setdefault("retry_backoff_sec", 0.01)
+        return DocumentIngester(self.client, project="wiki", manifest_path=self.manifest, **kwargs)
+
+    def test_walks_and_ingests(self) -> None:
+        _write(self.root, "adr/0001-use-sqlite.md", "# ADR-0001: Use SQLite\n\n## Status\nAccepted\n")
+        _write(self.root, "guides/setup.md", "Install it.\n")
+        _write(self.root, "decisions.md", "# Decisions\n\n## 2026-01-01: A\nfoo\n\n## 2026-01-02: B\nbar\n")
+        _write(self.root, "image.png", "not a doc")
+        _write(self.root, ".hidden/secret.md", "# Secret\n")
+        report = self._ingester().ingest(self.root)
+        self.assertEqual((report.files_seen, report.files_ingested, report.files_failed), (3, 3, 0))
+        self.assertEqual(report.entries_imported, 4)
+        self.assertEqual(report.parse_errors, 0)
+        titles = {item["title"] for item in self.server.store.search("setup sqlite foo bar", project="wiki", limit=10)}
+        self.assertIn("[ADR] setup", titles)  # H1 added from the file name
+        manifest = IngestManifest(self.manifest)
+        self.assertEqual(sorted(manifest.files), ["adr/0001-use-sqlite.md", "decisions.md", "guides/setup.md"])
+
+    def test_unchanged_files_are_skipped(self) -> None:
+        path = _write(self.root, "a.md", "# A\n\nalpha\n")
+        _write(self.root, "b.md", "# B\n\nbeta\n")
+        self.assertEqual(self._ingester().ingest(self.root).files_ingested, 2)
+        sent = self.server.request_counts.get("/v1/ingest/document", 0)
+
+        report = self._ingester().ingest(self.root)
+        self.assertEqual((report.files_skipped, report.files_ingested, report.bytes_read), (2, 0, 0))
+
+        os.utime(path, ns=(time.time_ns(), time.time_ns() + 10**9))  # touched, same content
+        report = self._ingester().ingest(self.root)
+        self.assertEqual((report.files_skipped, report.files_ingested), (2, 0))
+        self.assertGreater(report.bytes_read, 0)
+
+        _write(self.root, "b.md", "# B\n\nbeta v2\n")
+        report = self._ingester().ingest(self.root)
+        self.assertEqual((report.files_skipped, report.files_ingested), (1, 1))
+        self.assertEqual(self.server.request_counts.get("/v1/ingest/document", 0), sent + 1)
+
+    def test_changing_project_reingests(self) -> None:
+        _write(self.root, "a.md", "# A\n")
+        self._ingester().ingest(self.root)
+        other = DocumentIngester(self.client, project="other", manifest_path=self.manifest)
+        self.assertEqual(other.ingest(self.root).files_ingested, 1)
+
+    def test_large_adr_file_is_sent_in_parts(self) -> None:
+        body = "".join(f"## Section {i}\n{'word ' * 40}\n\n" for i in range(10))
+        _write(self.root, "big.md", "# Handbook\n\n" + body)
+        report = self._ingester(chunk_chars=600).ingest(self.root)
+        self.assertEqual(report.files_ingested, 1)
+        self.assertGreater(report.chunks_sent, 1)
+        self.assertEqual(report.entries_imported, report.chunks_sent)
+        titles = sorted(item["title"] for item in self.server.store.search("word", project="wiki", limit=50))
+        self.assertEqual(titles[0], f"[ADR] Handbook (part 1/{report.chunks_sent})")
+        self.assertEqual(IngestManifest(self.manifest).files["big.md"]["chunks"], report.chunks_sent)
+
+    def test_large_decisions_file_keeps_sections_whole(self) -> None:
+        text = "# Decisions\n\n" + "".join(f"## 2026-01-{i:02d}: D{i}\n{'why ' * 30}\n\n" for i in range(1, 9))
+        _write(self.root, "decisions.md", text)
+        report = self._ingester(chunk_chars=300).ingest(self.root)
+        self.assertGreater(report.chunks_sent, 1)
+        self.assertEqual(report.entries_imported, 8)
+        self.assertEqual(self.server.request_counts.get("/v1/ingest/document"), report.chunks_sent)
+
+    def test_retries_transient_errors(self) -> None:
+        _write(self.root, "a.md", "# A\n")
+        self.server.inject("/v1/ingest/document", error_rate=0.5, error_status=503)
+        self.server._random.seed(3)
+        report = self._ingester(retries=10).ingest(self.root)
+        self.assertEqual(report.files_ingested, 1)
+
+    def test_failed_file_is_not_recorded_and_resumes(self) -> None:
+        _write(self.root, "a.md", "# A\n")
+        _write(self.root, "b.md", "# B\n")
+        self.server.inject("/v1/ingest/document", error_rate=1.0, error_status=503)
+        report = self._ingester(retries=1).ingest(self.root)
+        self.assertEqual(report.files_failed, 2)
+        self.assertEqual(len(report.errors), 2)
+        self.assertEqual(IngestManifest(self.manifest).files, {})
+        self.server.clear_faults()
+        self.assertEqual(self._ingester().ingest(self.root).files_ingested, 2)
+
+    def test_resumes_after_interruption(self) -> None:
+        for i in range(6):
+            _write(self.root, f"doc{i}.md", f"# Doc {i}\n")
+        ingester = self._ingester()
+        walk = ingester.iter_files
+
+        def _interrupted(paths):
+            for index, item in enumerate(walk(paths)):
+                if index == 3:
+                    raise KeyboardInterrupt
+                yield item
+
+        ingester.iter_files = _interrupted
+        with self.assertRaises(KeyboardInterrupt):
+            ingester.ingest(self.root)
+        # Chunks still queued when the walk is interrupted are cancelled, so only
+        # a subset of the first three files may have reached the manifest.
+        recorded = sorted(IngestManifest(self.manifest).files)
+        self.assertLessEqual(set(recorded), {"doc0.md", "doc1.md", "doc2.md"})
+        report = self._ingester().ingest(self.root)
+        self.assertEqual((report.files_skipped, report.files_ingested), (len(recorded), 6 - len(recorded)))
+
+    def test_concurrency_and_back_pressure(self) -> None:
+        for i in range(12):
+            _write(self.root, f"doc{i:02d}.md", f"# Doc {i}\n")
+        in_flight = 0
+        peak = 0
+        lock = threading.Lock()
+        send = self.client.ingest_document
+
+        def _slow(**kwargs):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.02)
+            try:
+                return send(**kwargs)
+            finally:
+                with lock:
+                    in_flight -= 1
+
+        self.client.ingest_document = _slow
+        started = time.monotonic()
+        report = self._ingester(concurrency=4, max_pending=4).ingest(self.root)
+        self.assertEqual(report.files_ingested, 12)
+        self.assertLessEqual(peak, 4)
+        self.assertGreater(peak, 1)
+        self.assertLess(time.monotonic() - started, 12 * 0.02)
+
+    def test_knowledge_file_endpoint(self) -> None:
+        path = _write(self.root, "0002-x.md", "# ADR-0002: X\n")
+        report = self._ingester(endpoint="knowledge-file").ingest(path)
+        self.assertEqual(report.files_ingested, 1)
+        self.assertEqual(self.server.request_counts.get("/v1/ingest/knowledge-file"), 1)
+        with self.assertRaises(ValueError):
+            DocumentIngester(self.client, endpoint="knowledge-file", branch="main")
+
+    def test_client_reports_missing_content(self) -> None:
+        with self.assertRaises(HarnessMemAPIError) as ctx:
+            self.client.ingest_document(file_path="a.md", content="")
+        self.assertIn("required", ctx.exception.message)
+
+
+if __name__ == "__main__":
+    unittest.main()
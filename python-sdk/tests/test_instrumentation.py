@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import json
+import unittest
+from unittest.mock import patch
+from urllib.error import URLError
+
+from harness_mem.cache import ObservationCache
+from harness_mem.client import HarnessMemClient
+from harness_mem.errors import HarnessMemTransportError
+from harness_mem.instrumentation import ClientHooks, LatencyHistogram, MetricsCollector, endpoint_label
+
+
+class _FakeResponse:
+    status = 200
+
+    def __init__(self, payload: dict) -> None:
+        self._raw = json.dumps(payload).encode("utf-8")
+
+    def read(self) -> bytes:
+        return self._raw
+
+    def __enter__(self) -> "_FakeResponse":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
+class _Recorder(ClientHooks):
+    def __init__(self) -> None:
+        self.calls: list = []
+
+    def on_request_start(self, event) -> None:
+        self.calls.append(("start", event.endpoint, event.attempt))
+
+    def on_request_end(self, event) -> None:
+        self.calls.append(("end", event.endpoint, event.attempt, event.error is None))
+
+    def on_retry(self, event, delay_sec) -> None:
+        self.calls.append(("retry", event.endpoint, event.attempt))
+
+    def on_error(self, event) -> None:
+        self.calls.append(("error", event.endpoint, event.attempt))
+
+
+class LatencyHistogramTest(unittest.TestCase):
+    def test_percentiles_stay_within_relative_error(self) -> None:
+        histogram = LatencyHistogram()
+        for value in range(1, 10_001):
+            histogram.record(value / 10.0)  # 0.1 ms .. 1000 ms
+
+        self.assertEqual(histogram.count, 10_000)
+        for percentile, expected in ((50, 500.0), (99, 990.0), (99.9, 999.0)):
+            self.assertAlmostEqual(histogram.percentile(percentile), expected, delta=expected / 32)
+        self.assertEqual(histogram.percentile(100), 1000.0)
+
+    def test_merge_and_cumulative_counts(self) -> None:
+        first, second = LatencyHistogram(), LatencyHistogram()
+        first.record(0.5)
+        second.record(20.0)
+        second.record(2000.0)
+        first.merge(second)
+
+        self.assertEqual(first.count, 3)
+        self.assertEqual(first.cumulative_counts([1.0, 100.0, 10_000.0]), [1, 2, 3])
+
+
+class EndpointLabelTest(unittest.TestCase):
+    def test_ids_are_replaced(self) -> None:
+        self.assertEqual(endpoint_label("/v1/search"), "/v1/search")
+        self.assertEqual(endpoint_label("/v1/observations/obs_123"), "/v1/observations/:id")
+        self.assertEqual(endpoint_label("/v1/admin/teams/t1/members/U9"), "/v1/admin/teams/:id/members/:id")
+        self.assertEqual(endpoint_label("/v1/feed?cursor=abc"), "/v1/feed")
+
+
+class ClientInstrumentationTest(unittest.TestCase):
+    def test_metrics_record_client_and_server_latency(self) -> None:
+        metrics = MetricsCollector()
+        client = HarnessMemClient(hooks=[metrics])
+        payload = {"ok": True, "source": "core", "items": [], "meta": {"count": 0, "latency_ms": 0.0}}
+        with patch("harness_mem.client.urlopen", return_value=_FakeResponse(payload)):
+            client.search(query="wal")
+            client.search(query="wal")
+
+        snapshot = metrics.snapshot()["POST /v1/search"]
+        self.assertEqual(snapshot["requests"], 2)
+        self.assertEqual(snapshot["server_ms"]["count"], 2)
+        self.assertGreater(snapshot["bytes_out"], 0)
+        self.assertEqual(snapshot["bytes_in"], 2 * len(json.dumps(payload)))
+
+        text = metrics.to_prometheus()
+        self.assertIn('harness_mem_client_requests_total{method="POST",endpoint="/v1/search"} 2', text)
+        self.assertIn('harness_mem_client_request_duration_seconds_bucket{method="POST",endpoint="/v1/search",le="+Inf"} 2', text)
+        self.assertIn("# TYPE harness_mem_client_request_duration_seconds histogram", text)
+
+    def test_read_only_requests_are_retried_and_reported(self) -> None:
+        recorder, metrics = _Recorder(), MetricsCollector()
+        client = HarnessMemClient(hooks=[recorder, metrics], max_retries=2, retry_backoff_sec=0)
+        responses = [URLError("connection refused"), _FakeResponse({"ok": True, "items": []})]
+
+        def _urlopen(*args, **kwargs):
+            result = responses.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        with patch("harness_mem.client.urlopen", side_effect=_urlopen):
+            client.health()
+
+        self.assertEqual(
+            recorder.calls,
+            [
+                ("start", "/health", 0),
+                ("error", "/health", 0),
+                ("end", "/health", 0, False),
+                ("retry", "/health", 0),
+                ("start", "/health", 1),
+                ("end", "/health", 1, True),
+            ],
+        )
+        snapshot = metrics.snapshot()["GET /health"]
+        self.assertEqual((snapshot["requests"], snapshot["retries"], snapshot["errors"]), (2, 1, {"transport": 1}))
+
+    def test_writes_are_not_retried(self) -> None:
+        client = HarnessMemClient(max_retries=3, retry_backoff_sec=0)
+        with patch("harness_mem.client.urlopen", side_effect=URLError("down")) as mocked:
+            with self.assertRaises(HarnessMemTransportError):
+                client.record_event({"event_type": "user_prompt"})
+        self.assertEqual(mocked.call_count, 1)
+
+    def test_failing_hook_does_not_break_requests(self) -> None:
+        class _Broken(ClientHooks):
+            def on_request_end(self, event) -> None:
+                raise RuntimeError("boom")
+
+        client = HarnessMemClient(hooks=[_Broken()])
+        with patch("harness_mem.client.urlopen", return_value=_FakeResponse({"ok": True, "items": []})):
+            with self.assertLogs("harness_mem", level="ERROR"):
+                self.assertTrue(client.health()["ok"])
+
+    def test_cache_hits_are_reported(self) -> None:
+        metrics = MetricsCollector()
+        client = HarnessMemClient(hooks=[metrics], observation_cache=ObservationCache())
+        payload = {"ok": True, "items": [{"id": "a"}], "meta": {"count": 1}}
+        with patch("harness_mem.client.urlopen", return_value=_FakeResponse(payload)):
+            client.get_observations(ids=["a"])
+            client.get_observations(ids=["a"])
+
+        snapshot = metrics.snapshot()["POST /v1/observations/get"]
+        self.assertEqual((snapshot["cache_hits"], snapshot["cache_misses"], snapshot["requests"]), (1, 1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
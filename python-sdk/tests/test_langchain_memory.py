@@ -0,0 +1,133 @@
+"""harness_mem.langchain_memory のユニットテスト（FakeHarnessMemServer 使用）。"""
+from __future__ import annotations
+
+import asyncio
+import time
+import unittest
+
+from harness_mem.langchain_memory import HarnessMemLangChainMemory
+from harness_mem.testing import FakeHarnessMemServer
+
+
+class TestHarnessMemLangChainMemoryAsync(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = FakeHarnessMemServer().start()
+        self.server.store.add_observation(
+            {"id": "obs_1", "project": "demo", "title": "sqlite", "content": "WAL モードを有効化した"}
+        )
+        self.memory = HarnessMemLangChainMemory(project="demo", session_id="sess-1", base_url=self.server.base_url)
+
+    def tearDown(self) -> None:
+        self.memory.close()
+        self.server.stop()
+
+    def test_aload_memory_variables_returns_history(self) -> None:
+        result = asyncio.run(self.memory.aload_memory_variables({"input": "sqlite"}))
+        self.assertEqual(result, {"history": "WAL モードを有効化した"})
+
+    def test_aload_memory_variables_empty_query(self) -> None:
+        result = asyncio.run(self.memory.aload_memory_variables({"input": ""}))
+        self.assertEqual(result, {"history": ""})
+
+    def test_aload_memory_variables_swallows_errors(self) -> None:
+        self.server.inject("/v1/search", error_rate=1.0, error_status=500)
+        result = asyncio.run(self.memory.aload_memory_variables({"input": "sqlite"}))
+        self.assertEqual(result, {"history": ""})
+
+    def test_asave_context_returns_before_the_write_completes(self) -> None:
+        self.server.inject("/v1/checkpoints/record", latency_ms=200)
+
+        started = time.perf_counter()
+        asyncio.run(self.memory.asave_context({"input": "migrate to bun"}, {"output": "done"}))
+        self.assertLess(time.perf_counter() - started, 0.15)
+
+        self.assertTrue(self.memory.flush(timeout=5))
+        saved = self.server.store.search("bun", project="demo")
+        self.assertEqual(len(saved), 1)
+        self.assertEqual(saved[0]["content"], "Human: migrate to bun\nAI: done")
+        self.assertEqual(saved[0]["title"], "migrate to bun")
+
+    def test_close_drains_pending_writes(self) -> None:
+        self.server.inject("/v1/checkpoints/record", latency_ms=20)
+
+        async def _turns() -> None:
+            for turn in range(5):
+                await self.memory.asave_context({"input": f"turn {turn}"}, {"output": "ok"})
+
+        asyncio.run(_turns())
+        self.assertTrue(self.memory.close(timeout=5))
+        self.assertEqual(self.server.request_counts["/v1/checkpoints/record"], 5)
+
+    def test_asave_context_skips_empty_turns(self) -> None:
+        asyncio.run(self.memory.asave_context({"input": ""}, {"output": ""}))
+        self.assertTrue(self.memory.flush(timeout=1))
+        self.assertNotIn("/v1/checkpoints/record", self.server.request_counts)
+
+    def test_save_context_still_writes_synchronously(self) -> None:
+        self.memory.save_context({"input": "sync turn"}, {"output": "ok"})
+        self.assertEqual(self.server.request_counts["/v1/checkpoints/record"], 1)
+
+
+class TestHarnessMemLangChainMemoryBudget(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = FakeHarnessMemServer().start()
+        for index in range(6):
+            self.server.store.add_observation(
+                {"id": f"obs_{index}", "project": "demo", "title": "sqlite", "content": f"sqlite note {index} " + "x" * 40}
+            )
+        self.memory = HarnessMemLangChainMemory(
+            project="demo",
+            session_id="sess-1",
+            base_url=self.server.base_url,
+            search_limit=20,
+            max_history_tokens=40,
+        )
+
+    def tearDown(self) -> None:
+        self.memory.close()
+        self.server.stop()
+
+    def test_history_fits_the_token_budget(self) -> None:
+        history = self.memory.load_memory_variables({"input": "sqlite"})["history"]
+        self.assertTrue(history)
+        self.assertLessEqual(self.memory.token_counter(history), 40)
+        self.assertLess(history.count("sqlite note"), 6)
+
+    def test_later_turns_use_the_feed_instead_of_searching(self) -> None:
+        self.memory.load_memory_variables({"input": "sqlite"})
+        self.memory.load_memory_variables({"input": "sqlite again"})
+        self.memory.save_context({"input": "switch to postgres"}, {"output": "ok"})
+        history = self.memory.load_memory_variables({"input": "postgres"})["history"]
+
+        self.assertEqual(self.server.request_counts["/v1/search"], 1)
+        self.assertTrue(history.startswith("Human: switch to postgres"))
+
+    def test_refresh_interval_triggers_a_new_search(self) -> None:
+        self.memory.history_refresh_sec = 0
+        self.memory.load_memory_variables({"input": "sqlite"})
+        self.memory.load_memory_variables({"input": "sqlite"})
+        self.assertEqual(self.server.request_counts["/v1/search"], 2)
+
+    def test_async_budgeted_history(self) -> None:
+        async def _turns():
+            first = await self.memory.aload_memory_variables({"input": "sqlite"})
+            second = await self.memory.aload_memory_variables({"input": "sqlite"})
+            return first, second
+
+        first, second = asyncio.run(_turns())
+        self.assertEqual(first, second)
+        self.assertEqual(self.server.request_counts["/v1/search"], 1)
+
+    def test_clear_drops_the_cached_history(self) -> None:
+        self.memory.load_memory_variables({"input": "sqlite"})
+        self.memory.clear()
+        self.memory.load_memory_variables({"input": "sqlite"})
+        self.assertEqual(self.server.request_counts["/v1/search"], 2)
+
+    def test_invalid_budget(self) -> None:
+        with self.assertRaises(ValueError):
+            HarnessMemLangChainMemory(project="demo", session_id="s", max_history_tokens=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import threading
+import time
+import unittest
+
+from harness_mem import HarnessMemAPIError, HarnessMemLeaseLostError
+from harness_mem.lease import LeaseManager
+from harness_mem.testing import FakeHarnessMemServer
+
+
+class LeaseClientTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = FakeHarnessMemServer().start()
+        self.client = self.server.client()
+
+    def tearDown(self) -> None:
+        self.server.stop()
+
+    def test_acquire_renew_release(self) -> None:
+        acquired = self.client.acquire_lease(target="consolidation", agent_id="w1", project="demo", ttl_ms=5000)
+        lease_id = acquired["lease"]["leaseId"]
+        self.assertEqual(acquired["lease"]["ttlMs"], 5000)
+
+        renewed = self.client.renew_lease(lease_id=lease_id, agent_id="w1", ttl_ms=8000)
+        self.assertEqual(renewed["lease"]["ttlMs"], 8000)
+        self.assertIsNotNone(renewed["lease"]["renewedAt"])
+
+        released = self.client.release_lease(lease_id=lease_id, agent_id="w1")
+        self.assertEqual(released["lease"]["status"], "released")
+
+    def test_contention_raises_already_leased(self) -> None:
+        self.client.acquire_lease(target="reindex", agent_id="w1", project="demo")
+        with self.assertRaises(HarnessMemAPIError) as ctx:
+            self.client.acquire_lease(target="reindex", agent_id="w2", project="demo")
+        self.assertEqual(ctx.exception.message, "already_leased")
+        self.assertEqual(ctx.exception.response_body["heldBy"], "w1")
+        # Different project, same target: no contention.
+        self.client.acquire_lease(target="reindex", agent_id="w2", project="other")
+
+    def test_renew_by_other_agent_is_rejected(self) -> None:
+        lease_id = self.client.acquire_lease(target="t", agent_id="w1")["lease"]["leaseId"]
+        with self.assertRaises(HarnessMemAPIError) as ctx:
+            self.client.renew_lease(lease_id=lease_id, agent_id="w2")
+        self.assertEqual(ctx.exception.message, "not_owner")
+
+
+class LeaseManagerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = FakeHarnessMemServer().start()
+        self.client = self.server.client()
+
+    def tearDown(self) -> None:
+        self.server.stop()
+
+    def test_second_agent_cannot_acquire(self) -> None:
+        with LeaseManager(self.client, agent_id="a", project="demo") as first, LeaseManager(
+            self.client, agent_id="b", project="demo"
+        ) as second:
+            lease = first.acquire("consolidation:demo")
+            self.assertIsNotNone(lease)
+            self.assertIsNone(second.acquire("consolidation:demo"))
+            lease.release()
+            self.assertIsNotNone(second.acquire("consolidation:demo"))
+
+    def test_context_manager_releases(self) -> None:
+        manager = LeaseManager(self.client, agent_id="a")
+        with manager.acquire("job") as lease:
+            lease.check()
+            self.assertEqual(len(self.server.leases.active()), 1)
+        self.assertEqual(self.server.leases.active(), [])
+        with self.assertRaises(HarnessMemLeaseLostError):
+            lease.check()
+        manager.close()
+
+    def test_renews_in_the_background(self) -> None:
+        with LeaseManager(self.client, agent_id="a", ttl_ms=300) as manager:
+            lease = manager.acquire("job")
+            time.sleep(0.7)
+            lease.check()
+            self.assertGreaterEqual(lease.renewals, 2)
+            self.assertEqual(len(self.server.leases.active()), 1)
+
+    def test_lost_lease_is_fenced(self) -> None:
+        lost = []
+        with LeaseManager(self.client, agent_id="a", ttl_ms=300, on_lost=lost.append) as manager:
+            lease = manager.acquire("job")
+            # Another agent takes over after the daemon expired our lease.
+            clock = self.server.leases.clock
+            self.server.leases.clock = lambda: clock() + 10_000
+            self.client.acquire_lease(target="job", agent_id="b")
+
+            deadline = time.monotonic() + 2
+            while not lost and time.monotonic() < deadline:
+                time.sleep(0.02)
+            self.assertEqual(lost, [lease])
+            self.assertFalse(lease.valid)
+            with self.assertRaises(HarnessMemLeaseLostError) as ctx:
+                lease.check()
+            self.assertEqual(ctx.exception.reason, "expired")
+
+    def test_local_deadline_fences_when_renewal_fails(self) -> None:
+        self.server.inject("/v1/lease/renew", error_rate=1.0, error_status=503)
+        with LeaseManager(self.client, agent_id="a", ttl_ms=200) as manager:
+            lease = manager.acquire("job")
+            with self.assertLogs("harness_mem", level="WARNING"):
+                time.sleep(0.4)
+            with self.assertRaises(HarnessMemLeaseLostError):
+                lease.check()
+
+    def test_workers_partition_jobs(self) -> None:
+        jobs = [f"consolidation:project-{index}" for index in range(12)]
+        done = {}
+        lock = threading.Lock()
+
+        def _worker(name: str) -> None:
+            manager = LeaseManager(self.client, agent_id=name)
+            for lease in manager.claim(jobs):
+                with lease:
+                    with lock:
+                        done.setdefault(lease.target, []).append(name)
+                    time.sleep(0.01)
+                    lease.finish(cooldown_ms=60_000)
+            manager.close()
+
+        threads = [threading.Thread(target=_worker, args=(f"worker-{index}",)) for index in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=10)
+
+        # Every job ran exactly once, spread over several workers.
+        self.assertEqual(set(done), set(jobs))
+        self.assertTrue(all(len(names) == 1 for names in done.values()))
+        self.assertGreater(len({name for names in done.values() for name in names}), 1)
+
+    def test_finish_keeps_target_leased_for_cooldown(self) -> None:
+        with LeaseManager(self.client, agent_id="a") as first, LeaseManager(self.client, agent_id="b") as second:
+            with first.acquire("job") as lease:
+                lease.finish(cooldown_ms=60_000)
+            self.assertEqual(first.held(), [])
+            self.assertIsNone(second.acquire("job"))
+
+    def test_invalid_options(self) -> None:
+        with self.assertRaises(ValueError):
+            LeaseManager(self.client, renew_fraction=1.5)
+        with self.assertRaises(ValueError):
+            LeaseManager(self.client, ttl_ms=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+from harness_mem.loader import ObservationLoader
+
+
+def _make_client() -> MagicMock:
+    client = MagicMock()
+
+    def _get_observations(*, ids, include_private=False, compact=True):
+        return {"ok": True, "items": [{"id": item_id, "compact": compact} for item_id in ids if item_id != "missing"]}
+
+    client.get_observations.side_effect = _get_observations
+    return client
+
+
+class ObservationLoaderTest(unittest.TestCase):
+    def test_concurrent_loads_share_one_deduplicated_request(self) -> None:
+        client = _make_client()
+        loader = ObservationLoader(client, batch_window_ms=200)
+        results: dict = {}
+
+        def _worker(observation_id: str, slot: int) -> None:
+            results[slot] = loader.load(observation_id)
+
+        threads = [
+            threading.Thread(target=_worker, args=(observation_id, slot))
+            for slot, observation_id in enumerate(["a", "b", "a", "c"])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        client.get_observations.assert_called_once()
+        self.assertEqual(sorted(client.get_observations.call_args.kwargs["ids"]), ["a", "b", "c"])
+        self.assertEqual(results[0]["id"], "a")
+        self.assertEqual(results[2]["id"], "a")
+        self.assertEqual(loader.stats(), {"loads": 4, "ids_requested": 3, "batches_sent": 1})
+
+    def test_variants_are_batched_separately(self) -> None:
+        client = _make_client()
+        loader = ObservationLoader(client, batch_window_ms=1000)
+        compact = loader.load_future("a")
+        full = loader.load_future("a", compact=False)
+        loader.dispatch()
+
+        self.assertTrue(compact.result(timeout=1)["compact"])
+        self.assertFalse(full.result(timeout=1)["compact"])
+        self.assertEqual(client.get_observations.call_count, 2)
+
+    def test_full_batch_is_sent_without_waiting(self) -> None:
+        client = _make_client()
+        loader = ObservationLoader(client, max_batch_size=2, batch_window_ms=10_000)
+        self.assertEqual([item["id"] for item in loader.load_many(["a", "b"])], ["a", "b"])
+
+    def test_missing_ids_resolve_to_none(self) -> None:
+        loader = ObservationLoader(_make_client(), batch_window_ms=0)
+        self.assertEqual(loader.load_many(["a", "missing"])[1], None)
+
+    def test_errors_reach_every_caller(self) -> None:
+        client = MagicMock()
+        client.get_observations.side_effect = RuntimeError("daemon down")
+        loader = ObservationLoader(client, batch_window_ms=1000)
+        futures = [loader.load_future("a"), loader.load_future("b")]
+        loader.dispatch()
+        for future in futures:
+            with self.assertRaises(RuntimeError):
+                future.result(timeout=1)
+
+    def test_aload(self) -> None:
+        loader = ObservationLoader(_make_client(), batch_window_ms=1)
+
+        async def _main():
+            return await asyncio.gather(loader.aload("x"), loader.aload("y"))
+
+        first, second = asyncio.run(_main())
+        self.assertEqual((first["id"], second["id"]), ("x", "y"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import asyncio
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from harness_mem.loadgen import TraceEntry, TraceRecorder, load_trace, main, replay, schedule
+from harness_mem.testing import FakeHarnessMemServer
+
+
+def _event(content: str) -> dict:
+    return {
+        "platform": "claude",
+        "project": "demo",
+        "session_id": "s1",
+        "event_type": "user_prompt",
+        "payload": {"content": content},
+    }
+
+
+class TraceRecorderTest(unittest.TestCase):
+    def test_records_replayable_requests_only(self) -> None:
+        buffer = io.StringIO()
+        with FakeHarnessMemServer() as server:
+            client = server.client(hooks=[TraceRecorder(buffer)])
+            client.record_event(_event("sqlite wal"))
+            client.search(query="wal", project="demo", limit=3)
+            client.health()
+
+        lines = [json.loads(line) for line in buffer.getvalue().splitlines()]
+        self.assertEqual([line["path"] for line in lines], ["/v1/events/record", "/v1/search"])
+        self.assertEqual(lines[0]["body"]["event"]["payload"], {"content": "x" * len("sqlite wal")})
+        self.assertEqual(lines[1]["body"]["query"], "xxx")
+        self.assertEqual(lines[1]["body"]["limit"], 3)
+
+    def test_raw_records_bodies_verbatim(self) -> None:
+        buffer = io.StringIO()
+        with FakeHarnessMemServer() as server:
+            server.client(hooks=[TraceRecorder(buffer, raw=True)]).search(query="wal", project="demo")
+        self.assertEqual(json.loads(buffer.getvalue())["body"]["query"], "wal")
+
+
+class ScheduleTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.entries = [TraceEntry(0.0, "POST", "/v1/search", {"query": "a"}), TraceEntry(2.0, "POST", "/v1/timeline")]
+
+    def test_constant_rate_cycles_entries_for_duration(self) -> None:
+        planned = list(schedule(self.entries, qps=10, duration_sec=0.5))
+        self.assertEqual([round(offset, 2) for offset, _ in planned], [0.0, 0.1, 0.2, 0.3, 0.4])
+        self.assertEqual([entry.operation for _, entry in planned][:2], ["search", "timeline"])
+
+    def test_poisson_is_seeded(self) -> None:
+        first = [offset for offset, _ in schedule(self.entries, arrival="poisson", qps=100, duration_sec=1, seed=3)]
+        second = [offset for offset, _ in schedule(self.entries, arrival="poisson", qps=100, duration_sec=1, seed=3)]
+        self.assertEqual(first, second)
+        self.assertGreater(len(first), 50)
+
+    def test_trace_arrival_keeps_recorded_gaps(self) -> None:
+        planned = list(schedule(self.entries, arrival="trace", speed=4))
+        self.assertEqual([offset for offset, _ in planned], [0.0, 0.5])
+
+
+class ReplayTest(unittest.TestCase):
+    def _write_trace(self, server: FakeHarnessMemServer) -> str:
+        handle, path = tempfile.mkstemp(suffix=".jsonl")
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        recorder = TraceRecorder(path)
+        client = server.client(hooks=[recorder])
+        created = client.record_event(_event("sqlite wal checkpoint"))["items"][0]
+        client.search(query="wal", project="demo")
+        client.get_observations(ids=[created["id"]])
+        client.timeline(created["id"])
+        client.resume_pack(project="demo")
+        recorder.close()
+        return path
+
+    def test_replay_reports_per_operation_percentiles(self) -> None:
+        with FakeHarnessMemServer() as server:
+            entries = load_trace(self._write_trace(server))
+            self.assertEqual(len(entries), 5)
+            server.inject("/v1/timeline", error_rate=1.0, error_status=503)
+            report = asyncio.run(
+                replay(entries, base_url=server.base_url, qps=200, duration_sec=0.5, concurrency=8)
+            ).to_dict()
+
+        self.assertEqual(report["completed"], report["scheduled"])
+        self.assertGreater(report["completed"], 50)
+        self.assertEqual(set(report["operations"]), {"search", "record_event", "get_observations", "timeline", "resume_pack"})
+        self.assertEqual(report["operations"]["timeline"]["error_rate"], 1.0)
+        self.assertEqual(report["operations"]["search"]["error_rate"], 0.0)
+        self.assertIn("p999", report["operations"]["search"]["latency_ms"])
+
+    def test_unexpected_errors_are_recorded_not_raised(self) -> None:
+        with FakeHarnessMemServer() as server:
+            entries = load_trace(self._write_trace(server))
+            with patch("harness_mem.loadgen.HarnessMemClient._request", side_effect=ValueError("bad body")):
+                report = asyncio.run(
+                    replay(entries, base_url=server.base_url, qps=100, duration_sec=0.2, concurrency=4)
+                ).to_dict()
+
+        self.assertEqual(report["completed"], report["scheduled"])
+        self.assertEqual(report["operations"]["search"]["errors"], {"ValueError": report["operations"]["search"]["requests"]})
+
+    def test_cli_against_fake_server(self) -> None:
+        with FakeHarnessMemServer() as server:
+            path = self._write_trace(server)
+        self.assertEqual(main([path, "--fake", "--qps", "100", "--operations", "search,record_event", "--json"]), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import json
+import unittest
+from unittest import mock
+from unittest.mock import patch
+
+from harness_mem import rerank as rerank_module
+from harness_mem.client import HarnessMemClient
+from harness_mem.rerank import WeightedReranker, content_signature
+
+
+class _FakeResponse:
+    def __init__(self, payload: dict) -> None:
+        self._raw = json.dumps(payload).encode("utf-8")
+
+    def read(self) -> bytes:
+        return self._raw
+
+    def __enter__(self) -> "_FakeResponse":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
+_ITEMS = [
+    {"id": "a", "title": "t", "content": "same", "hybrid_score": 0.9, "recency": 0.1, "tags": ["backfill"]},
+    {"id": "b", "title": "t", "content": "same", "hybrid_score": 0.5, "recency": 0.9},
+    {"id": "c", "title": "u", "content": "other", "hybrid_score": 0.6, "recency": 0.8, "tags": ["Decision"]},
+    {"id": "d", "title": "v", "content": "missing scores"},
+]
+
+
+class WeightedRerankerTest(unittest.TestCase):
+    def test_blend_and_tag_boosts(self) -> None:
+        reranker = WeightedReranker(
+            weights={"hybrid_score": 0.5, "recency": 0.5},
+            tag_boosts={"decision": 0.2, "backfill": -0.5},
+        )
+        ranked = reranker.rerank(_ITEMS, limit=3)
+        self.assertEqual([item["id"] for item in ranked], ["c", "b", "a"])
+
+    def test_python_fallback_matches_numpy(self) -> None:
+        reranker = WeightedReranker(weights={"hybrid_score": 1.0, "recency": 0.25}, tag_boosts={"decision": 0.1})
+        expected = reranker.scores(_ITEMS)
+        with mock.patch.object(rerank_module, "_np", None):
+            fallback = reranker.scores(_ITEMS)
+        for left, right in zip(expected, fallback):
+            self.assertAlmostEqual(left, right)
+
+    def test_tag_boosts_sum_per_item(self) -> None:
+        items = [
+            {"id": "a", "tags": ["Decision", "backfill", "decision"]},
+            {"id": "b"},
+            {"id": "c", "tags": ["other", "DECISION"]},
+        ]
+        reranker = WeightedReranker(tag_boosts={"decision": 0.25, "backfill": -0.5})
+        expected = [0.0, 0.0, 0.25]
+        for scores in (reranker.scores(items), self._python_scores(reranker, items)):
+            for left, right in zip(scores, expected):
+                self.assertAlmostEqual(left, right)
+
+    @staticmethod
+    def _python_scores(reranker: WeightedReranker, items: list) -> list:
+        with mock.patch.object(rerank_module, "_np", None):
+            return reranker.scores(items)
+
+    def test_ties_keep_server_order(self) -> None:
+        items = [{"id": str(index), "hybrid_score": 0.5} for index in range(5)]
+        ranked = WeightedReranker().rerank(items, limit=5)
+        self.assertEqual([item["id"] for item in ranked], ["0", "1", "2", "3", "4"])
+
+    def test_dedupe_by_signature_keeps_best(self) -> None:
+        ranked = WeightedReranker(dedupe_by=content_signature).rerank(_ITEMS, limit=4)
+        self.assertEqual([item["id"] for item in ranked], ["a", "c", "d"])
+
+    def test_rejects_unknown_weight_fields(self) -> None:
+        with self.assertRaises(ValueError):
+            WeightedReranker(weights={"score": 1.0})
+
+
+class SearchWithRerankerTest(unittest.TestCase):
+    def test_search_overfetches_and_trims_to_limit(self) -> None:
+        client = HarnessMemClient(base_url="http://example.local")
+        reranker = WeightedReranker(weights={"recency": 1.0}, overfetch=4)
+        with patch("harness_mem.client.urlopen", return_value=_FakeResponse({"ok": True, "items": _ITEMS})) as mocked:
+            result = client.search(query="x", limit=2, reranker=reranker)
+
+        payload = json.loads(mocked.call_args.args[0].data)
+        self.assertEqual(payload["limit"], 8)
+        self.assertEqual([item["id"] for item in result["items"]], ["b", "c"])
+
+    def test_overfetch_is_capped_at_server_maximum(self) -> None:
+        client = HarnessMemClient(base_url="http://example.local")
+        with patch("harness_mem.client.urlopen", return_value=_FakeResponse({"ok": True, "items": []})) as mocked:
+            client.search(query="x", limit=50, reranker=WeightedReranker(overfetch=5))
+
+        self.assertEqual(json.loads(mocked.call_args.args[0].data)["limit"], 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import unittest
+from typing import List
+
+from harness_mem import HarnessMemAPIError
+from harness_mem.instrumentation import RequestEvent
+from harness_mem.retention import RetentionExecutor
+from harness_mem.testing import FakeHarnessMemServer
+
+
+def _search_event(latency_ms: float) -> RequestEvent:
+    return RequestEvent(method="POST", endpoint="/v1/search", url="", server_latency_ms=latency_ms)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+        self.sleeps: List[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class RetentionExecutorTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = FakeHarnessMemServer().start()
+        self.client = self.server.client()
+        self.clock = FakeClock()
+        for i in range(120):
+            self.server.store.add_observation(
+                {"id": f"old_{i:03d}", "project": "p", "event_type": "tool_use" if i % 2 else "user_prompt", "content": "x"}
+            )
+        self.server.store.add_observation({"id": "other_001", "project": "q", "event_type": "tool_use"})
+
+    def tearDown(self) -> None:
+        self.server.stop()
+
+    def _executor(self, **kwargs) -> RetentionExecutor:
+        kwargs.setdefault("clock", self.clock)
+        kwargs.setdefault("sleep", self.clock.sleep)
+        kwargs.setdefault("retry_backoff_sec", 0.01)
+        return RetentionExecutor(self.client, project="p", **kwargs)
+
+    def test_deletes_filtered_feed_items(self) -> None:
+        progress: List[int] = []
+        executor = self._executor(
+            filters={"type": "tool_use", "page_size": 25}, batch_size=20, on_progress=lambda r: progress.append(r.deleted)
+        )
+        report = executor.run()
+        self.assertEqual((report.scanned, report.selected, report.deleted, report.failed), (60, 60, 60, 0))
+        self.assertEqual(len(self.server.store), 61)
+        self.assertEqual(progress, sorted(progress))
+        self.assertEqual(progress[-1], 60)
+        self.assertEqual(self.server.request_counts["/v1/observations/bulk-delete"], report.batches)
+        self.assertNotIn(executor, self.client.hooks)
+
+    def test_select_predicate_and_explicit_ids(self) -> None:
+        report = self._executor(select=lambda item: item["id"] < "old_010").run()
+        self.assertEqual((report.scanned, report.deleted), (120, 10))
+        report = self._executor().run(["old_050", "missing"])
+        self.assertEqual((report.selected, report.deleted, report.skipped), (2, 1, 1))
+
+    def test_batch_grows_while_searches_are_fast(self) -> None:
+        executor = self._executor(batch_size=10, min_batch_size=10, target_latency_ms=100)
+        executor.on_request_end(_search_event(5))
+        report = executor.run()
+        self.assertEqual(report.deleted, 120)
+        self.assertEqual(report.batches, 5)  # 10, 20, 30, 40, then the last 20 in a 50 batch
+        self.assertEqual(self.clock.sleeps, [])
+
+    def test_slow_searches_shrink_batches_and_add_pauses(self) -> None:
+        executor = self._executor(batch_size=40, min_batch_size=10, target_latency_ms=100, max_interval_sec=0.2)
+        deletes = self.client.bulk_delete_observations
+        sizes: List[int] = []
+
+        def _delete(ids):
+            sizes.append(len(ids))
+            executor.on_request_end(_search_event(400))  # interactive searches are suffering
+            return deletes(ids)
+
+        self.client.bulk_delete_observations = _delete
+        report = executor.run()
+        self.assertEqual(report.deleted, 120)
+        self.assertEqual(sizes[:4], [40, 20, 10, 10])
+        self.assertEqual(self.clock.sleeps[:3], [0.05, 0.1, 0.2])
+        self.assertEqual(max(self.clock.sleeps), 0.2)
+        self.assertEqual(report.slowdowns, report.batches)
+        self.assertEqual(report.search_latency_ms, 400)
+
+    def test_recovers_when_latency_drops(self) -> None:
+        executor = self._executor(batch_size=40, min_batch_size=10, target_latency_ms=100)
+        latencies = iter([400, 400, 10, 10, 10, 10, 10, 10, 10, 10])
+        deletes = self.client.bulk_delete_observations
+
+        def _delete(ids):
+            self.clock.now += 60  # older samples leave the window
+            executor.on_request_end(_search_event(next(latencies)))
+            return deletes(ids)
+
+        self.client.bulk_delete_observations = _delete
+        report = executor.run()
+        self.assertEqual(report.deleted, 120)
+        self.assertEqual(report.slowdowns, 2)
+        self.assertGreater(report.batch_size, 10)
+        self.assertLess(report.interval_sec, 0.05)  # pauses decay again
+
+    def test_probe_search_when_no_traffic(self) -> None:
+        report = self._executor(probe_query="anything", batch_size=50).run()
+        self.assertEqual(report.probes, 1)  # later batches reuse the probe's sample within window_sec
+        self.assertEqual(self.server.request_counts["/v1/search"], report.probes)
+        self.assertIsNotNone(report.search_latency_ms)
+
+    def test_retries_and_counts_failed_batches(self) -> None:
+        self.server.inject("/v1/observations/bulk-delete", error_rate=1.0, error_status=503)
+        report = self._executor(retries=2, batch_size=50).run()
+        self.assertEqual((report.deleted, report.failed), (0, 120))
+        self.assertEqual(len(report.errors), report.batches)
+        self.assertEqual(self.server.request_counts["/v1/observations/bulk-delete"], report.batches * 3)
+
+    def test_non_retryable_error_stops_the_job(self) -> None:
+        self.server.token = "secret"
+        with self.assertRaises(HarnessMemAPIError):
+            self._executor().run(["old_000"])
+
+    def test_dry_run_only_counts(self) -> None:
+        report = self._executor(dry_run=True).run()
+        self.assertEqual((report.selected, report.deleted, report.batches), (120, 0, 0))
+        self.assertEqual(len(self.server.store), 121)
+        self.assertNotIn("/v1/observations/bulk-delete", self.server.request_counts)
+
+    def test_validation(self) -> None:
+        with self.assertRaises(ValueError):
+            RetentionExecutor(self.client, batch_size=1000)
+        with self.assertRaises(ValueError):
+            RetentionExecutor(self.client, source="search")
+
+    def test_bulk_delete_cap_is_reported_by_fake(self) -> None:
+        with self.assertRaises(HarnessMemAPIError) as ctx:
+            self.client.bulk_delete_observations([f"id{i}" for i in range(501)])
+        self.assertIn("exceeds maximum of 500", ctx.exception.message)
+
+
+if __name__ == "__main__":
+    unittest.main()
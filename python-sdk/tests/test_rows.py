@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import json
+import pickle
+import unittest
+from unittest.mock import patch
+
+from harness_mem.client import HarnessMemClient
+from harness_mem.rows import LAZY_ROWS_AVAILABLE, ObservationRow, ObservationRows
+
+
+class _FakeResponse:
+    def __init__(self, payload: dict) -> None:
+        self._raw = json.dumps(payload).encode("utf-8")
+
+    def read(self) -> bytes:
+        return self._raw
+
+    def __enter__(self) -> "_FakeResponse":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
+def _item(index: int) -> dict:
+    return {
+        "id": f"obs-{index}",
+        "project": "proj",
+        "platform": "claude",
+        "session_id": "session-1",
+        "title": f"title {index}",
+        "content": "content",
+        "tags": ["decision", "perf"],
+        "hybrid_score": 0.5,
+        "observation_type": "decision",
+    }
+
+
+_PAYLOAD = {"ok": True, "source": "core", "items": [_item(1), _item(2)], "meta": {"count": 2}}
+
+
+class ObservationRowTest(unittest.TestCase):
+    def test_row_behaves_like_the_source_dict(self) -> None:
+        source = _item(1)
+        row = ObservationRow(source)
+
+        self.assertEqual(row["title"], "title 1")
+        self.assertEqual(row.get("tags"), ["decision", "perf"])
+        self.assertEqual(row["observation_type"], "decision")
+        self.assertIsNone(row.get("rerank_score"))
+        self.assertNotIn("rerank_score", row)
+        self.assertIn("observation_type", row)
+        self.assertEqual(dict(row), source)
+        self.assertEqual(row, source)
+        self.assertEqual(len(row), len(source))
+
+    def test_row_is_slotted_and_read_only(self) -> None:
+        row = ObservationRow(_item(1))
+        self.assertFalse(hasattr(row, "__dict__"))
+        with self.assertRaises(AttributeError):
+            row.title = "changed"  # type: ignore[misc]
+
+    def test_repeated_values_are_shared_across_rows(self) -> None:
+        first = ObservationRow(_item(1))
+        second = ObservationRow(json.loads(json.dumps(_item(2))))
+        self.assertIs(object.__getattribute__(first, "tags"), object.__getattribute__(second, "tags"))
+        self.assertIs(object.__getattribute__(first, "project"), object.__getattribute__(second, "project"))
+
+    def test_row_pickles_round_trip(self) -> None:
+        row = ObservationRow(_item(3))
+        self.assertEqual(pickle.loads(pickle.dumps(row)), row)
+
+    def test_rows_container_supports_slicing_and_to_dicts(self) -> None:
+        rows = ObservationRows([_item(1), _item(2), _item(3)])
+        self.assertEqual(len(rows[1:]), 2)
+        self.assertEqual(rows.to_dicts()[0], _item(1))
+
+
+class ClientResultModeTest(unittest.TestCase):
+    def test_rejects_unknown_result_mode(self) -> None:
+        with self.assertRaises(ValueError):
+            HarnessMemClient(result_mode="columns")
+
+    def test_rows_mode_wraps_search_items(self) -> None:
+        client = HarnessMemClient(base_url="http://example.local", result_mode="rows")
+        with patch("harness_mem.client.urlopen", return_value=_FakeResponse(_PAYLOAD)):
+            result = client.search(query="x")
+
+        self.assertIsInstance(result["items"], ObservationRows)
+        self.assertEqual([row["id"] for row in result["items"]], ["obs-1", "obs-2"])
+        self.assertEqual(result["meta"]["count"], 2)
+
+    def test_rows_mode_leaves_other_endpoints_alone(self) -> None:
+        client = HarnessMemClient(base_url="http://example.local", result_mode="rows")
+        with patch("harness_mem.client.urlopen", return_value=_FakeResponse({"ok": True, "items": [{"a": 1}]})):
+            result = client.audit_log()
+        self.assertIsInstance(result["items"], list)
+
+    @unittest.skipUnless(LAZY_ROWS_AVAILABLE, "msgspec is not installed")
+    def test_lazy_mode_decodes_rows_on_access(self) -> None:
+        client = HarnessMemClient(base_url="http://example.local", result_mode="lazy")
+        with patch("harness_mem.client.urlopen", return_value=_FakeResponse(_PAYLOAD)):
+            result = client.feed()
+
+        items = result["items"]
+        self.assertEqual(len(items), 2)
+        self.assertIsInstance(items[0], ObservationRow)
+        self.assertEqual(items[1]["title"], "title 2")
+        self.assertEqual(items[1]["tags"], ["decision", "perf"])
+        self.assertTrue(result["ok"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import threading
+import time
+import unittest
+
+from harness_mem import HarnessMemAPIError
+from harness_mem.signals import SignalInbox
+from harness_mem.testing import FakeHarnessMemServer
+
+
+class SignalClientTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = FakeHarnessMemServer().start()
+        self.client = self.server.client()
+
+    def tearDown(self) -> None:
+        self.server.stop()
+
+    def test_send_read_ack(self) -> None:
+        sent = self.client.send_signal(from_agent="planner", to="worker", content="start", project="demo")
+        signal_id = sent["signal"]["signalId"]
+
+        signals = self.client.read_signals(agent_id="worker", project="demo")["signals"]
+        self.assertEqual([signal["signalId"] for signal in signals], [signal_id])
+        self.assertEqual(signals[0]["from"], "planner")
+        self.assertEqual(self.client.read_signals(agent_id="someone-else", project="demo")["signals"], [])
+
+        self.client.ack_signal(signal_id=signal_id, agent_id="worker")
+        self.assertEqual(self.client.read_signals(agent_id="worker", project="demo")["signals"], [])
+        with self.assertRaises(HarnessMemAPIError) as ctx:
+            self.client.ack_signal(signal_id=signal_id, agent_id="worker")
+        self.assertEqual(ctx.exception.message, "already_acked")
+
+
+class SignalInboxTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = FakeHarnessMemServer(publish_signals=True, stream_ping_sec=0.2).start()
+        self.client = self.server.client()
+
+    def tearDown(self) -> None:
+        self.server.stop()
+
+    def _send(self, count: int, to: str = "worker") -> None:
+        for index in range(count):
+            self.client.send_signal(from_agent="planner", to=to, content=f"job {index}", project="demo")
+
+    def test_full_batches_are_repolled_immediately(self) -> None:
+        self._send(5)
+        inbox = SignalInbox(self.client, "worker", project="demo", batch_size=2)
+        first = inbox.poll()
+        self.assertEqual(len(first), 2)
+        self.assertEqual(inbox.interval_sec, 0.0)
+        inbox.ack(first)
+        inbox.ack(inbox.poll())
+        self.assertEqual(len(inbox.poll()), 1)
+        self.assertEqual(inbox.interval_sec, inbox.min_interval_sec)
+        inbox.close()
+
+    def test_idle_polls_back_off_to_the_cap(self) -> None:
+        inbox = SignalInbox(
+            self.client, "worker", project="demo", min_interval_sec=0.1, max_interval_sec=0.5
+        )
+        intervals = []
+        for _ in range(4):
+            inbox.poll()
+            intervals.append(inbox.interval_sec)
+        self.assertEqual(intervals, [0.2, 0.4, 0.5, 0.5])
+        inbox.close()
+
+    def test_consume_acks_in_batches(self) -> None:
+        self._send(7)
+        stop = threading.Event()
+        inbox = SignalInbox(self.client, "worker", project="demo", batch_size=3)
+        seen = []
+        for signal in inbox.consume(stop=stop):
+            seen.append(signal["content"])
+            if len(seen) == 7:
+                stop.set()
+        inbox.close()
+
+        self.assertEqual(seen, [f"job {index}" for index in range(7)])
+        self.assertEqual(self.server.request_counts["/v1/signal/read"], 3)
+        self.assertEqual(inbox.stats()["acked"], 7)
+        self.assertEqual(self.client.read_signals(agent_id="worker", project="demo")["signals"], [])
+
+    def test_ack_treats_already_acked_as_done(self) -> None:
+        self._send(3)
+        inbox = SignalInbox(self.client, "worker", project="demo")
+        signals = inbox.poll()
+        self.client.ack_signal(signal_id=signals[0]["signalId"], agent_id="worker")
+        self.assertEqual(inbox.ack(signals), 3)
+        self.assertEqual(inbox.ack(["missing"]), 0)
+        self.assertEqual(inbox.stats()["ack_failures"], 1)
+        inbox.close()
+
+    def test_stream_wakes_an_idle_inbox(self) -> None:
+        inbox = SignalInbox(
+            self.client, "worker", project="demo", min_interval_sec=5.0, max_interval_sec=10.0, wake_on_stream=True
+        )
+        received = []
+        done = threading.Event()
+
+        def _consume() -> None:
+            for signal in inbox.consume():
+                received.append((time.monotonic(), signal))
+                done.set()
+                return
+
+        consumer = threading.Thread(target=_consume)
+        consumer.start()
+        deadline = time.monotonic() + 5
+        while inbox.stream_state != "connected" and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.05)
+
+        sent_at = time.monotonic()
+        self._send(1)
+        self.assertTrue(done.wait(3))
+        consumer.join(timeout=5)
+        inbox.close()
+
+        self.assertLess(received[0][0] - sent_at, 1.0)
+        self.assertGreaterEqual(inbox.stats()["wakeups"], 1)
+
+    def test_stream_ignores_signals_for_other_agents(self) -> None:
+        inbox = SignalInbox(self.client, "worker", project="demo", wake_on_stream=True)
+        inbox.wait(timeout=0)
+        deadline = time.monotonic() + 5
+        while inbox.stream_state != "connected" and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.05)
+        self._send(1, to="reviewer")
+        self.assertFalse(inbox.wait(timeout=0.3))
+        inbox.close()
+
+    def test_stream_is_opt_in(self) -> None:
+        inbox = SignalInbox(self.client, "worker", project="demo")
+        inbox.wait(timeout=0)
+        self.assertEqual(inbox.stream_state, "off")
+        inbox.close()
+
+    def test_invalid_options(self) -> None:
+        with self.assertRaises(ValueError):
+            SignalInbox(self.client, "")
+        with self.assertRaises(ValueError):
+            SignalInbox(self.client, "a", min_interval_sec=2, max_interval_sec=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
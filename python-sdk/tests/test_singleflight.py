@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from harness_mem.client import HarnessMemClient
+from harness_mem.errors import HarnessMemTransportError
+from harness_mem.singleflight import SingleFlight, canonical_key
+
+
+class _FakeResponse:
+    def __init__(self, payload: dict) -> None:
+        self._raw = json.dumps(payload).encode("utf-8")
+
+    def read(self) -> bytes:
+        return self._raw
+
+    def __enter__(self) -> "_FakeResponse":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
+def _run_concurrently(count: int, target) -> list:
+    results: list = [None] * count
+    barrier = threading.Barrier(count)
+
+    def _worker(index: int) -> None:
+        barrier.wait()
+        try:
+            results[index] = target()
+        except Exception as exc:  # noqa: BLE001
+            results[index] = exc
+
+    threads = [threading.Thread(target=_worker, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    return results
+
+
+class SingleFlightTest(unittest.TestCase):
+    def test_canonical_key_ignores_key_order(self) -> None:
+        self.assertEqual(
+            canonical_key("post", "/v1/search", {"a": 1, "b": 2}),
+            canonical_key("POST", "/v1/search", {"b": 2, "a": 1}),
+        )
+
+    def test_concurrent_callers_share_one_execution(self) -> None:
+        group = SingleFlight()
+        calls = []
+
+        def _slow() -> dict:
+            calls.append(1)
+            time.sleep(0.1)
+            return {"ok": True}
+
+        results = _run_concurrently(6, lambda: group.do("k", _slow))
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(result == {"ok": True} for result in results))
+        self.assertEqual(group.stats(), {"executed": 1, "deduplicated": 5, "in_flight": 0})
+
+    def test_errors_propagate_to_every_waiter(self) -> None:
+        group = SingleFlight()
+
+        def _boom() -> dict:
+            time.sleep(0.1)
+            raise RuntimeError("daemon down")
+
+        results = _run_concurrently(4, lambda: group.do("k", _boom))
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+
+    def test_sequential_calls_are_not_cached(self) -> None:
+        group = SingleFlight()
+        group.do("k", lambda: 1)
+        group.do("k", lambda: 2)
+        self.assertEqual(group.stats()["executed"], 2)
+
+    def test_window_reuses_recent_results(self) -> None:
+        group = SingleFlight(window_sec=0.5)
+        self.assertEqual(group.do("k", lambda: {"n": 1}), {"n": 1})
+        self.assertEqual(group.do("k", lambda: {"n": 2}), {"n": 1})
+        self.assertEqual(group.stats(), {"executed": 1, "deduplicated": 1, "in_flight": 0})
+        group.forget()
+        self.assertEqual(group.do("k", lambda: {"n": 3}), {"n": 3})
+
+    def test_window_does_not_keep_errors(self) -> None:
+        group = SingleFlight(window_sec=0.5)
+
+        def _boom() -> int:
+            raise RuntimeError("daemon down")
+
+        with self.assertRaises(RuntimeError):
+            group.do("k", _boom)
+        self.assertEqual(group.do("k", lambda: 2), 2)
+
+
+class ClientCoalescingTest(unittest.TestCase):
+    def test_identical_concurrent_searches_send_one_request(self) -> None:
+        client = HarnessMemClient(base_url="http://example.local", coalesce=True)
+
+        def _slow_urlopen(*args, **kwargs):
+            time.sleep(0.1)
+            return _FakeResponse({"ok": True, "items": [{"id": "obs-1"}]})
+
+        with patch("harness_mem.client.urlopen", side_effect=_slow_urlopen) as mocked:
+            results = _run_concurrently(5, lambda: client.search(query="q", project="p"))
+
+        self.assertEqual(mocked.call_count, 1)
+        self.assertTrue(all(result["items"][0]["id"] == "obs-1" for result in results))
+        self.assertEqual(client.coalesce_stats()["deduplicated"], 4)
+
+    def test_writes_are_never_coalesced(self) -> None:
+        client = HarnessMemClient(base_url="http://example.local", coalesce=True)
+
+        def _slow_urlopen(*args, **kwargs):
+            time.sleep(0.05)
+            return _FakeResponse({"ok": True, "items": []})
+
+        with patch("harness_mem.client.urlopen", side_effect=_slow_urlopen) as mocked:
+            _run_concurrently(3, lambda: client.record_event({"event_type": "checkpoint"}))
+
+        self.assertEqual(mocked.call_count, 3)
+
+    def test_transport_error_is_shared(self) -> None:
+        client = HarnessMemClient(base_url="http://example.local", coalesce=True)
+
+        def _failing_urlopen(*args, **kwargs):
+            time.sleep(0.1)
+            raise OSError("connection refused")
+
+        with patch("harness_mem.client.urlopen", side_effect=_failing_urlopen) as mocked:
+            results = _run_concurrently(3, lambda: client.resume_pack(project="p"))
+
+        self.assertEqual(mocked.call_count, 1)
+        self.assertTrue(all(isinstance(result, HarnessMemTransportError) for result in results))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+import time
+import unittest
+from typing import Dict, List, Optional
+
+from harness_mem import HarnessMemAPIError
+from harness_mem.sync import SyncEngine, SyncState
+from harness_mem.testing import FakeHarnessMemServer
+
+
+def _ts(n: int) -> str:
+    return f"2026-01-01T00:{n // 60:02d}:{n % 60:02d}.000Z"
+
+
+class LocalStore:
+    """A device's record store; ``since`` is ignored so the engine's own filtering is exercised."""
+
+    def __init__(self) -> None:
+        self.records: Dict[str, dict] = {}
+        self.applied: List[List[dict]] = []
+
+    def write(self, record_id: str, content: str, n: int) -> None:
+        self.records[record_id] = {"id": record_id, "content": content, "updated_at": _ts(n)}
+
+    def changed_since(self, since: Optional[str]) -> List[dict]:
+        return list(self.records.values())
+
+    def upsert_many(self, records: List[dict]) -> None:
+        self.applied.append(records)
+        for record in records:
+            self.records[record["id"]] = dict(record)
+
+
+class SyncClientTest(unittest.TestCase):
+    def test_push_and_pull(self) -> None:
+        with FakeHarnessMemServer() as server:
+            client = server.client()
+            response = client.sync_push(device_id="a", records=[{"id": "r1", "content": "x", "updated_at": _ts(1)}])
+            self.assertEqual(response["items"][0]["conflicts"], [])
+            pulled = client.sync_pull(since=_ts(0))["items"][0]["records"]
+            self.assertEqual([(r["id"], r["device_id"]) for r in pulled], [("r1", "a")])
+            self.assertEqual(client.sync_pull(since=_ts(1))["items"][0]["records"], [])
+            with self.assertRaises(HarnessMemAPIError) as ctx:
+                client.sync_push(device_id="", records=[])
+            self.assertEqual(ctx.exception.status_code, 400)
+
+
+class SyncEngineTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = FakeHarnessMemServer().start()
+        self.client = self.server.client()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.state_path = os.path.join(self.tmp.name, "sync.json")
+
+    def tearDown(self) -> None:
+        self.server.stop()
+        self.tmp.cleanup()
+
+    def _engine(self, store: LocalStore, device_id: str = "laptop", **kwargs) -> SyncEngine:
+        kwargs.setdefault("retry_backoff_sec", 0.01)
+        kwargs.setdefault("state_path", self.state_path)
+        return SyncEngine(
+            self.client, device_id=device_id, source=store.changed_since, apply=store.upsert_many, **kwargs
+        )
+
+    def test_pushes_only_the_delta(self) -> None:
+        store = LocalStore()
+        for i in range(5):
+            store.write(f"r{i}", f"v{i}", i)
+        report = self._engine(store).sync()
+        self.assertEqual((report.pushed, report.batches), (5, 1))
+        self.assertEqual(report.push_mark, _ts(4))
+        self.assertEqual(self.server.sync.records["r0"]["device_id"], "laptop")
+
+        report = self._engine(store).sync()
+        self.assertEqual((report.pushed, report.skipped, report.batches), (0, 5, 0))
+
+        store.write("r1", "v1 edited", 10)
+        store.write("r9", "new", 10)
+        engine = self._engine(store)
+        self.assertEqual([r["id"] for r in engine.pending()], ["r1", "r9"])
+        self.assertEqual(engine.sync().pushed, 2)
+        self.assertEqual(self.server.sync.records["r1"]["content"], "v1 edited")
+
+    def test_records_sharing_the_mark_timestamp(self) -> None:
+        store = LocalStore()
+        store.write("a", "1", 5)
+        self._engine(store).sync()
+        store.write("b", "2", 5)  # same updated_at as the mark, not yet pushed
+        self.assertEqual([r["id"] for r in self._engine(store).pending()], ["b"])
+        self._engine(store).sync()
+        self.assertEqual(self._engine(store).pending(), [])
+        self.assertEqual(sorted(SyncState(self.state_path).peers[f"laptop@{self.client.base_url}"]["push_mark_ids"]), ["a", "b"])
+
+    def test_batches_respect_count_and_byte_limits(self) -> None:
+        store = LocalStore()
+        for i in range(25):
+            store.write(f"r{i:02d}", "x" * 100, i)
+        report = self._engine(store, batch_size=10, target_push_ms=10_000).sync()
+        self.assertEqual(report.pushed, 25)
+        self.assertEqual(self.server.sync.pushes[0], 10)
+        self.assertGreater(report.batch_size, 10)  # fast pushes grow the batch
+
+        self.server.sync.records.clear()
+        self.server.sync.pushes.clear()
+        os.remove(self.state_path)
+        report = self._engine(store, max_batch_bytes=600).sync()
+        self.assertEqual(report.pushed, 25)
+        self.assertTrue(all(count <= 4 for count in self.server.sync.pushes))
+
+    def test_slow_pushes_shrink_the_batch(self) -> None:
+        store = LocalStore()
+        for i in range(40):
+            store.write(f"r{i:02d}", "x", i)
+        self.server.inject("/v1/sync/push", latency_ms=30)
+        report = self._engine(store, batch_size=16, target_push_ms=10).sync()
+        self.assertEqual(report.pushed, 40)
+        self.assertEqual(self.server.sync.pushes[:3], [16, 8, 4])
+        self.assertEqual(report.batch_size, 1)
+
+    def test_oversized_batch_is_split(self) -> None:
+        self.server.sync.max_push_records = 3
+        store = LocalStore()
+        for i in range(10):
+            store.write(f"r{i}", "x", i)
+        report = self._engine(store, batch_size=8).sync()
+        self.assertEqual(report.pushed, 10)
+        self.assertGreater(report.splits, 0)
+        self.assertEqual(len(self.server.sync.records), 10)
+        self.assertTrue(all(count <= 3 for count in self.server.sync.pushes[1:]))
+
+    def test_retries_transient_errors(self) -> None:
+        store = LocalStore()
+        store.write("r1", "x", 1)
+        self.server.inject("/v1/sync/push", error_rate=0.5, error_status=503)
+        self.server._random.seed(3)
+        self.assertEqual(self._engine(store, retries=10).sync().pushed, 1)
+
+    def test_resumes_after_interruption(self) -> None:
+        store = LocalStore()
+        for i in range(9):
+            store.write(f"r{i}", "x", i)
+        engine = self._engine(store, batch_size=3, target_push_ms=10_000)
+        push = self.client.sync_push
+        calls = 0
+
+        def _flaky(**kwargs):
+            nonlocal calls
+            calls += 1
+            if calls == 2:
+                raise KeyboardInterrupt
+            return push(**kwargs)
+
+        self.client.sync_push = _flaky
+        with self.assertRaises(KeyboardInterrupt):
+            engine.sync()
+        self.assertEqual(engine.push_mark, _ts(2))  # the first batch was acknowledged
+        self.client.sync_push = push
+        report = self._engine(store).sync()
+        self.assertEqual(report.pushed, 6)
+        self.assertEqual(len(self.server.sync.records), 9)
+
+    def test_two_devices_converge_without_echo(self) -> None:
+        laptop, desktop = LocalStore(), LocalStore()
+        laptop.write("note", "from laptop", 1)
+        desktop.write("todo", "from desktop", 2)
+        self._engine(laptop, "laptop", state_path=os.path.join(self.tmp.name, "l.json")).sync()
+        report = self._engine(desktop, "desktop", state_path=os.path.join(self.tmp.name, "d.json")).sync()
+        self.assertEqual(report.pushed, 1)
+        self.assertIn("note", desktop.records)
+
+        report = self._engine(laptop, "laptop", state_path=os.path.join(self.tmp.name, "l.json")).sync()
+        self.assertEqual(report.pushed, 0)  # the pulled "todo" is desktop's and is not echoed back
+        self.assertEqual([r["id"] for batch in laptop.applied for r in batch], ["todo"])
+        self.assertEqual(sorted(laptop.records), sorted(desktop.records))
+
+        report = self._engine(laptop, "laptop", state_path=os.path.join(self.tmp.name, "l.json")).sync()
+        self.assertEqual((report.pushed, report.pulled), (0, 0))
+
+    def test_conflict_winner_from_another_device_is_applied(self) -> None:
+        self.client.sync_push(
+            device_id="desktop", records=[{"id": "doc", "content": "newer", "updated_at": _ts(20), "device_id": "desktop"}]
+        )
+        laptop = LocalStore()
+        laptop.write("doc", "older", 10)
+        engine = SyncEngine(self.client, device_id="laptop", source=laptop.changed_since, apply=laptop.upsert_many)
+        pull = engine._pull
+        engine._pull = lambda mark: (time.sleep(0.05), pull(mark))[1]  # keep the pull in flight past the push
+        report = engine.sync()
+        self.assertEqual(report.conflicts, 1)
+        self.assertEqual(laptop.records["doc"]["content"], "newer")
+        self.assertEqual(engine.pending(), [])
+
+    def test_pull_runs_alongside_push(self) -> None:
+        store = LocalStore()
+        for i in range(6):
+            store.write(f"r{i}", "x", i)
+        self.server.inject("/v1/sync/push", latency_ms=40)
+        self.server.inject("/v1/sync/pull", latency_ms=150)
+        overlap = threading.Event()
+        push = self.client.sync_push
+        pull = self.client.sync_pull
+        in_pull = threading.Event()
+
+        def _pull(**kwargs):
+            in_pull.set()
+            try:
+                return pull(**kwargs)
+            finally:
+                in_pull.clear()
+
+        def _push(**kwargs):
+            response = push(**kwargs)
+            if in_pull.is_set():
+                overlap.set()
+            return response
+
+        self.client.sync_pull = _pull
+        self.client.sync_push = _push
+        self._engine(store, batch_size=2, target_push_ms=10_000).sync()
+        self.assertTrue(overlap.is_set())
+
+    def test_push_only_without_apply(self) -> None:
+        store = LocalStore()
+        store.write("r1", "x", 1)
+        engine = SyncEngine(self.client, device_id="cli", source=store.changed_since)
+        self.assertEqual(engine.sync().pushed, 1)
+        self.assertEqual(self.server.request_counts.get("/v1/sync/pull", 0), 0)
+
+    def test_validation(self) -> None:
+        with self.assertRaises(ValueError):
+            SyncEngine(self.client, device_id="", source=lambda since: [])
+        with self.assertRaises(ValueError):
+            SyncEngine(self.client, device_id="d", source=lambda since: [], conflict_policy="mine")
+        engine = SyncEngine(self.client, device_id="d", source=lambda since: [{"id": "x"}])
+        with self.assertRaises(ValueError):
+            engine.sync()
+
+
+if __name__ == "__main__":
+    unittest.main()
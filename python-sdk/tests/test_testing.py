@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+import unittest
+from urllib.request import Request, urlopen
+
+from harness_mem.errors import HarnessMemAPIError
+from harness_mem.testing import FakeHarnessMemServer, FakeStore
+
+
+def _event(content: str, *, session_id: str = "s1", project: str = "demo", **extra) -> dict:
+    return {
+        "platform": "claude",
+        "project": project,
+        "session_id": session_id,
+        "event_type": "user_prompt",
+        "payload": {"content": content},
+        **extra,
+    }
+
+
+class FakeHarnessMemServerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = FakeHarnessMemServer(seed=1).start()
+        self.addCleanup(self.server.stop)
+        self.client = self.server.client()
+
+    def test_record_search_get_round_trip(self) -> None:
+        first = self.client.record_event(_event("sqlite wal checkpoint"))["items"][0]
+        self.client.record_event(_event("unrelated note"))
+        self.client.record_event(_event("secret wal", privacy_tags=["private"]))
+
+        hits = self.client.search(query="wal checkpoint", project="demo")["items"]
+        self.assertEqual([item["id"] for item in hits], [first["id"]])
+        self.assertGreater(hits[0]["hybrid_score"], 0)
+        self.assertEqual(len(self.client.search(query="wal", include_private=True)["items"]), 2)
+
+        fetched = self.client.get_observations(ids=[first["id"], "obs_missing"])
+        self.assertEqual([item["content"] for item in fetched["items"]], ["sqlite wal checkpoint"])
+        self.assertTrue(self.client.health()["ok"])
+
+    def test_dedupe_by_event_id(self) -> None:
+        first = self.client.record_event(_event("once", event_id="evt_1"))["items"][0]
+        second = self.client.record_event(_event("once", event_id="evt_1"))["items"][0]
+        self.assertEqual(first["id"], second["id"])
+        self.assertTrue(second["deduped"])
+
+    def test_timeline_resume_pack_and_feed_paging(self) -> None:
+        ids = [self.client.record_event(_event(f"step {index}"))["items"][0]["id"] for index in range(5)]
+        self.client.record_event(_event("other session", session_id="s2"))
+
+        timeline = self.client.timeline(ids[2], before=1, after=1)["items"]
+        self.assertEqual([item["id"] for item in timeline], ids[1:4])
+        self.assertEqual([item["position"] for item in timeline], ["before", "center", "after"])
+
+        pack = self.client.resume_pack(project="demo", session_id="s2", limit=2)["items"]
+        self.assertEqual([item["id"] for item in pack], [ids[4], ids[3]])
+
+        pages = list(self.client.iter_feed(page_size=2, project="demo"))
+        self.assertEqual(len(pages), 6)
+        self.assertEqual(pages[-1]["id"], ids[0])
+
+    def test_error_injection(self) -> None:
+        self.server.inject("/v1/search", error_rate=1.0, error_status=503)
+        with self.assertRaises(HarnessMemAPIError) as ctx:
+            self.client.search(query="anything")
+        self.assertEqual(ctx.exception.status_code, 503)
+        self.assertEqual(self.server.injected_errors, 1)
+        self.assertTrue(self.client.health()["ok"])
+
+    def test_latency_injection(self) -> None:
+        self.server.inject("/health", latency_ms=50)
+        started = time.perf_counter()
+        self.client.health()
+        self.assertGreaterEqual(time.perf_counter() - started, 0.05)
+
+    def test_token_is_enforced(self) -> None:
+        server = FakeHarnessMemServer(token="secret").start()
+        self.addCleanup(server.stop)
+        self.assertTrue(server.client().health()["ok"])
+        with self.assertRaises(HarnessMemAPIError) as ctx:
+            server.client(token="wrong").health()
+        self.assertEqual(ctx.exception.status_code, 401)
+
+    def test_stream_delivers_new_observations(self) -> None:
+        received: list = []
+        ready = threading.Event()
+
+        def _read() -> None:
+            with urlopen(Request(f"{self.server.base_url}/v1/stream?project=demo"), timeout=5) as response:
+                event = None
+                for raw_line in response:
+                    line = raw_line.decode("utf-8").strip()
+                    if line.startswith("event: "):
+                        event = line[len("event: "):]
+                    elif line.startswith("data: "):
+                        if event == "ready":
+                            ready.set()
+                        elif event == "observation.created":
+                            received.append(json.loads(line[len("data: "):]))
+                            return
+
+        reader = threading.Thread(target=_read, daemon=True)
+        reader.start()
+        self.assertTrue(ready.wait(timeout=5))
+        created = self.client.record_event(_event("streamed"))["items"][0]
+        reader.join(timeout=5)
+        self.assertEqual([item["id"] for item in received], [created["id"]])
+
+
+
+class FakeStoreTest(unittest.TestCase):
+    def test_deleted_items_leave_timeline_resume_pack_and_feed(self) -> None:
+        store = FakeStore()
+        ids = [store.record_event(_event(f"step {index}"))["id"] for index in range(5)]
+        self.assertEqual(store.delete([ids[2], ids[2], "missing"]), 1)
+        self.assertEqual(len(store), 4)
+        self.assertEqual([item["id"] for item in store.timeline(ids[1], before=1, after=1)], [ids[0], ids[1], ids[3]])
+        self.assertEqual([item["id"] for item in store.resume_pack("demo", limit=3)], [ids[4], ids[3], ids[1]])
+        page, cursor = store.feed(limit=2)
+        self.assertEqual([item["id"] for item in page], [ids[4], ids[3]])
+        page, cursor = store.feed(cursor=cursor, limit=2)
+        self.assertEqual([item["id"] for item in page], [ids[1], ids[0]])
+        self.assertIsNone(cursor)
+
+    def test_event_log_keeps_the_newest_events(self) -> None:
+        store = FakeStore(max_events=3)
+        for index in range(5):
+            store.publish("signal.sent", {"index": index})
+        self.assertEqual(store.latest_event_id(), 5)
+        self.assertEqual([event_id for event_id, _, _ in store.events_since(0)], [3, 4, 5])
+        self.assertEqual([data["index"] for _, _, data in store.events_since(3)], [3, 4])
+        self.assertEqual(store.events_since(5), [])
+        self.assertFalse(store.wait_for_events(5, timeout=0))
+
+    def test_bulk_delete_reports_missing_ids_as_skipped(self) -> None:
+        with FakeHarnessMemServer() as server:
+            created = server.store.record_event(_event("doomed"))["id"]
+            body = json.dumps({"ids": [created, "missing", created]}).encode("utf-8")
+            request = Request(f"{server.base_url}/v1/observations/bulk-delete", data=body, method="POST",
+                              headers={"content-type": "application/json"})
+            with urlopen(request, timeout=5) as response:
+                result = json.loads(response.read())["items"][0]
+        self.assertEqual(result, {"deleted": [created], "skipped": ["missing"]})
+
+
+if __name__ == "__main__":
+    unittest.main()